@@ -0,0 +1,33 @@
+"""add search settings embedding precision
+
+Revision ID: 6a3f2c81be57
+Revises: d4e7a9c21f38
+Create Date: 2025-02-17 09:41:12.527310
+
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "6a3f2c81be57"
+down_revision = "d4e7a9c21f38"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "search_settings",
+        sa.Column(
+            "embedding_precision",
+            sa.Enum("FLOAT", "BFLOAT16", name="embeddingprecision", native_enum=False),
+            nullable=False,
+            server_default="FLOAT",
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("search_settings", "embedding_precision")
@@ -0,0 +1,28 @@
+"""add index attempt checkpoint
+
+Revision ID: 8b2f1d6c4e90
+Revises: 3c9a1e7d52b4
+Create Date: 2025-02-12 15:31:08.417224
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "8b2f1d6c4e90"
+down_revision = "3c9a1e7d52b4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "index_attempt",
+        sa.Column("checkpoint", postgresql.JSONB(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("index_attempt", "checkpoint")
@@ -0,0 +1,33 @@
+"""file store object storage
+
+Revision ID: b8e1f4d2c7a9
+Revises: 6a3f2c81be57
+Create Date: 2025-02-19 11:02:45.118204
+
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "b8e1f4d2c7a9"
+down_revision = "6a3f2c81be57"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("file_store", sa.Column("bucket_name", sa.String(), nullable=True))
+    op.add_column("file_store", sa.Column("object_key", sa.String(), nullable=True))
+    op.alter_column("file_store", "lobj_oid", existing_type=sa.Integer(), nullable=True)
+
+
+def downgrade() -> None:
+    # fails while files are in object storage, move them back to Postgres first with
+    # scripts/migrate_file_store.py --to postgres
+    op.alter_column(
+        "file_store", "lobj_oid", existing_type=sa.Integer(), nullable=False
+    )
+    op.drop_column("file_store", "object_key")
+    op.drop_column("file_store", "bucket_name")
@@ -0,0 +1,28 @@
+"""add index attempt performance profile
+
+Revision ID: d4e7a9c21f38
+Revises: 8b2f1d6c4e90
+Create Date: 2025-02-14 10:12:45.103387
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "d4e7a9c21f38"
+down_revision = "8b2f1d6c4e90"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "index_attempt",
+        sa.Column("performance_profile", postgresql.JSONB(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("index_attempt", "performance_profile")
@@ -0,0 +1,145 @@
+import asyncio
+import time
+from collections.abc import Callable
+from collections.abc import Hashable
+from dataclasses import dataclass
+from dataclasses import field
+
+from onyx.utils.logger import setup_logger
+from shared_configs.model_server_models import Embedding
+from shared_configs.utils import batch_by_token_budget
+
+logger = setup_logger()
+
+# Runs a CPU-bound encode of a list of texts, called from a worker thread
+EncodeFunction = Callable[[list[str]], list[Embedding]]
+
+
+@dataclass
+class _PendingRequest:
+    texts: list[str]
+    future: asyncio.Future[list[Embedding]]
+    enqueued: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class _PendingGroup:
+    encode_fn: EncodeFunction
+    requests: list[_PendingRequest] = field(default_factory=list)
+    num_texts: int = 0
+    flush_handle: asyncio.TimerHandle | None = None
+
+
+class EmbeddingBatcher:
+    """Coalesces concurrent embedding requests for the same local model into shared
+    forward passes.
+
+    Requests with the same batch key (model + everything that changes the output) that
+    arrive within `max_wait_ms` of the first one are merged, up to `max_batch_texts`
+    texts. The merged texts are sorted by length and split into sub-batches whose padded
+    size (texts in the sub-batch * longest text, in characters as a proxy for tokens)
+    stays within `max_padded_chars`, so a single long text does not inflate the padding
+    of many short ones. Embeddings are handed back to each request in its own order.
+
+    Requests which are already large on their own skip the wait and go straight through.
+    """
+
+    def __init__(
+        self,
+        max_wait_ms: float,
+        max_batch_texts: int,
+        max_padded_chars: int,
+    ) -> None:
+        self.max_wait = max_wait_ms / 1000
+        self.max_batch_texts = max_batch_texts
+        self.max_padded_chars = max_padded_chars
+        self._groups: dict[Hashable, _PendingGroup] = {}
+        # keep references to the running encode tasks so they are not garbage collected
+        self._tasks: set[asyncio.Task] = set()
+
+        # stats, mostly for debugging / tuning the window
+        self.num_requests = 0
+        self.num_forward_batches = 0
+
+    async def embed(
+        self, batch_key: Hashable, texts: list[str], encode_fn: EncodeFunction
+    ) -> list[Embedding]:
+        loop = asyncio.get_running_loop()
+        self.num_requests += 1
+
+        if len(texts) >= self.max_batch_texts:
+            return await self._encode_texts(texts, encode_fn)
+
+        group = self._groups.get(batch_key)
+        if group is None:
+            group = _PendingGroup(encode_fn=encode_fn)
+            self._groups[batch_key] = group
+            group.flush_handle = loop.call_later(self.max_wait, self._flush, batch_key)
+
+        request = _PendingRequest(texts=texts, future=loop.create_future())
+        group.requests.append(request)
+        group.num_texts += len(texts)
+
+        if group.num_texts >= self.max_batch_texts:
+            self._flush(batch_key)
+
+        return await request.future
+
+    def _flush(self, batch_key: Hashable) -> None:
+        group = self._groups.pop(batch_key, None)
+        if group is None:
+            return
+
+        if group.flush_handle:
+            group.flush_handle.cancel()
+
+        task = asyncio.get_running_loop().create_task(self._encode_group(group))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _encode_texts(
+        self, texts: list[str], encode_fn: EncodeFunction
+    ) -> list[Embedding]:
+        sub_batches = batch_by_token_budget(
+            [len(text) for text in texts],
+            token_budget=self.max_padded_chars,
+            max_batch_size=self.max_batch_texts,
+        )
+
+        loop = asyncio.get_running_loop()
+        embeddings: list[Embedding] = [[] for _ in texts]
+        for sub_batch in sub_batches:
+            # Run CPU-bound embedding in a thread pool
+            sub_batch_embeddings = await loop.run_in_executor(
+                None, encode_fn, [texts[ind] for ind in sub_batch]
+            )
+            self.num_forward_batches += 1
+            for ind, embedding in zip(sub_batch, sub_batch_embeddings):
+                embeddings[ind] = embedding
+
+        return embeddings
+
+    async def _encode_group(self, group: _PendingGroup) -> None:
+        requests = group.requests
+        flat_texts = [text for request in requests for text in request.texts]
+        try:
+            embeddings = await self._encode_texts(flat_texts, group.encode_fn)
+        except Exception as e:
+            for request in requests:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            return
+
+        if len(requests) > 1:
+            logger.debug(
+                f"Coalesced {len(requests)} embedding requests with {len(flat_texts)} texts, "
+                f"oldest waited {time.monotonic() - requests[0].enqueued:.3f}s"
+            )
+
+        start = 0
+        for request in requests:
+            end = start + len(request.texts)
+            # the caller may have gone away (e.g. cancelled request)
+            if not request.future.done():
+                request.future.set_result(embeddings[start:end])
+            start = end
@@ -27,9 +27,13 @@ from model_server.constants import DEFAULT_VERTEX_MODEL
 from model_server.constants import DEFAULT_VOYAGE_MODEL
 from model_server.constants import EmbeddingModelTextType
 from model_server.constants import EmbeddingProvider
+from model_server.embedding_batcher import EmbeddingBatcher
 from model_server.utils import simple_log_function_time
 from onyx.utils.logger import setup_logger
 from shared_configs.configs import API_BASED_EMBEDDING_TIMEOUT
+from shared_configs.configs import EMBEDDING_COALESCE_MAX_BATCH_SIZE
+from shared_configs.configs import EMBEDDING_COALESCE_MAX_PADDED_CHARS
+from shared_configs.configs import EMBEDDING_COALESCE_WINDOW_MS
 from shared_configs.configs import INDEXING_ONLY
 from shared_configs.configs import OPENAI_EMBEDDING_TIMEOUT
 from shared_configs.enums import EmbedTextType
@@ -53,6 +57,16 @@ _RERANK_MODEL: Optional["CrossEncoder"] = None
 _RETRY_DELAY = 10 if INDEXING_ONLY else 0.1
 _RETRY_TRIES = 10 if INDEXING_ONLY else 2
 
+_EMBEDDING_BATCHER = (
+    EmbeddingBatcher(
+        max_wait_ms=EMBEDDING_COALESCE_WINDOW_MS,
+        max_batch_texts=EMBEDDING_COALESCE_MAX_BATCH_SIZE,
+        max_padded_chars=EMBEDDING_COALESCE_MAX_PADDED_CHARS,
+    )
+    if EMBEDDING_COALESCE_WINDOW_MS > 0
+    else None
+)
+
 # OpenAI only allows 2048 embeddings to be computed at once
 _OPENAI_MAX_INPUT_LEN = 2048
 # Cohere allows up to 96 embeddings in a single embedding calling
@@ -386,17 +400,28 @@ async def embed_text(
         local_model = get_embedding_model(
             model_name=model_name, max_context_length=max_context_length
         )
-        # Run CPU-bound embedding in a thread pool
-        embeddings_vectors = await asyncio.get_event_loop().run_in_executor(
-            None,
-            lambda: local_model.encode(
-                prefixed_texts, normalize_embeddings=normalize_embeddings
-            ),
-        )
-        embeddings = [
-            embedding if isinstance(embedding, list) else embedding.tolist()
-            for embedding in embeddings_vectors
-        ]
+
+        def _encode(texts_to_encode: list[str]) -> list[Embedding]:
+            embeddings_vectors = local_model.encode(
+                texts_to_encode, normalize_embeddings=normalize_embeddings
+            )
+            return [
+                embedding if isinstance(embedding, list) else embedding.tolist()
+                for embedding in embeddings_vectors
+            ]
+
+        if _EMBEDDING_BATCHER:
+            # coalesced with concurrent requests which produce comparable embeddings
+            embeddings = await _EMBEDDING_BATCHER.embed(
+                batch_key=(model_name, max_context_length, normalize_embeddings),
+                texts=prefixed_texts,
+                encode_fn=_encode,
+            )
+        else:
+            # Run CPU-bound embedding in a thread pool
+            embeddings = await asyncio.get_event_loop().run_in_executor(
+                None, _encode, prefixed_texts
+            )
 
         elapsed = time.monotonic() - start
         logger.info(
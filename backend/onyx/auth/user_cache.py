@@ -0,0 +1,355 @@
+"""Cache of the users which session tokens and API keys resolve to.
+
+Resolving the user of a request takes a Redis lookup of the session token plus a
+Postgres query for the user, or a Postgres query for the user of an API key, and in the
+multi tenant case another Redis lookup for the tenant. The results are cached in memory
+of each API server process for a few seconds.
+
+The cache is invalidated in all processes via Redis pub/sub whenever a token is
+destroyed on logout and whenever a row of the user or api_key table is changed or
+deleted through SQLAlchemy, e.g. on role changes, deactivation or API key revocation.
+Entries are only served while the invalidations can be received."""
+import copy
+import hashlib
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable
+from collections.abc import Callable
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any
+from typing import TypeVar
+
+from fastapi import Request
+from prometheus_client import Counter
+from redis.client import Redis
+from sqlalchemy import event
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm import ORMExecuteState
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import instance_state
+from sqlalchemy.orm.attributes import set_committed_value
+
+from onyx.configs.app_configs import AUTH_USER_CACHE_MAX_ENTRIES
+from onyx.configs.app_configs import AUTH_USER_CACHE_TTL_SECONDS
+from onyx.configs.constants import FASTAPI_USERS_AUTH_COOKIE_NAME
+from onyx.db.models import ApiKey
+from onyx.db.models import User
+from onyx.redis.redis_invalidation import RedisInvalidationSubscriber
+from onyx.redis.redis_pool import get_redis_client
+from onyx.redis.redis_pool import retrieve_auth_token_data_from_redis
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+AUTH_USER_CACHE_INVALIDATION_CHANNEL = "onyx_auth_user_cache_invalidation"
+
+_CHANGED_USER_IDS_KEY = "auth_user_cache_changed_user_ids"
+_ALL_USERS_CHANGED_KEY = "auth_user_cache_all_users_changed"
+
+T = TypeVar("T")
+
+auth_user_cache_lookups = Counter(
+    "onyx_auth_user_cache_lookups",
+    "Lookups of the users of session tokens and API keys in the auth user cache",
+    ["kind", "result"],
+)
+
+
+class AuthUserCacheKind(str, Enum):
+    # hashed session token -> user
+    TOKEN = "token"
+    # hashed session token -> token data with the tenant id
+    TOKEN_DATA = "token_data"
+    # tenant id and hashed API key -> user
+    API_KEY = "api_key"
+
+
+@dataclass
+class AuthUserCacheStats:
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def hash_token(token: str) -> str:
+    """Tokens are not kept in memory or published as is"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _detached_copy(instance: T, memo: dict[int, Any] | None = None) -> T:
+    """A copy of an ORM instance with the same loaded attributes, including loaded
+    relationships. It is detached, so it can be added to any session like the
+    original, and each copy can be modified and attached independently."""
+    if memo is None:
+        memo = {}
+    if id(instance) in memo:
+        return memo[id(instance)]
+
+    state = instance_state(instance)
+    mapper = state.mapper
+    instance_copy = mapper.class_manager.new_instance()
+    memo[id(instance)] = instance_copy
+    # column values can be set directly, make_transient_to_detached commits them
+    copy_dict = instance_state(instance_copy).dict
+    for attr in mapper.column_attrs:
+        if attr.key in state.dict:
+            value = state.dict[attr.key]
+            # other column values, e.g. strings, UUIDs and enums, are immutable
+            if isinstance(value, (list, dict)):
+                value = copy.deepcopy(value)
+            copy_dict[attr.key] = value
+    for relationship in mapper.relationships:
+        if relationship.key not in state.dict:
+            continue
+        value = state.dict[relationship.key]
+        if relationship.uselist:
+            value = [_detached_copy(item, memo) for item in value]
+        elif value is not None:
+            value = _detached_copy(value, memo)
+        set_committed_value(instance_copy, relationship.key, value)
+    make_transient_to_detached(instance_copy)
+    return instance_copy
+
+
+class AuthUserCache:
+    """Bounded cache of resolved users and token data which expire after
+    `ttl_seconds`. See the module docstring for how entries are invalidated."""
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        max_entries: int,
+        redis_client_factory: Callable[[], Redis],
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._redis_client_factory = redis_client_factory
+        self._stats = {kind: AuthUserCacheStats() for kind in AuthUserCacheKind}
+        self._reset()
+        self._subscriber = RedisInvalidationSubscriber(
+            channel=AUTH_USER_CACHE_INVALIDATION_CHANNEL,
+            redis_client_factory=redis_client_factory,
+            on_message=self._on_message,
+            on_subscription_change=self._set_subscribed,
+            on_fork=self._reset,
+        )
+
+    def _reset(self) -> None:
+        self._lock = threading.Lock()
+        # (kind, key) -> (expires at, user id, value)
+        self._entries: OrderedDict[
+            tuple[AuthUserCacheKind, str], tuple[float, str, Any]
+        ] = OrderedDict()
+        # changes on every invalidation, values loaded before are not added
+        self._version = 0
+        self._subscribed = False
+
+    def _on_message(self, message: dict[str, Any]) -> None:
+        if message.get("all"):
+            self.invalidate_all()
+        self.invalidate(
+            token_hashes=message.get("token_hashes", []),
+            user_ids=message.get("user_ids", []),
+        )
+
+    def _set_subscribed(self, subscribed: bool) -> None:
+        with self._lock:
+            self._subscribed = subscribed
+            self._entries.clear()
+            self._version += 1
+
+    def version(self) -> int:
+        """To be passed to `put` for a value loaded after calling this"""
+        self._subscriber.ensure_started()
+        return self._version
+
+    def get(self, kind: AuthUserCacheKind, key: str) -> Any | None:
+        """A copy of the cached value, or None"""
+        self._subscriber.ensure_started()
+        with self._lock:
+            entry = self._entries.get((kind, key))
+            if entry is not None and entry[0] < time.monotonic():
+                del self._entries[(kind, key)]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end((kind, key))
+                self._stats[kind].hits += 1
+            else:
+                self._stats[kind].misses += 1
+
+        auth_user_cache_lookups.labels(
+            kind=kind.value, result="miss" if entry is None else "hit"
+        ).inc()
+        if entry is None:
+            return None
+        value = entry[2]
+        return _detached_copy(value) if isinstance(value, User) else copy.copy(value)
+
+    def put(
+        self,
+        kind: AuthUserCacheKind,
+        key: str,
+        user_id: str,
+        value: Any,
+        version: int,
+    ) -> None:
+        value = _detached_copy(value) if isinstance(value, User) else copy.copy(value)
+        with self._lock:
+            if not self._subscribed or version != self._version:
+                return
+            self._entries[(kind, key)] = (
+                time.monotonic() + self.ttl_seconds,
+                user_id,
+                value,
+            )
+            self._entries.move_to_end((kind, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def get_or_load_user(
+        self,
+        kind: AuthUserCacheKind,
+        key: str,
+        load_user: Callable[[], Awaitable[User | None]],
+    ) -> User | None:
+        """Users which are not found are not cached"""
+        user = self.get(kind, key)
+        if user is not None:
+            return user
+
+        version = self.version()
+        user = await load_user()
+        if user is not None:
+            self.put(kind, key, str(user.id), user, version)
+        return user
+
+    def invalidate(
+        self, token_hashes: list[str] | None = None, user_ids: list[str] | None = None
+    ) -> None:
+        with self._lock:
+            self._version += 1
+            for token_hash in token_hashes or []:
+                self._entries.pop((AuthUserCacheKind.TOKEN, token_hash), None)
+                self._entries.pop((AuthUserCacheKind.TOKEN_DATA, token_hash), None)
+            if user_ids:
+                user_id_set = set(user_ids)
+                for entry_key, (_, user_id, _) in list(self._entries.items()):
+                    if user_id in user_id_set:
+                        del self._entries[entry_key]
+
+    def invalidate_all(self) -> None:
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+
+    def publish_invalidation(
+        self,
+        token_hashes: list[str] | None = None,
+        user_ids: list[str] | None = None,
+        all_users: bool = False,
+    ) -> None:
+        """Invalidates the entries in this and all other processes"""
+        if all_users:
+            self.invalidate_all()
+        self.invalidate(token_hashes=token_hashes, user_ids=user_ids)
+        self._subscriber.publish(
+            self._redis_client_factory(),
+            {
+                "token_hashes": token_hashes or [],
+                "user_ids": user_ids or [],
+                "all": all_users,
+            },
+        )
+
+    def stats(self) -> dict[AuthUserCacheKind, AuthUserCacheStats]:
+        with self._lock:
+            return {
+                kind: AuthUserCacheStats(hits=stats.hits, misses=stats.misses)
+                for kind, stats in self._stats.items()
+            }
+
+
+_AUTH_USER_CACHE = (
+    AuthUserCache(
+        ttl_seconds=AUTH_USER_CACHE_TTL_SECONDS,
+        max_entries=AUTH_USER_CACHE_MAX_ENTRIES,
+        redis_client_factory=lambda: get_redis_client(tenant_id=None),
+    )
+    if AUTH_USER_CACHE_TTL_SECONDS > 0
+    else None
+)
+
+
+def get_auth_user_cache() -> AuthUserCache | None:
+    return _AUTH_USER_CACHE
+
+
+async def get_auth_token_data(request: Request) -> dict | None:
+    """The data stored for the session token of the request, see
+    retrieve_auth_token_data_from_redis"""
+    token = request.cookies.get(FASTAPI_USERS_AUTH_COOKIE_NAME)
+    cache = get_auth_user_cache()
+    if not token or cache is None:
+        return await retrieve_auth_token_data_from_redis(request)
+
+    token_hash = hash_token(token)
+    token_data = cache.get(AuthUserCacheKind.TOKEN_DATA, token_hash)
+    if token_data is not None:
+        return token_data
+
+    version = cache.version()
+    token_data = await retrieve_auth_token_data_from_redis(request)
+    if token_data is not None:
+        cache.put(
+            AuthUserCacheKind.TOKEN_DATA,
+            token_hash,
+            str(token_data.get("sub")),
+            token_data,
+            version,
+        )
+    return token_data
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session: Session, flush_context: Any) -> None:
+    user_ids: set[str] = set()
+    for instance in itertools.chain(session.dirty, session.deleted):
+        if isinstance(instance, User):
+            user_ids.add(str(instance.id))
+        elif isinstance(instance, ApiKey):
+            user_ids.add(str(instance.user_id))
+    if user_ids:
+        session.info.setdefault(_CHANGED_USER_IDS_KEY, set()).update(user_ids)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_user_changes(orm_execute_state: ORMExecuteState) -> None:
+    # the rows changed by bulk UPDATE / DELETE statements are not known
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ in (User, ApiKey):
+        orm_execute_state.session.info[_ALL_USERS_CHANGED_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session: Session) -> None:
+    user_ids = session.info.pop(_CHANGED_USER_IDS_KEY, None)
+    all_users = session.info.pop(_ALL_USERS_CHANGED_KEY, False)
+    cache = get_auth_user_cache()
+    if cache is None or not (user_ids or all_users):
+        return
+    cache.publish_invalidation(user_ids=sorted(user_ids or []), all_users=all_users)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session: Session) -> None:
+    session.info.pop(_CHANGED_USER_IDS_KEY, None)
+    session.info.pop(_ALL_USERS_CHANGED_KEY, None)
@@ -2,6 +2,8 @@ import json
 import secrets
 import uuid
 from collections.abc import AsyncGenerator
+from collections.abc import Awaitable
+from collections.abc import Callable
 from datetime import datetime
 from datetime import timezone
 from typing import cast
@@ -58,6 +60,9 @@ from onyx.auth.schemas import AuthBackend
 from onyx.auth.schemas import UserCreate
 from onyx.auth.schemas import UserRole
 from onyx.auth.schemas import UserUpdateWithRole
+from onyx.auth.user_cache import AuthUserCacheKind
+from onyx.auth.user_cache import get_auth_user_cache
+from onyx.auth.user_cache import hash_token
 from onyx.configs.app_configs import AUTH_BACKEND
 from onyx.configs.app_configs import AUTH_COOKIE_EXPIRE_TIME_SECONDS
 from onyx.configs.app_configs import AUTH_TYPE
@@ -616,7 +621,7 @@ def get_redis_strategy() -> RedisStrategy:
 def get_database_strategy(
     access_token_db: AccessTokenDatabase[AccessToken] = Depends(get_access_token_db),
 ) -> DatabaseStrategy:
-    return DatabaseStrategy(
+    return CachedDatabaseStrategy(
         access_token_db, lifetime_seconds=SESSION_EXPIRE_TIME_SECONDS
     )
 
@@ -658,6 +663,15 @@ class TenantAwareRedisStrategy(RedisStrategy[User, uuid.UUID]):
 
     async def read_token(
         self, token: Optional[str], user_manager: BaseUserManager[User, uuid.UUID]
+    ) -> Optional[User]:
+        if token is None:
+            return None
+        return await _read_token_cached(
+            token, lambda: self._read_token(token, user_manager)
+        )
+
+    async def _read_token(
+        self, token: str, user_manager: BaseUserManager[User, uuid.UUID]
     ) -> Optional[User]:
         redis = await get_async_redis_connection()
         token_data_str = await redis.get(f"{self.key_prefix}{token}")
@@ -676,6 +690,54 @@ class TenantAwareRedisStrategy(RedisStrategy[User, uuid.UUID]):
         """Properly delete the token from async redis."""
         redis = await get_async_redis_connection()
         await redis.delete(f"{self.key_prefix}{token}")
+        _invalidate_token(token)
+
+
+class CachedDatabaseStrategy(DatabaseStrategy):
+    """The database strategy with the users of tokens cached, see AuthUserCache"""
+
+    async def read_token(
+        self, token: Optional[str], user_manager: BaseUserManager[User, uuid.UUID]
+    ) -> Optional[User]:
+        if token is None:
+            return None
+        return await _read_token_cached(
+            token, lambda: DatabaseStrategy.read_token(self, token, user_manager)
+        )
+
+    async def destroy_token(self, token: str, user: User) -> None:
+        await super().destroy_token(token, user)
+        _invalidate_token(token)
+
+
+async def _read_token_cached(
+    token: str, read_token: Callable[[], Awaitable[Optional[User]]]
+) -> Optional[User]:
+    cache = get_auth_user_cache()
+    if cache is None:
+        return await read_token()
+    return await cache.get_or_load_user(
+        AuthUserCacheKind.TOKEN, hash_token(token), read_token
+    )
+
+
+def _invalidate_token(token: str) -> None:
+    cache = get_auth_user_cache()
+    if cache is not None:
+        cache.publish_invalidation(token_hashes=[hash_token(token)])
+
+
+async def fetch_user_for_api_key_cached(
+    hashed_api_key: str, async_db_session: AsyncSession
+) -> User | None:
+    cache = get_auth_user_cache()
+    if cache is None:
+        return await fetch_user_for_api_key(hashed_api_key, async_db_session)
+    return await cache.get_or_load_user(
+        AuthUserCacheKind.API_KEY,
+        f"{CURRENT_TENANT_ID_CONTEXTVAR.get()}:{hashed_api_key}",
+        lambda: fetch_user_for_api_key(hashed_api_key, async_db_session),
+    )
 
 
 if AUTH_BACKEND == AuthBackend.REDIS:
@@ -764,7 +826,7 @@ async def optional_user(
     if user is None:
         hashed_api_key = get_hashed_api_key_from_request(request)
         if hashed_api_key:
-            user = await fetch_user_for_api_key(hashed_api_key, async_db_session)
+            user = await fetch_user_for_api_key_cached(hashed_api_key, async_db_session)
 
     return user
 
@@ -1080,7 +1142,7 @@ async def api_key_dep(
         raise HTTPException(status_code=401, detail="Missing API key")
 
     if hashed_api_key:
-        user = await fetch_user_for_api_key(hashed_api_key, async_db_session)
+        user = await fetch_user_for_api_key_cached(hashed_api_key, async_db_session)
 
     if user is None:
         raise HTTPException(status_code=401, detail="Invalid API key")
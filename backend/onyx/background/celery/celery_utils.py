@@ -1,3 +1,4 @@
+from collections.abc import Iterator
 from datetime import datetime
 from datetime import timezone
 from typing import Any
@@ -88,21 +89,34 @@ def document_batch_to_ids(
     return {doc.id for doc in doc_batch}
 
 
-def extract_ids_from_runnable_connector(
+def yield_ids_from_runnable_connector(
     runnable_connector: BaseConnector,
     callback: IndexingHeartbeatInterface | None = None,
-) -> set[str]:
+) -> Iterator[set[str]]:
     """
+    Yields the document IDs of the connector batch by batch, so that the caller does
+    not need to hold all of them at once.
+
     If the SlimConnector hasnt been implemented for the given connector, just pull
     all docs using the load_from_state and grab out the IDs.
 
     Optionally, a callback can be passed to handle the length of each document batch.
     """
-    all_connector_doc_ids: set[str] = set()
-
     if isinstance(runnable_connector, SlimConnector):
         for metadata_batch in runnable_connector.retrieve_all_slim_documents():
-            all_connector_doc_ids.update({doc.id for doc in metadata_batch})
+            if callback:
+                if callback.should_stop():
+                    raise RuntimeError(
+                        "yield_ids_from_runnable_connector: Stop signal detected"
+                    )
+
+            yield {doc.id for doc in metadata_batch}
+
+            if callback:
+                callback.progress(
+                    "yield_ids_from_runnable_connector", len(metadata_batch)
+                )
+        return
 
     doc_batch_generator = None
 
@@ -124,14 +138,23 @@ def extract_ids_from_runnable_connector(
         if callback:
             if callback.should_stop():
                 raise RuntimeError(
-                    "extract_ids_from_runnable_connector: Stop signal detected"
+                    "yield_ids_from_runnable_connector: Stop signal detected"
                 )
 
-        all_connector_doc_ids.update(doc_batch_processing_func(doc_batch))
+        yield doc_batch_processing_func(doc_batch)
 
         if callback:
-            callback.progress("extract_ids_from_runnable_connector", len(doc_batch))
+            callback.progress("yield_ids_from_runnable_connector", len(doc_batch))
+
 
+def extract_ids_from_runnable_connector(
+    runnable_connector: BaseConnector,
+    callback: IndexingHeartbeatInterface | None = None,
+) -> set[str]:
+    """All document IDs of the connector, see yield_ids_from_runnable_connector."""
+    all_connector_doc_ids: set[str] = set()
+    for doc_id_batch in yield_ids_from_runnable_connector(runnable_connector, callback):
+        all_connector_doc_ids.update(doc_id_batch)
     return all_connector_doc_ids
 
 
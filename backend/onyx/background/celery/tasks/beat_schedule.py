@@ -1,6 +1,7 @@
 from datetime import timedelta
 from typing import Any
 
+from onyx.configs.app_configs import ENABLE_EMBEDDING_CACHE
 from onyx.configs.app_configs import LLM_MODEL_UPDATE_API_URL
 from onyx.configs.constants import ONYX_CLOUD_CELERY_TASK_PREFIX
 from onyx.configs.constants import OnyxCeleryPriority
@@ -115,6 +116,20 @@ if LLM_MODEL_UPDATE_API_URL:
         }
     )
 
+# Keep the embedding cache table bounded, indexing attempts only ever insert into it
+if ENABLE_EMBEDDING_CACHE:
+    beat_task_templates.append(
+        {
+            "name": "evict-embedding-cache",
+            "task": OnyxCeleryTask.EVICT_EMBEDDING_CACHE,
+            "schedule": timedelta(hours=1),
+            "options": {
+                "priority": OnyxCeleryPriority.LOW,
+                "expires": BEAT_EXPIRES_DEFAULT,
+            },
+        }
+    )
+
 
 def make_cloud_generator_task(task: dict[str, Any]) -> dict[str, Any]:
     cloud_task: dict[str, Any] = {}
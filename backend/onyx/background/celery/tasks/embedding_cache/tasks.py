@@ -0,0 +1,32 @@
+from celery import shared_task
+from celery import Task
+
+from onyx.background.celery.apps.app_base import task_logger
+from onyx.configs.app_configs import EMBEDDING_CACHE_MAX_ENTRIES
+from onyx.configs.app_configs import JOB_TIMEOUT
+from onyx.configs.constants import OnyxCeleryTask
+from onyx.db.embedding_cache import evict_embedding_cache_entries
+from onyx.db.engine import get_session_with_tenant
+
+
+@shared_task(
+    name=OnyxCeleryTask.EVICT_EMBEDDING_CACHE,
+    ignore_result=True,
+    soft_time_limit=JOB_TIMEOUT,
+    trail=False,
+    bind=True,
+)
+def evict_embedding_cache_task(self: Task, *, tenant_id: str | None) -> bool | None:
+    """Trims the tenant's embedding cache table down to EMBEDDING_CACHE_MAX_ENTRIES,
+    least recently used entries first."""
+    with get_session_with_tenant(tenant_id) as db_session:
+        num_evicted = evict_embedding_cache_entries(
+            db_session, EMBEDDING_CACHE_MAX_ENTRIES
+        )
+
+    if num_evicted:
+        task_logger.info(
+            f"Evicted {num_evicted} embedding cache entries: tenant={tenant_id}"
+        )
+
+    return True
@@ -0,0 +1,88 @@
+import os
+import sqlite3
+import tempfile
+from collections.abc import Iterable
+from collections.abc import Iterator
+from types import TracebackType
+
+from onyx.configs.app_configs import PRUNING_ID_STORE_CACHE_KIB
+from onyx.configs.app_configs import PRUNING_ID_STORE_DIR
+from onyx.utils.batching import batch_generator
+
+# ids per statement, stays below the sqlite limit of bound parameters
+_LOOKUP_BATCH_SIZE = 500
+
+
+class DocumentIdStore:
+    """A set of document ids kept in a temporary sqlite database on disk.
+
+    Pruning a connector compares every document id of the source against every
+    indexed document id. Held in memory, these sets take gigabytes for large
+    connectors. The ids in the store are kept in a b-tree which is only cached up to
+    PRUNING_ID_STORE_CACHE_KIB, so memory stays bounded however many ids are added.
+
+    The file is deleted when the store is closed."""
+
+    def __init__(self, directory: str | None = PRUNING_ID_STORE_DIR) -> None:
+        fd, self._path = tempfile.mkstemp(
+            prefix="onyx_doc_ids_", suffix=".sqlite", dir=directory
+        )
+        os.close(fd)
+        self._conn = sqlite3.connect(self._path)
+        # a temporary file which is thrown away on failure needs no durability
+        self._conn.execute("PRAGMA journal_mode = OFF")
+        self._conn.execute("PRAGMA synchronous = OFF")
+        self._conn.execute(f"PRAGMA cache_size = -{PRUNING_ID_STORE_CACHE_KIB}")
+        self._conn.execute("PRAGMA temp_store = FILE")
+        self._conn.execute("CREATE TABLE ids (id TEXT PRIMARY KEY) WITHOUT ROWID")
+        self._count = 0
+
+    def add(self, ids: Iterable[str]) -> None:
+        """Adds the ids, duplicates are ignored."""
+        for id_batch in batch_generator(ids, _LOOKUP_BATCH_SIZE):
+            with self._conn:
+                cursor = self._conn.executemany(
+                    "INSERT OR IGNORE INTO ids (id) VALUES (?)",
+                    ((id,) for id in id_batch),
+                )
+            self._count += cursor.rowcount
+
+    def missing(self, ids: Iterable[str]) -> Iterator[str]:
+        """Yields the ids which are not in the store, an anti-join of the ids with
+        the store done in batches. Only one batch of ids is held at a time."""
+        for id_batch in batch_generator(ids, _LOOKUP_BATCH_SIZE):
+            placeholders = ",".join("?" * len(id_batch))
+            found = {
+                row[0]
+                for row in self._conn.execute(
+                    f"SELECT id FROM ids WHERE id IN ({placeholders})", id_batch
+                )
+            }
+            for id in id_batch:
+                if id not in found:
+                    yield id
+
+    def __iter__(self) -> Iterator[str]:
+        # a separate cursor, the ids are read from disk while iterating
+        return (row[0] for row in self._conn.execute("SELECT id FROM ids"))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self) -> None:
+        self._conn.close()
+        try:
+            os.remove(self._path)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self) -> "DocumentIdStore":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
@@ -53,10 +53,12 @@ class RetryDocumentIndex:
         tenant_id: str | None,
         chunk_count: int | None,
         fields: VespaDocumentFields,
+        chunk_range_cache: dict | None = None,
     ) -> int:
         return self.index.update_single(
             doc_id,
             tenant_id=tenant_id,
             chunk_count=chunk_count,
             fields=fields,
+            chunk_range_cache=chunk_range_cache,
         )
@@ -138,6 +138,8 @@ def document_by_cc_pair_cleanup_task(
                     tenant_id=tenant_id,
                     chunk_count=doc.chunk_count,
                     fields=fields,
+                    # the chunk range is only looked up once across retries
+                    chunk_range_cache={},
                 )
 
                 # there are still other cc_pair references to the doc, so just resync to Vespa
@@ -2,6 +2,9 @@ import random
 import time
 import traceback
 from collections.abc import Callable
+from concurrent.futures import as_completed
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
 from datetime import datetime
 from datetime import timezone
 from http import HTTPStatus
@@ -15,12 +18,16 @@ from celery import Task
 from celery.exceptions import SoftTimeLimitExceeded
 from celery.result import AsyncResult
 from celery.states import READY_STATES
+from pydantic import BaseModel
+from pydantic import ConfigDict
 from redis import Redis
 from redis.lock import Lock as RedisLock
 from sqlalchemy.orm import Session
 from tenacity import RetryError
 
 from onyx.access.access import get_access_for_document
+from onyx.access.access import get_access_for_documents
+from onyx.access.access import get_null_document_access
 from onyx.background.celery.apps.app_base import task_logger
 from onyx.background.celery.celery_redis import celery_get_queue_length
 from onyx.background.celery.celery_redis import celery_get_unacked_task_ids
@@ -32,6 +39,7 @@ from onyx.background.celery.tasks.shared.RetryDocumentIndex import RetryDocument
 from onyx.background.celery.tasks.shared.tasks import LIGHT_SOFT_TIME_LIMIT
 from onyx.background.celery.tasks.shared.tasks import LIGHT_TIME_LIMIT
 from onyx.configs.app_configs import JOB_TIMEOUT
+from onyx.configs.app_configs import VESPA_SYNC_BATCH_CONCURRENCY
 from onyx.configs.app_configs import VESPA_SYNC_MAX_TASKS
 from onyx.configs.constants import CELERY_VESPA_SYNC_BEAT_LOCK_TIMEOUT
 from onyx.configs.constants import OnyxCeleryQueues
@@ -49,11 +57,14 @@ from onyx.db.connector_credential_pair import get_connector_credential_pairs
 from onyx.db.document import count_documents_by_needs_sync
 from onyx.db.document import get_document
 from onyx.db.document import get_document_ids_for_connector_credential_pair
+from onyx.db.document import get_documents_by_ids
 from onyx.db.document import mark_document_as_synced
+from onyx.db.document import mark_documents_as_synced
 from onyx.db.document_set import delete_document_set
 from onyx.db.document_set import delete_document_set_cc_pair_relationship__no_commit
 from onyx.db.document_set import fetch_document_sets
 from onyx.db.document_set import fetch_document_sets_for_document
+from onyx.db.document_set import fetch_document_sets_for_documents
 from onyx.db.document_set import get_document_set_by_id
 from onyx.db.document_set import mark_document_set_as_synced
 from onyx.db.engine import get_session_with_tenant
@@ -63,6 +74,7 @@ from onyx.db.enums import SyncType
 from onyx.db.index_attempt import delete_index_attempts
 from onyx.db.index_attempt import get_index_attempt
 from onyx.db.index_attempt import mark_attempt_failed
+from onyx.db.models import Document as DbDocument
 from onyx.db.models import DocumentSet
 from onyx.db.models import UserGroup
 from onyx.db.search_settings import get_active_search_settings
@@ -98,6 +110,11 @@ from shared_configs.configs import MULTI_TENANT
 
 logger = setup_logger()
 
+# a batch needs more time than a single document, even though its Vespa updates run
+# concurrently. Documents not synced in time stay dirty and get picked up again
+VESPA_METADATA_SYNC_BATCH_SOFT_TIME_LIMIT = 300
+VESPA_METADATA_SYNC_BATCH_TIME_LIMIT = VESPA_METADATA_SYNC_BATCH_SOFT_TIME_LIMIT + 15
+
 
 # celery auto associates tasks created inside another task,
 # which bloats the result metadata considerably. trail=False prevents this.
@@ -1024,6 +1041,8 @@ def vespa_metadata_sync_task(
                 tenant_id=tenant_id,
                 chunk_count=doc.chunk_count,
                 fields=fields,
+                # the chunk range is only looked up once across retries
+                chunk_range_cache={},
             )
 
             # update db last. Worst case = we crash right before this and
@@ -1074,6 +1093,177 @@ def vespa_metadata_sync_task(
     return True
 
 
+def _unwrap_retry_error(ex: Exception) -> Exception | None:
+    """Returns the exception which made tenacity give up, or the exception itself."""
+    if not isinstance(ex, RetryError):
+        return ex
+
+    task_logger.warning(
+        f"Tenacity retry failed: num_attempts={ex.last_attempt.attempt_number}"
+    )
+
+    # only return the inner exception if it is of type Exception
+    e_temp = ex.last_attempt.exception()
+    if isinstance(e_temp, Exception):
+        return e_temp
+    return None
+
+
+def _is_non_retryable(e: Exception | None) -> bool:
+    return (
+        isinstance(e, httpx.HTTPStatusError)
+        and e.response.status_code == HTTPStatus.BAD_REQUEST
+    )
+
+
+class DocumentBatchSyncResult(BaseModel):
+    synced_doc_ids: list[str] = []
+    # failed with an error that may go away when retried
+    failed_doc_ids: list[str] = []
+    chunks_affected: int = 0
+    last_exception: Exception | None = None
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+
+def sync_document_batch(
+    document_ids: list[str],
+    db_session: Session,
+    retry_index: RetryDocumentIndex,
+    tenant_id: str | None,
+    max_concurrency: int = VESPA_SYNC_BATCH_CONCURRENCY,
+) -> DocumentBatchSyncResult:
+    """Syncs the access, document sets and boost of the given documents to Vespa.
+    The metadata is loaded for the whole batch at once, the Vespa updates run
+    concurrently and the documents which were updated are marked as synced in a
+    single commit."""
+    result = DocumentBatchSyncResult()
+
+    docs = get_documents_by_ids(db_session, document_ids)
+    if not docs:
+        return result
+
+    doc_ids = [doc.id for doc in docs]
+    doc_id_to_doc_sets = dict(fetch_document_sets_for_documents(doc_ids, db_session))
+    doc_id_to_access = get_access_for_documents(
+        document_ids=doc_ids, db_session=db_session
+    )
+
+    # chunk ranges looked up for documents without a chunk count, reused on retries
+    chunk_range_cache: dict = {}
+
+    def _update(doc: DbDocument) -> int:
+        return retry_index.update_single(
+            doc.id,
+            tenant_id=tenant_id,
+            chunk_count=doc.chunk_count,
+            fields=VespaDocumentFields(
+                document_sets=set(doc_id_to_doc_sets.get(doc.id, [])),
+                access=doc_id_to_access.get(doc.id, get_null_document_access()),
+                boost=doc.boost,
+                hidden=doc.hidden,
+            ),
+            chunk_range_cache=chunk_range_cache,
+        )
+
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(max_concurrency, len(docs))),
+        thread_name_prefix="vespa_metadata_sync",
+    ) as executor:
+        future_to_doc_id = {
+            executor.submit(copy_context().run, _update, doc): doc.id for doc in docs
+        }
+        for future in as_completed(future_to_doc_id):
+            doc_id = future_to_doc_id[future]
+            try:
+                result.chunks_affected += future.result()
+                result.synced_doc_ids.append(doc_id)
+            except Exception as ex:
+                e = _unwrap_retry_error(ex)
+                if _is_non_retryable(e):
+                    task_logger.exception(
+                        f"Non-retryable error during vespa metadata sync: doc={doc_id}"
+                    )
+                    continue
+
+                task_logger.exception(
+                    f"Unexpected exception during vespa metadata sync: doc={doc_id}"
+                )
+                result.failed_doc_ids.append(doc_id)
+                result.last_exception = e
+
+    # update db last. Worst case = we crash right before this and
+    # the sync might repeat again later
+    mark_documents_as_synced(result.synced_doc_ids, db_session)
+    return result
+
+
+@shared_task(
+    name=OnyxCeleryTask.VESPA_METADATA_SYNC_BATCH_TASK,
+    bind=True,
+    soft_time_limit=VESPA_METADATA_SYNC_BATCH_SOFT_TIME_LIMIT,
+    time_limit=VESPA_METADATA_SYNC_BATCH_TIME_LIMIT,
+    max_retries=3,
+)
+def vespa_metadata_sync_batch_task(
+    self: Task, document_ids: list[str], tenant_id: str | None
+) -> bool:
+    """Batched counterpart of `vespa_metadata_sync_task`. Only the documents which
+    failed are retried, under the same task id so that taskset tracking is not
+    affected."""
+    start = time.monotonic()
+
+    try:
+        with get_session_with_tenant(tenant_id) as db_session:
+            active_search_settings = get_active_search_settings(db_session)
+            doc_index = get_default_document_index(
+                search_settings=active_search_settings.primary,
+                secondary_search_settings=active_search_settings.secondary,
+                httpx_client=HttpxPool.get("vespa"),
+            )
+
+            result = sync_document_batch(
+                document_ids=document_ids,
+                db_session=db_session,
+                retry_index=RetryDocumentIndex(doc_index),
+                tenant_id=tenant_id,
+            )
+    except SoftTimeLimitExceeded:
+        task_logger.info(
+            f"SoftTimeLimitExceeded exception. num_docs={len(document_ids)}"
+        )
+        return False
+    except Exception as ex:
+        task_logger.exception(
+            f"Unexpected exception during batched vespa metadata sync: "
+            f"num_docs={len(document_ids)}"
+        )
+
+        # Exponential backoff from 2^4 to 2^6 ... i.e. 16, 32, 64
+        countdown = 2 ** (self.request.retries + 4)
+        raise self.retry(exc=_unwrap_retry_error(ex), countdown=countdown)
+
+    elapsed = time.monotonic() - start
+    task_logger.info(
+        f"action=sync_batch "
+        f"docs={len(document_ids)} "
+        f"synced={len(result.synced_doc_ids)} "
+        f"failed={len(result.failed_doc_ids)} "
+        f"chunks={result.chunks_affected} "
+        f"elapsed={elapsed:.2f}"
+    )
+
+    if result.failed_doc_ids:
+        countdown = 2 ** (self.request.retries + 4)
+        raise self.retry(
+            kwargs=dict(document_ids=result.failed_doc_ids, tenant_id=tenant_id),
+            exc=result.last_exception,
+            countdown=countdown,
+        )
+
+    return True
+
+
 def is_fence(key_bytes: bytes) -> bool:
     key_str = key_bytes.decode("utf-8")
     if key_str == RedisGlobalConnectorCredentialPair.FENCE_KEY:
@@ -2,6 +2,9 @@
 into a series of checkpoints to better handle intermittent failures
 / jobs being killed by cloud providers."""
 import datetime
+from typing import Any
+
+from pydantic import BaseModel
 
 from onyx.configs.app_configs import EXPERIMENTAL_CHECKPOINTING_ENABLED
 from onyx.configs.constants import DocumentSource
@@ -78,3 +81,26 @@ def get_time_windows_for_index_attempt(
         start_of_window = end_of_window
 
     return time_windows
+
+
+class IndexingCheckpoint(BaseModel):
+    """Progress of an indexing attempt with a `CheckpointConnector`, stored on the
+    attempt after each batch which was fully indexed.
+
+    The connector checkpoint is only valid for the time window it was produced in."""
+
+    window_start: datetime.datetime
+    window_end: datetime.datetime
+    connector_checkpoint: dict[str, Any]
+
+
+def get_time_windows_for_resumed_attempt(
+    checkpoint: IndexingCheckpoint, source_type: DocumentSource
+) -> list[tuple[datetime.datetime, datetime.datetime]]:
+    """Finishes the window the checkpoint belongs to, then continues up to now from
+    where that window ended. Earlier windows were completed by the failed attempt."""
+    return [
+        (checkpoint.window_start, checkpoint.window_end)
+    ] + get_time_windows_for_index_attempt(
+        last_successful_run=checkpoint.window_end, source_type=source_type
+    )
@@ -1,5 +1,6 @@
 import time
 import traceback
+from collections import deque
 from datetime import datetime
 from datetime import timedelta
 from datetime import timezone
@@ -8,7 +9,12 @@ from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from onyx.background.indexing.checkpointing import get_time_windows_for_index_attempt
+from onyx.background.indexing.checkpointing import (
+    get_time_windows_for_resumed_attempt,
+)
+from onyx.background.indexing.checkpointing import IndexingCheckpoint
 from onyx.background.indexing.tracer import OnyxTracer
+from onyx.configs.app_configs import INDEXING_PIPELINE_DEPTH
 from onyx.configs.app_configs import INDEXING_SIZE_WARNING_THRESHOLD
 from onyx.configs.app_configs import INDEXING_TRACER_INTERVAL
 from onyx.configs.app_configs import LEAVE_CONNECTOR_ACTIVE_ON_INITIALIZATION_FAILURE
@@ -17,6 +23,7 @@ from onyx.configs.constants import DocumentSource
 from onyx.configs.constants import MilestoneRecordType
 from onyx.connectors.connector_runner import ConnectorRunner
 from onyx.connectors.factory import instantiate_connector
+from onyx.connectors.interfaces import ConnectorCheckpoint
 from onyx.connectors.models import Document
 from onyx.connectors.models import IndexAttemptMetadata
 from onyx.db.connector_credential_pair import get_connector_credential_pair_from_id
@@ -25,12 +32,15 @@ from onyx.db.connector_credential_pair import update_connector_credential_pair
 from onyx.db.engine import get_session_with_tenant
 from onyx.db.enums import ConnectorCredentialPairStatus
 from onyx.db.index_attempt import get_index_attempt
+from onyx.db.index_attempt import get_resumable_checkpoint
 from onyx.db.index_attempt import mark_attempt_canceled
 from onyx.db.index_attempt import mark_attempt_failed
 from onyx.db.index_attempt import mark_attempt_partially_succeeded
 from onyx.db.index_attempt import mark_attempt_succeeded
 from onyx.db.index_attempt import transition_attempt_to_in_progress
 from onyx.db.index_attempt import update_docs_indexed
+from onyx.db.index_attempt import update_index_attempt_checkpoint
+from onyx.db.index_attempt import update_index_attempt_performance_profile
 from onyx.db.models import ConnectorCredentialPair
 from onyx.db.models import IndexAttempt
 from onyx.db.models import IndexingStatus
@@ -40,9 +50,16 @@ from onyx.httpx.httpx_pool import HttpxPool
 from onyx.indexing.embedder import DefaultIndexingEmbedder
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
 from onyx.indexing.indexing_pipeline import build_indexing_pipeline
+from onyx.indexing.indexing_pipeline import IndexingPipelineResult
+from onyx.indexing.indexing_profiler import IndexingProfiler
+from onyx.indexing.indexing_profiler import IndexingStage
+from onyx.indexing.pipelined_indexing import build_pipelined_indexer
+from onyx.indexing.pipelined_indexing import PipelinedIndexer
+from onyx.indexing.pipelined_indexing import ThreadSafeHeartbeat
 from onyx.utils.logger import setup_logger
 from onyx.utils.logger import TaskAttemptSingleton
 from onyx.utils.telemetry import create_milestone_and_report
+from onyx.utils.threadpool_concurrency import prefetch_iterator
 from onyx.utils.variable_functionality import global_version
 
 logger = setup_logger()
@@ -57,9 +74,11 @@ def _get_connector_runner(
     end_time: datetime,
     tenant_id: str | None,
     leave_connector_active: bool = LEAVE_CONNECTOR_ACTIVE_ON_INITIALIZATION_FAILURE,
+    checkpoint: ConnectorCheckpoint | None = None,
 ) -> ConnectorRunner:
     """
     NOTE: `start_time` and `end_time` are only used for poll connectors
+    NOTE: `checkpoint` is only used for checkpoint connectors
 
     Returns an iterator of document batches and whether the returned documents
     are the complete list of existing documents of the connector. If the task
@@ -100,7 +119,9 @@ def _get_connector_runner(
         raise e
 
     return ConnectorRunner(
-        connector=runnable_connector, time_range=(start_time, end_time)
+        connector=runnable_connector,
+        time_range=(start_time, end_time),
+        checkpoint=checkpoint,
     )
 
 
@@ -175,6 +196,10 @@ def _run_indexing(
     """
     start_time = time.time()
 
+    if INDEXING_PIPELINE_DEPTH > 0 and callback:
+        # in pipelined mode the heartbeat is also driven from the embedding thread
+        callback = ThreadSafeHeartbeat(callback)
+
     with get_session_with_tenant(tenant_id) as db_session_temp:
         index_attempt_start = get_index_attempt(db_session_temp, index_attempt_id)
         if not index_attempt_start:
@@ -222,6 +247,23 @@ def _run_indexing(
             )
         )
 
+        # continue where the previous attempt stopped if it failed midway, unless
+        # a fresh run was explicitly requested
+        resume_checkpoint: IndexingCheckpoint | None = None
+        if not ctx.from_beginning:
+            stored_checkpoint = get_resumable_checkpoint(
+                db_session_temp, index_attempt_start
+            )
+            if stored_checkpoint:
+                resume_checkpoint = IndexingCheckpoint.model_validate(stored_checkpoint)
+                # carry it over right away, so that if this attempt also fails before
+                # completing a batch the next one can still resume from it
+                update_index_attempt_checkpoint(
+                    db_session=db_session_temp,
+                    index_attempt_id=index_attempt_id,
+                    checkpoint=stored_checkpoint,
+                )
+
         embedding_model = DefaultIndexingEmbedder.from_db_search_settings(
             search_settings=index_attempt_start.search_settings,
             callback=callback,
@@ -233,6 +275,20 @@ def _run_indexing(
         httpx_client=HttpxPool.get("vespa"),
     )
 
+    # time spent per pipeline stage, stored with the attempt as it progresses
+    profiler = IndexingProfiler()
+
+    def _persist_profile() -> None:
+        try:
+            with get_session_with_tenant(tenant_id) as db_session_temp:
+                update_index_attempt_performance_profile(
+                    db_session=db_session_temp,
+                    index_attempt_id=index_attempt_id,
+                    performance_profile=profiler.get_profile().model_dump(mode="json"),
+                )
+        except Exception:
+            logger.exception("Failed to store the indexing performance profile")
+
     indexing_pipeline = build_indexing_pipeline(
         attempt_id=index_attempt_id,
         embedder=embedding_model,
@@ -244,6 +300,7 @@ def _run_indexing(
         db_session=db_session,
         tenant_id=tenant_id,
         callback=callback,
+        profiler=profiler,
     )
 
     tracer: OnyxTracer
@@ -258,24 +315,102 @@ def _run_indexing(
         credential_id=ctx.credential_id,
     )
 
+    pipelined_indexer: PipelinedIndexer | None = None
+    fetch_timings: dict[str, float] = {}
+    if INDEXING_PIPELINE_DEPTH > 0:
+        pipelined_indexer = build_pipelined_indexer(
+            embedder=embedding_model,
+            document_index=document_index,
+            index_attempt_metadata=index_attempt_md,
+            db_session=db_session,
+            max_pending_batches=INDEXING_PIPELINE_DEPTH,
+            ignore_time_skip=(
+                ctx.from_beginning
+                or (ctx.search_settings_status == IndexModelStatus.FUTURE)
+            ),
+            attempt_id=index_attempt_id,
+            tenant_id=tenant_id,
+            callback=callback,
+            profiler=profiler,
+        )
+
     batch_num = 0
     net_doc_change = 0
     document_count = 0
     chunk_count = 0
     run_end_dt = None
     tracer_counter: int
+    # checkpoints of the batches which were handed to the indexing pipeline, in order
+    pending_checkpoints: deque[IndexingCheckpoint | None] = deque()
+    # once a batch failed (within INDEXING_EXCEPTION_LIMIT) the checkpoint must not move
+    # past it, otherwise a resumed attempt would silently skip its documents
+    checkpoint_blocked_by_failure = False
+
+    def _record_results(results: list[IndexingPipelineResult]) -> None:
+        nonlocal net_doc_change, chunk_count, document_count
+        nonlocal checkpoint_blocked_by_failure
+
+        # results always come back in the order the batches were submitted
+        completed_checkpoint: IndexingCheckpoint | None = None
+        for index_pipeline_result in results:
+            net_doc_change += index_pipeline_result.new_docs
+            chunk_count += index_pipeline_result.total_chunks
+            document_count += index_pipeline_result.total_docs
+            batch_checkpoint = pending_checkpoints.popleft()
+            if index_pipeline_result.failed:
+                checkpoint_blocked_by_failure = True
+            if not checkpoint_blocked_by_failure:
+                completed_checkpoint = batch_checkpoint
+
+        # commit transaction so that the `update` below begins
+        # with a brand new transaction. Postgres uses the start
+        # of the transactions when computing `NOW()`, so if we have
+        # a long running transaction, the `time_updated` field will
+        # be inaccurate
+        db_session.commit()
+
+        # This new value is updated every batch, so UI can refresh per batch update
+        with get_session_with_tenant(tenant_id) as db_session_temp:
+            update_docs_indexed(
+                db_session=db_session_temp,
+                index_attempt_id=index_attempt_id,
+                total_docs_indexed=document_count,
+                new_docs_indexed=net_doc_change,
+                docs_removed_from_index=0,
+            )
+            if completed_checkpoint:
+                update_index_attempt_checkpoint(
+                    db_session=db_session_temp,
+                    index_attempt_id=index_attempt_id,
+                    checkpoint=completed_checkpoint.model_dump(mode="json"),
+                )
+
+        if results:
+            _persist_profile()
 
-    for ind, (window_start, window_end) in enumerate(
-        get_time_windows_for_index_attempt(
+    if resume_checkpoint:
+        logger.info(
+            f"Resuming from checkpoint: "
+            f"window_start={resume_checkpoint.window_start} "
+            f"window_end={resume_checkpoint.window_end}"
+        )
+        time_windows = get_time_windows_for_resumed_attempt(
+            resume_checkpoint, source_type=db_connector.source
+        )
+    else:
+        time_windows = get_time_windows_for_index_attempt(
             last_successful_run=datetime.fromtimestamp(
                 last_successful_index_time, tz=timezone.utc
             ),
             source_type=db_connector.source,
         )
-    ):
+
+    for ind, (window_start, window_end) in enumerate(time_windows):
         cc_pair_loop: ConnectorCredentialPair | None = None
         index_attempt_loop: IndexAttempt | None = None
         tracer_counter = 0
+        # before the poll offset is applied, a checkpoint is only valid for this window
+        checkpoint_window_start = window_start
 
         try:
             window_start = max(
@@ -298,11 +433,28 @@ def _run_indexing(
                     start_time=window_start,
                     end_time=window_end,
                     tenant_id=tenant_id,
+                    checkpoint=(
+                        resume_checkpoint.connector_checkpoint
+                        if resume_checkpoint and ind == 0
+                        else None
+                    ),
                 )
 
             if INDEXING_TRACER_INTERVAL > 0:
                 tracer.snap()
-            for doc_batch in connector_runner.run():
+            connector_batches = profiler.profile_document_batches(
+                connector_runner.run_with_checkpoints()
+            )
+            for doc_batch, connector_checkpoint in (
+                prefetch_iterator(
+                    connector_batches,
+                    max_prefetched=INDEXING_PIPELINE_DEPTH,
+                    thread_name="indexing_fetch",
+                    timings=fetch_timings,
+                )
+                if pipelined_indexer
+                else connector_batches
+            ):
                 # Check if connector is disabled mid run and stop if so unless it's the secondary
                 # index being built. We want to populate it even for paused connectors
                 # Often paused connectors are sources that aren't updated frequently but the
@@ -347,52 +499,53 @@ def _run_indexing(
 
                 batch_description = []
 
-                doc_batch_cleaned = strip_null_characters(doc_batch)
-                for doc in doc_batch_cleaned:
-                    batch_description.append(doc.to_short_descriptor())
+                with profiler.measure(IndexingStage.DOC_CLEANUP) as measurement:
+                    doc_batch_cleaned = strip_null_characters(doc_batch)
+                    for doc in doc_batch_cleaned:
+                        batch_description.append(doc.to_short_descriptor())
 
-                    doc_size = 0
-                    for section in doc.sections:
-                        doc_size += len(section.text)
+                        doc_size = 0
+                        for section in doc.sections:
+                            doc_size += len(section.text)
 
-                    if doc_size > INDEXING_SIZE_WARNING_THRESHOLD:
-                        logger.warning(
-                            f"Document size: doc='{doc.to_short_descriptor()}' "
-                            f"size={doc_size} "
-                            f"threshold={INDEXING_SIZE_WARNING_THRESHOLD}"
-                        )
+                        if doc_size > INDEXING_SIZE_WARNING_THRESHOLD:
+                            logger.warning(
+                                f"Document size: doc='{doc.to_short_descriptor()}' "
+                                f"size={doc_size} "
+                                f"threshold={INDEXING_SIZE_WARNING_THRESHOLD}"
+                            )
+                    measurement.add_documents(doc_batch_cleaned)
 
                 logger.debug(f"Indexing batch of documents: {batch_description}")
 
                 index_attempt_md.batch_num = batch_num + 1  # use 1-index for this
 
-                # real work happens here!
-                index_pipeline_result = indexing_pipeline(
-                    document_batch=doc_batch_cleaned,
-                    index_attempt_metadata=index_attempt_md,
+                pending_checkpoints.append(
+                    IndexingCheckpoint(
+                        window_start=checkpoint_window_start,
+                        window_end=window_end,
+                        connector_checkpoint=connector_checkpoint,
+                    )
+                    if connector_checkpoint is not None
+                    else None
                 )
 
-                batch_num += 1
-                net_doc_change += index_pipeline_result.new_docs
-                chunk_count += index_pipeline_result.total_chunks
-                document_count += index_pipeline_result.total_docs
-
-                # commit transaction so that the `update` below begins
-                # with a brand new transaction. Postgres uses the start
-                # of the transactions when computing `NOW()`, so if we have
-                # a long running transaction, the `time_updated` field will
-                # be inaccurate
-                db_session.commit()
-
-                # This new value is updated every batch, so UI can refresh per batch update
-                with get_session_with_tenant(tenant_id) as db_session_temp:
-                    update_docs_indexed(
-                        db_session=db_session_temp,
-                        index_attempt_id=index_attempt_id,
-                        total_docs_indexed=document_count,
-                        new_docs_indexed=net_doc_change,
-                        docs_removed_from_index=0,
+                # real work happens here!
+                if pipelined_indexer:
+                    # returns the results of earlier batches which completed meanwhile
+                    index_pipeline_results = pipelined_indexer.submit(
+                        doc_batch_cleaned, batch_num=batch_num + 1
                     )
+                else:
+                    index_pipeline_results = [
+                        indexing_pipeline(
+                            document_batch=doc_batch_cleaned,
+                            index_attempt_metadata=index_attempt_md,
+                        )
+                    ]
+
+                batch_num += 1
+                _record_results(index_pipeline_results)
 
                 if callback:
                     callback.progress("_run_indexing", len(doc_batch_cleaned))
@@ -408,6 +561,9 @@ def _run_indexing(
                     tracer.snap()
                     tracer.log_previous_diff(INDEXING_TRACER_NUM_PRINT_ENTRIES)
 
+            if pipelined_indexer:
+                _record_results(pipelined_indexer.drain())
+
             run_end_dt = window_end
             if ctx.is_primary:
                 with get_session_with_tenant(tenant_id) as db_session_temp:
@@ -423,6 +579,13 @@ def _run_indexing(
                 f"Connector run exceptioned after elapsed time: {time.time() - start_time} seconds"
             )
 
+            if pipelined_indexer:
+                # batches still in flight are not marked as indexed, so they will
+                # simply be picked up again by the next attempt
+                pipelined_indexer.shutdown()
+            pending_checkpoints.clear()
+            _persist_profile()
+
             if isinstance(e, ConnectorStopSignal):
                 with get_session_with_tenant(tenant_id) as db_session_temp:
                     mark_attempt_canceled(
@@ -484,6 +647,13 @@ def _run_indexing(
             # reason it will then be marked as a failure
             break
 
+    if pipelined_indexer:
+        pipelined_indexer.log_stage_stats(fetch_timings)
+        pipelined_indexer.shutdown()
+
+    _persist_profile()
+    logger.info(f"Indexing stage profile: {profiler.summary()}")
+
     if INDEXING_TRACER_INTERVAL > 0:
         logger.debug(
             f"Running trace comparison between start and end of indexing. {tracer_counter} batches processed."
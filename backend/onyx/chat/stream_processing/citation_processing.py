@@ -12,11 +12,57 @@ from onyx.utils.logger import setup_logger
 logger = setup_logger()
 
 
+_CITATION_PATTERN = re.compile(r"\[(\d+)\]|\[\[(\d+)\]\]")  # [1], [[1]], etc.
+_BACKTICK_RUN_PATTERN = re.compile(r"`+")
+
+
 def in_code_block(llm_text: str) -> bool:
     count = llm_text.count(TRIPLE_BACKTICK)
     return count % 2 != 0
 
 
+class _CodeBlockTracker:
+    """Incremental version of `in_code_block` over text fed piece by piece.
+
+    `str.count` counts k // 3 triple backticks in every run of k backticks, so only
+    the finished runs and the length of the run at the end of the text are kept."""
+
+    def __init__(self) -> None:
+        self._finished_count = 0
+        self._trailing_run = 0
+
+    @property
+    def in_code_block(self) -> bool:
+        return (self._finished_count + self._trailing_run // 3) % 2 != 0
+
+    def feed(self, text: str) -> None:
+        stripped = text.rstrip("`")
+        if not stripped:
+            self._trailing_run += len(text)
+            return
+
+        # a leading run continues the run at the end of the previous text
+        inner = stripped.lstrip("`")
+        self._finished_count += (self._trailing_run + len(stripped) - len(inner)) // 3
+        if "`" in inner:
+            self._finished_count += sum(
+                len(run) // 3 for run in _BACKTICK_RUN_PATTERN.findall(inner)
+            )
+        self._trailing_run = len(text) - len(stripped)
+
+
+def _ends_with_possible_citation(text: str) -> bool:
+    r"""Same as searching for `(\[+\d*$)` ([1, [, [[, [[2, etc.) but only looks at the
+    end of the text. Like `$`, also matches right before a final newline."""
+
+    def _check(end: int) -> bool:
+        while end > 0 and text[end - 1].isdecimal():
+            end -= 1
+        return end > 0 and text[end - 1] == "["
+
+    return _check(len(text)) or (text.endswith("\n") and _check(len(text) - 1))
+
+
 class CitationProcessor:
     def __init__(
         self,
@@ -31,7 +77,10 @@ class CitationProcessor:
         self.stop_stream = stop_stream
         self.final_order_mapping = final_doc_id_to_rank_map.order_mapping
         self.display_order_mapping = display_doc_id_to_rank_map.order_mapping
-        self.llm_out = ""
+        # only the length and code block state of the output so far are needed, the
+        # work per token must not grow with the length of the answer
+        self.llm_out_len = 0
+        self.code_block_tracker = _CodeBlockTracker()
         self.max_citation_num = len(context_docs)
         self.citation_order: list[int] = []  # order of citations in the LLM output
         self.curr_segment = ""
@@ -59,7 +108,9 @@ class CitationProcessor:
             self.hold = ""
 
         self.curr_segment += token
-        self.llm_out += token
+        self.llm_out_len += len(token)
+        self.code_block_tracker.feed(token)
+        in_code_block = self.code_block_tracker.in_code_block
 
         # Handle code blocks without language tags
         if "`" in self.curr_segment:
@@ -67,25 +118,20 @@ class CitationProcessor:
                 pass
             elif "```" in self.curr_segment:
                 piece_that_comes_after = self.curr_segment.split("```")[1][0]
-                if piece_that_comes_after == "\n" and in_code_block(self.llm_out):
+                if piece_that_comes_after == "\n" and in_code_block:
                     self.curr_segment = self.curr_segment.replace("```", "```plaintext")
 
-        citation_pattern = r"\[(\d+)\]|\[\[(\d+)\]\]"  # [1], [[1]], etc.
-        citations_found = list(re.finditer(citation_pattern, self.curr_segment))
-        possible_citation_pattern = r"(\[+\d*$)"  # [1, [, [[, [[2, etc.
-        possible_citation_found = re.search(
-            possible_citation_pattern, self.curr_segment
-        )
+        citations_found = list(_CITATION_PATTERN.finditer(self.curr_segment))
+        possible_citation_found = _ends_with_possible_citation(self.curr_segment)
 
-        if len(citations_found) == 0 and len(self.llm_out) - self.past_cite_count > 5:
+        if len(citations_found) == 0 and self.llm_out_len - self.past_cite_count > 5:
             self.current_citations = []
 
         result = ""
-        if citations_found and not in_code_block(self.llm_out):
+        if citations_found and not in_code_block:
             last_citation_end = 0
             length_to_add = 0
-            while len(citations_found) > 0:
-                citation = citations_found.pop(0)
+            for citation in citations_found:
                 numerical_value = int(
                     next(group for group in citation.groups() if group is not None)
                 )
@@ -151,7 +197,7 @@ class CitationProcessor:
 
                     link = context_llm_doc.link
 
-                    self.past_cite_count = len(self.llm_out)
+                    self.past_cite_count = self.llm_out_len
                     self.current_citations.append(final_citation_num)
 
                     if citation_order_idx not in self.cited_inds:
@@ -6,6 +6,7 @@ from typing import cast
 from onyx.auth.schemas import AuthBackend
 from onyx.configs.constants import AuthType
 from onyx.configs.constants import DocumentIndexType
+from onyx.configs.constants import FileStoreType
 from onyx.file_processing.enums import HtmlBasedConnectorTransformLinksStrategy
 
 #####
@@ -64,6 +65,14 @@ SESSION_EXPIRE_TIME_SECONDS = int(
     or 86400 * 7
 )  # 7 days
 
+# The users which session tokens and API keys resolve to are kept in memory of each
+# API server process for up to this many seconds. Logouts and changes to users or API
+# keys are pushed to all processes via Redis pub/sub. 0 disables the cache
+AUTH_USER_CACHE_TTL_SECONDS = float(os.environ.get("AUTH_USER_CACHE_TTL_SECONDS") or 10)
+AUTH_USER_CACHE_MAX_ENTRIES = int(
+    os.environ.get("AUTH_USER_CACHE_MAX_ENTRIES") or 10000
+)
+
 # Default request timeout, mostly used by connectors
 REQUEST_TIMEOUT_SECONDS = int(os.environ.get("REQUEST_TIMEOUT_SECONDS") or 60)
 
@@ -194,6 +203,20 @@ except ValueError:
 
 USE_IAM_AUTH = os.getenv("USE_IAM_AUTH", "False").lower() == "true"
 
+# Where uploaded files (connector uploads, chat files, ...) are stored, Postgres large
+# objects or an S3 compatible object storage. The file records stay in Postgres
+FILE_STORE_TYPE = FileStoreType(
+    (os.environ.get("FILE_STORE_TYPE") or FileStoreType.POSTGRES.value).lower()
+)
+S3_FILE_STORE_BUCKET_NAME = os.environ.get("S3_FILE_STORE_BUCKET_NAME") or "onyx-files"
+# Prefix of the object keys in the bucket
+S3_FILE_STORE_PREFIX = os.environ.get("S3_FILE_STORE_PREFIX") or "onyx-files"
+# Set for S3 compatible storage like MinIO, e.g. http://minio:9000
+S3_ENDPOINT_URL = os.environ.get("S3_ENDPOINT_URL") or None
+# If not set, the default credential chain of boto3 is used (e.g. an IAM role)
+S3_AWS_ACCESS_KEY_ID = os.environ.get("S3_AWS_ACCESS_KEY_ID") or None
+S3_AWS_SECRET_ACCESS_KEY = os.environ.get("S3_AWS_SECRET_ACCESS_KEY") or None
+
 
 REDIS_SSL = os.getenv("REDIS_SSL", "").lower() == "true"
 REDIS_HOST = os.environ.get("REDIS_HOST") or "localhost"
@@ -243,6 +266,16 @@ REDIS_POOL_MAX_CONNECTIONS = int(os.environ.get("REDIS_POOL_MAX_CONNECTIONS", 12
 REDIS_SSL_CERT_REQS = os.getenv("REDIS_SSL_CERT_REQS", "none")
 REDIS_SSL_CA_CERTS = os.getenv("REDIS_SSL_CA_CERTS", None)
 
+# Values loaded from the key value store are kept in memory of each process for up to
+# this many seconds. Changes are also pushed to all processes via Redis pub/sub, the
+# TTL only bounds how long a missed change can go unnoticed. 0 disables the cache
+KV_STORE_NEAR_CACHE_TTL_SECONDS = float(
+    os.environ.get("KV_STORE_NEAR_CACHE_TTL_SECONDS") or 30
+)
+KV_STORE_NEAR_CACHE_MAX_ENTRIES = int(
+    os.environ.get("KV_STORE_NEAR_CACHE_MAX_ENTRIES") or 1024
+)
+
 CELERY_RESULT_EXPIRES = int(os.environ.get("CELERY_RESULT_EXPIRES", 86400))  # seconds
 
 # https://docs.celeryq.dev/en/stable/userguide/configuration.html#broker-pool-limit
@@ -293,6 +326,12 @@ except ValueError:
 # The maximum number of tasks that can be queued up to sync to Vespa in a single pass
 VESPA_SYNC_MAX_TASKS = 1024
 
+# Number of documents synced to Vespa by a single metadata sync task. Setting this to 1
+# sends one task per document
+VESPA_SYNC_BATCH_SIZE = int(os.environ.get("VESPA_SYNC_BATCH_SIZE") or 100)
+# Number of concurrent Vespa partial updates issued by a batched metadata sync task
+VESPA_SYNC_BATCH_CONCURRENCY = int(os.environ.get("VESPA_SYNC_BATCH_CONCURRENCY") or 16)
+
 DB_YIELD_PER_DEFAULT = 64
 
 #####
@@ -300,6 +339,16 @@ DB_YIELD_PER_DEFAULT = 64
 #####
 POLL_CONNECTOR_OFFSET = 30  # Minutes overlap between poll windows
 
+# Number of processes the File connector parses uploaded files in. 0 parses them in
+# the indexing process itself, without the timeout and memory limit below
+FILE_PARSING_PROCESSES = int(os.environ.get("FILE_PARSING_PROCESSES") or 4)
+# A file which takes longer to parse is skipped, 0 disables the timeout
+FILE_PARSING_TIMEOUT = float(os.environ.get("FILE_PARSING_TIMEOUT") or 300)
+# Address space limit of a parsing process, a file needing more is skipped. 0 disables
+FILE_PARSING_MEMORY_LIMIT_MB = int(
+    os.environ.get("FILE_PARSING_MEMORY_LIMIT_MB") or 4096
+)
+
 # View the list here:
 # https://github.com/onyx-dot-app/onyx/blob/main/backend/onyx/connectors/factory.py
 # If this is empty, all connectors are enabled, this is an option for security heavy orgs where
@@ -426,6 +475,14 @@ MAX_PRUNING_DOCUMENT_RETRIEVAL_PER_MINUTE = int(
     os.environ.get("MAX_PRUNING_DOCUMENT_RETRIEVAL_PER_MINUTE", 0)
 )
 
+# Pruning keeps the document ids of the source in a temporary file instead of memory.
+# Directory of the file, defaults to the system temp directory
+PRUNING_ID_STORE_DIR = os.environ.get("PRUNING_ID_STORE_DIR") or None
+# Memory used for caching pages of the file, in KiB
+PRUNING_ID_STORE_CACHE_KIB = int(
+    os.environ.get("PRUNING_ID_STORE_CACHE_KIB") or 16 * 1024
+)
+
 # comma delimited list of zendesk article labels to skip indexing for
 ZENDESK_CONNECTOR_SKIP_ARTICLE_LABELS = os.environ.get(
     "ZENDESK_CONNECTOR_SKIP_ARTICLE_LABELS", ""
@@ -488,6 +545,48 @@ INDEXING_TRACER_INTERVAL = int(os.environ.get("INDEXING_TRACER_INTERVAL") or 0)
 INDEXING_EMBEDDING_MODEL_NUM_THREADS = int(
     os.environ.get("INDEXING_EMBEDDING_MODEL_NUM_THREADS") or 1
 )
+# Number of concurrent embedding requests to a self hosted model server. Only worth raising
+# when the model server has several replicas (or workers) to serve them.
+LOCAL_EMBEDDING_MODEL_NUM_THREADS = int(
+    os.environ.get("LOCAL_EMBEDDING_MODEL_NUM_THREADS") or 1
+)
+
+# When > 0, consecutive batches of an indexing attempt are pipelined: the next batch is
+# fetched from the connector and chunked while the current one is embedded and written
+# to the document index. The value is the number of batches that may be buffered ahead
+# of each stage. 0 (the default) processes batches strictly one after the other.
+INDEXING_PIPELINE_DEPTH = int(os.environ.get("INDEXING_PIPELINE_DEPTH") or 0)
+
+# Persist chunk embeddings in Postgres, keyed by a hash of the model settings and the exact
+# text sent to the model, so that re-indexing unchanged content skips the model server.
+ENABLE_EMBEDDING_CACHE = os.environ.get("ENABLE_EMBEDDING_CACHE", "").lower() == "true"
+# Least recently used entries beyond this count are evicted by an hourly beat task
+EMBEDDING_CACHE_MAX_ENTRIES = int(
+    os.environ.get("EMBEDDING_CACHE_MAX_ENTRIES") or 2_000_000
+)
+
+# Query embeddings are kept in an in process LRU cache so that repeated searches (retries,
+# rephrasings, several tools asking the same thing) skip the model server. 0 disables it.
+QUERY_EMBEDDING_CACHE_SIZE = int(os.environ.get("QUERY_EMBEDDING_CACHE_SIZE") or 1024)
+QUERY_EMBEDDING_CACHE_TTL_SECONDS = int(
+    os.environ.get("QUERY_EMBEDDING_CACHE_TTL_SECONDS") or 60 * 60
+)
+# Also share cached query embeddings between processes through Redis
+QUERY_EMBEDDING_CACHE_USE_REDIS = (
+    os.environ.get("QUERY_EMBEDDING_CACHE_USE_REDIS", "").lower() == "true"
+)
+
+# Token counts of the texts put into the LLM context (e.g. the same retrieved sections
+# on every turn of a chat session) are kept in an in process LRU cache. 0 disables it.
+TOKEN_COUNT_CACHE_SIZE = int(os.environ.get("TOKEN_COUNT_CACHE_SIZE") or 20_000)
+
+# The files attached to a chat session are sent to the LLM on every turn, their content
+# is kept in an in process LRU cache of this total size. 0 disables it.
+CHAT_FILE_CACHE_MAX_MB = int(os.environ.get("CHAT_FILE_CACHE_MAX_MB") or 256)
+# If set, files evicted from the in memory cache are kept in this directory, up to
+# the given total size
+CHAT_FILE_DISK_CACHE_DIR = os.environ.get("CHAT_FILE_DISK_CACHE_DIR") or None
+CHAT_FILE_DISK_CACHE_MAX_MB = int(os.environ.get("CHAT_FILE_DISK_CACHE_MAX_MB") or 2048)
 
 # During an indexing attempt, specifies the number of batches which are allowed to
 # exception without aborting the attempt.
@@ -544,6 +643,39 @@ CUSTOM_ANSWER_VALIDITY_CONDITIONS = json.loads(
 
 VESPA_REQUEST_TIMEOUT = int(os.environ.get("VESPA_REQUEST_TIMEOUT") or "15")
 
+# Long lived HTTP/2 connection pool used for searches and chunk retrieval, so queries do
+# not pay for setting up connections. Idle connections are kept for the expiry (seconds).
+VESPA_QUERY_POOL_MAX_CONNECTIONS = int(
+    os.environ.get("VESPA_QUERY_POOL_MAX_CONNECTIONS") or 32
+)
+VESPA_QUERY_POOL_MAX_KEEPALIVE_CONNECTIONS = int(
+    os.environ.get("VESPA_QUERY_POOL_MAX_KEEPALIVE_CONNECTIONS") or 16
+)
+VESPA_QUERY_POOL_KEEPALIVE_EXPIRY = float(
+    os.environ.get("VESPA_QUERY_POOL_KEEPALIVE_EXPIRY") or 60
+)
+
+# Document feed (index / update / delete of chunks) to Vespa. The number of operations in
+# flight adapts between the min and max depending on whether Vespa is throttling
+# (429 / 503) the feed. Over HTTPS (managed Vespa) they are multiplexed on up to
+# VESPA_FEED_MAX_CONNECTIONS HTTP/2 connections. Over plain HTTP the feed falls back to
+# HTTP/1.1 with one operation per connection, so at most
+# VESPA_FEED_HTTP1_MAX_CONNECTIONS operations are in flight per process.
+VESPA_FEED_MAX_IN_FLIGHT = int(os.environ.get("VESPA_FEED_MAX_IN_FLIGHT") or 256)
+VESPA_FEED_MIN_IN_FLIGHT = int(os.environ.get("VESPA_FEED_MIN_IN_FLIGHT") or 8)
+VESPA_FEED_MAX_CONNECTIONS = int(os.environ.get("VESPA_FEED_MAX_CONNECTIONS") or 8)
+VESPA_FEED_HTTP1_MAX_CONNECTIONS = int(
+    os.environ.get("VESPA_FEED_HTTP1_MAX_CONNECTIONS") or 32
+)
+# attempts per operation before the feed gives up on it
+VESPA_FEED_MAX_RETRIES = int(os.environ.get("VESPA_FEED_MAX_RETRIES") or 10)
+
+# Send embeddings to Vespa as hex encoded tensor cells instead of JSON float lists, both
+# when feeding chunks and in the query. Much smaller requests and cheaper to parse.
+VESPA_TENSOR_HEX_ENCODING = (
+    os.environ.get("VESPA_TENSOR_HEX_ENCODING", "true").lower() == "true"
+)
+
 SYSTEM_RECURSION_LIMIT = int(os.environ.get("SYSTEM_RECURSION_LIMIT") or "1000")
 
 PARSE_WITH_TRAFILATURA = os.environ.get("PARSE_WITH_TRAFILATURA", "").lower() == "true"
@@ -46,6 +46,15 @@ EMBEDDING_BATCH_SIZE = int(os.environ.get("EMBEDDING_BATCH_SIZE") or 0) or None
 BATCH_SIZE_ENCODE_CHUNKS = EMBEDDING_BATCH_SIZE or 8
 # don't send over too many chunks at once, as sending too many could cause timeouts
 BATCH_SIZE_ENCODE_CHUNKS_FOR_API_EMBEDDING_SERVICES = EMBEDDING_BATCH_SIZE or 512
+# For local models, group texts of similar token length and size the batches by padded
+# tokens (batch size * context size) instead of by count, so a few long chunks don't force
+# padding onto many short ones. Batches hold at most this multiple of the batch size.
+LOCAL_EMBEDDING_TOKEN_BUDGET_BATCHING = (
+    os.environ.get("LOCAL_EMBEDDING_TOKEN_BUDGET_BATCHING", "").lower() != "false"
+)
+LOCAL_EMBEDDING_MAX_BATCH_SIZE_MULTIPLIER = int(
+    os.environ.get("LOCAL_EMBEDDING_MAX_BATCH_SIZE_MULTIPLIER") or 4
+)
 # For score display purposes, only way is to know the expected ranges
 CROSS_ENCODER_RANGE_MAX = 1
 CROSS_ENCODER_RANGE_MIN = 0
@@ -10,13 +10,17 @@ from onyx.configs.app_configs import CONTINUE_ON_CONNECTOR_FAILURE
 from onyx.configs.app_configs import INDEX_BATCH_SIZE
 from onyx.configs.constants import DocumentSource
 from onyx.connectors.confluence.onyx_confluence import build_confluence_client
+from onyx.connectors.confluence.onyx_confluence import ConfluencePaginationPosition
 from onyx.connectors.confluence.onyx_confluence import OnyxConfluence
 from onyx.connectors.confluence.utils import attachment_to_content
 from onyx.connectors.confluence.utils import build_confluence_document_id
 from onyx.connectors.confluence.utils import datetime_from_string
 from onyx.connectors.confluence.utils import extract_text_from_confluence_html
 from onyx.connectors.confluence.utils import validate_attachment_filetype
+from onyx.connectors.interfaces import CheckpointConnector
+from onyx.connectors.interfaces import ConnectorCheckpoint
 from onyx.connectors.interfaces import GenerateDocumentsOutput
+from onyx.connectors.interfaces import GenerateDocumentsWithCheckpointOutput
 from onyx.connectors.interfaces import GenerateSlimDocumentOutput
 from onyx.connectors.interfaces import LoadConnector
 from onyx.connectors.interfaces import PollConnector
@@ -77,7 +81,9 @@ _FULL_EXTENSION_FILTER_STRING = "".join(
 )
 
 
-class ConfluenceConnector(LoadConnector, PollConnector, SlimConnector):
+class ConfluenceConnector(
+    LoadConnector, PollConnector, SlimConnector, CheckpointConnector
+):
     def __init__(
         self,
         wiki_base: str,
@@ -268,29 +274,51 @@ class ConfluenceConnector(LoadConnector, PollConnector, SlimConnector):
         start: SecondsSinceUnixEpoch | None = None,
         end: SecondsSinceUnixEpoch | None = None,
     ) -> GenerateDocumentsOutput:
+        for doc_batch, _ in self._fetch_document_batches_with_checkpoint(start, end):
+            yield doc_batch
+
+    def _fetch_document_batches_with_checkpoint(
+        self,
+        start: SecondsSinceUnixEpoch | None = None,
+        end: SecondsSinceUnixEpoch | None = None,
+        checkpoint: ConnectorCheckpoint | None = None,
+    ) -> GenerateDocumentsWithCheckpointOutput:
+        """Each page is followed by its attachments. The checkpoint is the position in
+        the page query of the first page which was not completely yielded yet."""
         doc_batch: list[Document] = []
-        confluence_page_ids: list[str] = []
+
+        resume_position: ConfluencePaginationPosition | None = None
+        if checkpoint and checkpoint.get("page_position"):
+            resume_position = ConfluencePaginationPosition.model_validate(
+                checkpoint["page_position"]
+            )
+
+        def _checkpoint() -> ConnectorCheckpoint:
+            return {
+                "page_position": (
+                    resume_position.model_dump() if resume_position else None
+                )
+            }
 
         page_query = self._construct_page_query(start, end)
         logger.debug(f"page_query: {page_query}")
         # Fetch pages as Documents
-        for page in self.confluence_client.paginated_cql_retrieval(
+        for (
+            page,
+            next_position,
+        ) in self.confluence_client.paginated_cql_retrieval_with_position(
             cql=page_query,
             expand=",".join(_PAGE_EXPANSION_FIELDS),
             limit=self.batch_size,
+            position=resume_position,
         ):
             logger.debug(f"_fetch_document_batches: {page['id']}")
-            confluence_page_ids.append(page["id"])
             doc = self._convert_object_to_document(page)
             if doc is not None:
                 doc_batch.append(doc)
-            if len(doc_batch) >= self.batch_size:
-                yield doc_batch
-                doc_batch = []
 
-        # Fetch attachments as Documents
-        for confluence_page_id in confluence_page_ids:
-            attachment_query = self._construct_attachment_query(confluence_page_id)
+            # Fetch attachments of the page as Documents
+            attachment_query = self._construct_attachment_query(page["id"])
             # TODO: maybe should add time filter as well?
             for attachment in self.confluence_client.paginated_cql_retrieval(
                 cql=attachment_query,
@@ -300,11 +328,17 @@ class ConfluenceConnector(LoadConnector, PollConnector, SlimConnector):
                 if doc is not None:
                     doc_batch.append(doc)
                 if len(doc_batch) >= self.batch_size:
-                    yield doc_batch
+                    # the page is only partially done, resuming starts over with it
+                    yield doc_batch, _checkpoint()
                     doc_batch = []
 
+            resume_position = next_position
+            if len(doc_batch) >= self.batch_size:
+                yield doc_batch, _checkpoint()
+                doc_batch = []
+
         if doc_batch:
-            yield doc_batch
+            yield doc_batch, _checkpoint()
 
     def load_from_state(self) -> GenerateDocumentsOutput:
         return self._fetch_document_batches()
@@ -316,6 +350,14 @@ class ConfluenceConnector(LoadConnector, PollConnector, SlimConnector):
     ) -> GenerateDocumentsOutput:
         return self._fetch_document_batches(start, end)
 
+    def load_from_checkpoint(
+        self,
+        start: SecondsSinceUnixEpoch | None,
+        end: SecondsSinceUnixEpoch | None,
+        checkpoint: ConnectorCheckpoint | None,
+    ) -> GenerateDocumentsWithCheckpointOutput:
+        return self._fetch_document_batches_with_checkpoint(start, end, checkpoint)
+
     def retrieve_all_slim_documents(
         self,
         start: SecondsSinceUnixEpoch | None = None,
@@ -1,4 +1,5 @@
 import math
+import re
 import time
 from collections.abc import Callable
 from collections.abc import Iterator
@@ -8,6 +9,7 @@ from typing import TypeVar
 from urllib.parse import quote
 
 from atlassian import Confluence  # type:ignore
+from pydantic import BaseModel
 from requests import HTTPError
 
 from onyx.utils.logger import setup_logger
@@ -29,6 +31,13 @@ class ConfluenceRateLimitError(Exception):
     pass
 
 
+class ConfluencePaginationPosition(BaseModel):
+    """Url of a page of results + number of results already consumed from it"""
+
+    url: str
+    offset: int
+
+
 def _handle_http_error(e: HTTPError, attempt: int) -> int:
     MIN_DELAY = 2
     MAX_DELAY = 60
@@ -154,11 +163,27 @@ class OnyxConfluence(Confluence):
         """
         This will paginate through the top level query.
         """
-        if not limit:
-            limit = _DEFAULT_PAGINATION_LIMIT
+        for _, response in self._paginate_url_responses(url_suffix, limit):
+            # yield the results individually
+            yield from response.get("results", [])
 
-        connection_char = "&" if "?" in url_suffix else "?"
-        url_suffix += f"{connection_char}limit={limit}"
+    def _paginate_url_responses(
+        self, url_suffix: str, limit: int | None = None
+    ) -> Iterator[tuple[str, dict[str, Any]]]:
+        """
+        Paginates through the top level query, yielding each raw response together
+        with the url it was fetched from. If the url already specifies a limit (e.g.
+        it is a `next` link of an earlier response), that limit is kept.
+        """
+        existing_limit = re.search(r"[?&]limit=(\d+)", url_suffix)
+        if existing_limit:
+            limit = int(existing_limit.group(1))
+        else:
+            if not limit:
+                limit = _DEFAULT_PAGINATION_LIMIT
+
+            connection_char = "&" if "?" in url_suffix else "?"
+            url_suffix += f"{connection_char}limit={limit}"
 
         while url_suffix:
             logger.debug(f"Making confluence call to {url_suffix}")
@@ -223,8 +248,7 @@ class OnyxConfluence(Confluence):
                 )
                 raise e
 
-            # yield the results individually
-            yield from next_response.get("results", [])
+            yield url_suffix, next_response
 
             url_suffix = next_response.get("_links", {}).get("next")
 
@@ -242,6 +266,34 @@ class OnyxConfluence(Confluence):
             f"rest/api/content/search?cql={cql}{expand_string}", limit
         )
 
+    def paginated_cql_retrieval_with_position(
+        self,
+        cql: str,
+        expand: str | None = None,
+        limit: int | None = None,
+        position: ConfluencePaginationPosition | None = None,
+    ) -> Iterator[tuple[dict[str, Any], ConfluencePaginationPosition]]:
+        """
+        Same as `paginated_cql_retrieval`, but each result comes with the position
+        from which the retrieval can be resumed to get the results after it.
+        `position` resumes a previous retrieval of the same query.
+        """
+        if position:
+            url_suffix = position.url
+            num_to_skip = position.offset
+        else:
+            expand_string = f"&expand={expand}" if expand else ""
+            url_suffix = f"rest/api/content/search?cql={cql}{expand_string}"
+            num_to_skip = 0
+
+        for response_url, response in self._paginate_url_responses(url_suffix, limit):
+            results = response.get("results", [])
+            for ind in range(num_to_skip, len(results)):
+                yield results[ind], ConfluencePaginationPosition(
+                    url=response_url, offset=ind + 1
+                )
+            num_to_skip = 0
+
     def cql_paginate_all_expansions(
         self,
         cql: str,
@@ -1,11 +1,15 @@
 import sys
 import time
+from collections.abc import Iterator
 from datetime import datetime
 
 from onyx.connectors.interfaces import BaseConnector
+from onyx.connectors.interfaces import CheckpointConnector
+from onyx.connectors.interfaces import ConnectorCheckpoint
 from onyx.connectors.interfaces import GenerateDocumentsOutput
 from onyx.connectors.interfaces import LoadConnector
 from onyx.connectors.interfaces import PollConnector
+from onyx.connectors.models import Document
 from onyx.utils.logger import setup_logger
 
 
@@ -21,15 +25,37 @@ class ConnectorRunner:
         connector: BaseConnector,
         time_range: TimeRange | None = None,
         fail_loudly: bool = False,
+        checkpoint: ConnectorCheckpoint | None = None,
     ):
         self.connector = connector
 
-        if isinstance(self.connector, PollConnector):
+        # batches paired with the checkpoint to resume after them, if supported
+        self.doc_batch_generator: Iterator[
+            tuple[list[Document], ConnectorCheckpoint | None]
+        ]
+
+        if isinstance(self.connector, CheckpointConnector):
+            if isinstance(self.connector, PollConnector):
+                if time_range is None:
+                    raise ValueError("time_range is required for PollConnector")
+
+                self.doc_batch_generator = self.connector.load_from_checkpoint(
+                    time_range[0].timestamp(), time_range[1].timestamp(), checkpoint
+                )
+            else:
+                self.doc_batch_generator = self.connector.load_from_checkpoint(
+                    None, None, checkpoint
+                )
+
+        elif isinstance(self.connector, PollConnector):
             if time_range is None:
                 raise ValueError("time_range is required for PollConnector")
 
-            self.doc_batch_generator = self.connector.poll_source(
-                time_range[0].timestamp(), time_range[1].timestamp()
+            self.doc_batch_generator = (
+                (batch, None)
+                for batch in self.connector.poll_source(
+                    time_range[0].timestamp(), time_range[1].timestamp()
+                )
             )
 
         elif isinstance(self.connector, LoadConnector):
@@ -38,22 +64,31 @@ class ConnectorRunner:
                     "time_range specified, but passed in connector is not a PollConnector"
                 )
 
-            self.doc_batch_generator = self.connector.load_from_state()
+            self.doc_batch_generator = (
+                (batch, None) for batch in self.connector.load_from_state()
+            )
 
         else:
             raise ValueError(f"Invalid connector. type: {type(self.connector)}")
 
     def run(self) -> GenerateDocumentsOutput:
-        """Adds additional exception logging to the connector."""
+        for batch, _ in self.run_with_checkpoints():
+            yield batch
+
+    def run_with_checkpoints(
+        self,
+    ) -> Iterator[tuple[list[Document], ConnectorCheckpoint | None]]:
+        """Adds additional exception logging to the connector. The checkpoint is always
+        None for connectors which don't support checkpointing."""
         try:
             start = time.monotonic()
-            for batch in self.doc_batch_generator:
+            for batch, checkpoint in self.doc_batch_generator:
                 # to know how long connector is taking
                 logger.debug(
                     f"Connector took {time.monotonic() - start} seconds to build a batch."
                 )
 
-                yield batch
+                yield batch, checkpoint
 
                 start = time.monotonic()
 
@@ -2,12 +2,16 @@ import os
 from collections.abc import Iterator
 from datetime import datetime
 from datetime import timezone
+from io import BytesIO
 from pathlib import Path
 from typing import Any
 from typing import IO
 
 from sqlalchemy.orm import Session
 
+from onyx.configs.app_configs import FILE_PARSING_MEMORY_LIMIT_MB
+from onyx.configs.app_configs import FILE_PARSING_PROCESSES
+from onyx.configs.app_configs import FILE_PARSING_TIMEOUT
 from onyx.configs.app_configs import INDEX_BATCH_SIZE
 from onyx.configs.constants import DocumentSource
 from onyx.connectors.cross_connector_utils.miscellaneous_utils import time_str_to_utc
@@ -23,10 +27,12 @@ from onyx.file_processing.extract_file_text import get_file_ext
 from onyx.file_processing.extract_file_text import is_text_file_extension
 from onyx.file_processing.extract_file_text import is_valid_file_ext
 from onyx.file_processing.extract_file_text import load_files_from_zip
-from onyx.file_processing.extract_file_text import read_pdf_file
+from onyx.file_processing.extract_file_text import read_pdf_pages
 from onyx.file_processing.extract_file_text import read_text_file
+from onyx.file_processing.unstructured import get_unstructured_api_key
 from onyx.file_store.file_store import get_default_file_store
 from onyx.utils.logger import setup_logger
+from onyx.utils.process_pool import ProcessPool
 from shared_configs.configs import POSTGRES_DEFAULT_SCHEMA
 from shared_configs.contextvars import CURRENT_TENANT_ID_CONTEXTVAR
 
@@ -61,6 +67,7 @@ def _process_file(
     file: IO[Any],
     metadata: dict[str, Any] | None = None,
     pdf_pass: str | None = None,
+    use_unstructured: bool = True,
 ) -> list[Document]:
     extension = get_file_ext(file_name)
     if not is_valid_file_ext(extension):
@@ -68,6 +75,8 @@ def _process_file(
         return []
 
     file_metadata: dict[str, Any] = {}
+    file_content_raw = ""
+    pdf_pages: Iterator[tuple[int, str]] | None = None
 
     if is_text_file_extension(file_name):
         encoding = detect_encoding(file)
@@ -75,15 +84,22 @@ def _process_file(
             file, encoding=encoding, ignore_onyx_metadata=False
         )
 
-    # Using the PDF reader function directly to pass in password cleanly
-    elif extension == ".pdf" and pdf_pass is not None:
-        file_content_raw, file_metadata = read_pdf_file(file=file, pdf_pass=pdf_pass)
+    # PDFs are read page by page, each page becomes a section linking to the page.
+    # Unstructured parses the whole file if it is configured and there is no password
+    elif extension == ".pdf" and (
+        pdf_pass is not None or not (use_unstructured and get_unstructured_api_key())
+    ):
+        pdf_pages, pdf_metadata = read_pdf_pages(file=file, pdf_pass=pdf_pass)
+        # the PDF metadata has only been kept for password protected PDFs
+        if pdf_pass is not None:
+            file_metadata = pdf_metadata
 
     else:
         file_content_raw = extract_file_text(
             file=file,
             file_name=file_name,
             break_on_unprocessable=True,
+            use_unstructured=use_unstructured,
         )
 
     all_metadata = {**metadata, **file_metadata} if metadata else file_metadata
@@ -143,12 +159,20 @@ def _process_file(
         else None
     )
 
+    link = all_metadata.get("link")
+    sections = [Section(link=link, text=file_content_raw.strip())]
+    if pdf_pages is not None:
+        page_sections = [
+            Section(link=f"{link}#page={page_number}" if link else None, text=text)
+            for page_number, page_text in pdf_pages
+            if (text := page_text.strip())
+        ]
+        sections = page_sections or sections
+
     return [
         Document(
             id=doc_id,
-            sections=[
-                Section(link=all_metadata.get("link"), text=file_content_raw.strip())
-            ],
+            sections=sections,
             source=source_type or DocumentSource.FILE,
             semantic_identifier=file_display_name,
             title=title,
@@ -161,6 +185,18 @@ def _process_file(
     ]
 
 
+def _process_file_content(
+    file_name: str,
+    content: bytes,
+    metadata: dict[str, Any],
+    pdf_pass: str | None,
+) -> list[Document]:
+    """Runs in a parsing process, see LocalFileConnector._process_files"""
+    return _process_file(
+        file_name, BytesIO(content), metadata, pdf_pass, use_unstructured=False
+    )
+
+
 class LocalFileConnector(LoadConnector):
     def __init__(
         self,
@@ -177,32 +213,82 @@ class LocalFileConnector(LoadConnector):
         self.pdf_pass = credentials.get("pdf_password")
         return None
 
+    def _read_files(
+        self, db_session: Session
+    ) -> Iterator[tuple[str, IO, dict[str, Any]]]:
+        for file_path in self.file_locations:
+            current_datetime = datetime.now(timezone.utc)
+            files = _read_files_and_metadata(
+                file_name=str(file_path), db_session=db_session
+            )
+
+            for file_name, file, metadata in files:
+                metadata["time_updated"] = metadata.get(
+                    "time_updated", current_datetime
+                )
+                yield file_name, file, metadata
+
+    def _process_files(
+        self, files: Iterator[tuple[str, IO, dict[str, Any]]]
+    ) -> Iterator[tuple[str, list[Document], str | None]]:
+        """Yields the file name, its documents and the error if it failed.
+
+        Parsing is CPU bound, so files are parsed in a pool of processes. This also
+        isolates files which take too long or too much memory to parse. Unstructured
+        parses remotely and needs the database for its API key, so it stays here."""
+        if FILE_PARSING_PROCESSES < 1 or get_unstructured_api_key():
+            for file_name, file, metadata in files:
+                try:
+                    documents = _process_file(file_name, file, metadata, self.pdf_pass)
+                except Exception as e:
+                    yield file_name, [], str(e)
+                    continue
+                yield file_name, documents, None
+            return
+
+        with ProcessPool(
+            FILE_PARSING_PROCESSES,
+            timeout=FILE_PARSING_TIMEOUT,
+            memory_limit_mb=FILE_PARSING_MEMORY_LIMIT_MB,
+        ) as pool:
+            results = pool.imap(
+                _process_file_content,
+                (
+                    (file_name, file.read(), metadata, self.pdf_pass)
+                    for file_name, file, metadata in files
+                ),
+            )
+            for result in results:
+                yield result.args[0], result.value or [], result.error
+
     def load_from_state(self) -> GenerateDocumentsOutput:
         documents: list[Document] = []
+        num_failed = 0
         token = CURRENT_TENANT_ID_CONTEXTVAR.set(self.tenant_id)
 
         with get_session_with_tenant(self.tenant_id) as db_session:
-            for file_path in self.file_locations:
-                current_datetime = datetime.now(timezone.utc)
-                files = _read_files_and_metadata(
-                    file_name=str(file_path), db_session=db_session
-                )
-
-                for file_name, file, metadata in files:
-                    metadata["time_updated"] = metadata.get(
-                        "time_updated", current_datetime
-                    )
-                    documents.extend(
-                        _process_file(file_name, file, metadata, self.pdf_pass)
+            for file_name, file_documents, error in self._process_files(
+                self._read_files(db_session)
+            ):
+                if error is not None:
+                    # a file which cannot be parsed should not fail the others
+                    logger.error(
+                        f"Skipping file '{file_name}', failed to parse: {error}"
                     )
+                    num_failed += 1
+                    continue
 
-                    if len(documents) >= self.batch_size:
-                        yield documents
-                        documents = []
+                documents.extend(file_documents)
+                if len(documents) >= self.batch_size:
+                    yield documents
+                    documents = []
 
             if documents:
                 yield documents
 
+        if num_failed:
+            logger.warning(f"Skipped {num_failed} files which failed to parse")
+
         CURRENT_TENANT_ID_CONTEXTVAR.reset(token)
 
 
@@ -15,6 +15,12 @@ SecondsSinceUnixEpoch = float
 GenerateDocumentsOutput = Iterator[list[Document]]
 GenerateSlimDocumentOutput = Iterator[list[SlimDocument]]
 
+# Opaque, JSON serializable progress marker of a connector run
+ConnectorCheckpoint = dict[str, Any]
+GenerateDocumentsWithCheckpointOutput = Iterator[
+    tuple[list[Document], ConnectorCheckpoint]
+]
+
 
 class BaseConnector(abc.ABC):
     REDIS_KEY_PREFIX = "da_connector_data:"
@@ -58,6 +64,25 @@ class PollConnector(BaseConnector):
         raise NotImplementedError
 
 
+# Large loads / polls which can be resumed after a failed indexing attempt
+class CheckpointConnector(BaseConnector):
+    @abc.abstractmethod
+    def load_from_checkpoint(
+        self,
+        start: SecondsSinceUnixEpoch | None,
+        end: SecondsSinceUnixEpoch | None,
+        checkpoint: ConnectorCheckpoint | None,
+    ) -> GenerateDocumentsWithCheckpointOutput:
+        """Yields each batch together with a checkpoint. Calling this again with that
+        checkpoint (and the same start / end) yields the documents which come after the
+        batch. Documents may be repeated after resuming, but none may be skipped.
+
+        `start` and `end` are None for a full load, as for `LoadConnector`, and
+        otherwise work as for `PollConnector`. No checkpoint means from the beginning.
+        """
+        raise NotImplementedError
+
+
 class SlimConnector(BaseConnector):
     @abc.abstractmethod
     def retrieve_all_slim_documents(
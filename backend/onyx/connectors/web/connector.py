@@ -29,7 +29,7 @@ from onyx.connectors.interfaces import GenerateDocumentsOutput
 from onyx.connectors.interfaces import LoadConnector
 from onyx.connectors.models import Document
 from onyx.connectors.models import Section
-from onyx.file_processing.extract_file_text import read_pdf_file
+from onyx.file_processing.extract_file_text import read_pdf_pages
 from onyx.file_processing.html_utils import web_html_cleanup
 from onyx.utils.logger import setup_logger
 from onyx.utils.sitemap import list_pages_for_site
@@ -306,15 +306,22 @@ class WebConnector(LoadConnector):
                 if current_url.split(".")[-1] == "pdf":
                     # PDF files are not checked for links
                     response = requests.get(current_url)
-                    page_text, metadata = read_pdf_file(
+                    pdf_pages, metadata = read_pdf_pages(
                         file=io.BytesIO(response.content)
                     )
                     last_modified = response.headers.get("Last-Modified")
 
+                    # a section per page, so that citations link to the page
+                    sections = [
+                        Section(link=f"{current_url}#page={page_number}", text=text)
+                        for page_number, text in pdf_pages
+                        if text.strip()
+                    ] or [Section(link=current_url, text="")]
+
                     doc_batch.append(
                         Document(
                             id=current_url,
-                            sections=[Section(link=current_url, text=page_text)],
+                            sections=sections,
                             source=DocumentSource.WEB,
                             semantic_identifier=current_url.split("/")[-1],
                             metadata=metadata,
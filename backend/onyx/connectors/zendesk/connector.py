@@ -9,7 +9,10 @@ from onyx.configs.constants import DocumentSource
 from onyx.connectors.cross_connector_utils.miscellaneous_utils import (
     time_str_to_utc,
 )
+from onyx.connectors.interfaces import CheckpointConnector
+from onyx.connectors.interfaces import ConnectorCheckpoint
 from onyx.connectors.interfaces import GenerateDocumentsOutput
+from onyx.connectors.interfaces import GenerateDocumentsWithCheckpointOutput
 from onyx.connectors.interfaces import GenerateSlimDocumentOutput
 from onyx.connectors.interfaces import LoadConnector
 from onyx.connectors.interfaces import PollConnector
@@ -81,16 +84,37 @@ def _get_content_tag_mapping(client: ZendeskClient) -> dict[str, str]:
 def _get_articles(
     client: ZendeskClient, start_time: int | None = None, page_size: int = MAX_PAGE_SIZE
 ) -> Iterator[dict[str, Any]]:
+    for article, _ in _get_articles_with_position(client, start_time, page_size):
+        yield article
+
+
+def _get_articles_with_position(
+    client: ZendeskClient,
+    start_time: int | None = None,
+    page_size: int = MAX_PAGE_SIZE,
+    position: dict[str, Any] | None = None,
+) -> Iterator[tuple[dict[str, Any], dict[str, Any]]]:
+    """Yields each article with the position to resume the retrieval after it"""
     params = (
         {"start_time": start_time, "page[size]": page_size}
         if start_time
         else {"page[size]": page_size}
     )
+    num_to_skip = 0
+    if position:
+        if position["after_cursor"]:
+            params["page[after]"] = position["after_cursor"]
+        num_to_skip = position["offset"]
 
     while True:
         data = client.make_request("help_center/articles", params)
-        for article in data["articles"]:
-            yield article
+        articles = data["articles"]
+        for ind in range(num_to_skip, len(articles)):
+            yield articles[ind], {
+                "after_cursor": params.get("page[after]"),
+                "offset": ind + 1,
+            }
+        num_to_skip = 0
 
         if not data.get("meta", {}).get("has_more"):
             break
@@ -100,12 +124,28 @@ def _get_articles(
 def _get_tickets(
     client: ZendeskClient, start_time: int | None = None
 ) -> Iterator[dict[str, Any]]:
+    for ticket, _ in _get_tickets_with_position(client, start_time):
+        yield ticket
+
+
+def _get_tickets_with_position(
+    client: ZendeskClient,
+    start_time: int | None = None,
+    position: dict[str, Any] | None = None,
+) -> Iterator[tuple[dict[str, Any], dict[str, Any]]]:
+    """Yields each ticket with the position to resume the retrieval after it"""
     params = {"start_time": start_time} if start_time else {"start_time": 0}
+    num_to_skip = 0
+    if position:
+        params["start_time"] = position["start_time"]
+        num_to_skip = position["offset"]
 
     while True:
         data = client.make_request("incremental/tickets.json", params)
-        for ticket in data["tickets"]:
-            yield ticket
+        tickets = data["tickets"]
+        for ind in range(num_to_skip, len(tickets)):
+            yield tickets[ind], {"start_time": params["start_time"], "offset": ind + 1}
+        num_to_skip = 0
 
         if not data.get("end_of_stream", False):
             params["start_time"] = data["end_time"]
@@ -277,7 +317,9 @@ def _ticket_to_document(
     )
 
 
-class ZendeskConnector(LoadConnector, PollConnector, SlimConnector):
+class ZendeskConnector(
+    LoadConnector, PollConnector, SlimConnector, CheckpointConnector
+):
     def __init__(
         self,
         batch_size: int = INDEX_BATCH_SIZE,
@@ -309,28 +351,44 @@ class ZendeskConnector(LoadConnector, PollConnector, SlimConnector):
     def poll_source(
         self, start: SecondsSinceUnixEpoch | None, end: SecondsSinceUnixEpoch | None
     ) -> GenerateDocumentsOutput:
+        for doc_batch, _ in self.load_from_checkpoint(start, end, None):
+            yield doc_batch
+
+    def load_from_checkpoint(
+        self,
+        start: SecondsSinceUnixEpoch | None,
+        end: SecondsSinceUnixEpoch | None,
+        checkpoint: ConnectorCheckpoint | None,
+    ) -> GenerateDocumentsWithCheckpointOutput:
+        """The checkpoint is the position in the article / ticket listing after the
+        last item of the batch."""
         if self.client is None:
             raise ZendeskCredentialsNotSetUpError()
 
         self.content_tags = _get_content_tag_mapping(self.client)
 
+        position = checkpoint.get("position") if checkpoint else None
         if self.content_type == "articles":
-            yield from self._poll_articles(start)
+            yield from self._poll_articles(start, position)
         elif self.content_type == "tickets":
-            yield from self._poll_tickets(start)
+            yield from self._poll_tickets(start, position)
         else:
             raise ValueError(f"Unsupported content_type: {self.content_type}")
 
     def _poll_articles(
-        self, start: SecondsSinceUnixEpoch | None
-    ) -> GenerateDocumentsOutput:
-        articles = _get_articles(self.client, start_time=int(start) if start else None)
+        self,
+        start: SecondsSinceUnixEpoch | None,
+        position: dict[str, Any] | None = None,
+    ) -> GenerateDocumentsWithCheckpointOutput:
+        articles = _get_articles_with_position(
+            self.client, start_time=int(start) if start else None, position=position
+        )
 
         # This one is built on the fly as there may be more many more authors than tags
         author_map: dict[str, BasicExpertInfo] = {}
 
-        doc_batch = []
-        for article in articles:
+        doc_batch: list[Document] = []
+        for article, position in articles:
             if (
                 article.get("body") is None
                 or article.get("draft")
@@ -349,58 +407,50 @@ class ZendeskConnector(LoadConnector, PollConnector, SlimConnector):
 
             doc_batch.append(documents)
             if len(doc_batch) >= self.batch_size:
-                yield doc_batch
-                doc_batch.clear()
+                yield doc_batch, {"position": position}
+                doc_batch = []
 
         if doc_batch:
-            yield doc_batch
+            yield doc_batch, {"position": position}
 
     def _poll_tickets(
-        self, start: SecondsSinceUnixEpoch | None
-    ) -> GenerateDocumentsOutput:
+        self,
+        start: SecondsSinceUnixEpoch | None,
+        position: dict[str, Any] | None = None,
+    ) -> GenerateDocumentsWithCheckpointOutput:
         if self.client is None:
             raise ZendeskCredentialsNotSetUpError()
 
         author_map: dict[str, BasicExpertInfo] = {}
 
-        ticket_generator = _get_tickets(
-            self.client, start_time=int(start) if start else None
+        tickets = _get_tickets_with_position(
+            self.client, start_time=int(start) if start else None, position=position
         )
 
-        while True:
-            doc_batch = []
-            for _ in range(self.batch_size):
-                try:
-                    ticket = next(ticket_generator)
-
-                    # Check if the ticket status is deleted and skip it if so
-                    if ticket.get("status") == "deleted":
-                        continue
-
-                    new_author_map, documents = _ticket_to_document(
-                        ticket=ticket,
-                        author_map=author_map,
-                        client=self.client,
-                        default_subdomain=self.subdomain,
-                    )
+        doc_batch: list[Document] = []
+        for ticket, position in tickets:
+            # Check if the ticket status is deleted and skip it if so
+            if ticket.get("status") == "deleted":
+                continue
 
-                    if new_author_map:
-                        author_map.update(new_author_map)
+            new_author_map, documents = _ticket_to_document(
+                ticket=ticket,
+                author_map=author_map,
+                client=self.client,
+                default_subdomain=self.subdomain,
+            )
 
-                    doc_batch.append(documents)
+            if new_author_map:
+                author_map.update(new_author_map)
 
-                    if len(doc_batch) >= self.batch_size:
-                        yield doc_batch
-                        doc_batch.clear()
+            doc_batch.append(documents)
 
-                except StopIteration:
-                    # No more tickets to process
-                    if doc_batch:
-                        yield doc_batch
-                    return
+            if len(doc_batch) >= self.batch_size:
+                yield doc_batch, {"position": position}
+                doc_batch = []
 
-            if doc_batch:
-                yield doc_batch
+        if doc_batch:
+            yield doc_batch, {"position": position}
 
     def retrieve_all_slim_documents(
         self,
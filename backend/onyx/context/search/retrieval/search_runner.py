@@ -23,6 +23,9 @@ from onyx.document_index.interfaces import VespaChunkRequest
 from onyx.document_index.vespa.shared_utils.utils import (
     replace_invalid_doc_id_characters,
 )
+from onyx.natural_language_processing.embedding_cache import (
+    get_query_embedding_cache,
+)
 from onyx.natural_language_processing.search_nlp_models import EmbeddingModel
 from onyx.secondary_llm_flows.query_expansion import multilingual_query_expansion
 from onyx.utils.logger import setup_logger
@@ -128,6 +131,8 @@ def doc_index_retrieval(
         # The below are globally set, this flow always uses the indexing one
         server_host=MODEL_SERVER_HOST,
         server_port=MODEL_SERVER_PORT,
+        # identical queries (retries, rephrasings, sub questions) are very common
+        embedding_cache=get_query_embedding_cache(),
     )
 
     query_embedding = model.encode([query.query], text_type=EmbedTextType.QUERY)[0]
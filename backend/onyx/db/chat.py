@@ -43,7 +43,7 @@ from onyx.db.models import SearchDoc as DBSearchDoc
 from onyx.db.models import ToolCall
 from onyx.db.models import User
 from onyx.db.persona import get_best_persona_id_for_user
-from onyx.db.pg_file_store import delete_lobj_by_name
+from onyx.file_store.file_store import get_default_file_store
 from onyx.file_store.models import FileDescriptor
 from onyx.llm.override_models import LLMOverride
 from onyx.llm.override_models import PromptOverride
@@ -220,6 +220,7 @@ def delete_messages_and_files_from_chat_session(
         )
     ).fetchall()
 
+    file_store = get_default_file_store(db_session)
     for id, files in messages_with_files:
         delete_tool_call_for_message_id(message_id=id, db_session=db_session)
         delete_search_doc_message_relationship(message_id=id, db_session=db_session)
@@ -227,7 +228,10 @@ def delete_messages_and_files_from_chat_session(
             lobj_name = file_info.get("id")
             if lobj_name:
                 logger.info(f"Deleting file with name: {lobj_name}")
-                delete_lobj_by_name(lobj_name, db_session)
+                try:
+                    file_store.delete_file(lobj_name)
+                except RuntimeError:
+                    logger.info(f"no file with name {lobj_name} found")
 
     db_session.execute(
         delete(ChatMessage).where(ChatMessage.chat_session_id == chat_session_id)
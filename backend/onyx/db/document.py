@@ -2,6 +2,7 @@ import contextlib
 import time
 from collections.abc import Generator
 from collections.abc import Iterable
+from collections.abc import Iterator
 from collections.abc import Sequence
 from datetime import datetime
 from datetime import timezone
@@ -21,6 +22,7 @@ from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
 from sqlalchemy.sql.expression import null
 
+from onyx.configs.app_configs import DB_YIELD_PER_DEFAULT
 from onyx.configs.constants import DEFAULT_BOOST
 from onyx.configs.constants import DocumentSource
 from onyx.db.connector_credential_pair import get_connector_credential_pair_from_id
@@ -189,6 +191,27 @@ def get_document_ids_for_connector_credential_pair(
     return list(db_session.execute(doc_ids_stmt).scalars().all())
 
 
+def yield_document_ids_for_connector_credential_pair(
+    db_session: Session, connector_id: int, credential_id: int
+) -> Iterator[str]:
+    """Streams the ids with a server side cursor instead of loading them all. The
+    cursor stays open until the iterator is exhausted, the session must not be used
+    for anything else meanwhile."""
+    # yield_per as an execution option implies stream_results, calling .yield_per()
+    # on the result only batches rows the driver already fetched completely
+    doc_ids_stmt = (
+        select(DocumentByConnectorCredentialPair.id)
+        .where(
+            and_(
+                DocumentByConnectorCredentialPair.connector_id == connector_id,
+                DocumentByConnectorCredentialPair.credential_id == credential_id,
+            )
+        )
+        .execution_options(yield_per=DB_YIELD_PER_DEFAULT)
+    )
+    yield from db_session.scalars(doc_ids_stmt)
+
+
 def get_documents_for_connector_credential_pair(
     db_session: Session, connector_id: int, credential_id: int, limit: int | None = None
 ) -> Sequence[DbDocument]:
@@ -485,6 +508,20 @@ def update_docs_chunk_count__no_commit(
         doc.chunk_count = doc_id_to_chunk_count[doc.id]
 
 
+def get_document_ids_without_chunk_count(
+    db_session: Session,
+    limit: int,
+    after_document_id: str | None = None,
+) -> list[str]:
+    """Documents indexed before the chunk count was stored, in ID order so the
+    caller can page through them with `after_document_id`."""
+    stmt = select(DbDocument.id).where(DbDocument.chunk_count.is_(None))
+    if after_document_id is not None:
+        stmt = stmt.where(DbDocument.id > after_document_id)
+    stmt = stmt.order_by(DbDocument.id).limit(limit)
+    return list(db_session.scalars(stmt).all())
+
+
 def mark_document_as_modified(
     document_id: str,
     db_session: Session,
@@ -510,6 +547,18 @@ def mark_document_as_synced(document_id: str, db_session: Session) -> None:
     db_session.commit()
 
 
+def mark_documents_as_synced(document_ids: list[str], db_session: Session) -> None:
+    if not document_ids:
+        return
+
+    db_session.execute(
+        update(DbDocument)
+        .where(DbDocument.id.in_(document_ids))
+        .values(last_synced=datetime.now(timezone.utc))
+    )
+    db_session.commit()
+
+
 def delete_document_by_connector_credential_pair__no_commit(
     db_session: Session,
     document_id: str,
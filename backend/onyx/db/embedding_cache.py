@@ -0,0 +1,109 @@
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from typing import cast
+
+from sqlalchemy import delete
+from sqlalchemy import func
+from sqlalchemy import select
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import CursorResult
+from sqlalchemy.orm import Session
+
+from onyx.db.models import EmbeddingCacheEntry
+
+# Entries are only marked as used again once their last use is older than this. Eviction
+# does not need finer granularity and it keeps cache hits from writing on every lookup.
+_LAST_USED_AT_GRANULARITY = timedelta(hours=1)
+
+
+def fetch_cached_embeddings(
+    db_session: Session,
+    cache_keys: list[str],
+) -> dict[str, bytes]:
+    """Returns the packed embeddings for the keys which are present and marks the ones
+    not used within the last `_LAST_USED_AT_GRANULARITY` as recently used."""
+    if not cache_keys:
+        return {}
+
+    rows = db_session.execute(
+        select(
+            EmbeddingCacheEntry.cache_key,
+            EmbeddingCacheEntry.embedding,
+            EmbeddingCacheEntry.last_used_at,
+        ).where(EmbeddingCacheEntry.cache_key.in_(cache_keys))
+    ).all()
+    hits = {cache_key: embedding for cache_key, embedding, _ in rows}
+
+    now = datetime.now(timezone.utc)
+    stale_cutoff = now - _LAST_USED_AT_GRANULARITY
+    stale_keys = [
+        cache_key for cache_key, _, last_used_at in rows if last_used_at < stale_cutoff
+    ]
+    if stale_keys:
+        db_session.execute(
+            update(EmbeddingCacheEntry)
+            .where(
+                EmbeddingCacheEntry.cache_key.in_(stale_keys),
+                EmbeddingCacheEntry.last_used_at < stale_cutoff,
+            )
+            .values(last_used_at=now)
+        )
+        db_session.commit()
+
+    return hits
+
+
+def upsert_cached_embeddings(
+    db_session: Session,
+    model_name: str,
+    key_to_embedding: dict[str, bytes],
+) -> None:
+    """NOTE: this function is Postgres specific. Not all DBs support the ON CONFLICT clause."""
+    if not key_to_embedding:
+        return
+
+    insert_stmt = insert(EmbeddingCacheEntry).values(
+        [
+            {
+                "cache_key": cache_key,
+                "model_name": model_name,
+                "embedding": embedding,
+                "last_used_at": datetime.now(timezone.utc),
+            }
+            for cache_key, embedding in key_to_embedding.items()
+        ]
+    )
+    db_session.execute(
+        insert_stmt.on_conflict_do_update(
+            index_elements=["cache_key"],
+            set_={"last_used_at": insert_stmt.excluded.last_used_at},
+        )
+    )
+    db_session.commit()
+
+
+def evict_embedding_cache_entries(db_session: Session, max_entries: int) -> int:
+    """Deletes the least recently used entries so that at most `max_entries` remain.
+    Returns the number of deleted entries."""
+    num_entries = db_session.scalar(select(func.count(EmbeddingCacheEntry.cache_key)))
+    if not num_entries or num_entries <= max_entries:
+        return 0
+
+    oldest_keys = (
+        select(EmbeddingCacheEntry.cache_key)
+        .order_by(EmbeddingCacheEntry.last_used_at.asc())
+        .limit(num_entries - max_entries)
+        .scalar_subquery()
+    )
+    result = cast(
+        CursorResult,
+        db_session.execute(
+            delete(EmbeddingCacheEntry).where(
+                EmbeddingCacheEntry.cache_key.in_(oldest_keys)
+            )
+        ),
+    )
+    db_session.commit()
+    return result.rowcount
@@ -27,6 +27,7 @@ from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.orm import Session
 from sqlalchemy.orm import sessionmaker
 
+from onyx.auth.user_cache import get_auth_token_data
 from onyx.configs.app_configs import AWS_REGION_NAME
 from onyx.configs.app_configs import LOG_POSTGRES_CONN_COUNTS
 from onyx.configs.app_configs import LOG_POSTGRES_LATENCY
@@ -42,7 +43,6 @@ from onyx.configs.app_configs import POSTGRES_PORT
 from onyx.configs.app_configs import POSTGRES_USER
 from onyx.configs.constants import POSTGRES_UNKNOWN_APP_NAME
 from onyx.configs.constants import SSL_CERT_FILE
-from onyx.redis.redis_pool import retrieve_auth_token_data_from_redis
 from onyx.server.utils import BasicAuthenticationError
 from onyx.utils.logger import setup_logger
 from shared_configs.configs import MULTI_TENANT
@@ -333,7 +333,7 @@ async def get_current_tenant_id(request: Request) -> str:
 
     try:
         # Look up token data in Redis
-        token_data = await retrieve_auth_token_data_from_redis(request)
+        token_data = await get_auth_token_data(request)
 
         if not token_data:
             current_value = CURRENT_TENANT_ID_CONTEXTVAR.get()
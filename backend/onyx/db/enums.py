@@ -64,6 +64,13 @@ class IndexModelStatus(str, PyEnum):
     FUTURE = "FUTURE"
 
 
+class EmbeddingPrecision(str, PyEnum):
+    # Cell type of the embeddings in the document index. Values are the Vespa
+    # tensor cell types, bfloat16 halves the memory of the vectors.
+    FLOAT = "float"
+    BFLOAT16 = "bfloat16"
+
+
 class ChatSessionSharedStatus(str, PyEnum):
     PUBLIC = "public"
     PRIVATE = "private"
@@ -2,6 +2,7 @@ from collections.abc import Sequence
 from datetime import datetime
 from datetime import timedelta
 from datetime import timezone
+from typing import Any
 
 from sqlalchemy import and_
 from sqlalchemy import delete
@@ -287,6 +288,64 @@ def update_docs_indexed(
         raise
 
 
+def update_index_attempt_checkpoint(
+    db_session: Session,
+    index_attempt_id: int,
+    checkpoint: dict[str, Any] | None,
+) -> None:
+    db_session.execute(
+        update(IndexAttempt)
+        .where(IndexAttempt.id == index_attempt_id)
+        .values(checkpoint=checkpoint)
+    )
+    db_session.commit()
+
+
+def update_index_attempt_performance_profile(
+    db_session: Session,
+    index_attempt_id: int,
+    performance_profile: dict[str, Any],
+) -> None:
+    db_session.execute(
+        update(IndexAttempt)
+        .where(IndexAttempt.id == index_attempt_id)
+        .values(performance_profile=performance_profile)
+    )
+    db_session.commit()
+
+
+def get_resumable_checkpoint(
+    db_session: Session,
+    index_attempt: IndexAttempt,
+) -> dict[str, Any] | None:
+    """Returns the checkpoint of the attempt which ran right before `index_attempt`
+    (for the same cc pair and search settings), if that attempt failed midway."""
+    previous_attempt = db_session.scalars(
+        select(IndexAttempt)
+        .where(
+            IndexAttempt.connector_credential_pair_id
+            == index_attempt.connector_credential_pair_id,
+            IndexAttempt.search_settings_id == index_attempt.search_settings_id,
+            IndexAttempt.id < index_attempt.id,
+        )
+        .order_by(desc(IndexAttempt.id))
+        .limit(1)
+    ).first()
+
+    if (
+        previous_attempt is None
+        or previous_attempt.status != IndexingStatus.FAILED
+        or previous_attempt.checkpoint is None
+    ):
+        return None
+
+    logger.info(
+        f"Found checkpoint of failed index attempt: "
+        f"previous_attempt={previous_attempt.id} attempt={index_attempt.id}"
+    )
+    return previous_attempt.checkpoint
+
+
 def get_last_attempt(
     connector_id: int,
     credential_id: int,
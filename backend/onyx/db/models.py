@@ -51,6 +51,7 @@ from onyx.configs.constants import TokenRateLimitScope
 from onyx.connectors.models import InputType
 from onyx.db.enums import ChatSessionSharedStatus
 from onyx.db.enums import ConnectorCredentialPairStatus
+from onyx.db.enums import EmbeddingPrecision
 from onyx.db.enums import IndexingStatus
 from onyx.db.enums import IndexModelStatus
 from onyx.db.enums import TaskStatus
@@ -691,6 +692,12 @@ class SearchSettings(Base):
     # Mini and Large Chunks (large chunk also checks for model max context)
     multipass_indexing: Mapped[bool] = mapped_column(Boolean, default=True)
 
+    embedding_precision: Mapped[EmbeddingPrecision] = mapped_column(
+        Enum(EmbeddingPrecision, native_enum=False),
+        default=EmbeddingPrecision.FLOAT,
+        server_default=EmbeddingPrecision.FLOAT.name,
+    )
+
     multilingual_expansion: Mapped[list[str]] = mapped_column(
         postgresql.ARRAY(String), default=[]
     )
@@ -817,6 +824,15 @@ class IndexAttempt(Base):
     error_msg: Mapped[str | None] = mapped_column(Text, default=None)
     # only filled if status = "failed" AND an unhandled exception caused the failure
     full_exception_trace: Mapped[str | None] = mapped_column(Text, default=None)
+    # progress of a checkpointed connector run (see `IndexingCheckpoint`), used to
+    # resume from where this attempt stopped if it fails
+    checkpoint: Mapped[dict[str, Any] | None] = mapped_column(
+        postgresql.JSONB(), nullable=True, default=None
+    )
+    # time spent in each stage of the indexing pipeline (see `IndexingProfile`)
+    performance_profile: Mapped[dict[str, Any] | None] = mapped_column(
+        postgresql.JSONB(), nullable=True, default=None
+    )
     # Nullable because in the past, we didn't allow swapping out embedding models live
     search_settings_id: Mapped[int] = mapped_column(
         ForeignKey("search_settings.id", ondelete="SET NULL"),
@@ -1852,7 +1868,26 @@ class PGFileStore(Base):
     file_origin: Mapped[FileOrigin] = mapped_column(Enum(FileOrigin, native_enum=False))
     file_type: Mapped[str] = mapped_column(String, default="text/plain")
     file_metadata: Mapped[JSON_ro] = mapped_column(postgresql.JSONB(), nullable=True)
-    lobj_oid: Mapped[int] = mapped_column(Integer, nullable=False)
+    # the content is either a Postgres large object or an object in object storage
+    lobj_oid: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    bucket_name: Mapped[str | None] = mapped_column(String, nullable=True)
+    object_key: Mapped[str | None] = mapped_column(String, nullable=True)
+
+
+class EmbeddingCacheEntry(Base):
+    """Embeddings of chunk texts, keyed by a hash of everything that determines the
+    embedding (model, normalization, prefix, exact text sent to the model). Lets
+    re-indexing of unchanged content skip the model server."""
+
+    __tablename__ = "embedding_cache"
+
+    cache_key: Mapped[str] = mapped_column(String, primary_key=True)
+    model_name: Mapped[str] = mapped_column(String, nullable=False)
+    # float32 values, packed
+    embedding: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    last_used_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), index=True
+    )
 
 
 class AgentSearchMetrics(Base):
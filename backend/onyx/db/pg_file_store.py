@@ -3,6 +3,7 @@ from io import BytesIO
 from typing import IO
 
 from psycopg2.extensions import connection
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from onyx.configs.constants import FileOrigin
@@ -84,6 +85,18 @@ def read_lobj(
         return BytesIO(large_object.read())
 
 
+def read_lobj_range(
+    lobj_oid: int,
+    db_session: Session,
+    offset: int,
+    length: int,
+) -> bytes:
+    pg_conn = get_pg_conn_from_session(db_session)
+    large_object = pg_conn.lobject(lobj_oid, mode="rb")
+    large_object.seek(offset)
+    return large_object.read(length)
+
+
 def delete_lobj_by_id(
     lobj_oid: int,
     db_session: Session,
@@ -102,8 +115,9 @@ def delete_lobj_by_name(
         logger.info(f"no file with name {lobj_name} found")
         return
 
-    pg_conn = get_pg_conn_from_session(db_session)
-    pg_conn.lobject(pgfilestore.lobj_oid).unlink()
+    if pgfilestore.lobj_oid is not None:
+        pg_conn = get_pg_conn_from_session(db_session)
+        pg_conn.lobject(pgfilestore.lobj_oid).unlink()
 
     delete_pgfilestore_by_file_name(lobj_name, db_session)
     db_session.commit()
@@ -114,25 +128,33 @@ def upsert_pgfilestore(
     display_name: str | None,
     file_origin: FileOrigin,
     file_type: str,
-    lobj_oid: int,
+    lobj_oid: int | None,
     db_session: Session,
     commit: bool = False,
     file_metadata: dict | None = None,
+    bucket_name: str | None = None,
+    object_key: str | None = None,
 ) -> PGFileStore:
+    """The content is either the large object `lobj_oid` or the object `object_key`
+    in object storage. A replaced large object is deleted, a replaced object in object
+    storage has to be deleted by the caller."""
     pgfilestore = db_session.query(PGFileStore).filter_by(file_name=file_name).first()
 
     if pgfilestore:
-        try:
-            # This should not happen in normal execution
-            delete_lobj_by_id(lobj_oid=pgfilestore.lobj_oid, db_session=db_session)
-        except Exception:
-            # If the delete fails as well, the large object doesn't exist anyway and even if it
-            # fails to delete, it's not too terrible as most files sizes are insignificant
-            logger.error(
-                f"Failed to delete large object with oid {pgfilestore.lobj_oid}"
-            )
+        if pgfilestore.lobj_oid is not None and pgfilestore.lobj_oid != lobj_oid:
+            try:
+                # This should not happen in normal execution
+                delete_lobj_by_id(lobj_oid=pgfilestore.lobj_oid, db_session=db_session)
+            except Exception:
+                # If the delete fails as well, the large object doesn't exist anyway and even if it
+                # fails to delete, it's not too terrible as most files sizes are insignificant
+                logger.error(
+                    f"Failed to delete large object with oid {pgfilestore.lobj_oid}"
+                )
 
         pgfilestore.lobj_oid = lobj_oid
+        pgfilestore.bucket_name = bucket_name
+        pgfilestore.object_key = object_key
     else:
         pgfilestore = PGFileStore(
             file_name=file_name,
@@ -141,6 +163,8 @@ def upsert_pgfilestore(
             file_type=file_type,
             file_metadata=file_metadata,
             lobj_oid=lobj_oid,
+            bucket_name=bucket_name,
+            object_key=object_key,
         )
         db_session.add(pgfilestore)
 
@@ -148,3 +172,22 @@ def upsert_pgfilestore(
         db_session.commit()
 
     return pgfilestore
+
+
+def get_pgfilestore_file_names(
+    db_session: Session,
+    in_object_storage: bool,
+    limit: int,
+    after_file_name: str | None = None,
+) -> list[str]:
+    """File names in order, of the files stored as large objects or in object
+    storage"""
+    stmt = select(PGFileStore.file_name)
+    if in_object_storage:
+        stmt = stmt.where(PGFileStore.object_key.is_not(None))
+    else:
+        stmt = stmt.where(PGFileStore.lobj_oid.is_not(None))
+    if after_file_name is not None:
+        stmt = stmt.where(PGFileStore.file_name > after_file_name)
+    stmt = stmt.order_by(PGFileStore.file_name).limit(limit)
+    return list(db_session.scalars(stmt).all())
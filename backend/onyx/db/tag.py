@@ -3,6 +3,8 @@ from sqlalchemy import delete
 from sqlalchemy import func
 from sqlalchemy import or_
 from sqlalchemy import select
+from sqlalchemy import tuple_
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
 from onyx.configs.constants import DocumentSource
@@ -108,6 +110,70 @@ def create_or_add_document_tag_list(
     return all_tags
 
 
+def upsert_document_tags(
+    db_session: Session,
+    document_id_to_tags: dict[str, list[tuple[str, str, DocumentSource]]],
+) -> None:
+    """Set based version of `create_or_add_document_tag(_list)` for a batch of documents.
+    Tags are (key, value, source) triples. Missing tags are created and the documents
+    are linked to them, existing links are left as they are.
+
+    NOTE: this function is Postgres specific. Not all DBs support the ON CONFLICT clause.
+    """
+    unique_tags = {
+        tag
+        for tags in document_id_to_tags.values()
+        for tag in tags
+        if check_tag_validity(tag[0], tag[1])
+    }
+    if not unique_tags:
+        return
+
+    # sorted so that concurrent batches lock the tag rows in the same order
+    sorted_tags = sorted(unique_tags, key=lambda tag: (tag[0], tag[1], tag[2].value))
+    db_session.execute(
+        insert(Tag)
+        .values(
+            [
+                {"tag_key": tag_key, "tag_value": tag_value, "source": source}
+                for tag_key, tag_value, source in sorted_tags
+            ]
+        )
+        .on_conflict_do_nothing(index_elements=["tag_key", "tag_value", "source"])
+    )
+
+    tag_to_id = {
+        (tag_key, tag_value, source): tag_id
+        for tag_id, tag_key, tag_value, source in db_session.execute(
+            select(Tag.id, Tag.tag_key, Tag.tag_value, Tag.source).where(
+                tuple_(Tag.tag_key, Tag.tag_value, Tag.source).in_(sorted_tags)
+            )
+        )
+    }
+
+    document_tag_rows = sorted(
+        {
+            (document_id, tag_to_id[tag])
+            for document_id, tags in document_id_to_tags.items()
+            for tag in tags
+            if tag in tag_to_id
+        }
+    )
+    if document_tag_rows:
+        db_session.execute(
+            insert(Document__Tag)
+            .values(
+                [
+                    {"document_id": document_id, "tag_id": tag_id}
+                    for document_id, tag_id in document_tag_rows
+                ]
+            )
+            .on_conflict_do_nothing()
+        )
+
+    db_session.commit()
+
+
 def find_tags(
     tag_key_prefix: str | None,
     tag_value_prefix: str | None,
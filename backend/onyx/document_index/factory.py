@@ -1,6 +1,7 @@
 import httpx
 from sqlalchemy.orm import Session
 
+from onyx.db.enums import EmbeddingPrecision
 from onyx.db.models import SearchSettings
 from onyx.db.search_settings import get_current_search_settings
 from onyx.document_index.interfaces import DocumentIndex
@@ -19,9 +20,19 @@ def get_default_document_index(
 
     secondary_index_name: str | None = None
     secondary_large_chunks_enabled: bool | None = None
+    secondary_embedding_precision: EmbeddingPrecision | None = None
     if secondary_search_settings:
         secondary_index_name = secondary_search_settings.index_name
         secondary_large_chunks_enabled = secondary_search_settings.large_chunks_enabled
+        secondary_embedding_precision = secondary_search_settings.embedding_precision
+
+    embedding_precision = search_settings.embedding_precision
+    if MULTI_TENANT:
+        # the shared multi-tenant indices are registered with float embeddings only
+        embedding_precision = EmbeddingPrecision.FLOAT
+        secondary_embedding_precision = (
+            EmbeddingPrecision.FLOAT if secondary_search_settings else None
+        )
 
     # Currently only supporting Vespa
     return VespaIndex(
@@ -31,6 +42,8 @@ def get_default_document_index(
         secondary_large_chunks_enabled=secondary_large_chunks_enabled,
         multitenant=MULTI_TENANT,
         httpx_client=httpx_client,
+        embedding_precision=embedding_precision,
+        secondary_embedding_precision=secondary_embedding_precision,
     )
 
 
@@ -252,6 +252,7 @@ class Updatable(abc.ABC):
         tenant_id: str | None,
         chunk_count: int | None,
         fields: VespaDocumentFields,
+        chunk_range_cache: dict | None = None,
     ) -> int:
         """
         Updates all chunks for a document with the specified fields.
@@ -263,6 +264,9 @@ class Updatable(abc.ABC):
 
         Parameters:
         - fields: the fields to update in the document. Any field set to None will not be changed.
+        - chunk_range_cache: a dict shared by the updates of one run (e.g. a sync task), the
+                index keeps the chunk ranges it had to look up in it so that retries do not
+                look them up again. Don't keep it around longer, ranges change on re-indexing.
 
         Return:
             None
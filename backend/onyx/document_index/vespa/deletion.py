@@ -1,11 +1,10 @@
-import concurrent.futures
+from collections.abc import Iterable
 from uuid import UUID
 
-import httpx
-from retry import retry
-
+from onyx.document_index.vespa.feed_client import get_vespa_feed_client
+from onyx.document_index.vespa.feed_client import VespaFeedClient
+from onyx.document_index.vespa.feed_client import VespaFeedOperation
 from onyx.document_index.vespa_constants import DOCUMENT_ID_ENDPOINT
-from onyx.document_index.vespa_constants import NUM_THREADS
 from onyx.utils.logger import setup_logger
 
 logger = setup_logger()
@@ -14,48 +13,26 @@ logger = setup_logger()
 CONTENT_SUMMARY = "content_summary"
 
 
-@retry(tries=10, delay=1, backoff=2)
-def _retryable_http_delete(http_client: httpx.Client, url: str) -> None:
-    res = http_client.delete(url)
-    res.raise_for_status()
-
-
-def _delete_vespa_chunk(
-    doc_chunk_id: UUID, index_name: str, http_client: httpx.Client
-) -> None:
-    try:
-        _retryable_http_delete(
-            http_client,
-            f"{DOCUMENT_ID_ENDPOINT.format(index_name=index_name)}/{doc_chunk_id}",
-        )
-    except httpx.HTTPStatusError as e:
-        logger.error(f"Failed to delete chunk, details: {e.response.text}")
-        raise
+def build_vespa_delete_operation(
+    doc_chunk_id: UUID, index_name: str, document_id: str
+) -> VespaFeedOperation:
+    return VespaFeedOperation(
+        method="DELETE",
+        url=f"{DOCUMENT_ID_ENDPOINT.format(index_name=index_name)}/{doc_chunk_id}",
+        document_id=document_id,
+    )
 
 
 def delete_vespa_chunks(
-    doc_chunk_ids: list[UUID],
+    doc_chunk_ids: Iterable[UUID],
     index_name: str,
-    http_client: httpx.Client,
-    executor: concurrent.futures.ThreadPoolExecutor | None = None,
+    feed_client: VespaFeedClient | None = None,
+    document_id: str = "",
 ) -> None:
-    external_executor = True
-
-    if not executor:
-        external_executor = False
-        executor = concurrent.futures.ThreadPoolExecutor(max_workers=NUM_THREADS)
-
-    try:
-        chunk_deletion_future = {
-            executor.submit(
-                _delete_vespa_chunk, doc_chunk_id, index_name, http_client
-            ): doc_chunk_id
-            for doc_chunk_id in doc_chunk_ids
-        }
-        for future in concurrent.futures.as_completed(chunk_deletion_future):
-            # Will raise exception if the deletion raised an exception
-            future.result()
-
-    finally:
-        if not external_executor:
-            executor.shutdown(wait=True)
+    """Deleting a chunk which does not exist is not an error in Vespa.
+    `document_id` is only used to report failures."""
+    feed_client = feed_client or get_vespa_feed_client()
+    feed_client.feed(
+        build_vespa_delete_operation(doc_chunk_id, index_name, document_id)
+        for doc_chunk_id in doc_chunk_ids
+    )
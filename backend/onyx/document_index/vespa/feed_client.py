@@ -0,0 +1,330 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from collections.abc import Callable
+from collections.abc import Iterable
+from dataclasses import dataclass
+from http import HTTPStatus
+from typing import Any
+from typing import Literal
+
+import httpx
+
+from onyx.configs.app_configs import VESPA_FEED_HTTP1_MAX_CONNECTIONS
+from onyx.configs.app_configs import VESPA_FEED_MAX_CONNECTIONS
+from onyx.configs.app_configs import VESPA_FEED_MAX_IN_FLIGHT
+from onyx.configs.app_configs import VESPA_FEED_MAX_RETRIES
+from onyx.configs.app_configs import VESPA_FEED_MIN_IN_FLIGHT
+from onyx.document_index.vespa.shared_utils.utils import get_vespa_async_http_client
+from onyx.document_index.vespa.shared_utils.utils import vespa_uses_http2
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+# Vespa is asking the client to slow down
+_THROTTLED_STATUS_CODES = {
+    HTTPStatus.TOO_MANY_REQUESTS,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+}
+# transient errors, the operation is retried without touching the window
+_RETRYABLE_STATUS_CODES = {
+    HTTPStatus.INTERNAL_SERVER_ERROR,
+    HTTPStatus.BAD_GATEWAY,
+    HTTPStatus.GATEWAY_TIMEOUT,
+}
+
+
+@dataclass
+class VespaFeedOperation:
+    """A single document/v1 operation. POST puts a whole chunk, PUT is a partial update
+    and DELETE removes the chunk."""
+
+    method: Literal["POST", "PUT", "DELETE"]
+    url: str
+    # the Onyx document the chunk belongs to, only used to report failures
+    document_id: str
+    body: dict[str, Any] | None = None
+
+
+@dataclass
+class VespaFeedFailure:
+    operation: VespaFeedOperation
+    exception: Exception
+
+
+@dataclass
+class VespaFeedStats:
+    operations: int = 0
+    retries: int = 0
+    throttled: int = 0
+    elapsed_seconds: float = 0.0
+
+
+class _AdaptiveWindow:
+    """Bounds the number of operations in flight. The window grows by one for every
+    window's worth of successful responses and is halved when Vespa throttles, at most
+    once per window so a burst of 429s from the same window only counts once (AIMD)."""
+
+    def __init__(self, initial: int, minimum: int, maximum: int) -> None:
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.size = float(min(max(initial, self.minimum), self.maximum))
+        self.in_flight = 0
+        self._completed = 0
+        self._next_decrease_at = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.size))
+            self.in_flight += 1
+
+    async def release(self) -> None:
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    async def on_response(self, throttled: bool) -> None:
+        async with self._condition:
+            self._completed += 1
+            if throttled:
+                if self._completed >= self._next_decrease_at:
+                    self.size = max(float(self.minimum), self.size / 2)
+                    self._next_decrease_at = self._completed + int(self.size)
+            else:
+                self.size = min(float(self.maximum), self.size + 1 / self.size)
+            self._condition.notify_all()
+
+
+class VespaFeedClient:
+    """Feeds document/v1 operations to Vespa from synchronous code.
+
+    Operations are sent with an async client running on a dedicated event loop thread,
+    so up to `max_in_flight` concurrent requests are sent instead of one blocking
+    request per worker thread. Over HTTP/2 a handful of connections carry all of them.
+    Over HTTP/1.1 every operation in flight needs its own connection, so the window is
+    capped at the (smaller) number of connections. Operations stream through a sliding
+    window, a slow operation does not hold back the ones queued behind it. The window
+    adapts to how fast Vespa accepts the feed and throttled / failed operations are
+    retried individually with exponential backoff.
+
+    Safe to call `feed` from several threads at once, they share the window."""
+
+    def __init__(
+        self,
+        max_in_flight: int = VESPA_FEED_MAX_IN_FLIGHT,
+        min_in_flight: int = VESPA_FEED_MIN_IN_FLIGHT,
+        max_retries: int = VESPA_FEED_MAX_RETRIES,
+        max_connections: int | None = None,
+        http2: bool | None = None,
+        client_factory: Callable[[], httpx.AsyncClient] | None = None,
+        backoff_base_seconds: float = 0.5,
+        backoff_max_seconds: float = 10.0,
+    ) -> None:
+        self.http2 = vespa_uses_http2() if http2 is None else http2
+        if max_connections is None:
+            max_connections = (
+                VESPA_FEED_MAX_CONNECTIONS
+                if self.http2
+                else VESPA_FEED_HTTP1_MAX_CONNECTIONS
+            )
+        self.max_connections = max_connections
+        self.max_in_flight = max_in_flight
+        self.min_in_flight = min_in_flight
+        if not self.http2:
+            # each connection sends one request at a time, a larger window would just
+            # queue in the pool until the pool timeout hits
+            self.max_in_flight = min(max_in_flight, max_connections)
+            self.min_in_flight = min(min_in_flight, self.max_in_flight)
+        self.max_retries = max(1, max_retries)
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self._client_factory = client_factory or (
+            lambda: get_vespa_async_http_client(
+                max_connections=self.max_connections, http2=self.http2
+            )
+        )
+
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._pid: int | None = None
+        self._client: httpx.AsyncClient | None = None
+        self._window: _AdaptiveWindow | None = None
+
+    @property
+    def window_size(self) -> int | None:
+        return int(self._window.size) if self._window else None
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            # the loop thread does not survive a fork (e.g. celery prefork workers)
+            if self._loop is None or self._pid != os.getpid():
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever, name="vespa-feed", daemon=True
+                )
+                thread.start()
+                self._loop = loop
+                self._thread = thread
+                self._pid = os.getpid()
+                self._client = None
+                self._window = None
+            return self._loop
+
+    def feed(self, operations: Iterable[VespaFeedOperation]) -> VespaFeedStats:
+        """Blocks until every operation went through or gave up. If any operation
+        failed, the error of the first failure is raised once all others are done."""
+        loop = self._get_loop()
+        return asyncio.run_coroutine_threadsafe(self._feed(operations), loop).result()
+
+    def close(self) -> None:
+        with self._lock:
+            loop, thread, client = self._loop, self._thread, self._client
+            self._loop = self._thread = self._client = self._window = None
+        if loop is None or self._pid != os.getpid():
+            return
+
+        if client is not None:
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join()
+        loop.close()
+
+    async def _feed(self, operations: Iterable[VespaFeedOperation]) -> VespaFeedStats:
+        if self._client is None:
+            self._client = self._client_factory()
+        if self._window is None:
+            self._window = _AdaptiveWindow(
+                initial=self.max_in_flight // 4,
+                minimum=self.min_in_flight,
+                maximum=self.max_in_flight,
+            )
+        client = self._client
+        window = self._window
+
+        start = time.monotonic()
+        stats = VespaFeedStats()
+        failures: list[VespaFeedFailure] = []
+        tasks: set[asyncio.Task] = set()
+
+        async def _run(operation: VespaFeedOperation) -> None:
+            try:
+                await self._send(client, window, operation, stats)
+            except Exception as e:
+                failures.append(VespaFeedFailure(operation=operation, exception=e))
+            finally:
+                await window.release()
+
+        try:
+            for operation in operations:
+                await window.acquire()
+                stats.operations += 1
+                task = asyncio.create_task(_run(operation))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        finally:
+            # also if building the operations failed, nothing is left running
+            if tasks:
+                await asyncio.gather(*tasks)
+        stats.elapsed_seconds = time.monotonic() - start
+
+        if failures:
+            _raise_feed_failures(failures)
+
+        logger.debug(
+            f"Vespa feed finished: operations={stats.operations} "
+            f"retries={stats.retries} throttled={stats.throttled} "
+            f"window={int(window.size)} elapsed={stats.elapsed_seconds:.2f}s"
+        )
+        return stats
+
+    async def _send(
+        self,
+        client: httpx.AsyncClient,
+        window: _AdaptiveWindow,
+        operation: VespaFeedOperation,
+        stats: VespaFeedStats,
+    ) -> None:
+        for attempt in range(self.max_retries):
+            if attempt:
+                stats.retries += 1
+                backoff = min(
+                    self.backoff_max_seconds,
+                    self.backoff_base_seconds * 2 ** (attempt - 1),
+                )
+                await asyncio.sleep(backoff * random.uniform(0.5, 1.0))
+
+            last_attempt = attempt == self.max_retries - 1
+            try:
+                response = await client.request(
+                    operation.method, operation.url, json=operation.body
+                )
+            except httpx.TransportError:
+                if last_attempt:
+                    raise
+                logger.debug(f"Vespa feed transport error for {operation.url}")
+                continue
+
+            throttled = response.status_code in _THROTTLED_STATUS_CODES
+            await window.on_response(throttled=throttled)
+            if throttled:
+                stats.throttled += 1
+
+            if response.is_success:
+                return
+            if last_attempt or not (
+                throttled or response.status_code in _RETRYABLE_STATUS_CODES
+            ):
+                response.raise_for_status()
+
+
+def _raise_feed_failures(failures: list[VespaFeedFailure]) -> None:
+    failed_document_ids = sorted(
+        {failure.operation.document_id for failure in failures}
+    )
+    for failure in failures:
+        details = (
+            failure.exception.response.text
+            if isinstance(failure.exception, httpx.HTTPStatusError)
+            else str(failure.exception)
+        )
+        logger.error(
+            f"Vespa feed operation failed: method={failure.operation.method} "
+            f"document={failure.operation.document_id} details={details}"
+        )
+
+    first_exception = failures[0].exception
+    if (
+        isinstance(first_exception, httpx.HTTPStatusError)
+        and first_exception.response.status_code == HTTPStatus.INSUFFICIENT_STORAGE
+    ):
+        logger.error(
+            "NOTE: HTTP Status 507 Insufficient Storage usually means "
+            "you need to allocate more memory or disk space to the "
+            "Vespa/index container."
+        )
+
+    # raise the original error so callers can keep checking the status code
+    first_exception.add_note(
+        f"{len(failures)} Vespa feed operation(s) failed for documents: "
+        f"{failed_document_ids}"
+    )
+    raise first_exception
+
+
+_VESPA_FEED_CLIENT: VespaFeedClient | None = None
+_VESPA_FEED_CLIENT_LOCK = threading.Lock()
+
+
+def get_vespa_feed_client() -> VespaFeedClient:
+    """Returns the process wide feed client, the window is shared by all callers."""
+    global _VESPA_FEED_CLIENT
+
+    with _VESPA_FEED_CLIENT_LOCK:
+        if _VESPA_FEED_CLIENT is None:
+            _VESPA_FEED_CLIENT = VespaFeedClient()
+        return _VESPA_FEED_CLIENT
@@ -1,4 +1,3 @@
-import concurrent.futures
 import io
 import logging
 import os
@@ -18,6 +17,7 @@ from uuid import UUID
 import httpx  # type: ignore
 import requests  # type: ignore
 
+from onyx.configs.app_configs import VESPA_TENSOR_HEX_ENCODING
 from onyx.configs.chat_configs import DOC_TIME_DECAY
 from onyx.configs.chat_configs import NUM_RETURNED_HITS
 from onyx.configs.chat_configs import TITLE_CONTENT_RATIO
@@ -25,6 +25,7 @@ from onyx.configs.chat_configs import VESPA_SEARCHER_THREADS
 from onyx.configs.constants import KV_REINDEX_KEY
 from onyx.context.search.models import IndexFilters
 from onyx.context.search.models import InferenceChunkUncleaned
+from onyx.db.enums import EmbeddingPrecision
 from onyx.document_index.document_index_utils import get_document_chunk_ids
 from onyx.document_index.interfaces import DocumentIndex
 from onyx.document_index.interfaces import DocumentInsertionRecord
@@ -39,13 +40,18 @@ from onyx.document_index.vespa.chunk_retrieval import (
     parallel_visit_api_retrieval,
 )
 from onyx.document_index.vespa.chunk_retrieval import query_vespa
+from onyx.document_index.vespa.deletion import build_vespa_delete_operation
 from onyx.document_index.vespa.deletion import delete_vespa_chunks
+from onyx.document_index.vespa.feed_client import get_vespa_feed_client
+from onyx.document_index.vespa.feed_client import VespaFeedClient
+from onyx.document_index.vespa.feed_client import VespaFeedOperation
 from onyx.document_index.vespa.indexing_utils import BaseHTTPXClientContext
 from onyx.document_index.vespa.indexing_utils import batch_index_vespa_chunks
 from onyx.document_index.vespa.indexing_utils import check_for_final_chunk_existence
 from onyx.document_index.vespa.indexing_utils import clean_chunk_id_copy
 from onyx.document_index.vespa.indexing_utils import GlobalHTTPXClientContext
 from onyx.document_index.vespa.indexing_utils import TemporaryHTTPXClientContext
+from onyx.document_index.vespa.shared_utils.utils import encode_dense_tensor_hex
 from onyx.document_index.vespa.shared_utils.utils import get_vespa_http_client
 from onyx.document_index.vespa.shared_utils.utils import (
     replace_invalid_doc_id_characters,
@@ -54,7 +60,6 @@ from onyx.document_index.vespa.shared_utils.vespa_request_builders import (
     build_vespa_filters,
 )
 from onyx.document_index.vespa_constants import ACCESS_CONTROL_LIST
-from onyx.document_index.vespa_constants import BATCH_SIZE
 from onyx.document_index.vespa_constants import BOOST
 from onyx.document_index.vespa_constants import CONTENT_SUMMARY
 from onyx.document_index.vespa_constants import DANSWER_CHUNK_REPLACEMENT_PAT
@@ -62,6 +67,7 @@ from onyx.document_index.vespa_constants import DATE_REPLACEMENT
 from onyx.document_index.vespa_constants import DOCUMENT_ID_ENDPOINT
 from onyx.document_index.vespa_constants import DOCUMENT_REPLACEMENT_PAT
 from onyx.document_index.vespa_constants import DOCUMENT_SETS
+from onyx.document_index.vespa_constants import EMBEDDING_PRECISION_REPLACEMENT_PAT
 from onyx.document_index.vespa_constants import HIDDEN
 from onyx.document_index.vespa_constants import NUM_THREADS
 from onyx.document_index.vespa_constants import SEARCH_THREAD_NUMBER_PAT
@@ -73,8 +79,8 @@ from onyx.document_index.vespa_constants import VESPA_TIMEOUT
 from onyx.document_index.vespa_constants import YQL_BASE
 from onyx.indexing.models import DocMetadataAwareIndexChunk
 from onyx.key_value_store.factory import get_kv_store
-from onyx.utils.batching import batch_generator
 from onyx.utils.logger import setup_logger
+from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
 from shared_configs.configs import MULTI_TENANT
 from shared_configs.model_server_models import Embedding
 
@@ -93,6 +99,15 @@ class _VespaUpdateRequest:
     update_request: dict[str, dict]
 
 
+@dataclass(frozen=True)
+class _ChunkRangeRequest:
+    index_name: str
+    document_id: str
+    # None for documents indexed before the chunk count was stored
+    previous_chunk_count: int | None
+    new_chunk_count: int = 0
+
+
 def in_memory_zip_from_file_bytes(file_contents: dict[str, bytes]) -> BinaryIO:
     zip_buffer = io.BytesIO()
     with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zipf:
@@ -126,6 +141,16 @@ def add_ngrams_to_schema(schema_content: str) -> str:
     return schema_content
 
 
+def _query_embedding_param(query_embedding: Embedding) -> str:
+    # the query tensor is always float, whatever the cell type of the index
+    if VESPA_TENSOR_HEX_ENCODING:
+        return (
+            f"tensor<float>(x[{len(query_embedding)}]):"
+            f"{encode_dense_tensor_hex(query_embedding)}"
+        )
+    return str(query_embedding)
+
+
 class VespaIndex(DocumentIndex):
     def __init__(
         self,
@@ -135,6 +160,9 @@ class VespaIndex(DocumentIndex):
         secondary_large_chunks_enabled: bool | None,
         multitenant: bool = False,
         httpx_client: httpx.Client | None = None,
+        feed_client: VespaFeedClient | None = None,
+        embedding_precision: EmbeddingPrecision = EmbeddingPrecision.FLOAT,
+        secondary_embedding_precision: EmbeddingPrecision | None = None,
     ) -> None:
         self.index_name = index_name
         self.secondary_index_name = secondary_index_name
@@ -142,8 +170,17 @@ class VespaIndex(DocumentIndex):
         self.large_chunks_enabled = large_chunks_enabled
         self.secondary_large_chunks_enabled = secondary_large_chunks_enabled
 
+        # cell type of the embedding tensors in the schema of each index
+        self.embedding_precision = embedding_precision
+        self.secondary_embedding_precision = (
+            secondary_embedding_precision or EmbeddingPrecision.FLOAT
+        )
+
         self.multitenant = multitenant
 
+        # index / update / delete operations go through the shared document feed
+        self.feed_client = feed_client or get_vespa_feed_client()
+
         self.httpx_client_context: BaseHTTPXClientContext
 
         if httpx_client:
@@ -220,18 +257,29 @@ class VespaIndex(DocumentIndex):
             schema_template = schema_f.read()
         schema_template = schema_template.replace(TENANT_ID_PAT, "")
 
-        schema = schema_template.replace(
-            DANSWER_CHUNK_REPLACEMENT_PAT, self.index_name
-        ).replace(VESPA_DIM_REPLACEMENT_PAT, str(index_embedding_dim))
+        schema = (
+            schema_template.replace(DANSWER_CHUNK_REPLACEMENT_PAT, self.index_name)
+            .replace(VESPA_DIM_REPLACEMENT_PAT, str(index_embedding_dim))
+            .replace(
+                EMBEDDING_PRECISION_REPLACEMENT_PAT, self.embedding_precision.value
+            )
+        )
 
         schema = add_ngrams_to_schema(schema) if needs_reindexing else schema
         schema = schema.replace(TENANT_ID_PAT, "")
         zip_dict[f"schemas/{schema_names[0]}.sd"] = schema.encode("utf-8")
 
         if self.secondary_index_name:
-            upcoming_schema = schema_template.replace(
-                DANSWER_CHUNK_REPLACEMENT_PAT, self.secondary_index_name
-            ).replace(VESPA_DIM_REPLACEMENT_PAT, str(secondary_index_embedding_dim))
+            upcoming_schema = (
+                schema_template.replace(
+                    DANSWER_CHUNK_REPLACEMENT_PAT, self.secondary_index_name
+                )
+                .replace(VESPA_DIM_REPLACEMENT_PAT, str(secondary_index_embedding_dim))
+                .replace(
+                    EMBEDDING_PRECISION_REPLACEMENT_PAT,
+                    self.secondary_embedding_precision.value,
+                )
+            )
             zip_dict[f"schemas/{schema_names[1]}.sd"] = upcoming_schema.encode("utf-8")
 
         zip_file = in_memory_zip_from_file_bytes(zip_dict)
@@ -309,9 +357,13 @@ class VespaIndex(DocumentIndex):
                 f"Creating index: {index_name} with embedding dimension: {embedding_dim}"
             )
 
-            schema = schema_template.replace(
-                DANSWER_CHUNK_REPLACEMENT_PAT, index_name
-            ).replace(VESPA_DIM_REPLACEMENT_PAT, str(embedding_dim))
+            schema = (
+                schema_template.replace(DANSWER_CHUNK_REPLACEMENT_PAT, index_name)
+                .replace(VESPA_DIM_REPLACEMENT_PAT, str(embedding_dim))
+                .replace(
+                    EMBEDDING_PRECISION_REPLACEMENT_PAT, EmbeddingPrecision.FLOAT.value
+                )
+            )
             schema = schema.replace(
                 TENANT_ID_PAT, TENANT_ID_REPLACEMENT if MULTI_TENANT else ""
             )
@@ -356,58 +408,59 @@ class VespaIndex(DocumentIndex):
 
         existing_docs: set[str] = set()
 
-        # NOTE: using `httpx` here since `requests` doesn't support HTTP2. This is beneficial for
-        # indexing / updates / deletes since we have to make a large volume of requests.
-        with (
-            concurrent.futures.ThreadPoolExecutor(max_workers=NUM_THREADS) as executor,
-            self.httpx_client_context as http_client,
-        ):
+        with self.httpx_client_context as http_client:
             # We require the start and end index for each document in order to
             # know precisely which chunks to delete. This information exists for
             # documents that have `chunk_count` in the database, but not for
             # `old_version` documents.
 
-            enriched_doc_infos: list[EnrichedDocumentIndexingInfo] = [
-                VespaIndex.enrich_basic_chunk_info(
-                    index_name=self.index_name,
+            enriched_doc_infos: list[EnrichedDocumentIndexingInfo] = list(
+                VespaIndex.enrich_basic_chunk_infos(
+                    chunk_range_requests=[
+                        _ChunkRangeRequest(
+                            index_name=self.index_name,
+                            document_id=doc_id,
+                            previous_chunk_count=doc_id_to_previous_chunk_cnt.get(
+                                doc_id, 0
+                            ),
+                            new_chunk_count=doc_id_to_new_chunk_cnt.get(doc_id, 0),
+                        )
+                        for doc_id in doc_id_to_new_chunk_cnt.keys()
+                    ],
                     http_client=http_client,
-                    document_id=doc_id,
-                    previous_chunk_count=doc_id_to_previous_chunk_cnt.get(doc_id, 0),
-                    new_chunk_count=doc_id_to_new_chunk_cnt.get(doc_id, 0),
-                )
-                for doc_id in doc_id_to_new_chunk_cnt.keys()
-            ]
+                ).values()
+            )
 
             for cleaned_doc_info in enriched_doc_infos:
                 # If the document has previously indexed chunks, we know it previously existed
                 if cleaned_doc_info.chunk_end_index:
                     existing_docs.add(cleaned_doc_info.doc_id)
 
-            # Now, for each doc, we know exactly where to start and end our deletion
-            # So let's generate the chunk IDs for each chunk to delete
-            chunks_to_delete = get_document_chunk_ids(
-                enriched_document_info_list=enriched_doc_infos,
+        # Now, for each doc, we know exactly where to start and end our deletion
+        # So let's generate the chunk IDs for each chunk to delete
+        delete_operations = [
+            build_vespa_delete_operation(
+                doc_chunk_id, self.index_name, enriched_doc_info.doc_id
+            )
+            for enriched_doc_info in enriched_doc_infos
+            for doc_chunk_id in get_document_chunk_ids(
+                enriched_document_info_list=[enriched_doc_info],
                 tenant_id=tenant_id,
                 large_chunks_enabled=large_chunks_enabled,
             )
+        ]
 
-            # Delete old Vespa documents
-            for doc_chunk_ids_batch in batch_generator(chunks_to_delete, BATCH_SIZE):
-                delete_vespa_chunks(
-                    doc_chunk_ids=doc_chunk_ids_batch,
-                    index_name=self.index_name,
-                    http_client=http_client,
-                    executor=executor,
-                )
+        # Delete old Vespa documents. This has to finish before the new chunks are
+        # written since they may reuse the ids of the old ones.
+        self.feed_client.feed(delete_operations)
 
-            for chunk_batch in batch_generator(cleaned_chunks, BATCH_SIZE):
-                batch_index_vespa_chunks(
-                    chunks=chunk_batch,
-                    index_name=self.index_name,
-                    http_client=http_client,
-                    multitenant=self.multitenant,
-                    executor=executor,
-                )
+        batch_index_vespa_chunks(
+            chunks=cleaned_chunks,
+            index_name=self.index_name,
+            multitenant=self.multitenant,
+            feed_client=self.feed_client,
+            embedding_precision=self.embedding_precision,
+        )
 
         all_cleaned_doc_ids = {chunk.source_document.id for chunk in cleaned_chunks}
 
@@ -419,50 +472,18 @@ class VespaIndex(DocumentIndex):
             for cleaned_doc_id in all_cleaned_doc_ids
         }
 
-    @classmethod
-    def _apply_updates_batched(
-        cls,
-        updates: list[_VespaUpdateRequest],
-        httpx_client: httpx.Client,
-        batch_size: int = BATCH_SIZE,
-    ) -> None:
-        """Runs a batch of updates in parallel via the ThreadPoolExecutor."""
-
-        def _update_chunk(
-            update: _VespaUpdateRequest, http_client: httpx.Client
-        ) -> httpx.Response:
-            logger.debug(
-                f"Updating with request to {update.url} with body {update.update_request}"
-            )
-            return http_client.put(
-                update.url,
-                headers={"Content-Type": "application/json"},
-                json=update.update_request,
+    def _apply_updates_batched(self, updates: list[_VespaUpdateRequest]) -> None:
+        """Sends all updates through the document feed, which keeps many of them in
+        flight at once and retries the ones Vespa throttles."""
+        self.feed_client.feed(
+            VespaFeedOperation(
+                method="PUT",
+                url=update.url,
+                document_id=update.document_id,
+                body=update.update_request,
             )
-
-        # NOTE: using `httpx` here since `requests` doesn't support HTTP2. This is beneficient for
-        # indexing / updates / deletes since we have to make a large volume of requests.
-
-        with (
-            concurrent.futures.ThreadPoolExecutor(max_workers=NUM_THREADS) as executor,
-            httpx_client as http_client,
-        ):
-            for update_batch in batch_generator(updates, batch_size):
-                future_to_document_id = {
-                    executor.submit(
-                        _update_chunk,
-                        update,
-                        http_client,
-                    ): update.document_id
-                    for update in update_batch
-                }
-                for future in concurrent.futures.as_completed(future_to_document_id):
-                    res = future.result()
-                    try:
-                        res.raise_for_status()
-                    except requests.HTTPError as e:
-                        failure_msg = f"Failed to update document: {future_to_document_id[future]}"
-                        raise requests.HTTPError(failure_msg) from e
+            for update in updates
+        )
 
     def update(
         self, update_requests: list[UpdateRequest], *, tenant_id: str | None
@@ -487,22 +508,28 @@ class VespaIndex(DocumentIndex):
 
         chunk_id_start_time = time.monotonic()
         with self.httpx_client_context as http_client:
-            for update_request in update_requests:
-                for doc_info in update_request.minimal_document_indexing_info:
-                    for index_name in index_names:
-                        doc_chunk_info = VespaIndex.enrich_basic_chunk_info(
-                            index_name=index_name,
-                            http_client=http_client,
-                            document_id=doc_info.doc_id,
-                            previous_chunk_count=doc_info.chunk_start_index,
-                            new_chunk_count=0,
-                        )
-                        doc_chunk_ids = get_document_chunk_ids(
-                            enriched_document_info_list=[doc_chunk_info],
-                            tenant_id=tenant_id,
-                            large_chunks_enabled=False,
-                        )
-                        all_doc_chunk_ids[doc_info.doc_id] = doc_chunk_ids
+            # a document may be part of several update requests, its chunk range is
+            # only resolved once
+            chunk_ranges = VespaIndex.enrich_basic_chunk_infos(
+                chunk_range_requests=[
+                    _ChunkRangeRequest(
+                        index_name=index_name,
+                        document_id=doc_info.doc_id,
+                        previous_chunk_count=doc_info.chunk_start_index,
+                    )
+                    for update_request in update_requests
+                    for doc_info in update_request.minimal_document_indexing_info
+                    for index_name in index_names
+                ],
+                http_client=http_client,
+            )
+
+        for chunk_range_request, doc_chunk_info in chunk_ranges.items():
+            all_doc_chunk_ids[chunk_range_request.document_id] = get_document_chunk_ids(
+                enriched_document_info_list=[doc_chunk_info],
+                tenant_id=tenant_id,
+                large_chunks_enabled=False,
+            )
 
         logger.debug(
             f"Took {time.monotonic() - chunk_id_start_time:.2f} seconds to fetch all Vespa chunk IDs"
@@ -542,23 +569,21 @@ class VespaIndex(DocumentIndex):
                         )
                     )
 
-        with self.httpx_client_context as httpx_client:
-            self._apply_updates_batched(processed_updates_requests, httpx_client)
+        self._apply_updates_batched(processed_updates_requests)
         logger.debug(
             "Finished updating Vespa documents in %.2f seconds",
             time.monotonic() - update_start,
         )
 
-    def _update_single_chunk(
+    def _build_single_chunk_update(
         self,
         doc_chunk_id: UUID,
         index_name: str,
         fields: VespaDocumentFields,
         doc_id: str,
-        http_client: httpx.Client,
-    ) -> None:
+    ) -> VespaFeedOperation | None:
         """
-        Update a single "chunk" (document) in Vespa using its chunk ID.
+        Build the update of a single "chunk" (document) in Vespa using its chunk ID.
         """
 
         update_dict: dict[str, dict] = {"fields": {}}
@@ -583,21 +608,13 @@ class VespaIndex(DocumentIndex):
 
         if not update_dict["fields"]:
             logger.error("Update request received but nothing to update.")
-            return
+            return None
 
         vespa_url = f"{DOCUMENT_ID_ENDPOINT.format(index_name=index_name)}/{doc_chunk_id}?create=true"
 
-        try:
-            resp = http_client.put(
-                vespa_url,
-                headers={"Content-Type": "application/json"},
-                json=update_dict,
-            )
-            resp.raise_for_status()
-        except httpx.HTTPStatusError as e:
-            error_message = f"Failed to update doc chunk {doc_chunk_id} (doc_id={doc_id}). Details: {e.response.text}"
-            logger.error(error_message)
-            raise
+        return VespaFeedOperation(
+            method="PUT", url=vespa_url, document_id=doc_id, body=update_dict
+        )
 
     def update_single(
         self,
@@ -606,6 +623,7 @@ class VespaIndex(DocumentIndex):
         chunk_count: int | None,
         tenant_id: str | None,
         fields: VespaDocumentFields,
+        chunk_range_cache: dict | None = None,
     ) -> int:
         """Note: if the document id does not exist, the update will be a no-op and the
         function will complete with no errors or exceptions.
@@ -615,31 +633,30 @@ class VespaIndex(DocumentIndex):
 
         doc_id = replace_invalid_doc_id_characters(doc_id)
 
-        with self.httpx_client_context as httpx_client:
-            for (
-                index_name,
-                large_chunks_enabled,
-            ) in self.index_to_large_chunks_enabled.items():
-                enriched_doc_infos = VespaIndex.enrich_basic_chunk_info(
-                    index_name=index_name,
-                    http_client=httpx_client,
-                    document_id=doc_id,
-                    previous_chunk_count=chunk_count,
-                    new_chunk_count=0,
-                )
+        update_operations: list[VespaFeedOperation] = []
+        for (
+            index_name,
+            large_chunks_enabled,
+            enriched_doc_info,
+        ) in self._enrich_chunk_info_for_all_indices(
+            doc_id, chunk_count, cache=chunk_range_cache
+        ):
+            doc_chunk_ids = get_document_chunk_ids(
+                enriched_document_info_list=[enriched_doc_info],
+                tenant_id=tenant_id,
+                large_chunks_enabled=large_chunks_enabled,
+            )
 
-                doc_chunk_ids = get_document_chunk_ids(
-                    enriched_document_info_list=[enriched_doc_infos],
-                    tenant_id=tenant_id,
-                    large_chunks_enabled=large_chunks_enabled,
-                )
+            doc_chunk_count += len(doc_chunk_ids)
 
-                doc_chunk_count += len(doc_chunk_ids)
+            for doc_chunk_id in doc_chunk_ids:
+                update_operation = self._build_single_chunk_update(
+                    doc_chunk_id, index_name, fields, doc_id
+                )
+                if update_operation:
+                    update_operations.append(update_operation)
 
-                for doc_chunk_id in doc_chunk_ids:
-                    self._update_single_chunk(
-                        doc_chunk_id, index_name, fields, doc_id, httpx_client
-                    )
+        self.feed_client.feed(update_operations)
 
         return doc_chunk_count
 
@@ -654,41 +671,23 @@ class VespaIndex(DocumentIndex):
 
         doc_id = replace_invalid_doc_id_characters(doc_id)
 
-        # NOTE: using `httpx` here since `requests` doesn't support HTTP2. This is beneficial for
-        # indexing / updates / deletes since we have to make a large volume of requests.
-        index_names = [self.index_name]
-        if self.secondary_index_name:
-            index_names.append(self.secondary_index_name)
-
-        with self.httpx_client_context as http_client, concurrent.futures.ThreadPoolExecutor(
-            max_workers=NUM_THREADS
-        ) as executor:
-            for (
-                index_name,
-                large_chunks_enabled,
-            ) in self.index_to_large_chunks_enabled.items():
-                enriched_doc_infos = VespaIndex.enrich_basic_chunk_info(
-                    index_name=index_name,
-                    http_client=http_client,
-                    document_id=doc_id,
-                    previous_chunk_count=chunk_count,
-                    new_chunk_count=0,
-                )
-                chunks_to_delete = get_document_chunk_ids(
-                    enriched_document_info_list=[enriched_doc_infos],
-                    tenant_id=tenant_id,
-                    large_chunks_enabled=large_chunks_enabled,
-                )
-                for doc_chunk_ids_batch in batch_generator(
-                    chunks_to_delete, BATCH_SIZE
-                ):
-                    total_chunks_deleted += len(doc_chunk_ids_batch)
-                    delete_vespa_chunks(
-                        doc_chunk_ids=doc_chunk_ids_batch,
-                        index_name=index_name,
-                        http_client=http_client,
-                        executor=executor,
-                    )
+        for (
+            index_name,
+            large_chunks_enabled,
+            enriched_doc_info,
+        ) in self._enrich_chunk_info_for_all_indices(doc_id, chunk_count):
+            chunks_to_delete = get_document_chunk_ids(
+                enriched_document_info_list=[enriched_doc_info],
+                tenant_id=tenant_id,
+                large_chunks_enabled=large_chunks_enabled,
+            )
+            total_chunks_deleted += len(chunks_to_delete)
+            delete_vespa_chunks(
+                doc_chunk_ids=chunks_to_delete,
+                index_name=index_name,
+                feed_client=self.feed_client,
+                document_id=doc_id,
+            )
 
         return total_chunks_deleted
 
@@ -756,7 +755,7 @@ class VespaIndex(DocumentIndex):
         params: dict[str, str | int | float] = {
             "yql": yql,
             "query": final_query,
-            "input.query(query_embedding)": str(query_embedding),
+            "input.query(query_embedding)": _query_embedding_param(query_embedding),
             "input.query(decay_factor)": str(DOC_TIME_DECAY * time_decay_multiplier),
             "input.query(alpha)": hybrid_alpha,
             "input.query(title_content_ratio)": title_content_ratio
@@ -837,6 +836,99 @@ class VespaIndex(DocumentIndex):
         )
         return enriched_doc_info
 
+    @classmethod
+    def enrich_basic_chunk_infos(
+        cls,
+        chunk_range_requests: list[_ChunkRangeRequest],
+        http_client: httpx.Client,
+        cache: dict[_ChunkRangeRequest, EnrichedDocumentIndexingInfo] | None = None,
+    ) -> dict[_ChunkRangeRequest, EnrichedDocumentIndexingInfo]:
+        """`enrich_basic_chunk_info` for many documents at once, in the order of the
+        requests with duplicates removed. Documents without a chunk count have their
+        chunk range probed in Vespa, these probes run concurrently across documents.
+
+        Resolved ranges are kept in `cache`, pass the same dict to reuse them within
+        a run (see the `chunk_range_cache` of `update_single`). Don't keep it around
+        longer, the ranges change once a document is re-indexed."""
+        cache = {} if cache is None else cache
+
+        unresolved = [
+            chunk_range_request
+            for chunk_range_request in dict.fromkeys(chunk_range_requests)
+            if chunk_range_request not in cache
+        ]
+        to_probe = [
+            chunk_range_request
+            for chunk_range_request in unresolved
+            if chunk_range_request.previous_chunk_count is None
+        ]
+
+        probed = run_functions_tuples_in_parallel(
+            [
+                (
+                    cls.enrich_basic_chunk_info,
+                    (
+                        chunk_range_request.index_name,
+                        http_client,
+                        chunk_range_request.document_id,
+                        None,
+                        chunk_range_request.new_chunk_count,
+                    ),
+                )
+                for chunk_range_request in to_probe
+            ],
+            max_workers=NUM_THREADS,
+        )
+        cache.update(zip(to_probe, probed))
+
+        # the range of documents with a chunk count is known without any requests
+        for chunk_range_request in unresolved:
+            if chunk_range_request.previous_chunk_count is not None:
+                cache[chunk_range_request] = cls.enrich_basic_chunk_info(
+                    index_name=chunk_range_request.index_name,
+                    http_client=http_client,
+                    document_id=chunk_range_request.document_id,
+                    previous_chunk_count=chunk_range_request.previous_chunk_count,
+                    new_chunk_count=chunk_range_request.new_chunk_count,
+                )
+
+        return {
+            chunk_range_request: cache[chunk_range_request]
+            for chunk_range_request in dict.fromkeys(chunk_range_requests)
+        }
+
+    def _enrich_chunk_info_for_all_indices(
+        self,
+        doc_id: str,
+        chunk_count: int | None,
+        cache: dict[_ChunkRangeRequest, EnrichedDocumentIndexingInfo] | None = None,
+    ) -> list[tuple[str, bool, EnrichedDocumentIndexingInfo]]:
+        """Chunk range of a document in the primary and, if any, the secondary index,
+        resolved concurrently. Returns (index name, large chunks enabled, range)."""
+        chunk_range_requests = {
+            index_name: _ChunkRangeRequest(
+                index_name=index_name,
+                document_id=doc_id,
+                previous_chunk_count=chunk_count,
+            )
+            for index_name in self.index_to_large_chunks_enabled
+        }
+        with self.httpx_client_context as http_client:
+            chunk_ranges = VespaIndex.enrich_basic_chunk_infos(
+                chunk_range_requests=list(chunk_range_requests.values()),
+                http_client=http_client,
+                cache=cache,
+            )
+
+        return [
+            (
+                index_name,
+                large_chunks_enabled,
+                chunk_ranges[chunk_range_requests[index_name]],
+            )
+            for index_name, large_chunks_enabled in self.index_to_large_chunks_enabled.items()
+        ]
+
     @classmethod
     def delete_entries_by_tenant_id(
         cls,
@@ -942,58 +1034,29 @@ class VespaIndex(DocumentIndex):
     def _apply_deletes_batched(
         cls,
         delete_requests: List["_VespaDeleteRequest"],
-        batch_size: int = BATCH_SIZE,
     ) -> None:
         """
-        Deletes documents in batches using multiple threads.
+        Deletes documents through the process wide document feed.
 
         Internal helper function for delete_entries_by_tenant_id.
 
-        This is a class method and does not use the httpx pool of the instance.
-        This is OK because we don't use this method often.
-
         Parameters:
             delete_requests (List[_VespaDeleteRequest]): The list of delete requests.
-            batch_size (int): The number of documents to delete in each batch.
         """
-
-        def _delete_document(
-            delete_request: "_VespaDeleteRequest", http_client: httpx.Client
-        ) -> None:
-            logger.debug(f"Deleting document with ID {delete_request.document_id}")
-            response = http_client.delete(
-                delete_request.url,
-                headers={"Content-Type": "application/json"},
-                timeout=None,
-            )
-            response.raise_for_status()
-
         logger.debug(f"Starting batch deletion for {len(delete_requests)} documents")
 
-        with concurrent.futures.ThreadPoolExecutor(max_workers=NUM_THREADS) as executor:
-            with get_vespa_http_client() as http_client:
-                for batch_start in range(0, len(delete_requests), batch_size):
-                    batch = delete_requests[batch_start : batch_start + batch_size]
-
-                    future_to_document_id = {
-                        executor.submit(
-                            _delete_document,
-                            delete_request,
-                            http_client,
-                        ): delete_request.document_id
-                        for delete_request in batch
-                    }
-
-                    for future in concurrent.futures.as_completed(
-                        future_to_document_id
-                    ):
-                        doc_id = future_to_document_id[future]
-                        try:
-                            future.result()
-                            logger.debug(f"Successfully deleted document: {doc_id}")
-                        except httpx.HTTPError as e:
-                            logger.error(f"Failed to delete document {doc_id}: {e}")
-                            # Optionally, implement retry logic or error handling here
+        try:
+            get_vespa_feed_client().feed(
+                VespaFeedOperation(
+                    method="DELETE",
+                    url=delete_request.url,
+                    document_id=delete_request.document_id,
+                )
+                for delete_request in delete_requests
+            )
+        except httpx.HTTPError as e:
+            # the failed documents have already been logged by the feed
+            logger.error(f"Failed to delete some documents: {e}")
 
         logger.info("Batch deletion completed")
 
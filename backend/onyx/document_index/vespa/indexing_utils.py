@@ -4,19 +4,27 @@ import uuid
 from abc import ABC
 from abc import abstractmethod
 from collections.abc import Callable
+from collections.abc import Iterable
 from datetime import datetime
 from datetime import timezone
-from http import HTTPStatus
+from typing import Any
 
 import httpx
 from retry import retry
 
+from onyx.configs.app_configs import VESPA_TENSOR_HEX_ENCODING
 from onyx.connectors.cross_connector_utils.miscellaneous_utils import (
     get_experts_stores_representations,
 )
+from onyx.db.enums import EmbeddingPrecision
 from onyx.document_index.document_index_utils import get_uuid_from_chunk
+from onyx.document_index.document_index_utils import get_uuid_from_chunk_info
 from onyx.document_index.document_index_utils import get_uuid_from_chunk_info_old
 from onyx.document_index.interfaces import MinimalDocumentIndexingInfo
+from onyx.document_index.vespa.feed_client import get_vespa_feed_client
+from onyx.document_index.vespa.feed_client import VespaFeedClient
+from onyx.document_index.vespa.feed_client import VespaFeedOperation
+from onyx.document_index.vespa.shared_utils.utils import encode_dense_tensor_hex
 from onyx.document_index.vespa.shared_utils.utils import remove_invalid_unicode_chars
 from onyx.document_index.vespa.shared_utils.utils import (
     replace_invalid_doc_id_characters,
@@ -120,22 +128,11 @@ def get_existing_documents_from_chunks(
     return document_ids
 
 
-@retry(tries=5, delay=1, backoff=2)
-def _index_vespa_chunk(
-    chunk: DocMetadataAwareIndexChunk,
-    index_name: str,
-    http_client: httpx.Client,
-    multitenant: bool,
-) -> None:
-    json_header = {
-        "Content-Type": "application/json",
-    }
-    document = chunk.source_document
-
+def _vespa_embedding_fields(
+    chunk: DocMetadataAwareIndexChunk, embedding_precision: EmbeddingPrecision
+) -> dict[str, Any]:
     # No minichunk documents in vespa, minichunk vectors are stored in the chunk itself
 
-    vespa_chunk_id = str(get_uuid_from_chunk(chunk))
-
     embeddings = chunk.embeddings
 
     embeddings_name_vector_map = {"full_chunk": embeddings.full_embedding}
@@ -144,9 +141,41 @@ def _index_vespa_chunk(
         for ind, m_c_embed in enumerate(embeddings.mini_chunk_embeddings):
             embeddings_name_vector_map[f"mini_chunk_{ind}"] = m_c_embed
 
+    if not VESPA_TENSOR_HEX_ENCODING:
+        return {
+            EMBEDDINGS: embeddings_name_vector_map,
+            TITLE_EMBEDDING: chunk.title_embedding,
+        }
+
+    # hex encoded cells are a fraction of the size of the JSON floats and are parsed
+    # by Vespa without going through the JSON number parser
+    return {
+        EMBEDDINGS: {
+            "blocks": {
+                name: encode_dense_tensor_hex(vector, embedding_precision)
+                for name, vector in embeddings_name_vector_map.items()
+            }
+        },
+        TITLE_EMBEDDING: {
+            "values": encode_dense_tensor_hex(
+                chunk.title_embedding, embedding_precision
+            )
+        }
+        if chunk.title_embedding is not None
+        else None,
+    }
+
+
+def _vespa_document_fields(
+    chunk: DocMetadataAwareIndexChunk,
+    multitenant: bool,
+    embedding_precision: EmbeddingPrecision = EmbeddingPrecision.FLOAT,
+) -> dict[str, Any]:
+    document = chunk.source_document
+
     title = document.get_title_for_document_index()
 
-    vespa_document_fields = {
+    vespa_document_fields: dict[str, Any] = {
         DOCUMENT_ID: document.id,
         CHUNK_ID: chunk.chunk_id,
         BLURB: remove_invalid_unicode_chars(chunk.blurb),
@@ -170,8 +199,7 @@ def _index_vespa_chunk(
         # Save as a list for efficient extraction as an Attribute
         METADATA_LIST: chunk.source_document.get_metadata_str_attributes(),
         METADATA_SUFFIX: chunk.metadata_suffix_keyword,
-        EMBEDDINGS: embeddings_name_vector_map,
-        TITLE_EMBEDDING: chunk.title_embedding,
+        **_vespa_embedding_fields(chunk, embedding_precision),
         DOC_UPDATED_AT: _vespa_get_updated_at_attribute(document.doc_updated_at),
         PRIMARY_OWNERS: get_experts_stores_representations(document.primary_owners),
         SECONDARY_OWNERS: get_experts_stores_representations(document.secondary_owners),
@@ -188,55 +216,40 @@ def _index_vespa_chunk(
         if chunk.tenant_id:
             vespa_document_fields[TENANT_ID] = chunk.tenant_id
 
-    vespa_url = f"{DOCUMENT_ID_ENDPOINT.format(index_name=index_name)}/{vespa_chunk_id}"
-    logger.debug(f'Indexing to URL "{vespa_url}"')
-    res = http_client.post(
-        vespa_url, headers=json_header, json={"fields": vespa_document_fields}
-    )
-    try:
-        res.raise_for_status()
-    except Exception as e:
-        logger.exception(
-            f"Failed to index document: '{document.id}'. Got response: '{res.text}'"
-        )
-        if isinstance(e, httpx.HTTPStatusError):
-            if e.response.status_code == HTTPStatus.INSUFFICIENT_STORAGE:
-                logger.error(
-                    "NOTE: HTTP Status 507 Insufficient Storage usually means "
-                    "you need to allocate more memory or disk space to the "
-                    "Vespa/index container."
-                )
+    return vespa_document_fields
 
-        raise e
+
+def build_vespa_index_operation(
+    chunk: DocMetadataAwareIndexChunk,
+    index_name: str,
+    multitenant: bool,
+    embedding_precision: EmbeddingPrecision = EmbeddingPrecision.FLOAT,
+) -> VespaFeedOperation:
+    vespa_chunk_id = str(get_uuid_from_chunk(chunk))
+    return VespaFeedOperation(
+        method="POST",
+        url=f"{DOCUMENT_ID_ENDPOINT.format(index_name=index_name)}/{vespa_chunk_id}",
+        document_id=chunk.source_document.id,
+        body={
+            "fields": _vespa_document_fields(chunk, multitenant, embedding_precision)
+        },
+    )
 
 
 def batch_index_vespa_chunks(
-    chunks: list[DocMetadataAwareIndexChunk],
+    chunks: Iterable[DocMetadataAwareIndexChunk],
     index_name: str,
-    http_client: httpx.Client,
     multitenant: bool,
-    executor: concurrent.futures.ThreadPoolExecutor | None = None,
+    feed_client: VespaFeedClient | None = None,
+    embedding_precision: EmbeddingPrecision = EmbeddingPrecision.FLOAT,
 ) -> None:
-    external_executor = True
-
-    if not executor:
-        external_executor = False
-        executor = concurrent.futures.ThreadPoolExecutor(max_workers=NUM_THREADS)
-
-    try:
-        chunk_index_future = {
-            executor.submit(
-                _index_vespa_chunk, chunk, index_name, http_client, multitenant
-            ): chunk
-            for chunk in chunks
-        }
-        for future in concurrent.futures.as_completed(chunk_index_future):
-            # Will raise exception if any indexing raised an exception
-            future.result()
-
-    finally:
-        if not external_executor:
-            executor.shutdown(wait=True)
+    """Writes the chunks to Vespa. The operations are built lazily while the feed
+    consumes them so there is no need to batch the chunks up front."""
+    feed_client = feed_client or get_vespa_feed_client()
+    feed_client.feed(
+        build_vespa_index_operation(chunk, index_name, multitenant, embedding_precision)
+        for chunk in chunks
+    )
 
 
 def clean_chunk_id_copy(
@@ -254,22 +267,69 @@ def clean_chunk_id_copy(
     return clean_chunk
 
 
+def _find_first_missing_chunk(
+    start_index: int, chunk_exists: Callable[[int], bool]
+) -> int:
+    """Chunks are contiguous, so instead of checking them one by one the range is
+    doubled until a missing chunk is found and the end is then binary searched. This
+    takes a logarithmic number of requests in the number of chunks."""
+    if not chunk_exists(start_index):
+        return start_index
+
+    # invariant: the chunk at `last_found` exists, the one at `first_missing` does not
+    last_found = start_index
+    step = 1
+    while chunk_exists(start_index + step):
+        last_found = start_index + step
+        step *= 2
+    first_missing = start_index + step
+
+    while first_missing - last_found > 1:
+        middle = (last_found + first_missing) // 2
+        if chunk_exists(middle):
+            last_found = middle
+        else:
+            first_missing = middle
+
+    return first_missing
+
+
 def check_for_final_chunk_existence(
     minimal_doc_info: MinimalDocumentIndexingInfo,
     start_index: int,
     index_name: str,
     http_client: httpx.Client,
 ) -> int:
-    index = start_index
-    while True:
+    """Returns the index after the last chunk of a document with the old chunk ID
+    system."""
+
+    def _chunk_exists(index: int) -> bool:
         doc_chunk_id = get_uuid_from_chunk_info_old(
             document_id=minimal_doc_info.doc_id,
             chunk_id=index,
             large_chunk_reference_ids=[],
         )
-        if not _does_doc_chunk_exist(doc_chunk_id, index_name, http_client):
-            return index
-        index += 1
+        return _does_doc_chunk_exist(doc_chunk_id, index_name, http_client)
+
+    return _find_first_missing_chunk(start_index, _chunk_exists)
+
+
+def count_document_chunks(
+    document_id: str,
+    index_name: str,
+    http_client: httpx.Client,
+    tenant_id: str | None,
+) -> int:
+    """Number of chunks a document has in Vespa with the current chunk ID system, for
+    when the chunk count is not known from Postgres."""
+
+    def _chunk_exists(index: int) -> bool:
+        doc_chunk_id = get_uuid_from_chunk_info(
+            document_id=document_id, chunk_id=index, tenant_id=tenant_id
+        )
+        return _does_doc_chunk_exist(doc_chunk_id, index_name, http_client)
+
+    return _find_first_missing_chunk(0, _chunk_exists)
 
 
 class BaseHTTPXClientContext(ABC):
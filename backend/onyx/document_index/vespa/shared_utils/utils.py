@@ -3,16 +3,24 @@ import time
 from typing import cast
 
 import httpx
+import numpy as np
 
 from onyx.configs.app_configs import MANAGED_VESPA
 from onyx.configs.app_configs import VESPA_CLOUD_CERT_PATH
 from onyx.configs.app_configs import VESPA_CLOUD_KEY_PATH
+from onyx.configs.app_configs import VESPA_QUERY_POOL_KEEPALIVE_EXPIRY
+from onyx.configs.app_configs import VESPA_QUERY_POOL_MAX_CONNECTIONS
+from onyx.configs.app_configs import VESPA_QUERY_POOL_MAX_KEEPALIVE_CONNECTIONS
 from onyx.configs.app_configs import VESPA_REQUEST_TIMEOUT
+from onyx.db.enums import EmbeddingPrecision
 from onyx.document_index.vespa_constants import VESPA_APP_CONTAINER_URL
+from onyx.httpx.httpx_pool import HttpxPool
 from onyx.utils.logger import setup_logger
 
 logger = setup_logger()
 
+VESPA_QUERY_POOL_NAME = "vespa_query"
+
 # NOTE: This does not seem to be used in reality despite the Vespa Docs pointing to this code
 # See here for reference: https://docs.vespa.ai/en/documents.html
 # https://github.com/vespa-engine/vespa/blob/master/vespajlib/src/main/java/com/yahoo/text/Text.java
@@ -62,6 +70,21 @@ def remove_invalid_unicode_chars(text: str) -> str:
     return _illegal_xml_chars_RE.sub("", text)
 
 
+def encode_dense_tensor_hex(
+    values: list[float], precision: EmbeddingPrecision = EmbeddingPrecision.FLOAT
+) -> str:
+    """Encodes the cells of a dense tensor in the hex form Vespa accepts in the feed
+    and in query tensor literals, big endian with 8 (float) or 4 (bfloat16) hex
+    characters per cell. The cells have to be of the tensor's cell type."""
+    cells = np.asarray(values, dtype=np.float32)
+    if precision == EmbeddingPrecision.BFLOAT16:
+        # bfloat16 is the upper half of a float32, round to nearest even
+        bits = cells.view(np.uint32).astype(np.uint64)
+        rounded = (bits + 0x7FFF + ((bits >> 16) & 1)) >> 16
+        return rounded.astype(">u2").tobytes().hex()
+    return cells.astype(">f4").tobytes().hex()
+
+
 def get_vespa_http_client(no_timeout: bool = False, http2: bool = True) -> httpx.Client:
     """
     Configure and return an HTTP client for communicating with Vespa,
@@ -78,6 +101,55 @@ def get_vespa_http_client(no_timeout: bool = False, http2: bool = True) -> httpx
     )
 
 
+def get_vespa_query_http_client() -> httpx.Client:
+    """Pooled client for the query path (search and chunk retrieval requests). The
+    connections are kept alive across queries, do not close the client."""
+
+    HttpxPool.init_client(
+        name=VESPA_QUERY_POOL_NAME,
+        cert=cast(tuple[str, str], (VESPA_CLOUD_CERT_PATH, VESPA_CLOUD_KEY_PATH))
+        if MANAGED_VESPA
+        else None,
+        verify=False if not MANAGED_VESPA else True,
+        timeout=VESPA_REQUEST_TIMEOUT,
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=VESPA_QUERY_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=VESPA_QUERY_POOL_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=VESPA_QUERY_POOL_KEEPALIVE_EXPIRY,
+        ),
+    )
+    return HttpxPool.get(VESPA_QUERY_POOL_NAME)
+
+
+def vespa_uses_http2() -> bool:
+    """HTTP/2 is only negotiated over TLS (ALPN), i.e. with managed Vespa. A self hosted
+    Vespa is reached over plain http:// where httpx falls back to HTTP/1.1, which
+    carries a single request per connection at a time."""
+    return VESPA_APP_CONTAINER_URL.startswith("https://")
+
+
+def get_vespa_async_http_client(
+    max_connections: int, http2: bool = True
+) -> httpx.AsyncClient:
+    """Async counterpart of `get_vespa_http_client`, used by the document feed.
+    Over HTTP/2 every connection multiplexes many concurrent requests, see
+    `vespa_uses_http2`."""
+
+    return httpx.AsyncClient(
+        cert=cast(tuple[str, str], (VESPA_CLOUD_CERT_PATH, VESPA_CLOUD_KEY_PATH))
+        if MANAGED_VESPA
+        else None,
+        verify=False if not MANAGED_VESPA else True,
+        timeout=VESPA_REQUEST_TIMEOUT,
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        ),
+    )
+
+
 def wait_for_vespa_with_timeout(wait_interval: int = 5, wait_limit: int = 60) -> bool:
     """Waits for Vespa to become ready subject to a timeout.
     Returns True if Vespa is ready, False otherwise."""
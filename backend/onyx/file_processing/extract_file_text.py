@@ -21,6 +21,7 @@ from fastapi import UploadFile
 from pypdf import PdfReader
 from pypdf.errors import PdfStreamError
 
+from onyx.configs.app_configs import MAX_DOCUMENT_CHARS
 from onyx.configs.constants import DANSWER_METADATA_FILENAME
 from onyx.configs.constants import FileOrigin
 from onyx.file_processing.html_utils import parse_html_page_basic
@@ -194,45 +195,55 @@ def pdf_to_text(file: IO[Any], pdf_pass: str | None = None) -> str:
     return text
 
 
+def _open_pdf(file: IO[Any], pdf_pass: str | None) -> tuple[PdfReader | None, dict]:
+    """Returns the reader and the metadata of the PDF, the reader is None if the PDF
+    is encrypted and cannot be decrypted"""
+    pdf_reader = PdfReader(file)
+
+    # If marked as encrypted and a password is provided, try to decrypt
+    if pdf_reader.is_encrypted and pdf_pass is not None:
+        decrypt_success = False
+        if pdf_pass is not None:
+            try:
+                decrypt_success = pdf_reader.decrypt(pdf_pass) != 0
+            except Exception:
+                logger.error("Unable to decrypt pdf")
+
+        if not decrypt_success:
+            # By user request, keep files that are unreadable just so they
+            # can be discoverable by title.
+            return None, {}
+    elif pdf_reader.is_encrypted:
+        logger.warning("No Password available to decrypt pdf, returning empty")
+        return None, {}
+
+    # Extract metadata from the PDF, removing leading '/' from keys if present
+    # This standardizes the metadata keys for consistency
+    metadata: Dict[str, Any] = {}
+    if pdf_reader.metadata is not None:
+        for key, value in pdf_reader.metadata.items():
+            clean_key = key.lstrip("/")
+            if isinstance(value, str) and value.strip():
+                metadata[clean_key] = value
+
+            elif isinstance(value, list) and all(
+                isinstance(item, str) for item in value
+            ):
+                metadata[clean_key] = ", ".join(value)
+
+    return pdf_reader, metadata
+
+
 def read_pdf_file(
     file: IO[Any],
     pdf_pass: str | None = None,
 ) -> tuple[str, dict]:
     metadata: Dict[str, Any] = {}
     try:
-        pdf_reader = PdfReader(file)
-
-        # If marked as encrypted and a password is provided, try to decrypt
-        if pdf_reader.is_encrypted and pdf_pass is not None:
-            decrypt_success = False
-            if pdf_pass is not None:
-                try:
-                    decrypt_success = pdf_reader.decrypt(pdf_pass) != 0
-                except Exception:
-                    logger.error("Unable to decrypt pdf")
-
-            if not decrypt_success:
-                # By user request, keep files that are unreadable just so they
-                # can be discoverable by title.
-                return "", metadata
-        elif pdf_reader.is_encrypted:
-            logger.warning("No Password available to decrypt pdf, returning empty")
+        pdf_reader, metadata = _open_pdf(file, pdf_pass)
+        if pdf_reader is None:
             return "", metadata
 
-        # Extract metadata from the PDF, removing leading '/' from keys if present
-        # This standardizes the metadata keys for consistency
-        metadata = {}
-        if pdf_reader.metadata is not None:
-            for key, value in pdf_reader.metadata.items():
-                clean_key = key.lstrip("/")
-                if isinstance(value, str) and value.strip():
-                    metadata[clean_key] = value
-
-                elif isinstance(value, list) and all(
-                    isinstance(item, str) for item in value
-                ):
-                    metadata[clean_key] = ", ".join(value)
-
         return (
             TEXT_SECTION_SEPARATOR.join(
                 page.extract_text() for page in pdf_reader.pages
@@ -249,6 +260,55 @@ def read_pdf_file(
     return "", metadata
 
 
+def _iter_pdf_pages(pdf_reader: PdfReader, max_chars: int) -> Iterator[tuple[int, str]]:
+    num_chars = 0
+    for page_number, page in enumerate(pdf_reader.pages, start=1):
+        try:
+            # stripped like the sections made from the pages, so that the limit
+            # matches the size the document is checked against before indexing
+            text = page.extract_text().strip()
+        except Exception:
+            logger.exception(f"Failed to read page {page_number} of PDF")
+            continue
+
+        yield page_number, text
+
+        num_chars += len(text)
+        if max_chars and num_chars > max_chars and page_number < len(pdf_reader.pages):
+            # the document is too long to be indexed, no need to read the rest
+            logger.warning(
+                f"Truncated PDF after page {page_number} of {len(pdf_reader.pages)}, "
+                f"it has more than {max_chars} characters"
+            )
+            return
+
+
+def read_pdf_pages(
+    file: IO[Any],
+    pdf_pass: str | None = None,
+    max_chars: int = MAX_DOCUMENT_CHARS,
+) -> tuple[Iterator[tuple[int, str]], dict]:
+    """Like read_pdf_file, but the text is extracted lazily page by page instead of
+    being joined into a single string. Returns the (1 based) page numbers with their
+    stripped text and the metadata of the PDF.
+
+    Reading stops once the stripped text of the pages exceeds `max_chars` characters,
+    the default is the limit above which documents are not indexed. A page which cannot be read is
+    skipped, a PDF which cannot be read has no pages."""
+    try:
+        pdf_reader, metadata = _open_pdf(file, pdf_pass)
+    except PdfStreamError:
+        logger.exception("PDF file is not a valid PDF")
+        return iter(()), {}
+    except Exception:
+        logger.exception("Failed to read PDF")
+        return iter(()), {}
+
+    if pdf_reader is None:
+        return iter(()), metadata
+    return _iter_pdf_pages(pdf_reader, max_chars), metadata
+
+
 def docx_to_text(file: IO[Any]) -> str:
     def is_simple_table(table: docx.table.Table) -> bool:
         for row in table.rows:
@@ -345,7 +405,10 @@ def extract_file_text(
     file_name: str,
     break_on_unprocessable: bool = True,
     extension: str | None = None,
+    use_unstructured: bool = True,
 ) -> str:
+    """`use_unstructured=False` skips the lookup of the Unstructured API key, which
+    needs the database, e.g. when parsing in a separate process."""
     extension_to_function: dict[str, Callable[[IO[Any]], str]] = {
         ".pdf": pdf_to_text,
         ".docx": docx_to_text,
@@ -357,7 +420,7 @@ def extract_file_text(
     }
 
     try:
-        if get_unstructured_api_key():
+        if use_unstructured and get_unstructured_api_key():
             try:
                 return unstructured_to_text(file, file_name)
             except Exception as unstructured_error:
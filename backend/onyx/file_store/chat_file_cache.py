@@ -0,0 +1,146 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
+from onyx.configs.app_configs import CHAT_FILE_CACHE_MAX_MB
+from onyx.configs.app_configs import CHAT_FILE_DISK_CACHE_DIR
+from onyx.configs.app_configs import CHAT_FILE_DISK_CACHE_MAX_MB
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+# tenant id, file id
+ChatFileKey = tuple[str, str]
+
+
+class ChatFileCache:
+    """LRU cache of the content of chat files, bounded by the total size of the
+    contents. Chat files are saved under a new id each time and never change, so
+    entries do not need to be invalidated.
+
+    If `disk_dir` is set, entries evicted from memory are written to a directory of
+    this process in it and read back from there, up to `max_disk_bytes`."""
+
+    def __init__(
+        self,
+        max_bytes: int,
+        disk_dir: str | None = None,
+        max_disk_bytes: int = 0,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes if disk_dir else 0
+        self._disk_dir = disk_dir
+        self._disk_path: str | None = None
+        self._memory: OrderedDict[ChatFileKey, bytes] = OrderedDict()
+        self._memory_bytes = 0
+        # sizes of the entries on disk
+        self._disk: OrderedDict[ChatFileKey, int] = OrderedDict()
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+
+    def _file_path(self, key: ChatFileKey) -> str:
+        if self._disk_path is None:
+            assert self._disk_dir is not None
+            os.makedirs(self._disk_dir, exist_ok=True)
+            self._disk_path = tempfile.mkdtemp(prefix="chat_files_", dir=self._disk_dir)
+        name = hashlib.sha256("/".join(key).encode()).hexdigest()
+        return os.path.join(self._disk_path, name)
+
+    def get(self, key: ChatFileKey) -> bytes | None:
+        with self._lock:
+            content = self._memory.get(key)
+            if content is not None:
+                self._memory.move_to_end(key)
+                return content
+            if key not in self._disk:
+                return None
+            self._disk.move_to_end(key)
+            path = self._file_path(key)
+
+        try:
+            with open(path, "rb") as file:
+                content = file.read()
+        except OSError:
+            # evicted meanwhile
+            return None
+
+        self._put_in_memory(key, content)
+        return content
+
+    def put(self, key: ChatFileKey, content: bytes) -> None:
+        if len(content) > self.max_bytes:
+            self._put_on_disk([(key, content)])
+            return
+        self._put_in_memory(key, content)
+
+    def _put_in_memory(self, key: ChatFileKey, content: bytes) -> None:
+        if len(content) > self.max_bytes:
+            return
+
+        evicted: list[tuple[ChatFileKey, bytes]] = []
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous)
+            self._memory[key] = content
+            self._memory_bytes += len(content)
+            while self._memory_bytes > self.max_bytes:
+                evicted_key, evicted_content = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted_content)
+                if evicted_key not in self._disk:
+                    evicted.append((evicted_key, evicted_content))
+
+        self._put_on_disk(evicted)
+
+    def _put_on_disk(self, entries: list[tuple[ChatFileKey, bytes]]) -> None:
+        for key, content in entries:
+            if len(content) > self.max_disk_bytes:
+                continue
+
+            with self._lock:
+                if key in self._disk:
+                    continue
+                path = self._file_path(key)
+            try:
+                with open(path, "wb") as file:
+                    file.write(content)
+            except OSError:
+                logger.exception("Failed to write chat file to the disk cache")
+                continue
+
+            with self._lock:
+                if key in self._disk:
+                    continue
+                self._disk[key] = len(content)
+                self._disk_bytes += len(content)
+                while self._disk_bytes > self.max_disk_bytes:
+                    evicted_key, size = self._disk.popitem(last=False)
+                    self._disk_bytes -= size
+                    try:
+                        os.remove(self._file_path(evicted_key))
+                    except OSError:
+                        pass
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            self._disk.clear()
+            self._disk_bytes = 0
+            if self._disk_path is not None:
+                shutil.rmtree(self._disk_path, ignore_errors=True)
+                self._disk_path = None
+
+
+_CHAT_FILE_CACHE = ChatFileCache(
+    max_bytes=CHAT_FILE_CACHE_MAX_MB * 1024 * 1024,
+    disk_dir=CHAT_FILE_DISK_CACHE_DIR,
+    max_disk_bytes=CHAT_FILE_DISK_CACHE_MAX_MB * 1024 * 1024,
+)
+
+
+def get_chat_file_cache() -> ChatFileCache:
+    return _CHAT_FILE_CACHE
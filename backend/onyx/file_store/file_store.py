@@ -1,17 +1,28 @@
 from abc import ABC
 from abc import abstractmethod
+from io import BytesIO
 from typing import IO
 
 from sqlalchemy.orm import Session
 
+from onyx.configs.app_configs import FILE_STORE_TYPE
+from onyx.configs.app_configs import S3_FILE_STORE_BUCKET_NAME
+from onyx.configs.app_configs import S3_FILE_STORE_PREFIX
 from onyx.configs.constants import FileOrigin
+from onyx.configs.constants import FileStoreType
 from onyx.db.models import PGFileStore
 from onyx.db.pg_file_store import create_populate_lobj
 from onyx.db.pg_file_store import delete_lobj_by_id
 from onyx.db.pg_file_store import delete_pgfilestore_by_file_name
 from onyx.db.pg_file_store import get_pgfilestore_by_file_name
 from onyx.db.pg_file_store import read_lobj
+from onyx.db.pg_file_store import read_lobj_range
 from onyx.db.pg_file_store import upsert_pgfilestore
+from onyx.file_store.s3_storage import S3ObjectStorage
+from onyx.utils.logger import setup_logger
+from shared_configs.contextvars import get_current_tenant_id
+
+logger = setup_logger()
 
 
 class FileStore(ABC):
@@ -59,6 +70,13 @@ class FileStore(ABC):
             Contents of the file and metadata dict
         """
 
+    @abstractmethod
+    def read_file_range(self, file_name: str, offset: int, length: int) -> bytes:
+        """
+        Read up to `length` bytes of a file starting at `offset`, without reading
+        the rest of the file
+        """
+
     @abstractmethod
     def read_file_record(self, file_name: str) -> PGFileStore:
         """
@@ -75,9 +93,25 @@ class FileStore(ABC):
         """
 
 
+def _get_record_object(file_record: PGFileStore) -> tuple[str, str] | None:
+    if file_record.bucket_name is None or file_record.object_key is None:
+        return None
+    return file_record.bucket_name, file_record.object_key
+
+
 class PostgresBackedFileStore(FileStore):
+    """Stores the content of new files as large objects in Postgres. Files which were
+    saved to object storage (see S3BackedFileStore) are still read from there, so
+    files can be moved between the stores without downtime."""
+
     def __init__(self, db_session: Session):
         self.db_session = db_session
+        self._object_storages: dict[str, S3ObjectStorage] = {}
+
+    def get_object_storage(self, bucket_name: str) -> S3ObjectStorage:
+        if bucket_name not in self._object_storages:
+            self._object_storages[bucket_name] = S3ObjectStorage(bucket_name)
+        return self._object_storages[bucket_name]
 
     def save_file(
         self,
@@ -88,6 +122,7 @@ class PostgresBackedFileStore(FileStore):
         file_type: str,
         file_metadata: dict | None = None,
     ) -> None:
+        previous_object = self._get_stored_object(file_name)
         try:
             # The large objects in postgres are saved as special objects can be listed with
             # SELECT * FROM pg_largeobject_metadata;
@@ -106,12 +141,46 @@ class PostgresBackedFileStore(FileStore):
             self.db_session.rollback()
             raise
 
+        if previous_object is not None:
+            self._delete_object(*previous_object)
+
+    def _get_stored_object(self, file_name: str) -> tuple[str, str] | None:
+        """The bucket and key of the file if it is in object storage"""
+        try:
+            file_record = self.read_file_record(file_name)
+        except RuntimeError:
+            return None
+        return _get_record_object(file_record)
+
+    def _get_record_object_storage(
+        self, file_record: PGFileStore
+    ) -> tuple[S3ObjectStorage, str]:
+        stored_object = _get_record_object(file_record)
+        if stored_object is None:
+            raise RuntimeError(f"File {file_record.file_name} has no content")
+        bucket_name, object_key = stored_object
+        return self.get_object_storage(bucket_name), object_key
+
+    def _delete_object(self, bucket_name: str, object_key: str) -> None:
+        # the record is already gone, a leftover object only takes up space
+        try:
+            self.get_object_storage(bucket_name).delete(object_key)
+        except Exception:
+            logger.exception(f"Failed to delete object {object_key} in {bucket_name}")
+
     def read_file(
         self, file_name: str, mode: str | None = None, use_tempfile: bool = False
     ) -> IO:
         file_record = get_pgfilestore_by_file_name(
             file_name=file_name, db_session=self.db_session
         )
+        if file_record.lobj_oid is None:
+            object_storage, object_key = self._get_record_object_storage(file_record)
+            if use_tempfile:
+                # fetches the ranges which are read instead of downloading the file
+                return object_storage.open(object_key)
+            return BytesIO(object_storage.read(object_key))
+
         return read_lobj(
             lobj_oid=file_record.lobj_oid,
             db_session=self.db_session,
@@ -119,6 +188,21 @@ class PostgresBackedFileStore(FileStore):
             use_tempfile=use_tempfile,
         )
 
+    def read_file_range(self, file_name: str, offset: int, length: int) -> bytes:
+        file_record = get_pgfilestore_by_file_name(
+            file_name=file_name, db_session=self.db_session
+        )
+        if file_record.lobj_oid is None:
+            object_storage, object_key = self._get_record_object_storage(file_record)
+            return object_storage.read_range(object_key, offset, length)
+
+        return read_lobj_range(
+            lobj_oid=file_record.lobj_oid,
+            db_session=self.db_session,
+            offset=offset,
+            length=length,
+        )
+
     def read_file_record(self, file_name: str) -> PGFileStore:
         file_record = get_pgfilestore_by_file_name(
             file_name=file_name, db_session=self.db_session
@@ -131,7 +215,9 @@ class PostgresBackedFileStore(FileStore):
             file_record = get_pgfilestore_by_file_name(
                 file_name=file_name, db_session=self.db_session
             )
-            delete_lobj_by_id(file_record.lobj_oid, db_session=self.db_session)
+            stored_object = _get_record_object(file_record)
+            if file_record.lobj_oid is not None:
+                delete_lobj_by_id(file_record.lobj_oid, db_session=self.db_session)
             delete_pgfilestore_by_file_name(
                 file_name=file_name, db_session=self.db_session
             )
@@ -140,7 +226,67 @@ class PostgresBackedFileStore(FileStore):
             self.db_session.rollback()
             raise
 
+        if stored_object is not None:
+            self._delete_object(*stored_object)
+
+
+class S3BackedFileStore(PostgresBackedFileStore):
+    """Stores the content of new files in S3 compatible object storage, the records
+    of the files stay in Postgres. Files which are still large objects in Postgres
+    are read from there until they are moved with scripts/migrate_file_store.py."""
+
+    def __init__(
+        self,
+        db_session: Session,
+        bucket_name: str = S3_FILE_STORE_BUCKET_NAME,
+        object_storage: S3ObjectStorage | None = None,
+    ):
+        super().__init__(db_session)
+        self.bucket_name = bucket_name
+        self._object_storages[bucket_name] = object_storage or S3ObjectStorage(
+            bucket_name
+        )
+
+    def get_object_key(self, file_name: str) -> str:
+        return f"{S3_FILE_STORE_PREFIX}/{get_current_tenant_id()}/{file_name}"
+
+    def save_file(
+        self,
+        file_name: str,
+        content: IO,
+        display_name: str | None,
+        file_origin: FileOrigin,
+        file_type: str,
+        file_metadata: dict | None = None,
+    ) -> None:
+        object_key = self.get_object_key(file_name)
+        previous_object = self._get_stored_object(file_name)
+        self.get_object_storage(self.bucket_name).upload(object_key, content)
+        try:
+            upsert_pgfilestore(
+                file_name=file_name,
+                display_name=display_name or file_name,
+                file_origin=file_origin,
+                file_type=file_type,
+                lobj_oid=None,
+                db_session=self.db_session,
+                file_metadata=file_metadata,
+                bucket_name=self.bucket_name,
+                object_key=object_key,
+            )
+            self.db_session.commit()
+        except Exception:
+            self.db_session.rollback()
+            raise
+
+        if previous_object is not None and previous_object != (
+            self.bucket_name,
+            object_key,
+        ):
+            self._delete_object(*previous_object)
+
 
 def get_default_file_store(db_session: Session) -> FileStore:
-    # The only supported file store now is the Postgres File Store
+    if FILE_STORE_TYPE == FileStoreType.S3:
+        return S3BackedFileStore(db_session=db_session)
     return PostgresBackedFileStore(db_session=db_session)
@@ -1,9 +1,12 @@
 import base64
+from collections.abc import Callable
 from enum import Enum
+from typing import Any
 from typing import NotRequired
 from typing_extensions import TypedDict  # noreorder
 
 from pydantic import BaseModel
+from pydantic import PrivateAttr
 
 
 class ChatFileType(str, Enum):
@@ -26,11 +29,40 @@ class FileDescriptor(TypedDict):
 
 
 class InMemoryChatFile(BaseModel):
+    """A chat file with its content. Instead of the content, a function loading it
+    can be given, it is then loaded on first access, e.g. for files of the chat
+    history of which only some end up in the prompt."""
+
     file_id: str
-    content: bytes
     file_type: ChatFileType
     filename: str | None = None
 
+    _content: bytes | None = PrivateAttr(default=None)
+    _load_content: Callable[[], bytes] | None = PrivateAttr(default=None)
+
+    def __init__(
+        self,
+        content: bytes | None = None,
+        load_content: Callable[[], bytes] | None = None,
+        **data: Any,
+    ) -> None:
+        super().__init__(**data)
+        if content is None and load_content is None:
+            raise ValueError("Either the content or a function loading it is needed")
+        self._content = content
+        self._load_content = load_content
+
+    @property
+    def content(self) -> bytes:
+        if self._content is None:
+            assert self._load_content is not None
+            self._content = self._load_content()
+        return self._content
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._content is not None
+
     def to_base64(self) -> str:
         if self.file_type == ChatFileType.IMAGE:
             return base64.b64encode(self.content).decode()
@@ -0,0 +1,183 @@
+import io
+from collections.abc import Iterator
+from typing import Any
+from typing import IO
+
+import boto3
+from botocore.client import Config
+
+from onyx.configs.app_configs import AWS_REGION_NAME
+from onyx.configs.app_configs import S3_AWS_ACCESS_KEY_ID
+from onyx.configs.app_configs import S3_AWS_SECRET_ACCESS_KEY
+from onyx.configs.app_configs import S3_ENDPOINT_URL
+from onyx.file_store.constants import STANDARD_CHUNK_SIZE
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+
+def build_s3_client(endpoint_url: str | None = S3_ENDPOINT_URL) -> Any:
+    return boto3.client(
+        "s3",
+        endpoint_url=endpoint_url,
+        region_name=AWS_REGION_NAME,
+        aws_access_key_id=S3_AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=S3_AWS_SECRET_ACCESS_KEY,
+        # S3 compatible storage like MinIO does not support virtual hosted buckets
+        config=Config(s3={"addressing_style": "path"}) if endpoint_url else None,
+    )
+
+
+def _read_chunk(content: IO, size: int) -> bytes:
+    """Reads up to `size` bytes, a single read may return less before the end"""
+    chunk = bytearray()
+    while len(chunk) < size:
+        data = content.read(size - len(chunk))
+        if not data:
+            break
+        chunk += data.encode() if isinstance(data, str) else data
+    return bytes(chunk)
+
+
+class _S3RangeReader(io.RawIOBase):
+    """Seekable reader of an object which fetches the requested ranges, so e.g. a zip
+    file can be read without downloading all of it."""
+
+    def __init__(self, client: Any, bucket_name: str, key: str) -> None:
+        self._client = client
+        self._bucket_name = bucket_name
+        self._key = key
+        self._size: int = client.head_object(Bucket=bucket_name, Key=key)[
+            "ContentLength"
+        ]
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self._size + offset
+        else:
+            raise ValueError(f"Invalid whence {whence}")
+        if position < 0:
+            raise ValueError(f"Negative seek position {position}")
+        self._position = position
+        return position
+
+    def _read_range(self, length: int) -> bytes:
+        end = min(self._position + length, self._size)
+        if end <= self._position:
+            return b""
+        response = self._client.get_object(
+            Bucket=self._bucket_name,
+            Key=self._key,
+            Range=f"bytes={self._position}-{end - 1}",
+        )
+        data = response["Body"].read()
+        self._position += len(data)
+        return data
+
+    def readinto(self, buffer: Any) -> int:
+        data = self._read_range(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+    def readall(self) -> bytes:
+        # in one request instead of one per default buffer size
+        return self._read_range(self._size - self._position)
+
+
+class S3ObjectStorage:
+    """The objects of a bucket in S3 compatible object storage"""
+
+    def __init__(
+        self,
+        bucket_name: str,
+        client: Any | None = None,
+        chunk_size: int = STANDARD_CHUNK_SIZE,
+    ) -> None:
+        self.bucket_name = bucket_name
+        self.client = client or build_s3_client()
+        # also the part size of multipart uploads, at least 5 MiB for S3
+        self.chunk_size = chunk_size
+
+    def upload(self, key: str, content: IO) -> None:
+        """Uploads the content chunk by chunk, as a multipart upload if it is larger
+        than a chunk, so it is never fully loaded into memory."""
+        chunk = _read_chunk(content, self.chunk_size)
+        if len(chunk) < self.chunk_size:
+            self.client.put_object(Bucket=self.bucket_name, Key=key, Body=chunk)
+            return
+
+        upload_id = self.client.create_multipart_upload(
+            Bucket=self.bucket_name, Key=key
+        )["UploadId"]
+        try:
+            parts: list[dict[str, Any]] = []
+            while chunk:
+                response = self.client.upload_part(
+                    Bucket=self.bucket_name,
+                    Key=key,
+                    UploadId=upload_id,
+                    PartNumber=len(parts) + 1,
+                    Body=chunk,
+                )
+                parts.append({"ETag": response["ETag"], "PartNumber": len(parts) + 1})
+                chunk = _read_chunk(content, self.chunk_size)
+
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+        except Exception:
+            # parts of an unfinished upload are stored (and billed) until aborted
+            try:
+                self.client.abort_multipart_upload(
+                    Bucket=self.bucket_name, Key=key, UploadId=upload_id
+                )
+            except Exception:
+                logger.exception(f"Failed to abort multipart upload of {key}")
+            raise
+
+    def open(self, key: str) -> IO[bytes]:
+        """A seekable file, the ranges read are fetched on demand"""
+        return io.BufferedReader(
+            _S3RangeReader(self.client, self.bucket_name, key),
+            buffer_size=self.chunk_size,
+        )
+
+    def iter_chunks(self, key: str) -> Iterator[bytes]:
+        """Streams the object with a single request"""
+        body = self.client.get_object(Bucket=self.bucket_name, Key=key)["Body"]
+        try:
+            yield from body.iter_chunks(self.chunk_size)
+        finally:
+            body.close()
+
+    def read(self, key: str) -> bytes:
+        return self.client.get_object(Bucket=self.bucket_name, Key=key)["Body"].read()
+
+    def read_range(self, key: str, offset: int, length: int) -> bytes:
+        if length <= 0:
+            return b""
+        return self.client.get_object(
+            Bucket=self.bucket_name,
+            Key=key,
+            Range=f"bytes={offset}-{offset + length - 1}",
+        )["Body"].read()
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket_name, Key=key)
@@ -1,7 +1,6 @@
 import base64
 from collections.abc import Callable
 from io import BytesIO
-from typing import cast
 from uuid import uuid4
 
 import requests
@@ -10,22 +9,58 @@ from sqlalchemy.orm import Session
 from onyx.configs.constants import FileOrigin
 from onyx.db.engine import get_session_with_tenant
 from onyx.db.models import ChatMessage
+from onyx.file_store.chat_file_cache import get_chat_file_cache
 from onyx.file_store.file_store import get_default_file_store
 from onyx.file_store.models import FileDescriptor
 from onyx.file_store.models import InMemoryChatFile
 from onyx.utils.b64 import get_image_type
 from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
+from shared_configs.contextvars import get_current_tenant_id
+
+
+def _read_chat_file_content(
+    file_id: str, tenant_id: str, db_session: Session | None = None
+) -> bytes:
+    """Reads through the chat file cache. A session is only opened if the file is
+    not cached and none is given."""
+    cache = get_chat_file_cache()
+    content = cache.get((tenant_id, file_id))
+    if content is not None:
+        return content
+
+    if db_session is None:
+        with get_session_with_tenant(tenant_id) as db_session:
+            content = (
+                get_default_file_store(db_session).read_file(file_id, mode="b").read()
+            )
+    else:
+        content = get_default_file_store(db_session).read_file(file_id, mode="b").read()
+
+    cache.put((tenant_id, file_id), content)
+    return content
 
 
 def load_chat_file(
     file_descriptor: FileDescriptor, db_session: Session
 ) -> InMemoryChatFile:
-    file_io = get_default_file_store(db_session).read_file(
-        file_descriptor["id"], mode="b"
-    )
     return InMemoryChatFile(
         file_id=file_descriptor["id"],
-        content=file_io.read(),
+        content=_read_chat_file_content(
+            file_descriptor["id"], get_current_tenant_id(), db_session
+        ),
+        file_type=file_descriptor["type"],
+        filename=file_descriptor.get("name"),
+    )
+
+
+def lazy_load_chat_file(file_descriptor: FileDescriptor) -> InMemoryChatFile:
+    """The content is read when it is first accessed, in its own session since that
+    may be on another thread."""
+    file_id = file_descriptor["id"]
+    tenant_id = get_current_tenant_id()
+    return InMemoryChatFile(
+        file_id=file_id,
+        load_content=lambda: _read_chat_file_content(file_id, tenant_id),
         file_type=file_descriptor["type"],
         filename=file_descriptor.get("name"),
     )
@@ -36,21 +71,19 @@ def load_all_chat_files(
     file_descriptors: list[FileDescriptor],
     db_session: Session,
 ) -> list[InMemoryChatFile]:
-    file_descriptors_for_history: list[FileDescriptor] = []
+    """The files of the new message are loaded, the files of the history are loaded
+    lazily since only the ones that make it into the prompt are needed."""
+    files: dict[str, InMemoryChatFile] = {}
+    for file_descriptor in file_descriptors:
+        if file_descriptor["id"] not in files:
+            files[file_descriptor["id"]] = load_chat_file(file_descriptor, db_session)
+
     for chat_message in chat_messages:
-        if chat_message.files:
-            file_descriptors_for_history.extend(chat_message.files)
-
-    files = cast(
-        list[InMemoryChatFile],
-        run_functions_tuples_in_parallel(
-            [
-                (load_chat_file, (file, db_session))
-                for file in file_descriptors + file_descriptors_for_history
-            ]
-        ),
-    )
-    return files
+        for file_descriptor in chat_message.files or []:
+            if file_descriptor["id"] not in files:
+                files[file_descriptor["id"]] = lazy_load_chat_file(file_descriptor)
+
+    return list(files.values())
 
 
 def save_file_from_url(url: str, tenant_id: str) -> str:
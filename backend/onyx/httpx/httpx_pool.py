@@ -1,17 +1,121 @@
+import os
 import threading
+import time
+from dataclasses import dataclass
+from dataclasses import replace
 from typing import Any
 
 import httpx
 
+# arguments which configure the connection pool rather than the client
+_TRANSPORT_KWARGS = ("verify", "cert", "http1", "http2", "limits")
+
+
+@dataclass
+class HttpxPoolMetrics:
+    """Counters of a pooled client since it was created"""
+
+    requests: int = 0
+    failed_requests: int = 0
+    # requests sent and waiting for the response headers
+    in_flight: int = 0
+    max_in_flight: int = 0
+    # requests sent over an existing connection vs. a newly opened one
+    reused_connections: int = 0
+    new_connections: int = 0
+    # time spent waiting for a free connection / stream in the pool
+    total_queue_seconds: float = 0.0
+    max_queue_seconds: float = 0.0
+
+    @property
+    def connection_reuse_rate(self) -> float:
+        connected = self.reused_connections + self.new_connections
+        return self.reused_connections / connected if connected else 0.0
+
+    @property
+    def avg_queue_seconds(self) -> float:
+        connected = self.reused_connections + self.new_connections
+        return self.total_queue_seconds / connected if connected else 0.0
+
+
+class _InstrumentedTransport(httpx.BaseTransport):
+    """Wraps the transport of a pooled client to collect `HttpxPoolMetrics`.
+
+    Uses the httpcore trace extension: the first event of a request is either opening
+    a new connection or sending on an existing one, so the time until then is the time
+    the request was queued in the pool."""
+
+    def __init__(self, transport: httpx.BaseTransport) -> None:
+        self._transport = transport
+        self._lock = threading.Lock()
+        self._metrics = HttpxPoolMetrics()
+
+    @property
+    def metrics(self) -> HttpxPoolMetrics:
+        with self._lock:
+            return replace(self._metrics)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        start = time.monotonic()
+        connected_at: float | None = None
+        new_connection = False
+        caller_trace = request.extensions.get("trace")
+
+        def trace(event_name: str, info: dict[str, Any]) -> None:
+            nonlocal connected_at, new_connection
+            if connected_at is None:
+                connected_at = time.monotonic()
+            if event_name.startswith("connection.connect_"):
+                new_connection = True
+            if caller_trace is not None:
+                caller_trace(event_name, info)
+
+        request.extensions["trace"] = trace
+
+        with self._lock:
+            self._metrics.in_flight += 1
+            self._metrics.max_in_flight = max(
+                self._metrics.max_in_flight, self._metrics.in_flight
+            )
+
+        failed = True
+        try:
+            response = self._transport.handle_request(request)
+            failed = False
+            return response
+        finally:
+            with self._lock:
+                metrics = self._metrics
+                metrics.in_flight -= 1
+                metrics.requests += 1
+                if failed:
+                    metrics.failed_requests += 1
+                if connected_at is not None:
+                    queue_seconds = connected_at - start
+                    metrics.total_queue_seconds += queue_seconds
+                    metrics.max_queue_seconds = max(
+                        metrics.max_queue_seconds, queue_seconds
+                    )
+                    if new_connection:
+                        metrics.new_connections += 1
+                    else:
+                        metrics.reused_connections += 1
+
+    def close(self) -> None:
+        self._transport.close()
+
 
 class HttpxPool:
     """Class to manage a global httpx Client instance"""
 
     _clients: dict[str, httpx.Client] = {}
+    _transports: dict[str, _InstrumentedTransport] = {}
+    _client_kwargs: dict[str, dict[str, Any]] = {}
+    _pid: int | None = None
     _lock: threading.Lock = threading.Lock()
 
     # Default parameters for creation
-    DEFAULT_KWARGS = {
+    DEFAULT_KWARGS: dict[str, Any] = {
         "http2": True,
         "limits": lambda: httpx.Limits(),
     }
@@ -20,23 +124,54 @@ class HttpxPool:
         pass
 
     @classmethod
-    def _init_client(cls, **kwargs: Any) -> httpx.Client:
+    def _init_client(cls, name: str, **kwargs: Any) -> httpx.Client:
         """Private helper method to create and return an httpx.Client."""
-        merged_kwargs = {**cls.DEFAULT_KWARGS, **kwargs}
-        return httpx.Client(**merged_kwargs)
+        merged_kwargs: dict[str, Any] = {
+            key: value() if callable(value) else value
+            for key, value in cls.DEFAULT_KWARGS.items()
+        }
+        merged_kwargs.update(kwargs)
+
+        # the client still gets all arguments, they apply to proxy transports
+        transport_kwargs: dict[str, Any] = {
+            key: merged_kwargs[key] for key in _TRANSPORT_KWARGS if key in merged_kwargs
+        }
+        transport = _InstrumentedTransport(httpx.HTTPTransport(**transport_kwargs))
+
+        cls._client_kwargs[name] = kwargs
+        cls._transports[name] = transport
+        return httpx.Client(transport=transport, **merged_kwargs)
+
+    @classmethod
+    def _check_pid(cls) -> None:
+        """Connections must not be shared with a forked child process, the child
+        recreates the clients with the same parameters. Must hold the lock."""
+        pid = os.getpid()
+        if cls._pid == pid:
+            return
+
+        if cls._pid is not None:
+            # not closed, the sockets still belong to the parent
+            for name in cls._clients:
+                cls._clients[name] = cls._init_client(name, **cls._client_kwargs[name])
+        cls._pid = pid
 
     @classmethod
     def init_client(cls, name: str, **kwargs: Any) -> None:
         """Allow the caller to init the client with extra params."""
         with cls._lock:
+            cls._check_pid()
             if name not in cls._clients:
-                cls._clients[name] = cls._init_client(**kwargs)
+                cls._clients[name] = cls._init_client(name, **kwargs)
 
     @classmethod
     def close_client(cls, name: str) -> None:
         """Allow the caller to close the client."""
         with cls._lock:
+            cls._check_pid()
             client = cls._clients.pop(name, None)
+            cls._transports.pop(name, None)
+            cls._client_kwargs.pop(name, None)
             if client:
                 client.close()
 
@@ -44,14 +179,25 @@ class HttpxPool:
     def close_all(cls) -> None:
         """Close all registered clients."""
         with cls._lock:
+            cls._check_pid()
             for client in cls._clients.values():
                 client.close()
             cls._clients.clear()
+            cls._transports.clear()
+            cls._client_kwargs.clear()
 
     @classmethod
     def get(cls, name: str) -> httpx.Client:
         """Gets the httpx.Client. Will init to default settings if not init'd."""
         with cls._lock:
+            cls._check_pid()
             if name not in cls._clients:
-                cls._clients[name] = cls._init_client()
+                cls._clients[name] = cls._init_client(name)
             return cls._clients[name]
+
+    @classmethod
+    def get_metrics(cls, name: str) -> HttpxPoolMetrics | None:
+        """Snapshot of the metrics of the client, None if it does not exist."""
+        with cls._lock:
+            transport = cls._transports.get(name)
+        return transport.metrics if transport else None
@@ -203,6 +203,16 @@ class Chunker:
         chunks: list[DocAwareChunk] = []
         link_offsets: dict[int, str] = {}
         chunk_text = ""
+        # Running totals for the chunk being built so that appending a section does not
+        # require re-tokenizing (or re-cleaning) everything accumulated so far. Sections
+        # are always joined by SECTION_SEPARATOR, so the totals are the sums of the parts.
+        # For tokenizers which merge across the separator (e.g. tiktoken) the summed token
+        # count can exceed the count of the joined text, so it is only an upper bound and
+        # the chunk is re-counted before it gets closed. Boundaries are therefore the same
+        # as when tokenizing the whole chunk, as long as joining never adds tokens.
+        chunk_token_count = 0
+        chunk_offset = 0
+        separator_token_count = len(self.tokenizer.tokenize(SECTION_SEPARATOR))
 
         def _create_chunk(
             text: str,
@@ -250,6 +260,8 @@ class Chunker:
                     chunks.append(_create_chunk(chunk_text, link_offsets))
                     link_offsets = {}
                     chunk_text = ""
+                    chunk_token_count = 0
+                    chunk_offset = 0
 
                 split_texts = self.chunk_splitter.split_text(section_text)
 
@@ -285,22 +297,29 @@ class Chunker:
 
                 continue
 
-            current_token_count = len(self.tokenizer.tokenize(chunk_text))
-            current_offset = len(shared_precompare_cleanup(chunk_text))
+            section_offset = len(shared_precompare_cleanup(section_text))
             # In the case where the whole section is shorter than a chunk, either add
             # to chunk or start a new one
-            next_section_tokens = (
-                len(self.tokenizer.tokenize(SECTION_SEPARATOR)) + section_token_count
-            )
-            if next_section_tokens + current_token_count <= content_token_limit:
+            next_section_tokens = separator_token_count + section_token_count
+            if (
+                chunk_text
+                and next_section_tokens + chunk_token_count > content_token_limit
+            ):
+                chunk_token_count = len(self.tokenizer.tokenize(chunk_text))
+            if next_section_tokens + chunk_token_count <= content_token_limit:
                 if chunk_text:
                     chunk_text += SECTION_SEPARATOR
+                    chunk_token_count += separator_token_count
+                link_offsets[chunk_offset] = section_link_text
                 chunk_text += section_text
-                link_offsets[current_offset] = section_link_text
+                chunk_token_count += section_token_count
+                chunk_offset += section_offset
             else:
                 chunks.append(_create_chunk(chunk_text, link_offsets))
                 link_offsets = {0: section_link_text}
                 chunk_text = section_text
+                chunk_token_count = section_token_count
+                chunk_offset = section_offset
 
         # Once we hit the end, if we're still in the process of building a chunk, add what we have.
         # If there is only whitespace left then don't include it. If there are no chunks at all
@@ -1,14 +1,17 @@
 from abc import ABC
 from abc import abstractmethod
 
+from onyx.configs.app_configs import ENABLE_EMBEDDING_CACHE
 from onyx.db.models import SearchSettings
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
 from onyx.indexing.models import ChunkEmbedding
 from onyx.indexing.models import DocAwareChunk
 from onyx.indexing.models import IndexChunk
+from onyx.natural_language_processing.embedding_cache import EmbeddingCache
 from onyx.natural_language_processing.search_nlp_models import EmbeddingModel
 from onyx.utils.logger import setup_logger
 from onyx.utils.timing import log_function_time
+from shared_configs.configs import INDEXING_MODEL_SERVER_ADDITIONAL_HOSTS
 from shared_configs.configs import INDEXING_MODEL_SERVER_HOST
 from shared_configs.configs import INDEXING_MODEL_SERVER_PORT
 from shared_configs.enums import EmbeddingProvider
@@ -59,8 +62,10 @@ class IndexingEmbedder(ABC):
             # The below are globally set, this flow always uses the indexing one
             server_host=INDEXING_MODEL_SERVER_HOST,
             server_port=INDEXING_MODEL_SERVER_PORT,
+            additional_servers=INDEXING_MODEL_SERVER_ADDITIONAL_HOSTS,
             retrim_content=True,
             callback=callback,
+            embedding_cache=EmbeddingCache() if ENABLE_EMBEDDING_CACHE else None,
         )
 
     @abstractmethod
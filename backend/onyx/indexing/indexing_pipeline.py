@@ -14,6 +14,7 @@ from onyx.access.models import DocumentAccess
 from onyx.configs.app_configs import INDEXING_EXCEPTION_LIMIT
 from onyx.configs.app_configs import MAX_DOCUMENT_CHARS
 from onyx.configs.constants import DEFAULT_BOOST
+from onyx.configs.constants import DocumentSource
 from onyx.connectors.cross_connector_utils.miscellaneous_utils import (
     get_experts_stores_representations,
 )
@@ -32,8 +33,7 @@ from onyx.db.document_set import fetch_document_sets_for_documents
 from onyx.db.index_attempt import create_index_attempt_error
 from onyx.db.models import Document as DBDocument
 from onyx.db.search_settings import get_current_search_settings
-from onyx.db.tag import create_or_add_document_tag
-from onyx.db.tag import create_or_add_document_tag_list
+from onyx.db.tag import upsert_document_tags
 from onyx.document_index.document_index_utils import (
     get_multipass_config,
 )
@@ -43,8 +43,12 @@ from onyx.document_index.interfaces import IndexBatchParams
 from onyx.indexing.chunker import Chunker
 from onyx.indexing.embedder import IndexingEmbedder
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
+from onyx.indexing.indexing_profiler import IndexingProfiler
+from onyx.indexing.indexing_profiler import IndexingStage
+from onyx.indexing.indexing_profiler import profile_stage
 from onyx.indexing.models import DocAwareChunk
 from onyx.indexing.models import DocMetadataAwareIndexChunk
+from onyx.indexing.models import IndexChunk
 from onyx.utils.logger import setup_logger
 from onyx.utils.timing import log_function_time
 
@@ -57,6 +61,14 @@ class DocumentBatchPrepareContext(BaseModel):
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
 
+class ChunkedDocumentBatch(BaseModel):
+    # documents of the batch which passed filtering
+    filtered_documents: list[Document]
+    # None if none of the documents need to be (re)indexed
+    ctx: DocumentBatchPrepareContext | None
+    chunks: list[DocAwareChunk]
+
+
 class IndexingPipelineResult(BaseModel):
     # number of documents that are completely new (e.g. did
     # not exist as a part of this OR any other connector)
@@ -66,6 +78,8 @@ class IndexingPipelineResult(BaseModel):
     total_docs: int
     # number of chunks that were inserted into Vespa
     total_chunks: int
+    # the batch raised an exception which was tolerated (see INDEXING_EXCEPTION_LIMIT)
+    failed: bool = False
 
 
 class IndexingPipelineProtocol(Protocol):
@@ -102,26 +116,15 @@ def _upsert_documents_in_db(
 
     upsert_documents(db_session, document_metadata_list)
 
-    # Insert document content metadata
+    # Insert document content metadata, in bulk for the whole batch
+    document_id_to_tags: dict[str, list[tuple[str, str, DocumentSource]]] = {}
     for doc in documents:
+        doc_tags = document_id_to_tags.setdefault(doc.id, [])
         for k, v in doc.metadata.items():
-            if isinstance(v, list):
-                create_or_add_document_tag_list(
-                    tag_key=k,
-                    tag_values=v,
-                    source=doc.source,
-                    document_id=doc.id,
-                    db_session=db_session,
-                )
-                continue
+            for tag_value in v if isinstance(v, list) else [v]:
+                doc_tags.append((k, tag_value, doc.source))
 
-            create_or_add_document_tag(
-                tag_key=k,
-                tag_value=v,
-                source=doc.source,
-                document_id=doc.id,
-                db_session=db_session,
-            )
+    upsert_document_tags(db_session, document_id_to_tags)
 
 
 def get_doc_ids_to_update(
@@ -149,6 +152,57 @@ def get_doc_ids_to_update(
     return updatable_docs
 
 
+def handle_index_batch_exception(
+    e: Exception,
+    *,
+    document_batch: list[Document],
+    index_attempt_metadata: IndexAttemptMetadata,
+    attempt_id: int | None,
+    db_session: Session,
+) -> None:
+    """Records a failed batch as an index attempt error. Re-raises if exceptions are not
+    tolerated (INDEXING_EXCEPTION_LIMIT == 0) or once the limit has been exceeded."""
+    if isinstance(e, httpx.HTTPStatusError):
+        if e.response.status_code == HTTPStatus.INSUFFICIENT_STORAGE:
+            logger.error(
+                "NOTE: HTTP Status 507 Insufficient Storage indicates "
+                "you need to allocate more memory or disk space to the "
+                "Vespa/index container."
+            )
+
+    if INDEXING_EXCEPTION_LIMIT == 0:
+        raise e
+
+    trace = traceback.format_exc()
+    create_index_attempt_error(
+        attempt_id,
+        batch=index_attempt_metadata.batch_num,
+        docs=document_batch,
+        exception_msg=str(e),
+        exception_traceback=trace,
+        db_session=db_session,
+    )
+    logger.exception(
+        f"Indexing batch {index_attempt_metadata.batch_num} failed. msg='{e}' trace='{trace}'"
+    )
+
+    index_attempt_metadata.num_exceptions += 1
+    if index_attempt_metadata.num_exceptions == INDEXING_EXCEPTION_LIMIT:
+        logger.warning(
+            f"Maximum number of exceptions for this index attempt "
+            f"({INDEXING_EXCEPTION_LIMIT}) has been reached. "
+            f"The next exception will abort the indexing attempt."
+        )
+    elif index_attempt_metadata.num_exceptions > INDEXING_EXCEPTION_LIMIT:
+        logger.warning(
+            f"Maximum number of exceptions for this index attempt "
+            f"({INDEXING_EXCEPTION_LIMIT}) has been exceeded."
+        )
+        raise RuntimeError(
+            f"Maximum exception limit of {INDEXING_EXCEPTION_LIMIT} exceeded."
+        )
+
+
 def index_doc_batch_with_handler(
     *,
     chunker: Chunker,
@@ -160,6 +214,7 @@ def index_doc_batch_with_handler(
     db_session: Session,
     ignore_time_skip: bool = False,
     tenant_id: str | None = None,
+    profiler: IndexingProfiler | None = None,
 ) -> IndexingPipelineResult:
     index_pipeline_result = IndexingPipelineResult(
         new_docs=0, total_docs=len(document_batch), total_chunks=0
@@ -174,49 +229,17 @@ def index_doc_batch_with_handler(
             db_session=db_session,
             ignore_time_skip=ignore_time_skip,
             tenant_id=tenant_id,
+            profiler=profiler,
         )
     except Exception as e:
-        if isinstance(e, httpx.HTTPStatusError):
-            if e.response.status_code == HTTPStatus.INSUFFICIENT_STORAGE:
-                logger.error(
-                    "NOTE: HTTP Status 507 Insufficient Storage indicates "
-                    "you need to allocate more memory or disk space to the "
-                    "Vespa/index container."
-                )
-
-        if INDEXING_EXCEPTION_LIMIT == 0:
-            raise
-
-        trace = traceback.format_exc()
-        create_index_attempt_error(
-            attempt_id,
-            batch=index_attempt_metadata.batch_num,
-            docs=document_batch,
-            exception_msg=str(e),
-            exception_traceback=trace,
+        handle_index_batch_exception(
+            e,
+            document_batch=document_batch,
+            index_attempt_metadata=index_attempt_metadata,
+            attempt_id=attempt_id,
             db_session=db_session,
         )
-        logger.exception(
-            f"Indexing batch {index_attempt_metadata.batch_num} failed. msg='{e}' trace='{trace}'"
-        )
-
-        index_attempt_metadata.num_exceptions += 1
-        if index_attempt_metadata.num_exceptions == INDEXING_EXCEPTION_LIMIT:
-            logger.warning(
-                f"Maximum number of exceptions for this index attempt "
-                f"({INDEXING_EXCEPTION_LIMIT}) has been reached. "
-                f"The next exception will abort the indexing attempt."
-            )
-        elif index_attempt_metadata.num_exceptions > INDEXING_EXCEPTION_LIMIT:
-            logger.warning(
-                f"Maximum number of exceptions for this index attempt "
-                f"({INDEXING_EXCEPTION_LIMIT}) has been exceeded."
-            )
-            raise RuntimeError(
-                f"Maximum exception limit of {INDEXING_EXCEPTION_LIMIT} exceeded."
-            )
-        else:
-            pass
+        index_pipeline_result.failed = True
 
     return index_pipeline_result
 
@@ -330,54 +353,44 @@ def filter_documents(document_batch: list[Document]) -> list[Document]:
     return documents
 
 
-@log_function_time(debug_only=True)
-def index_doc_batch(
+def index_doc_batch_chunk(
     *,
     document_batch: list[Document],
     chunker: Chunker,
-    embedder: IndexingEmbedder,
-    document_index: DocumentIndex,
     index_attempt_metadata: IndexAttemptMetadata,
     db_session: Session,
     ignore_time_skip: bool = False,
-    tenant_id: str | None = None,
     filter_fnc: Callable[[list[Document]], list[Document]] = filter_documents,
-) -> IndexingPipelineResult:
-    """Takes different pieces of the indexing pipeline and applies it to a batch of documents
-    Note that the documents should already be batched at this point so that it does not inflate the
-    memory requirements
-
-    Returns a tuple where the first element is the number of new docs and the
-    second element is the number of chunks."""
-
-    no_access = DocumentAccess.build(
-        user_emails=[],
-        user_groups=[],
-        external_user_emails=[],
-        external_user_group_ids=[],
-        is_public=False,
-    )
-
-    filtered_documents = filter_fnc(document_batch)
-
-    ctx = index_doc_batch_prepare(
-        documents=filtered_documents,
-        index_attempt_metadata=index_attempt_metadata,
-        ignore_time_skip=ignore_time_skip,
-        db_session=db_session,
-    )
-    if not ctx:
-        # even though we didn't actually index anything, we should still
-        # mark them as "completed" for the CC Pair in order to make the
-        # counts match
-        mark_document_as_indexed_for_cc_pair__no_commit(
-            connector_id=index_attempt_metadata.connector_id,
-            credential_id=index_attempt_metadata.credential_id,
-            document_ids=[doc.id for doc in filtered_documents],
+    profiler: IndexingProfiler | None = None,
+) -> ChunkedDocumentBatch:
+    """First half of the indexing pipeline: filters the batch, upserts the documents into
+    Postgres and chunks the ones that actually need to be (re)indexed."""
+    with profile_stage(profiler, IndexingStage.DOC_FILTER) as measurement:
+        filtered_documents = filter_fnc(document_batch)
+        measurement.add_documents(filtered_documents)
+
+    with profile_stage(profiler, IndexingStage.DB_UPSERT) as measurement:
+        measurement.add_documents(filtered_documents)
+        ctx = index_doc_batch_prepare(
+            documents=filtered_documents,
+            index_attempt_metadata=index_attempt_metadata,
+            ignore_time_skip=ignore_time_skip,
             db_session=db_session,
         )
-        return IndexingPipelineResult(
-            new_docs=0, total_docs=len(filtered_documents), total_chunks=0
+        if not ctx:
+            # even though we didn't actually index anything, we should still
+            # mark them as "completed" for the CC Pair in order to make the
+            # counts match
+            mark_document_as_indexed_for_cc_pair__no_commit(
+                connector_id=index_attempt_metadata.connector_id,
+                credential_id=index_attempt_metadata.credential_id,
+                document_ids=[doc.id for doc in filtered_documents],
+                db_session=db_session,
+            )
+
+    if not ctx:
+        return ChunkedDocumentBatch(
+            filtered_documents=filtered_documents, ctx=None, chunks=[]
         )
 
     doc_descriptors = [
@@ -390,10 +403,59 @@ def index_doc_batch(
     logger.debug(f"Starting indexing process for documents: {doc_descriptors}")
 
     logger.debug("Starting chunking")
-    chunks: list[DocAwareChunk] = chunker.chunk(ctx.updatable_docs)
+    with profile_stage(profiler, IndexingStage.CHUNKING) as measurement:
+        measurement.add_documents(ctx.updatable_docs)
+        chunks: list[DocAwareChunk] = chunker.chunk(ctx.updatable_docs)
+
+    return ChunkedDocumentBatch(
+        filtered_documents=filtered_documents, ctx=ctx, chunks=chunks
+    )
+
+
+def index_doc_batch_embed(
+    *,
+    chunked_batch: ChunkedDocumentBatch,
+    embedder: IndexingEmbedder,
+    profiler: IndexingProfiler | None = None,
+) -> list[IndexChunk]:
+    """Embeds the chunks of a batch. Does not touch Postgres so it is safe to run
+    outside of the thread that owns the db_session."""
+    if not chunked_batch.chunks:
+        return []
 
     logger.debug("Starting embedding")
-    chunks_with_embeddings = embedder.embed_chunks(chunks) if chunks else []
+    with profile_stage(profiler, IndexingStage.EMBEDDING) as measurement:
+        measurement.add_chunks(chunked_batch.chunks)
+        return embedder.embed_chunks(chunked_batch.chunks)
+
+
+def index_doc_batch_write(
+    *,
+    chunked_batch: ChunkedDocumentBatch,
+    chunks_with_embeddings: list[IndexChunk],
+    document_index: DocumentIndex,
+    index_attempt_metadata: IndexAttemptMetadata,
+    db_session: Session,
+    large_chunks_enabled: bool = False,
+    tenant_id: str | None = None,
+    profiler: IndexingProfiler | None = None,
+) -> IndexingPipelineResult:
+    """Last half of the indexing pipeline: writes the embedded chunks into the document
+    index and marks the documents as indexed in Postgres."""
+    filtered_documents = chunked_batch.filtered_documents
+    ctx = chunked_batch.ctx
+    if not ctx:
+        return IndexingPipelineResult(
+            new_docs=0, total_docs=len(filtered_documents), total_chunks=0
+        )
+
+    no_access = DocumentAccess.build(
+        user_emails=[],
+        user_groups=[],
+        external_user_emails=[],
+        external_user_group_ids=[],
+        is_public=False,
+    )
 
     updatable_ids = [doc.id for doc in ctx.updatable_docs]
 
@@ -401,119 +463,126 @@ def index_doc_batch(
     # NOTE: don't need to acquire till here, since this is when the actual race condition
     # with Vespa can occur.
     with prepare_to_modify_documents(db_session=db_session, document_ids=updatable_ids):
-        doc_id_to_access_info = get_access_for_documents(
-            document_ids=updatable_ids, db_session=db_session
-        )
-        doc_id_to_document_set = {
-            document_id: document_sets
-            for document_id, document_sets in fetch_document_sets_for_documents(
+        # looking up the access info etc. is part of building what gets written
+        with profile_stage(profiler, IndexingStage.INDEX_WRITE) as measurement:
+            doc_id_to_access_info = get_access_for_documents(
                 document_ids=updatable_ids, db_session=db_session
             )
-        }
+            doc_id_to_document_set = {
+                document_id: document_sets
+                for document_id, document_sets in fetch_document_sets_for_documents(
+                    document_ids=updatable_ids, db_session=db_session
+                )
+            }
 
-        doc_id_to_previous_chunk_cnt: dict[str, int | None] = {
-            document_id: chunk_count
-            for document_id, chunk_count in fetch_chunk_counts_for_documents(
-                document_ids=updatable_ids,
-                db_session=db_session,
-            )
-        }
+            doc_id_to_previous_chunk_cnt: dict[str, int | None] = {
+                document_id: chunk_count
+                for document_id, chunk_count in fetch_chunk_counts_for_documents(
+                    document_ids=updatable_ids,
+                    db_session=db_session,
+                )
+            }
+
+            doc_id_to_new_chunk_cnt: dict[str, int] = {
+                document_id: len(
+                    [
+                        chunk
+                        for chunk in chunks_with_embeddings
+                        if chunk.source_document.id == document_id
+                    ]
+                )
+                for document_id in updatable_ids
+            }
+
+            # we're concerned about race conditions where multiple simultaneous indexings might result
+            # in one set of metadata overwriting another one in vespa.
+            # we still write data here for the immediate and most likely correct sync, but
+            # to resolve this, an update of the last modified field at the end of this loop
+            # always triggers a final metadata sync via the celery queue
+            access_aware_chunks = [
+                DocMetadataAwareIndexChunk.from_index_chunk(
+                    index_chunk=chunk,
+                    access=doc_id_to_access_info.get(
+                        chunk.source_document.id, no_access
+                    ),
+                    document_sets=set(
+                        doc_id_to_document_set.get(chunk.source_document.id, [])
+                    ),
+                    boost=(
+                        ctx.id_to_db_doc_map[chunk.source_document.id].boost
+                        if chunk.source_document.id in ctx.id_to_db_doc_map
+                        else DEFAULT_BOOST
+                    ),
+                    tenant_id=tenant_id,
+                )
+                for chunk in chunks_with_embeddings
+            ]
 
-        doc_id_to_new_chunk_cnt: dict[str, int] = {
-            document_id: len(
-                [
-                    chunk
-                    for chunk in chunks_with_embeddings
-                    if chunk.source_document.id == document_id
-                ]
+            logger.debug(
+                "Indexing the following chunks: "
+                f"{[chunk.to_short_descriptor() for chunk in access_aware_chunks]}"
             )
-            for document_id in updatable_ids
-        }
-
-        # we're concerned about race conditions where multiple simultaneous indexings might result
-        # in one set of metadata overwriting another one in vespa.
-        # we still write data here for the immediate and most likely correct sync, but
-        # to resolve this, an update of the last modified field at the end of this loop
-        # always triggers a final metadata sync via the celery queue
-        access_aware_chunks = [
-            DocMetadataAwareIndexChunk.from_index_chunk(
-                index_chunk=chunk,
-                access=doc_id_to_access_info.get(chunk.source_document.id, no_access),
-                document_sets=set(
-                    doc_id_to_document_set.get(chunk.source_document.id, [])
-                ),
-                boost=(
-                    ctx.id_to_db_doc_map[chunk.source_document.id].boost
-                    if chunk.source_document.id in ctx.id_to_db_doc_map
-                    else DEFAULT_BOOST
+            # A document will not be spread across different batches, so all the
+            # documents with chunks in this set, are fully represented by the chunks
+            # in this set
+            insertion_records = document_index.index(
+                chunks=access_aware_chunks,
+                index_batch_params=IndexBatchParams(
+                    doc_id_to_previous_chunk_cnt=doc_id_to_previous_chunk_cnt,
+                    doc_id_to_new_chunk_cnt=doc_id_to_new_chunk_cnt,
+                    tenant_id=tenant_id,
+                    large_chunks_enabled=large_chunks_enabled,
                 ),
-                tenant_id=tenant_id,
             )
-            for chunk in chunks_with_embeddings
-        ]
-
-        logger.debug(
-            "Indexing the following chunks: "
-            f"{[chunk.to_short_descriptor() for chunk in access_aware_chunks]}"
-        )
-        # A document will not be spread across different batches, so all the
-        # documents with chunks in this set, are fully represented by the chunks
-        # in this set
-        insertion_records = document_index.index(
-            chunks=access_aware_chunks,
-            index_batch_params=IndexBatchParams(
-                doc_id_to_previous_chunk_cnt=doc_id_to_previous_chunk_cnt,
-                doc_id_to_new_chunk_cnt=doc_id_to_new_chunk_cnt,
-                tenant_id=tenant_id,
-                large_chunks_enabled=chunker.enable_large_chunks,
-            ),
-        )
 
-        successful_doc_ids = {record.document_id for record in insertion_records}
-        if successful_doc_ids != set(updatable_ids):
-            raise RuntimeError(
-                f"Some documents were not successfully indexed. "
-                f"Updatable IDs: {updatable_ids}, "
-                f"Successful IDs: {successful_doc_ids}"
+            successful_doc_ids = {record.document_id for record in insertion_records}
+            if successful_doc_ids != set(updatable_ids):
+                raise RuntimeError(
+                    f"Some documents were not successfully indexed. "
+                    f"Updatable IDs: {updatable_ids}, "
+                    f"Successful IDs: {successful_doc_ids}"
+                )
+            measurement.add_chunks(access_aware_chunks)
+
+        with profile_stage(profiler, IndexingStage.METADATA_UPDATE) as measurement:
+            measurement.add_documents(ctx.updatable_docs)
+            last_modified_ids = []
+            ids_to_new_updated_at = {}
+            for doc in ctx.updatable_docs:
+                last_modified_ids.append(doc.id)
+                # doc_updated_at is the source's idea (on the other end of the connector)
+                # of when the doc was last modified
+                if doc.doc_updated_at is None:
+                    continue
+                ids_to_new_updated_at[doc.id] = doc.doc_updated_at
+
+            update_docs_updated_at__no_commit(
+                ids_to_new_updated_at=ids_to_new_updated_at, db_session=db_session
             )
 
-        last_modified_ids = []
-        ids_to_new_updated_at = {}
-        for doc in ctx.updatable_docs:
-            last_modified_ids.append(doc.id)
-            # doc_updated_at is the source's idea (on the other end of the connector)
-            # of when the doc was last modified
-            if doc.doc_updated_at is None:
-                continue
-            ids_to_new_updated_at[doc.id] = doc.doc_updated_at
-
-        update_docs_updated_at__no_commit(
-            ids_to_new_updated_at=ids_to_new_updated_at, db_session=db_session
-        )
-
-        update_docs_last_modified__no_commit(
-            document_ids=last_modified_ids, db_session=db_session
-        )
+            update_docs_last_modified__no_commit(
+                document_ids=last_modified_ids, db_session=db_session
+            )
 
-        update_docs_chunk_count__no_commit(
-            document_ids=updatable_ids,
-            doc_id_to_chunk_count=doc_id_to_new_chunk_cnt,
-            db_session=db_session,
-        )
+            update_docs_chunk_count__no_commit(
+                document_ids=updatable_ids,
+                doc_id_to_chunk_count=doc_id_to_new_chunk_cnt,
+                db_session=db_session,
+            )
 
-        # these documents can now be counted as part of the CC Pairs
-        # document count, so we need to mark them as indexed
-        # NOTE: even documents we skipped since they were already up
-        # to date should be counted here in order to maintain parity
-        # between CC Pair and index attempt counts
-        mark_document_as_indexed_for_cc_pair__no_commit(
-            connector_id=index_attempt_metadata.connector_id,
-            credential_id=index_attempt_metadata.credential_id,
-            document_ids=[doc.id for doc in filtered_documents],
-            db_session=db_session,
-        )
+            # these documents can now be counted as part of the CC Pairs
+            # document count, so we need to mark them as indexed
+            # NOTE: even documents we skipped since they were already up
+            # to date should be counted here in order to maintain parity
+            # between CC Pair and index attempt counts
+            mark_document_as_indexed_for_cc_pair__no_commit(
+                connector_id=index_attempt_metadata.connector_id,
+                credential_id=index_attempt_metadata.credential_id,
+                document_ids=[doc.id for doc in filtered_documents],
+                db_session=db_session,
+            )
 
-        db_session.commit()
+            db_session.commit()
 
     result = IndexingPipelineResult(
         new_docs=len([r for r in insertion_records if r.already_existed is False]),
@@ -524,22 +593,62 @@ def index_doc_batch(
     return result
 
 
-def build_indexing_pipeline(
+@log_function_time(debug_only=True)
+def index_doc_batch(
     *,
+    document_batch: list[Document],
+    chunker: Chunker,
     embedder: IndexingEmbedder,
     document_index: DocumentIndex,
+    index_attempt_metadata: IndexAttemptMetadata,
     db_session: Session,
-    chunker: Chunker | None = None,
     ignore_time_skip: bool = False,
-    attempt_id: int | None = None,
     tenant_id: str | None = None,
+    filter_fnc: Callable[[list[Document]], list[Document]] = filter_documents,
+    profiler: IndexingProfiler | None = None,
+) -> IndexingPipelineResult:
+    """Takes different pieces of the indexing pipeline and applies it to a batch of documents
+    Note that the documents should already be batched at this point so that it does not inflate the
+    memory requirements
+
+    Returns a tuple where the first element is the number of new docs and the
+    second element is the number of chunks."""
+    chunked_batch = index_doc_batch_chunk(
+        document_batch=document_batch,
+        chunker=chunker,
+        index_attempt_metadata=index_attempt_metadata,
+        db_session=db_session,
+        ignore_time_skip=ignore_time_skip,
+        filter_fnc=filter_fnc,
+        profiler=profiler,
+    )
+
+    chunks_with_embeddings = index_doc_batch_embed(
+        chunked_batch=chunked_batch, embedder=embedder, profiler=profiler
+    )
+
+    return index_doc_batch_write(
+        chunked_batch=chunked_batch,
+        chunks_with_embeddings=chunks_with_embeddings,
+        document_index=document_index,
+        index_attempt_metadata=index_attempt_metadata,
+        db_session=db_session,
+        large_chunks_enabled=chunker.enable_large_chunks,
+        tenant_id=tenant_id,
+        profiler=profiler,
+    )
+
+
+def build_chunker(
+    *,
+    embedder: IndexingEmbedder,
+    db_session: Session,
     callback: IndexingHeartbeatInterface | None = None,
-) -> IndexingPipelineProtocol:
-    """Builds a pipeline which takes in a list (batch) of docs and indexes them."""
+) -> Chunker:
     search_settings = get_current_search_settings(db_session)
     multipass_config = get_multipass_config(search_settings)
 
-    chunker = chunker or Chunker(
+    return Chunker(
         tokenizer=embedder.embedding_model.tokenizer,
         enable_multipass=multipass_config.multipass_indexing,
         enable_large_chunks=multipass_config.enable_large_chunks,
@@ -547,6 +656,24 @@ def build_indexing_pipeline(
         callback=callback,
     )
 
+
+def build_indexing_pipeline(
+    *,
+    embedder: IndexingEmbedder,
+    document_index: DocumentIndex,
+    db_session: Session,
+    chunker: Chunker | None = None,
+    ignore_time_skip: bool = False,
+    attempt_id: int | None = None,
+    tenant_id: str | None = None,
+    callback: IndexingHeartbeatInterface | None = None,
+    profiler: IndexingProfiler | None = None,
+) -> IndexingPipelineProtocol:
+    """Builds a pipeline which takes in a list (batch) of docs and indexes them."""
+    chunker = chunker or build_chunker(
+        embedder=embedder, db_session=db_session, callback=callback
+    )
+
     return partial(
         index_doc_batch_with_handler,
         chunker=chunker,
@@ -556,4 +683,5 @@ def build_indexing_pipeline(
         attempt_id=attempt_id,
         db_session=db_session,
         tenant_id=tenant_id,
+        profiler=profiler,
     )
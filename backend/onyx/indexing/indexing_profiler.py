@@ -0,0 +1,185 @@
+import threading
+import time
+from collections.abc import Iterator
+from collections.abc import Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass
+from enum import Enum
+from typing import TypeVar
+
+from pydantic import BaseModel
+
+from onyx.connectors.models import Document
+from onyx.indexing.models import DocAwareChunk
+
+T = TypeVar("T")
+
+
+class IndexingStage(str, Enum):
+    CONNECTOR_FETCH = "connector_fetch"
+    DOC_CLEANUP = "doc_cleanup"
+    DOC_FILTER = "doc_filter"
+    DB_UPSERT = "db_upsert"
+    CHUNKING = "chunking"
+    EMBEDDING = "embedding"
+    INDEX_WRITE = "index_write"
+    METADATA_UPDATE = "metadata_update"
+
+
+class StageProfile(BaseModel):
+    # time spent in the stage, summed over all batches
+    wall_time_seconds: float = 0.0
+    # CPU time of the thread(s) running the stage, a stage which is mostly waiting on
+    # the network (e.g. embedding via the model server) has a much lower CPU time
+    cpu_time_seconds: float = 0.0
+    # number of times the stage ran, usually once per batch
+    calls: int = 0
+    # documents, or chunks for the stages that work on chunks
+    items: int = 0
+    # size of the text handled by the stage
+    bytes: int = 0
+
+
+class IndexingProfile(BaseModel):
+    """Per stage timings of an index attempt, stored with the attempt."""
+
+    stages: dict[IndexingStage, StageProfile]
+    wall_time_seconds: float
+
+    @property
+    def slowest_stage(self) -> IndexingStage | None:
+        if not any(stage.calls for stage in self.stages.values()):
+            return None
+        return max(self.stages, key=lambda stage: self.stages[stage].wall_time_seconds)
+
+
+def _text_size(text: str) -> int:
+    return len(text.encode("utf-8", errors="replace"))
+
+
+@dataclass
+class StageMeasurement:
+    """Handed out while a stage runs so the item / byte counts can be filled in once
+    they are known. Counting is skipped entirely if profiling is disabled."""
+
+    enabled: bool = True
+    items: int = 0
+    bytes: int = 0
+
+    def add_documents(self, documents: list[Document]) -> None:
+        if not self.enabled:
+            return
+        self.items += len(documents)
+        self.bytes += sum(
+            _text_size(section.text)
+            for document in documents
+            for section in document.sections
+        )
+
+    def add_chunks(self, chunks: Sequence[DocAwareChunk]) -> None:
+        if not self.enabled:
+            return
+        self.items += len(chunks)
+        self.bytes += sum(_text_size(chunk.content) for chunk in chunks)
+
+
+class IndexingProfiler:
+    """Accumulates how much time each stage of the indexing pipeline takes over a
+    whole index attempt. Safe to share between the threads of the pipelined indexer,
+    CPU time is measured per thread so stages running concurrently are not mixed up."""
+
+    def __init__(self) -> None:
+        self._stages: dict[IndexingStage, StageProfile] = {
+            stage: StageProfile() for stage in IndexingStage
+        }
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+
+    @contextmanager
+    def measure(self, stage: IndexingStage) -> Iterator[StageMeasurement]:
+        measurement = StageMeasurement()
+        wall_start = time.monotonic()
+        cpu_start = time.thread_time()
+        try:
+            yield measurement
+        finally:
+            self.record(
+                stage,
+                wall_time=time.monotonic() - wall_start,
+                cpu_time=time.thread_time() - cpu_start,
+                items=measurement.items,
+                num_bytes=measurement.bytes,
+            )
+
+    def record(
+        self,
+        stage: IndexingStage,
+        wall_time: float,
+        cpu_time: float,
+        items: int = 0,
+        num_bytes: int = 0,
+    ) -> None:
+        with self._lock:
+            stage_profile = self._stages[stage]
+            stage_profile.wall_time_seconds += wall_time
+            stage_profile.cpu_time_seconds += cpu_time
+            stage_profile.calls += 1
+            stage_profile.items += items
+            stage_profile.bytes += num_bytes
+
+    def profile_document_batches(
+        self, batches: Iterator[tuple[list[Document], T]]
+    ) -> Iterator[tuple[list[Document], T]]:
+        """Attributes the time spent producing each batch to the connector fetch stage.
+        Wrap the connector output before handing it to another thread so the time is
+        measured in the thread actually running the connector."""
+        while True:
+            wall_start = time.monotonic()
+            cpu_start = time.thread_time()
+            try:
+                batch = next(batches)
+            except StopIteration:
+                return
+
+            measurement = StageMeasurement()
+            measurement.add_documents(batch[0])
+            self.record(
+                IndexingStage.CONNECTOR_FETCH,
+                wall_time=time.monotonic() - wall_start,
+                cpu_time=time.thread_time() - cpu_start,
+                items=measurement.items,
+                num_bytes=measurement.bytes,
+            )
+            yield batch
+
+    def get_profile(self) -> IndexingProfile:
+        with self._lock:
+            return IndexingProfile(
+                stages={
+                    stage: stage_profile.model_copy()
+                    for stage, stage_profile in self._stages.items()
+                },
+                wall_time_seconds=time.monotonic() - self._start,
+            )
+
+    def summary(self) -> str:
+        profile = self.get_profile()
+        return " ".join(
+            f"{stage.value}={stage_profile.wall_time_seconds:.2f}s"
+            f"/cpu={stage_profile.cpu_time_seconds:.2f}s"
+            f"/items={stage_profile.items}"
+            for stage, stage_profile in profile.stages.items()
+        )
+
+
+@contextmanager
+def profile_stage(
+    profiler: IndexingProfiler | None, stage: IndexingStage
+) -> Iterator[StageMeasurement]:
+    """`IndexingProfiler.measure` which does nothing if no profiler is given."""
+    if profiler is None:
+        yield StageMeasurement(enabled=False)
+        return
+
+    with profiler.measure(stage) as measurement:
+        yield measurement
@@ -0,0 +1,277 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from dataclasses import dataclass
+
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from onyx.connectors.models import Document
+from onyx.connectors.models import IndexAttemptMetadata
+from onyx.document_index.interfaces import DocumentIndex
+from onyx.indexing.chunker import Chunker
+from onyx.indexing.embedder import IndexingEmbedder
+from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
+from onyx.indexing.indexing_pipeline import build_chunker
+from onyx.indexing.indexing_pipeline import ChunkedDocumentBatch
+from onyx.indexing.indexing_pipeline import handle_index_batch_exception
+from onyx.indexing.indexing_pipeline import index_doc_batch_chunk
+from onyx.indexing.indexing_pipeline import index_doc_batch_embed
+from onyx.indexing.indexing_pipeline import index_doc_batch_write
+from onyx.indexing.indexing_pipeline import IndexingPipelineResult
+from onyx.indexing.indexing_profiler import IndexingProfiler
+from onyx.indexing.models import IndexChunk
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+
+class PipelineStageStats(BaseModel):
+    stage: str
+    seconds: float = 0.0
+    batches: int = 0
+
+
+@dataclass
+class _PendingBatch:
+    document_batch: list[Document]
+    batch_num: int
+    # None if the batch already failed before reaching the embedding stage
+    chunked_batch: ChunkedDocumentBatch | None
+    embedding_future: Future[list[IndexChunk]] | None
+
+
+class ThreadSafeHeartbeat(IndexingHeartbeatInterface):
+    """Serializes calls into a heartbeat which is shared between the pipeline threads."""
+
+    def __init__(self, callback: IndexingHeartbeatInterface):
+        self._callback = callback
+        self._lock = threading.Lock()
+
+    def should_stop(self) -> bool:
+        with self._lock:
+            return self._callback.should_stop()
+
+    def progress(self, tag: str, amount: int) -> None:
+        with self._lock:
+            self._callback.progress(tag, amount)
+
+
+class PipelinedIndexer:
+    """Runs the indexing pipeline with consecutive batches overlapping each other.
+
+    Chunking (which needs the db_session) and the final write to the document index and
+    Postgres happen in the calling thread. Embedding runs in a single background thread,
+    so while batch N is being embedded, batch N + 1 is chunked and batch N - 1 is written.
+    At most `max_pending_batches` chunked batches wait on / in the embedding stage, after
+    which `submit` blocks on the oldest one (backpressure).
+
+    Batches are always written in the order they were submitted. Failures are handled per
+    batch with the same semantics as `index_doc_batch_with_handler`."""
+
+    def __init__(
+        self,
+        *,
+        chunker: Chunker,
+        embedder: IndexingEmbedder,
+        document_index: DocumentIndex,
+        index_attempt_metadata: IndexAttemptMetadata,
+        db_session: Session,
+        attempt_id: int | None,
+        max_pending_batches: int,
+        ignore_time_skip: bool = False,
+        tenant_id: str | None = None,
+        profiler: IndexingProfiler | None = None,
+    ):
+        self.chunker = chunker
+        self.embedder = embedder
+        self.document_index = document_index
+        self.index_attempt_metadata = index_attempt_metadata
+        self.db_session = db_session
+        self.attempt_id = attempt_id
+        self.max_pending_batches = max(1, max_pending_batches)
+        self.ignore_time_skip = ignore_time_skip
+        self.tenant_id = tenant_id
+        self.profiler = profiler
+
+        self.stage_stats: dict[str, PipelineStageStats] = {
+            stage: PipelineStageStats(stage=stage)
+            for stage in ("chunk", "embed", "embed_wait", "write")
+        }
+        self._stats_lock = threading.Lock()
+        self._pending: deque[_PendingBatch] = deque()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="indexing_embed"
+        )
+
+    def _record(self, stage: str, start: float) -> None:
+        with self._stats_lock:
+            stats = self.stage_stats[stage]
+            stats.seconds += time.monotonic() - start
+            stats.batches += 1
+
+    def _embed(self, chunked_batch: ChunkedDocumentBatch) -> list[IndexChunk]:
+        start = time.monotonic()
+        try:
+            return index_doc_batch_embed(
+                chunked_batch=chunked_batch,
+                embedder=self.embedder,
+                profiler=self.profiler,
+            )
+        finally:
+            self._record("embed", start)
+
+    def _finish_oldest(self) -> IndexingPipelineResult:
+        pending = self._pending.popleft()
+        self.index_attempt_metadata.batch_num = pending.batch_num
+
+        result = IndexingPipelineResult(
+            new_docs=0, total_docs=len(pending.document_batch), total_chunks=0
+        )
+        if pending.chunked_batch is None or pending.embedding_future is None:
+            result.failed = True
+            return result
+
+        try:
+            start = time.monotonic()
+            chunks_with_embeddings = pending.embedding_future.result()
+            self._record("embed_wait", start)
+
+            start = time.monotonic()
+            result = index_doc_batch_write(
+                chunked_batch=pending.chunked_batch,
+                chunks_with_embeddings=chunks_with_embeddings,
+                document_index=self.document_index,
+                index_attempt_metadata=self.index_attempt_metadata,
+                db_session=self.db_session,
+                large_chunks_enabled=self.chunker.enable_large_chunks,
+                tenant_id=self.tenant_id,
+                profiler=self.profiler,
+            )
+            self._record("write", start)
+        except Exception as e:
+            handle_index_batch_exception(
+                e,
+                document_batch=pending.document_batch,
+                index_attempt_metadata=self.index_attempt_metadata,
+                attempt_id=self.attempt_id,
+                db_session=self.db_session,
+            )
+            result.failed = True
+
+        return result
+
+    def submit(
+        self, document_batch: list[Document], batch_num: int
+    ) -> list[IndexingPipelineResult]:
+        """Chunks the batch and queues it for embedding. Returns the results of any
+        previously submitted batches which were completed to make room for it, always
+        in the order the batches were submitted."""
+        self.index_attempt_metadata.batch_num = batch_num
+        try:
+            start = time.monotonic()
+            chunked_batch = index_doc_batch_chunk(
+                document_batch=document_batch,
+                chunker=self.chunker,
+                index_attempt_metadata=self.index_attempt_metadata,
+                db_session=self.db_session,
+                ignore_time_skip=self.ignore_time_skip,
+                profiler=self.profiler,
+            )
+            self._record("chunk", start)
+        except Exception as e:
+            handle_index_batch_exception(
+                e,
+                document_batch=document_batch,
+                index_attempt_metadata=self.index_attempt_metadata,
+                attempt_id=self.attempt_id,
+                db_session=self.db_session,
+            )
+            # still queued so that results are returned in submission order
+            self._pending.append(
+                _PendingBatch(
+                    document_batch=document_batch,
+                    batch_num=batch_num,
+                    chunked_batch=None,
+                    embedding_future=None,
+                )
+            )
+        else:
+            # the embedder may read context vars (e.g. the tenant id) so carry them over
+            embedding_future = self._executor.submit(
+                copy_context().run, self._embed, chunked_batch
+            )
+            self._pending.append(
+                _PendingBatch(
+                    document_batch=document_batch,
+                    batch_num=batch_num,
+                    chunked_batch=chunked_batch,
+                    embedding_future=embedding_future,
+                )
+            )
+
+        results: list[IndexingPipelineResult] = []
+        while len(self._pending) > self.max_pending_batches:
+            results.append(self._finish_oldest())
+        return results
+
+    def drain(self) -> list[IndexingPipelineResult]:
+        """Completes all submitted batches, in order."""
+        results: list[IndexingPipelineResult] = []
+        while self._pending:
+            results.append(self._finish_oldest())
+        return results
+
+    def shutdown(self) -> None:
+        """Drops any batches which were not completed. Does not wait for an in flight
+        embedding call to return."""
+        for pending in self._pending:
+            if pending.embedding_future:
+                pending.embedding_future.cancel()
+        self._pending.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def log_stage_stats(self, fetch_timings: dict[str, float] | None = None) -> None:
+        stage_strs = [
+            f"{stats.stage}={stats.seconds:.2f}s/{stats.batches}"
+            for stats in self.stage_stats.values()
+        ]
+        if fetch_timings:
+            stage_strs = [
+                f"fetch={fetch_timings.get('produce', 0.0):.2f}s",
+                f"fetch_wait={fetch_timings.get('wait', 0.0):.2f}s",
+            ] + stage_strs
+        logger.info(f"Pipelined indexing stage timings: {' '.join(stage_strs)}")
+
+
+def build_pipelined_indexer(
+    *,
+    embedder: IndexingEmbedder,
+    document_index: DocumentIndex,
+    index_attempt_metadata: IndexAttemptMetadata,
+    db_session: Session,
+    max_pending_batches: int,
+    ignore_time_skip: bool = False,
+    attempt_id: int | None = None,
+    tenant_id: str | None = None,
+    callback: IndexingHeartbeatInterface | None = None,
+    profiler: IndexingProfiler | None = None,
+) -> PipelinedIndexer:
+    """Pipelined counterpart of `build_indexing_pipeline`."""
+    return PipelinedIndexer(
+        chunker=build_chunker(
+            embedder=embedder, db_session=db_session, callback=callback
+        ),
+        embedder=embedder,
+        document_index=document_index,
+        index_attempt_metadata=index_attempt_metadata,
+        db_session=db_session,
+        attempt_id=attempt_id,
+        max_pending_batches=max_pending_batches,
+        ignore_time_skip=ignore_time_skip,
+        tenant_id=tenant_id,
+        profiler=profiler,
+    )
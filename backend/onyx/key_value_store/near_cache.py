@@ -0,0 +1,129 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+from redis.client import Redis
+
+from onyx.configs.app_configs import KV_STORE_NEAR_CACHE_MAX_ENTRIES
+from onyx.configs.app_configs import KV_STORE_NEAR_CACHE_TTL_SECONDS
+from onyx.redis.redis_invalidation import RedisInvalidationSubscriber
+from onyx.redis.redis_pool import get_redis_client
+from onyx.utils.logger import setup_logger
+from onyx.utils.special_types import JSON_ro
+
+logger = setup_logger()
+
+# not prefixed with a tenant, the messages name the tenant
+KV_STORE_INVALIDATION_CHANNEL = "onyx_kv_store_invalidation"
+
+# tenant id, key
+NearCacheKey = tuple[str, str]
+
+
+class KVNearCache:
+    """In memory cache of the values of the key value store of this process.
+
+    Processes publish the keys they change to KV_STORE_INVALIDATION_CHANNEL, and a
+    background thread of every process drops these keys from its cache. Values are
+    only served while that thread is subscribed, the cache is emptied whenever the
+    subscription is lost. Entries also expire after `ttl_seconds` in case a message
+    is lost anyway."""
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        max_entries: int,
+        redis_client_factory: Callable[[], Redis],
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._reset()
+        self._subscriber = RedisInvalidationSubscriber(
+            channel=KV_STORE_INVALIDATION_CHANNEL,
+            redis_client_factory=redis_client_factory,
+            on_message=self._on_message,
+            on_subscription_change=self._set_subscribed,
+            on_fork=self._reset,
+        )
+
+    def _reset(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[NearCacheKey, tuple[float, Any]] = OrderedDict()
+        # changes whenever entries may have become stale, values loaded before a
+        # change are not added
+        self._version = 0
+        self._subscribed = False
+
+    def _on_message(self, message: dict[str, Any]) -> None:
+        self.invalidate(message["tenant_id"], message["key"])
+
+    def _set_subscribed(self, subscribed: bool) -> None:
+        with self._lock:
+            self._subscribed = subscribed
+            self._entries.clear()
+            self._version += 1
+
+    def version(self) -> int:
+        """To be passed to `put` for a value loaded after calling this"""
+        self._subscriber.ensure_started()
+        return self._version
+
+    def get(self, tenant_id: str, key: str) -> tuple[bool, JSON_ro]:
+        """Whether the key is cached and its value. Containers are copied, so callers
+        can modify them."""
+        self._subscriber.ensure_started()
+        with self._lock:
+            entry = self._entries.get((tenant_id, key))
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[(tenant_id, key)]
+                return False, None
+            self._entries.move_to_end((tenant_id, key))
+
+        if isinstance(value, (dict, list)):
+            return True, copy.deepcopy(value)
+        return True, value
+
+    def put(self, tenant_id: str, key: str, value: JSON_ro, version: int) -> None:
+        with self._lock:
+            if not self._subscribed or version != self._version:
+                return
+            self._entries[(tenant_id, key)] = (
+                time.monotonic() + self.ttl_seconds,
+                copy.deepcopy(value),
+            )
+            self._entries.move_to_end((tenant_id, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, tenant_id: str, key: str) -> None:
+        with self._lock:
+            self._entries.pop((tenant_id, key), None)
+            self._version += 1
+
+    def publish_invalidation(
+        self, redis_client: Redis, tenant_id: str, key: str
+    ) -> None:
+        """Drops the key from the cache of this and all other processes"""
+        self.invalidate(tenant_id, key)
+        self._subscriber.publish(redis_client, {"tenant_id": tenant_id, "key": key})
+
+
+_KV_NEAR_CACHE = (
+    KVNearCache(
+        ttl_seconds=KV_STORE_NEAR_CACHE_TTL_SECONDS,
+        max_entries=KV_STORE_NEAR_CACHE_MAX_ENTRIES,
+        redis_client_factory=lambda: get_redis_client(tenant_id=None),
+    )
+    if KV_STORE_NEAR_CACHE_TTL_SECONDS > 0
+    else None
+)
+
+
+def get_kv_near_cache() -> KVNearCache | None:
+    return _KV_NEAR_CACHE
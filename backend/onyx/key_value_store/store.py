@@ -13,6 +13,8 @@ from onyx.db.engine import is_valid_schema_name
 from onyx.db.models import KVStore
 from onyx.key_value_store.interface import KeyValueStore
 from onyx.key_value_store.interface import KvKeyNotFoundError
+from onyx.key_value_store.near_cache import get_kv_near_cache
+from onyx.key_value_store.near_cache import KVNearCache
 from onyx.redis.redis_pool import get_redis_client
 from onyx.utils.logger import setup_logger
 from onyx.utils.special_types import JSON_ro
@@ -28,7 +30,11 @@ KV_REDIS_KEY_EXPIRATION = 60 * 60 * 24  # 1 Day
 
 
 class PgRedisKVStore(KeyValueStore):
-    def __init__(self, redis_client: Redis | None = None) -> None:
+    def __init__(
+        self,
+        redis_client: Redis | None = None,
+        near_cache: KVNearCache | None = None,
+    ) -> None:
         self.tenant_id = get_current_tenant_id()
 
         # If no redis_client is provided, fall back to the context var
@@ -37,6 +43,9 @@ class PgRedisKVStore(KeyValueStore):
         else:
             self.redis_client = get_redis_client(tenant_id=self.tenant_id)
 
+        # values are cached in memory of this process unless disabled
+        self.near_cache = near_cache or get_kv_near_cache()
+
     @contextmanager
     def _get_session(self) -> Iterator[Session]:
         engine = get_sqlalchemy_engine()
@@ -77,7 +86,23 @@ class PgRedisKVStore(KeyValueStore):
                 session.add(obj)
             session.commit()
 
+        if self.near_cache:
+            self.near_cache.publish_invalidation(self.redis_client, self.tenant_id, key)
+
     def load(self, key: str) -> JSON_ro:
+        if not self.near_cache:
+            return self._load(key)
+
+        found, value = self.near_cache.get(self.tenant_id, key)
+        if found:
+            return value
+
+        version = self.near_cache.version()
+        value = self._load(key)
+        self.near_cache.put(self.tenant_id, key, value, version)
+        return value
+
+    def _load(self, key: str) -> JSON_ro:
         try:
             redis_value = self.redis_client.get(REDIS_KEY_PREFIX + key)
             if redis_value:
@@ -116,3 +141,6 @@ class PgRedisKVStore(KeyValueStore):
             if result == 0:
                 raise KvKeyNotFoundError
             session.commit()
+
+        if self.near_cache:
+            self.near_cache.publish_invalidation(self.redis_client, self.tenant_id, key)
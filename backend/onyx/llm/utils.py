@@ -1,7 +1,8 @@
-import copy
 import json
 from collections.abc import Callable
 from collections.abc import Iterator
+from collections.abc import Mapping
+from types import MappingProxyType
 from typing import Any
 from typing import cast
 
@@ -350,9 +351,49 @@ def test_llm(llm: LLM) -> str | None:
     return error_msg
 
 
-def get_model_map() -> dict:
-    starting_map = copy.deepcopy(cast(dict, litellm.model_cost))
+class ModelCapabilityIndex:
+    """Read only snapshot of `litellm.model_cost` with memoized model lookups.
 
+    Resolving a (provider, model name) pair goes through the fallbacks of
+    `_find_model_obj` once, afterwards it is a dict lookup."""
+
+    def __init__(self, model_map: Mapping[str, Any]) -> None:
+        self.model_map: Mapping[str, Mapping[str, Any]] = MappingProxyType(
+            {
+                name: MappingProxyType(dict(model_obj))
+                for name, model_obj in model_map.items()
+            }
+        )
+        self._resolved: dict[tuple[str, str], Mapping[str, Any] | None] = {}
+
+    def find(self, provider: str, model_name: str) -> Mapping[str, Any] | None:
+        key = (provider.strip(), model_name.strip())
+        try:
+            return self._resolved[key]
+        except KeyError:
+            model_obj = _find_model_obj(self.model_map, *key)
+            self._resolved[key] = model_obj
+            return model_obj
+
+
+_MODEL_CAPABILITY_INDEX: ModelCapabilityIndex | None = None
+
+
+def get_model_capability_index() -> ModelCapabilityIndex:
+    global _MODEL_CAPABILITY_INDEX
+
+    if _MODEL_CAPABILITY_INDEX is None:
+        _MODEL_CAPABILITY_INDEX = ModelCapabilityIndex(cast(dict, litellm.model_cost))
+    return _MODEL_CAPABILITY_INDEX
+
+
+def refresh_model_capability_index() -> None:
+    """Rebuilds the index on the next lookup, e.g. after the LLM providers changed."""
+    global _MODEL_CAPABILITY_INDEX
+    _MODEL_CAPABILITY_INDEX = None
+
+
+def get_model_map() -> Mapping[str, Mapping[str, Any]]:
     # NOTE: we could add additional models here in the future,
     # but for now there is no point. Ollama allows the user to
     # to specify their desired max context window, and it's
@@ -372,7 +413,17 @@ def get_model_map() -> dict:
     #         "max_output_tokens": 128000,
     #     }
 
-    return starting_map
+    # read only, built once per process instead of copying the litellm map per call
+    return get_model_capability_index().model_map
+
+
+def _lookup_model_obj(
+    model_map: Mapping[str, Any], provider: str, model_name: str
+) -> Mapping[str, Any] | None:
+    index = get_model_capability_index()
+    if model_map is index.model_map:
+        return index.find(provider, model_name)
+    return _find_model_obj(model_map, provider, model_name)
 
 
 def _strip_extra_provider_from_model_name(model_name: str) -> str:
@@ -383,7 +434,9 @@ def _strip_colon_from_model_name(model_name: str) -> str:
     return ":".join(model_name.split(":")[:-1]) if ":" in model_name else model_name
 
 
-def _find_model_obj(model_map: dict, provider: str, model_name: str) -> dict | None:
+def _find_model_obj(
+    model_map: Mapping[str, Any], provider: str, model_name: str
+) -> Mapping[str, Any] | None:
     stripped_model_name = _strip_extra_provider_from_model_name(model_name)
 
     model_names = [
@@ -417,7 +470,7 @@ def _find_model_obj(model_map: dict, provider: str, model_name: str) -> dict | N
 
 
 def get_llm_max_tokens(
-    model_map: dict,
+    model_map: Mapping[str, Any],
     model_name: str,
     model_provider: str,
 ) -> int:
@@ -428,7 +481,7 @@ def get_llm_max_tokens(
         return GEN_AI_MAX_TOKENS
 
     try:
-        model_obj = _find_model_obj(
+        model_obj = _lookup_model_obj(
             model_map,
             model_provider,
             model_name,
@@ -460,7 +513,7 @@ def get_llm_max_tokens(
 
 
 def get_llm_max_output_tokens(
-    model_map: dict,
+    model_map: Mapping[str, Any],
     model_name: str,
     model_provider: str,
 ) -> int:
@@ -526,13 +579,8 @@ def get_max_input_tokens(
 
 
 def model_supports_image_input(model_name: str, model_provider: str) -> bool:
-    model_map = get_model_map()
     try:
-        model_obj = _find_model_obj(
-            model_map,
-            model_provider,
-            model_name,
-        )
+        model_obj = get_model_capability_index().find(model_provider, model_name)
         if not model_obj:
             raise RuntimeError(
                 f"No litellm entry found for {model_provider}/{model_name}"
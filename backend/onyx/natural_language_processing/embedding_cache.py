@@ -0,0 +1,266 @@
+import hashlib
+import threading
+import time
+from abc import ABC
+from abc import abstractmethod
+from array import array
+from collections import OrderedDict
+from typing import cast
+
+from prometheus_client import Counter
+
+from onyx.configs.app_configs import QUERY_EMBEDDING_CACHE_SIZE
+from onyx.configs.app_configs import QUERY_EMBEDDING_CACHE_TTL_SECONDS
+from onyx.configs.app_configs import QUERY_EMBEDDING_CACHE_USE_REDIS
+from onyx.db.embedding_cache import fetch_cached_embeddings
+from onyx.db.embedding_cache import upsert_cached_embeddings
+from onyx.db.engine import get_session_with_tenant
+from onyx.redis.redis_pool import get_redis_client
+from onyx.utils.logger import setup_logger
+from shared_configs.contextvars import get_current_tenant_id
+from shared_configs.enums import EmbeddingProvider
+from shared_configs.enums import EmbedTextType
+from shared_configs.model_server_models import Embedding
+
+logger = setup_logger()
+
+_QUERY_EMBEDDING_REDIS_PREFIX = "query_embedding:"
+
+query_embedding_cache_lookups = Counter(
+    "onyx_query_embedding_cache_lookups",
+    "Lookups of query embeddings, served from process memory, Redis or a miss",
+    ["result"],
+)
+
+
+def pack_embedding(embedding: Embedding) -> bytes:
+    # float32 is what the document index stores anyway
+    return array("f", embedding).tobytes()
+
+
+def unpack_embedding(packed: bytes) -> Embedding:
+    values = array("f")
+    values.frombytes(packed)
+    return values.tolist()
+
+
+def build_embedding_cache_key(
+    *,
+    model_name: str | None,
+    provider_type: EmbeddingProvider | None,
+    normalize: bool,
+    prefix: str | None,
+    text_type: EmbedTextType,
+    max_seq_length: int,
+    text: str,
+    api_url: str | None = None,
+    deployment_name: str | None = None,
+) -> str:
+    """Hash of everything which determines the embedding the model server returns."""
+    hasher = hashlib.sha256()
+    parts = [
+        model_name or "",
+        provider_type.value if provider_type else "",
+        str(normalize),
+        prefix or "",
+        text_type.value,
+        str(max_seq_length),
+    ]
+    # only part of the key when set so that keys of other models stay stable
+    if api_url or deployment_name:
+        parts.extend([api_url or "", deployment_name or ""])
+    for part in parts:
+        hasher.update(part.encode("utf-8"))
+        # separator which cannot appear in the encoded parts
+        hasher.update(b"\x00")
+    hasher.update(text.encode("utf-8", errors="surrogatepass"))
+    return hasher.hexdigest()
+
+
+class EmbeddingCacheInterface(ABC):
+    """Cache of embeddings by the keys built with `build_embedding_cache_key`"""
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    @abstractmethod
+    def get(self, cache_keys: list[str]) -> dict[str, Embedding]:
+        """Returns the embeddings of the keys which are present, keys may repeat"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def put(self, model_name: str, key_to_embedding: dict[str, Embedding]) -> None:
+        raise NotImplementedError
+
+
+class EmbeddingCache(EmbeddingCacheInterface):
+    """Postgres backed embedding cache shared by all indexing workers of a tenant.
+    The table is bounded by a periodic beat task (see `evict_embedding_cache_task`).
+
+    Failures to read or write the cache are logged and otherwise ignored, the model
+    server is always the fallback."""
+
+    def get(self, cache_keys: list[str]) -> dict[str, Embedding]:
+        try:
+            with get_session_with_tenant(get_current_tenant_id()) as db_session:
+                packed = fetch_cached_embeddings(db_session, list(set(cache_keys)))
+        except Exception:
+            logger.exception("Failed to read from the embedding cache")
+            packed = {}
+
+        hits = {key: unpack_embedding(value) for key, value in packed.items()}
+        self.hits += sum(1 for key in cache_keys if key in hits)
+        self.misses += sum(1 for key in cache_keys if key not in hits)
+        return hits
+
+    def put(self, model_name: str, key_to_embedding: dict[str, Embedding]) -> None:
+        if not key_to_embedding:
+            return
+
+        try:
+            with get_session_with_tenant(get_current_tenant_id()) as db_session:
+                upsert_cached_embeddings(
+                    db_session,
+                    model_name=model_name,
+                    key_to_embedding={
+                        key: pack_embedding(embedding)
+                        for key, embedding in key_to_embedding.items()
+                    },
+                )
+        except Exception:
+            logger.exception("Failed to write to the embedding cache")
+
+
+class QueryEmbeddingCache(EmbeddingCacheInterface):
+    """Short lived cache for query embeddings, meant to be shared by the whole process.
+
+    Entries live in a bounded in memory LRU for `ttl_seconds`. Optionally they are also
+    written to Redis (with the same TTL) so that other api server processes and workers
+    benefit from them. Redis failures are logged and otherwise ignored."""
+
+    def __init__(
+        self,
+        max_entries: int = QUERY_EMBEDDING_CACHE_SIZE,
+        ttl_seconds: int = QUERY_EMBEDDING_CACHE_TTL_SECONDS,
+        use_redis: bool = QUERY_EMBEDDING_CACHE_USE_REDIS,
+    ) -> None:
+        super().__init__()
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.use_redis = use_redis
+        self.redis_hits = 0
+
+        # (tenant id, cache key) -> (expiry time, embedding), least recently used first
+        self._entries: OrderedDict[
+            tuple[str, str], tuple[float, Embedding]
+        ] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_local(self, tenant_id: str, cache_keys: set[str]) -> dict[str, Embedding]:
+        now = time.monotonic()
+        hits: dict[str, Embedding] = {}
+        with self._lock:
+            for cache_key in cache_keys:
+                entry = self._entries.get((tenant_id, cache_key))
+                if entry is None:
+                    continue
+                expires_at, embedding = entry
+                if expires_at < now:
+                    del self._entries[(tenant_id, cache_key)]
+                    continue
+                self._entries.move_to_end((tenant_id, cache_key))
+                hits[cache_key] = embedding
+        return hits
+
+    def _put_local(
+        self, tenant_id: str, key_to_embedding: dict[str, Embedding]
+    ) -> None:
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            for cache_key, embedding in key_to_embedding.items():
+                self._entries[(tenant_id, cache_key)] = (expires_at, embedding)
+                self._entries.move_to_end((tenant_id, cache_key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _get_redis(self, tenant_id: str, cache_keys: set[str]) -> dict[str, Embedding]:
+        hits: dict[str, Embedding] = {}
+        try:
+            redis_client = get_redis_client(tenant_id=tenant_id)
+            for cache_key in cache_keys:
+                packed = cast(
+                    bytes | None,
+                    redis_client.get(_QUERY_EMBEDDING_REDIS_PREFIX + cache_key),
+                )
+                if packed is not None:
+                    hits[cache_key] = unpack_embedding(packed)
+        except Exception:
+            logger.exception("Failed to read from the query embedding cache in Redis")
+        return hits
+
+    def _put_redis(
+        self, tenant_id: str, key_to_embedding: dict[str, Embedding]
+    ) -> None:
+        try:
+            redis_client = get_redis_client(tenant_id=tenant_id)
+            for cache_key, embedding in key_to_embedding.items():
+                redis_client.set(
+                    _QUERY_EMBEDDING_REDIS_PREFIX + cache_key,
+                    pack_embedding(embedding),
+                    ex=self.ttl_seconds,
+                )
+        except Exception:
+            logger.exception("Failed to write to the query embedding cache in Redis")
+
+    def get(self, cache_keys: list[str]) -> dict[str, Embedding]:
+        tenant_id = get_current_tenant_id()
+        unique_keys = set(cache_keys)
+
+        hits = self._get_local(tenant_id, unique_keys)
+        redis_hits: dict[str, Embedding] = {}
+        if self.use_redis and len(hits) < len(unique_keys):
+            redis_hits = self._get_redis(tenant_id, unique_keys - hits.keys())
+            if redis_hits:
+                self._put_local(tenant_id, redis_hits)
+                self.redis_hits += len(redis_hits)
+                hits.update(redis_hits)
+
+        num_hits = sum(1 for key in cache_keys if key in hits)
+        num_redis_hits = sum(1 for key in cache_keys if key in redis_hits)
+        self.hits += num_hits
+        self.misses += len(cache_keys) - num_hits
+        query_embedding_cache_lookups.labels(result="hit").inc(
+            num_hits - num_redis_hits
+        )
+        query_embedding_cache_lookups.labels(result="redis_hit").inc(num_redis_hits)
+        query_embedding_cache_lookups.labels(result="miss").inc(
+            len(cache_keys) - num_hits
+        )
+        return hits
+
+    def put(self, model_name: str, key_to_embedding: dict[str, Embedding]) -> None:
+        if not key_to_embedding:
+            return
+
+        tenant_id = get_current_tenant_id()
+        self._put_local(tenant_id, key_to_embedding)
+        if self.use_redis:
+            self._put_redis(tenant_id, key_to_embedding)
+
+
+_QUERY_EMBEDDING_CACHE: QueryEmbeddingCache | None = None
+_QUERY_EMBEDDING_CACHE_LOCK = threading.Lock()
+
+
+def get_query_embedding_cache() -> QueryEmbeddingCache | None:
+    """Returns the process wide query embedding cache, None if it is disabled"""
+    global _QUERY_EMBEDDING_CACHE
+
+    if QUERY_EMBEDDING_CACHE_SIZE <= 0:
+        return None
+
+    with _QUERY_EMBEDDING_CACHE_LOCK:
+        if _QUERY_EMBEDDING_CACHE is None:
+            _QUERY_EMBEDDING_CACHE = QueryEmbeddingCache()
+        return _QUERY_EMBEDDING_CACHE
@@ -1,8 +1,10 @@
+import itertools
 import threading
 import time
 from collections.abc import Callable
 from concurrent.futures import as_completed
 from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
 from functools import wraps
 from typing import Any
 
@@ -15,14 +17,23 @@ from retry import retry
 
 from onyx.configs.app_configs import INDEXING_EMBEDDING_MODEL_NUM_THREADS
 from onyx.configs.app_configs import LARGE_CHUNK_RATIO
+from onyx.configs.app_configs import LOCAL_EMBEDDING_MODEL_NUM_THREADS
 from onyx.configs.app_configs import SKIP_WARM_UP
 from onyx.configs.model_configs import BATCH_SIZE_ENCODE_CHUNKS
 from onyx.configs.model_configs import (
     BATCH_SIZE_ENCODE_CHUNKS_FOR_API_EMBEDDING_SERVICES,
 )
 from onyx.configs.model_configs import DOC_EMBEDDING_CONTEXT_SIZE
+from onyx.configs.model_configs import LOCAL_EMBEDDING_MAX_BATCH_SIZE_MULTIPLIER
+from onyx.configs.model_configs import LOCAL_EMBEDDING_TOKEN_BUDGET_BATCHING
 from onyx.db.models import SearchSettings
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
+from onyx.natural_language_processing.embedding_cache import (
+    build_embedding_cache_key,
+)
+from onyx.natural_language_processing.embedding_cache import (
+    EmbeddingCacheInterface,
+)
 from onyx.natural_language_processing.exceptions import (
     ModelServerRateLimitError,
 )
@@ -43,6 +54,7 @@ from shared_configs.model_server_models import IntentRequest
 from shared_configs.model_server_models import IntentResponse
 from shared_configs.model_server_models import RerankRequest
 from shared_configs.model_server_models import RerankResponse
+from shared_configs.utils import batch_by_token_budget
 from shared_configs.utils import batch_list
 
 logger = setup_logger()
@@ -89,6 +101,9 @@ class EmbeddingModel:
         callback: IndexingHeartbeatInterface | None = None,
         api_version: str | None = None,
         deployment_name: str | None = None,
+        embedding_cache: EmbeddingCacheInterface | None = None,
+        # other replicas of the model server, requests are spread round-robin
+        additional_servers: list[tuple[str, int]] | None = None,
     ) -> None:
         self.api_key = api_key
         self.provider_type = provider_type
@@ -104,14 +119,25 @@ class EmbeddingModel:
             model_name=model_name, provider_type=provider_type
         )
         self.callback = callback
+        self.embedding_cache = embedding_cache
 
-        model_server_url = build_model_server_url(server_host, server_port)
-        self.embed_server_endpoint = f"{model_server_url}/encoder/bi-encoder-embed"
+        self.embed_server_endpoints = [
+            f"{build_model_server_url(host, port)}/encoder/bi-encoder-embed"
+            for host, port in [(server_host, server_port)] + (additional_servers or [])
+        ]
+        self.embed_server_endpoint = self.embed_server_endpoints[0]
+        self._endpoint_cycle = itertools.cycle(self.embed_server_endpoints)
+        self._endpoint_lock = threading.Lock()
+
+    def _next_embed_server_endpoint(self) -> str:
+        with self._endpoint_lock:
+            return next(self._endpoint_cycle)
 
     def _make_model_server_request(self, embed_request: EmbedRequest) -> EmbedResponse:
         def _make_request() -> Response:
+            # retries also move on to the next model server
             response = requests.post(
-                self.embed_server_endpoint, json=embed_request.model_dump()
+                self._next_embed_server_endpoint(), json=embed_request.model_dump()
             )
             # signify that this is a rate limit error
             if response.status_code == 429:
@@ -159,8 +185,23 @@ class EmbeddingModel:
         batch_size: int,
         max_seq_length: int,
         num_threads: int = INDEXING_EMBEDDING_MODEL_NUM_THREADS,
+        local_num_threads: int = LOCAL_EMBEDDING_MODEL_NUM_THREADS,
     ) -> list[Embedding]:
-        text_batches = batch_list(texts, batch_size)
+        index_batches: list[list[int]] | None = None
+        if self.provider_type is None and LOCAL_EMBEDDING_TOKEN_BUDGET_BATCHING:
+            # the model truncates anything longer than max_seq_length anyway
+            token_lengths = [
+                min(len(self.tokenizer.encode(text)), max_seq_length) or 1
+                for text in texts
+            ]
+            index_batches = batch_by_token_budget(
+                token_lengths,
+                token_budget=batch_size * max_seq_length,
+                max_batch_size=batch_size * LOCAL_EMBEDDING_MAX_BATCH_SIZE_MULTIPLIER,
+            )
+            text_batches = [[texts[ind] for ind in batch] for batch in index_batches]
+        else:
+            text_batches = batch_list(texts, batch_size)
 
         logger.debug(
             f"Encoding {len(texts)} texts in {len(text_batches)} batches for local model"
@@ -202,13 +243,16 @@ class EmbeddingModel:
             return batch_idx, response.embeddings
 
         # only multi thread if:
-        #   1. num_threads is greater than 1
-        #   2. we are using an API-based embedding model (provider_type is not None)
-        #   3. there are more than 1 batch (no point in threading if only 1)
-        if num_threads >= 1 and self.provider_type and len(text_batches) > 1:
+        #   1. we are using an API-based embedding model (provider_type is not None)
+        #      or a self hosted model server with more than 1 thread configured
+        #   2. there are more than 1 batch (no point in threading if only 1)
+        if not self.provider_type:
+            num_threads = local_num_threads if local_num_threads > 1 else 0
+        if num_threads >= 1 and len(text_batches) > 1:
             with ThreadPoolExecutor(max_workers=num_threads) as executor:
                 future_to_batch = {
-                    executor.submit(process_batch, idx, batch): idx
+                    # the callback may read context vars (e.g. the tenant id)
+                    executor.submit(copy_context().run, process_batch, idx, batch): idx
                     for idx, batch in enumerate(text_batches, start=1)
                 }
 
@@ -222,6 +266,9 @@ class EmbeddingModel:
                             self.callback.progress("_batch_encode_texts", 1)
                     except Exception as e:
                         logger.exception("Embedding model failed to process batch")
+                        # don't start the batches which are still queued
+                        for pending_future in future_to_batch:
+                            pending_future.cancel()
                         raise e
 
                 # Sort by batch index and extend embeddings
@@ -236,6 +283,14 @@ class EmbeddingModel:
                 if self.callback:
                     self.callback.progress("_batch_encode_texts", 1)
 
+        if index_batches is not None:
+            # restore the original order of the texts
+            ordered_embeddings: list[Embedding] = [[] for _ in texts]
+            flat_indices = [ind for batch in index_batches for ind in batch]
+            for ind, embedding in zip(flat_indices, embeddings):
+                ordered_embeddings[ind] = embedding
+            embeddings = ordered_embeddings
+
         return embeddings
 
     def encode(
@@ -272,12 +327,58 @@ class EmbeddingModel:
             else local_embedding_batch_size
         )
 
-        return self._batch_encode_texts(
-            texts=texts,
-            text_type=text_type,
-            batch_size=batch_size,
-            max_seq_length=max_seq_length,
+        if self.embedding_cache is None:
+            return self._batch_encode_texts(
+                texts=texts,
+                text_type=text_type,
+                batch_size=batch_size,
+                max_seq_length=max_seq_length,
+            )
+
+        # the key is built from the exact text (after retrimming) sent to the model
+        prefix = (
+            self.query_prefix
+            if text_type == EmbedTextType.QUERY
+            else self.passage_prefix
         )
+        cache_keys = [
+            build_embedding_cache_key(
+                model_name=self.model_name,
+                provider_type=self.provider_type,
+                normalize=self.normalize,
+                prefix=prefix,
+                text_type=text_type,
+                max_seq_length=max_seq_length,
+                text=text,
+                api_url=self.api_url,
+                deployment_name=self.deployment_name,
+            )
+            for text in texts
+        ]
+        key_to_embedding = self.embedding_cache.get(cache_keys)
+
+        key_to_missing_text: dict[str, str] = {}
+        for cache_key, text in zip(cache_keys, texts):
+            if cache_key not in key_to_embedding:
+                key_to_missing_text[cache_key] = text
+
+        logger.debug(
+            f"Embedding cache: {len(texts) - len(key_to_missing_text)} of "
+            f"{len(texts)} texts served from the cache"
+        )
+
+        if key_to_missing_text:
+            new_embeddings = self._batch_encode_texts(
+                texts=list(key_to_missing_text.values()),
+                text_type=text_type,
+                batch_size=batch_size,
+                max_seq_length=max_seq_length,
+            )
+            new_key_to_embedding = dict(zip(key_to_missing_text, new_embeddings))
+            self.embedding_cache.put(self.model_name or "", new_key_to_embedding)
+            key_to_embedding.update(new_key_to_embedding)
+
+        return [key_to_embedding[cache_key] for cache_key in cache_keys]
 
     @classmethod
     def from_db_model(
@@ -286,6 +387,7 @@ class EmbeddingModel:
         server_host: str,  # Changes depending on indexing or inference
         server_port: int,
         retrim_content: bool = False,
+        embedding_cache: EmbeddingCacheInterface | None = None,
     ) -> "EmbeddingModel":
         return cls(
             server_host=server_host,
@@ -300,6 +402,7 @@ class EmbeddingModel:
             retrim_content=retrim_content,
             api_version=search_settings.api_version,
             deployment_name=search_settings.deployment_name,
+            embedding_cache=embedding_cache,
         )
 
 
@@ -1,10 +1,14 @@
+import hashlib
 import os
+import threading
 from abc import ABC
 from abc import abstractmethod
+from collections import OrderedDict
 from copy import copy
 
 from transformers import logging as transformer_logging  # type:ignore
 
+from onyx.configs.app_configs import TOKEN_COUNT_CACHE_SIZE
 from onyx.configs.model_configs import DOC_EMBEDDING_CONTEXT_SIZE
 from onyx.configs.model_configs import DOCUMENT_ENCODER_MODEL
 from onyx.context.search.models import InferenceChunk
@@ -155,6 +159,52 @@ def get_tokenizer(
     return _check_tokenizer_cache(provider_type, model_name)
 
 
+class _TokenCountCache:
+    """LRU cache of token counts keyed by the tokenizer and a hash of the text"""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[BaseTokenizer, bytes], int] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def count_tokens(self, text: str, tokenizer: BaseTokenizer) -> int:
+        if self.max_entries <= 0:
+            return len(tokenizer.encode(text))
+
+        key = (
+            tokenizer,
+            hashlib.blake2b(
+                text.encode("utf-8", "surrogatepass"), digest_size=16
+            ).digest(),
+        )
+        with self._lock:
+            token_count = self._entries.get(key)
+            if token_count is not None:
+                self._entries.move_to_end(key)
+                return token_count
+
+        token_count = len(tokenizer.encode(text))
+        with self._lock:
+            self._entries[key] = token_count
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return token_count
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_TOKEN_COUNT_CACHE = _TokenCountCache(max_entries=TOKEN_COUNT_CACHE_SIZE)
+
+
+def count_tokens(text: str, tokenizer: BaseTokenizer) -> int:
+    """Number of tokens of the text, cached as the same texts (e.g. retrieved sections)
+    are counted again on every turn of a chat session."""
+    return _TOKEN_COUNT_CACHE.count_tokens(text, tokenizer)
+
+
 def tokenizer_trim_content(
     content: str, desired_length: int, tokenizer: BaseTokenizer
 ) -> str:
@@ -1,6 +1,6 @@
 import time
+from collections.abc import Iterator
 from typing import cast
-from uuid import uuid4
 
 import redis
 from celery import Celery
@@ -9,16 +9,17 @@ from redis.lock import Lock as RedisLock
 from sqlalchemy.orm import Session
 
 from onyx.configs.app_configs import DB_YIELD_PER_DEFAULT
+from onyx.configs.app_configs import VESPA_SYNC_BATCH_SIZE
 from onyx.configs.constants import CELERY_VESPA_SYNC_BEAT_LOCK_TIMEOUT
 from onyx.configs.constants import OnyxCeleryPriority
-from onyx.configs.constants import OnyxCeleryQueues
-from onyx.configs.constants import OnyxCeleryTask
 from onyx.configs.constants import OnyxRedisConstants
 from onyx.db.connector_credential_pair import get_connector_credential_pair_from_id
 from onyx.db.document import (
     construct_document_id_select_for_connector_credential_pair_by_needs_sync,
 )
 from onyx.redis.redis_object_helper import RedisObjectHelper
+from onyx.redis.redis_object_helper import send_vespa_metadata_sync_task
+from onyx.utils.batching import batch_generator
 
 
 class RedisConnectorCredentialPair(RedisObjectHelper):
@@ -86,8 +87,19 @@ class RedisConnectorCredentialPair(RedisObjectHelper):
 
         num_docs = 0
 
-        for doc_id in db_session.scalars(stmt).yield_per(DB_YIELD_PER_DEFAULT):
-            doc_id = cast(str, doc_id)
+        def _doc_ids_to_sync() -> Iterator[str]:
+            nonlocal num_docs
+
+            for doc_id in db_session.scalars(stmt).yield_per(DB_YIELD_PER_DEFAULT):
+                num_docs += 1
+
+                # check if we should skip the document (typically because it's already syncing)
+                if doc_id in self.skip_docs:
+                    continue
+
+                yield cast(str, doc_id)
+
+        for doc_id_batch in batch_generator(_doc_ids_to_sync(), VESPA_SYNC_BATCH_SIZE):
             current_time = time.monotonic()
             if current_time - last_lock_time >= (
                 CELERY_VESPA_SYNC_BEAT_LOCK_TIMEOUT / 4
@@ -95,35 +107,20 @@ class RedisConnectorCredentialPair(RedisObjectHelper):
                 lock.reacquire()
                 last_lock_time = current_time
 
-            num_docs += 1
-
-            # check if we should skip the document (typically because it's already syncing)
-            if doc_id in self.skip_docs:
-                continue
-
-            # celery's default task id format is "dd32ded3-00aa-4884-8b21-42f8332e7fac"
-            # the key for the result is "celery-task-meta-dd32ded3-00aa-4884-8b21-42f8332e7fac"
-            # we prefix the task id so it's easier to keep track of who created the task
-            # aka "documentset_1_6dd32ded3-00aa-4884-8b21-42f8332e7fac"
-            custom_task_id = f"{self.task_id_prefix}_{uuid4()}"
-
-            # add to the tracking taskset in redis BEFORE creating the celery task.
             # note that for the moment we are using a single taskset key, not differentiated by cc_pair id
-            redis_client.sadd(
-                RedisConnectorCredentialPair.get_taskset_key(), custom_task_id
-            )
-
             # Priority on sync's triggered by new indexing should be medium
-            celery_app.send_task(
-                OnyxCeleryTask.VESPA_METADATA_SYNC_TASK,
-                kwargs=dict(document_id=doc_id, tenant_id=tenant_id),
-                queue=OnyxCeleryQueues.VESPA_METADATA_SYNC,
-                task_id=custom_task_id,
+            send_vespa_metadata_sync_task(
+                celery_app,
+                redis_client,
+                taskset_key=RedisConnectorCredentialPair.get_taskset_key(),
+                task_id_prefix=self.task_id_prefix,
+                document_ids=doc_id_batch,
+                tenant_id=tenant_id,
                 priority=OnyxCeleryPriority.MEDIUM,
             )
 
             num_tasks_sent += 1
-            self.skip_docs.add(doc_id)
+            self.skip_docs.update(doc_id_batch)
 
             if num_tasks_sent >= max_tasks:
                 break
@@ -0,0 +1,95 @@
+import json
+import os
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from redis.client import Redis
+
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+_RESUBSCRIBE_DELAY_SECONDS = 5
+
+
+class RedisInvalidationSubscriber:
+    """Invalidates in memory caches of this process on changes made by any process.
+
+    A background thread passes the JSON messages published to `channel` to
+    `on_message`. `on_subscription_change` is called with True once subscribed and
+    with False whenever the subscription is lost, since messages may have been missed
+    meanwhile, caches should only serve entries while subscribed. `on_fork` is called
+    in a forked process before it starts its own thread, as threads are not copied."""
+
+    def __init__(
+        self,
+        channel: str,
+        redis_client_factory: Callable[[], Redis],
+        on_message: Callable[[dict[str, Any]], None],
+        on_subscription_change: Callable[[bool], None],
+        on_fork: Callable[[], None],
+    ) -> None:
+        self.channel = channel
+        self._redis_client_factory = redis_client_factory
+        self._on_message = on_message
+        self._on_subscription_change = on_subscription_change
+        self._on_fork = on_fork
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def ensure_started(self) -> None:
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._lock = threading.Lock()
+            self._thread = None
+            self._on_fork()
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._listen, name=f"{self.channel}-listener", daemon=True
+                )
+                self._thread.start()
+
+    def _listen(self) -> None:
+        failed = False
+        while True:
+            pubsub = None
+            try:
+                pubsub = self._redis_client_factory().pubsub()
+                pubsub.subscribe(self.channel)
+                for message in pubsub.listen():
+                    if message["type"] == "subscribe":
+                        self._on_subscription_change(True)
+                        failed = False
+                    elif message["type"] == "message":
+                        self._on_message(json.loads(message["data"]))
+            except Exception as e:
+                # only once until it is subscribed again, it retries every few seconds
+                if not failed:
+                    logger.warning(
+                        f"Listener of {self.channel} failed, "
+                        f"not caching until it is resubscribed: {e}"
+                    )
+                failed = True
+            finally:
+                self._on_subscription_change(False)
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+            time.sleep(_RESUBSCRIBE_DELAY_SECONDS)
+
+    def publish(self, redis_client: Redis, message: dict[str, Any]) -> None:
+        """Sends the message to all processes. This process should apply it to its
+        own cache right away instead of waiting for it to arrive."""
+        try:
+            redis_client.publish(self.channel, json.dumps(message))
+        except Exception as e:
+            # the other processes pick up the change once their entries expire
+            logger.error(f"Failed to publish to {self.channel}: {str(e)}")
@@ -1,14 +1,60 @@
 from abc import ABC
 from abc import abstractmethod
+from uuid import uuid4
 
 from celery import Celery
 from redis import Redis
 from redis.lock import Lock as RedisLock
 from sqlalchemy.orm import Session
 
+from onyx.configs.app_configs import VESPA_SYNC_BATCH_SIZE
+from onyx.configs.constants import OnyxCeleryPriority
+from onyx.configs.constants import OnyxCeleryQueues
+from onyx.configs.constants import OnyxCeleryTask
 from onyx.redis.redis_pool import get_redis_client
 
 
+def send_vespa_metadata_sync_task(
+    celery_app: Celery,
+    redis_client: Redis,
+    taskset_key: str,
+    task_id_prefix: str,
+    document_ids: list[str],
+    tenant_id: str | None,
+    priority: OnyxCeleryPriority,
+    batch_size: int = VESPA_SYNC_BATCH_SIZE,
+) -> None:
+    """Sends a single task syncing the given documents to Vespa and tracks it in the
+    taskset. With a batch size of 1, the documents are expected one at a time and
+    the per document task is used."""
+    # celery's default task id format is "dd32ded3-00aa-4884-8b21-42f8332e7fac"
+    # the key for the result is "celery-task-meta-dd32ded3-00aa-4884-8b21-42f8332e7fac"
+    # we prefix the task id so it's easier to keep track of who created the task
+    # aka "documentset_1_6dd32ded3-00aa-4884-8b21-42f8332e7fac"
+    custom_task_id = f"{task_id_prefix}_{uuid4()}"
+
+    # add to the set BEFORE creating the task.
+    redis_client.sadd(taskset_key, custom_task_id)
+
+    if batch_size <= 1:
+        celery_app.send_task(
+            OnyxCeleryTask.VESPA_METADATA_SYNC_TASK,
+            kwargs=dict(document_id=document_ids[0], tenant_id=tenant_id),
+            queue=OnyxCeleryQueues.VESPA_METADATA_SYNC,
+            task_id=custom_task_id,
+            priority=priority,
+        )
+        return
+
+    celery_app.send_task(
+        OnyxCeleryTask.VESPA_METADATA_SYNC_BATCH_TASK,
+        kwargs=dict(document_ids=document_ids, tenant_id=tenant_id),
+        queue=OnyxCeleryQueues.VESPA_METADATA_SYNC,
+        task_id=custom_task_id,
+        priority=priority,
+    )
+
+
 class RedisObjectHelper(ABC):
     PREFIX = "base"
     FENCE_PREFIX = PREFIX + "_fence"
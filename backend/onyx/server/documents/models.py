@@ -22,6 +22,8 @@ from onyx.db.models import IndexAttempt
 from onyx.db.models import IndexAttemptError as DbIndexAttemptError
 from onyx.db.models import IndexingStatus
 from onyx.db.models import TaskStatus
+from onyx.indexing.indexing_profiler import IndexingProfile
+from onyx.indexing.indexing_profiler import IndexingStage
 from onyx.server.models import FullUserSnapshot
 from onyx.server.models import InvitedUserSnapshot
 from onyx.server.utils import mask_credential_dict
@@ -158,11 +160,19 @@ class IndexAttemptSnapshot(BaseModel):
     full_exception_trace: str | None
     time_started: str | None
     time_updated: str
+    # time spent in each stage of the indexing pipeline, None for older attempts
+    performance_profile: IndexingProfile | None = None
+    slowest_stage: IndexingStage | None = None
 
     @classmethod
     def from_index_attempt_db_model(
         cls, index_attempt: IndexAttempt
     ) -> "IndexAttemptSnapshot":
+        performance_profile = (
+            IndexingProfile.model_validate(index_attempt.performance_profile)
+            if index_attempt.performance_profile
+            else None
+        )
         return IndexAttemptSnapshot(
             id=index_attempt.id,
             status=index_attempt.status,
@@ -178,6 +188,10 @@ class IndexAttemptSnapshot(BaseModel):
                 else None
             ),
             time_updated=index_attempt.time_updated.isoformat(),
+            performance_profile=performance_profile,
+            slowest_stage=(
+                performance_profile.slowest_stage if performance_profile else None
+            ),
         )
 
 
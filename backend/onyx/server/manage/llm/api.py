@@ -21,6 +21,7 @@ from onyx.llm.factory import get_llm
 from onyx.llm.llm_provider_options import fetch_available_well_known_llms
 from onyx.llm.llm_provider_options import WellKnownLLMProviderDescriptor
 from onyx.llm.utils import litellm_exception_to_error_msg
+from onyx.llm.utils import refresh_model_capability_index
 from onyx.llm.utils import test_llm
 from onyx.server.manage.llm.models import FullLLMProvider
 from onyx.server.manage.llm.models import LLMProviderDescriptor
@@ -159,7 +160,7 @@ def put_llm_provider(
             )
 
     try:
-        return upsert_llm_provider(
+        upserted_llm_provider = upsert_llm_provider(
             llm_provider=llm_provider,
             db_session=db_session,
         )
@@ -167,6 +168,9 @@ def put_llm_provider(
         logger.exception("Failed to upsert LLM Provider")
         raise HTTPException(status_code=400, detail=str(e))
 
+    refresh_model_capability_index()
+    return upserted_llm_provider
+
 
 @admin_router.delete("/provider/{provider_id}")
 def delete_llm_provider(
@@ -175,6 +179,7 @@ def delete_llm_provider(
     db_session: Session = Depends(get_session),
 ) -> None:
     remove_llm_provider(db_session, provider_id)
+    refresh_model_capability_index()
 
 
 @admin_router.post("/provider/{provider_id}/default")
@@ -12,6 +12,7 @@ from onyx.context.search.models import SearchSettingsCreationRequest
 from onyx.db.connector_credential_pair import get_connector_credential_pairs
 from onyx.db.connector_credential_pair import resync_cc_pair
 from onyx.db.engine import get_session
+from onyx.db.enums import EmbeddingPrecision
 from onyx.db.index_attempt import expire_index_attempts
 from onyx.db.models import IndexModelStatus
 from onyx.db.models import User
@@ -33,6 +34,7 @@ from onyx.server.manage.models import FullModelVersionResponse
 from onyx.server.models import IdReturn
 from onyx.utils.logger import setup_logger
 from shared_configs.configs import ALT_INDEX_SUFFIX
+from shared_configs.configs import MULTI_TENANT
 
 router = APIRouter(prefix="/search-settings")
 logger = setup_logger()
@@ -50,6 +52,16 @@ def set_new_search_settings(
     if search_settings_new.index_name:
         logger.warning("Index name was specified by request, this is not suggested")
 
+    # the indices shared by all tenants are set up with float embeddings
+    if (
+        MULTI_TENANT
+        and search_settings_new.embedding_precision != EmbeddingPrecision.FLOAT
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only float embeddings are supported in multi-tenant mode",
+        )
+
     # Validate cloud provider exists or create new LiteLLM provider
     if search_settings_new.provider_type is not None:
         cloud_provider = get_embedding_provider_from_provider_type(
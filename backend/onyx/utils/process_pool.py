@@ -0,0 +1,201 @@
+"""A pool of worker processes for CPU bound work which must not take down the caller.
+
+Each task runs with a timeout, a worker which exceeds it is killed and replaced. Workers
+can be started with a memory limit, so a pathological input fails its task instead of
+exhausting the memory of the host. Failures are returned per task.
+
+Workers are started as separate interpreters rather than with multiprocessing, so the
+pool can also be used from daemonic processes like the indexing job processes, which
+multiprocessing does not allow to have children."""
+import os
+import resource
+import subprocess
+import sys
+import threading
+from collections import deque
+from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Iterator
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from multiprocessing.connection import Connection
+from multiprocessing.connection import Pipe
+from types import TracebackType
+from typing import Any
+from typing import Generic
+from typing import TypeVar
+
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+R = TypeVar("R")
+
+_WORKER_SHUTDOWN_TIMEOUT = 5
+
+
+@dataclass
+class ProcessPoolResult(Generic[R]):
+    args: tuple
+    value: R | None = None
+    # set if the task failed, the value is None then
+    error: str | None = None
+
+
+class _Worker:
+    def __init__(self, memory_limit_mb: int) -> None:
+        self._conn, child_conn = Pipe()
+        # workers unpickle the functions to run, so they need the same import path
+        env = os.environ.copy()
+        env["PYTHONPATH"] = os.pathsep.join(path or os.getcwd() for path in sys.path)
+        self._process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                __name__,
+                str(child_conn.fileno()),
+                str(memory_limit_mb),
+            ],
+            pass_fds=(child_conn.fileno(),),
+            env=env,
+        )
+        child_conn.close()
+
+    def run(
+        self, func: Callable[..., R], args: tuple, timeout: float | None
+    ) -> tuple[R | None, str | None, bool]:
+        """Returns the value, the error and whether the worker can be reused. With a
+        timeout of None it waits for the task however long it takes."""
+        try:
+            self._conn.send((func, args))
+            if not self._conn.poll(timeout):
+                return None, f"Timed out after {timeout} seconds", False
+            succeeded, value, reusable = self._conn.recv()
+        except (EOFError, OSError):
+            return (
+                None,
+                f"Worker process exited with code {self._process.wait()}",
+                False,
+            )
+
+        if succeeded:
+            return value, None, reusable
+        return None, value, reusable
+
+    def close(self) -> None:
+        try:
+            self._conn.send(None)
+            self._process.wait(_WORKER_SHUTDOWN_TIMEOUT)
+        except (OSError, subprocess.TimeoutExpired):
+            self.kill()
+        self._conn.close()
+
+    def kill(self) -> None:
+        self._process.kill()
+        self._process.wait()
+        self._conn.close()
+
+
+class ProcessPool:
+    """Runs picklable module level functions in up to `num_processes` worker
+    processes. A timeout (seconds per task) or memory limit of 0 disables it."""
+
+    def __init__(
+        self, num_processes: int, timeout: float = 0, memory_limit_mb: int = 0
+    ) -> None:
+        if num_processes < 1:
+            raise ValueError("A process pool needs at least one process")
+        if timeout < 0 or memory_limit_mb < 0:
+            raise ValueError("The timeout and memory limit must not be negative")
+
+        self.num_processes = num_processes
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self._idle_workers: list[_Worker] = []
+        self._lock = threading.Lock()
+
+    def _run(self, func: Callable[..., R], args: tuple) -> ProcessPoolResult[R]:
+        with self._lock:
+            worker = self._idle_workers.pop() if self._idle_workers else None
+        if worker is None:
+            worker = _Worker(self.memory_limit_mb)
+
+        value, error, reusable = worker.run(
+            func, args, self.timeout if self.timeout > 0 else None
+        )
+        if not reusable:
+            logger.warning(f"Replacing process pool worker: {error}")
+            worker.kill()
+        else:
+            with self._lock:
+                self._idle_workers.append(worker)
+
+        return ProcessPoolResult(args=args, value=value, error=error)
+
+    def imap(
+        self, func: Callable[..., R], args_iterable: Iterable[tuple]
+    ) -> Iterator[ProcessPoolResult[R]]:
+        """Yields the results in the order of the arguments. Arguments are only taken
+        from the iterable while fewer than twice the number of processes are pending,
+        so it is consumed lazily."""
+        max_pending = 2 * self.num_processes
+        with ThreadPoolExecutor(max_workers=self.num_processes) as executor:
+            pending: deque[Future[ProcessPoolResult[R]]] = deque()
+            for args in args_iterable:
+                pending.append(executor.submit(self._run, func, args))
+                if len(pending) >= max_pending:
+                    yield pending.popleft().result()
+
+            while pending:
+                yield pending.popleft().result()
+
+    def close(self) -> None:
+        with self._lock:
+            workers, self._idle_workers = self._idle_workers, []
+        for worker in workers:
+            worker.close()
+
+    def __enter__(self) -> "ProcessPool":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+def _worker_main(fd: int, memory_limit_mb: int) -> None:
+    if memory_limit_mb:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    conn = Connection(fd)
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            # the pool is gone
+            return
+        if task is None:
+            return
+
+        func, args = task
+        try:
+            result: Any = func(*args)
+        except MemoryError:
+            # the state of the process is unknown after running out of memory
+            conn.send((False, "Exceeded the memory limit", False))
+            return
+        except Exception as e:
+            conn.send((False, f"{type(e).__name__}: {e}", True))
+            continue
+
+        conn.send((True, result, True))
+
+
+if __name__ == "__main__":
+    _worker_main(fd=int(sys.argv[1]), memory_limit_mb=int(sys.argv[2]))
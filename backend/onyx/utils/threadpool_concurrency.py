@@ -1,5 +1,10 @@
+import contextvars
+import queue
+import threading
+import time
 import uuid
 from collections.abc import Callable
+from collections.abc import Iterator
 from concurrent.futures import as_completed
 from concurrent.futures import ThreadPoolExecutor
 from typing import Any
@@ -106,3 +111,89 @@ def run_functions_in_parallel(
                     raise
 
     return results
+
+
+class _PrefetchDone:
+    """Sentinel placed on the queue once the wrapped iterator is exhausted"""
+
+
+class _PrefetchError:
+    def __init__(self, exception: BaseException):
+        self.exception = exception
+
+
+def prefetch_iterator(
+    iterator: Iterator[R],
+    max_prefetched: int,
+    thread_name: str = "prefetch",
+    timings: dict[str, float] | None = None,
+) -> Iterator[R]:
+    """
+    Consumes `iterator` in a background thread, buffering at most `max_prefetched`
+    items ahead of the consumer. The producer blocks once the buffer is full, so a slow
+    consumer applies backpressure to the producer instead of growing memory.
+
+    Exceptions raised by the producer are re-raised in the consumer. If the consumer
+    stops early (break / exception / close), the producer thread is told to stop and
+    the wrapped iterator is not advanced any further.
+
+    If `timings` is passed, "produce" and "wait" (time the consumer spent blocked on
+    the producer) are accumulated into it, in seconds.
+    """
+    buffer: queue.Queue[R | _PrefetchDone | _PrefetchError] = queue.Queue(
+        maxsize=max(1, max_prefetched)
+    )
+    stop_event = threading.Event()
+
+    def _put(item: R | _PrefetchDone | _PrefetchError) -> bool:
+        while not stop_event.is_set():
+            try:
+                buffer.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce() -> None:
+        try:
+            while not stop_event.is_set():
+                start = time.monotonic()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                if timings is not None:
+                    timings["produce"] = (
+                        timings.get("produce", 0.0) + time.monotonic() - start
+                    )
+                if not _put(item):
+                    return
+        except BaseException as e:
+            _put(_PrefetchError(e))
+            return
+
+        _put(_PrefetchDone())
+
+    # run the producer with the caller's context so that context vars
+    # (e.g. the current tenant id) are visible to the wrapped iterator
+    context = contextvars.copy_context()
+    producer = threading.Thread(
+        target=context.run, args=(_produce,), name=thread_name, daemon=True
+    )
+    producer.start()
+
+    try:
+        while True:
+            start = time.monotonic()
+            item = buffer.get()
+            if timings is not None:
+                timings["wait"] = timings.get("wait", 0.0) + time.monotonic() - start
+
+            if isinstance(item, _PrefetchDone):
+                return
+            if isinstance(item, _PrefetchError):
+                raise item.exception
+
+            yield item
+    finally:
+        stop_event.set()
@@ -0,0 +1,248 @@
+"""Backfills `document.chunk_count` for documents indexed before the chunk count was
+stored in Postgres.
+
+Without a chunk count, every update / delete of such a document first has to probe
+Vespa to find out how many chunks it has, and its chunks use the old chunk ID
+system. For each of these documents this script:
+- copies the chunks stored under old chunk IDs to the current chunk IDs
+- deletes the chunks stored under the old chunk IDs
+- records the chunk count
+
+so afterwards the document is handled like any newly indexed document.
+
+Chunks are copied last to first. A copy which was interrupted therefore never
+includes the first chunk and is simply redone on the next run. Once the first chunk
+exists under the current ID, the current IDs are authoritative.
+
+Updates to a document while it is being copied may be lost, so best run this while
+indexing and syncing are paused. Only the primary index is handled, run it after a
+pending index swap has completed.
+
+Usage:
+    python scripts/backfill_chunk_count.py [--tenant-id TENANT_ID] [--batch-size 100]
+"""
+import argparse
+import concurrent.futures
+import os
+import sys
+from typing import Any
+
+import httpx
+
+# makes it so `PYTHONPATH=.` is not required when running this script
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+
+from onyx.db.document import get_document_ids_without_chunk_count  # noqa: E402
+from onyx.db.document import update_docs_chunk_count__no_commit  # noqa: E402
+from onyx.db.engine import get_session_with_tenant  # noqa: E402
+from onyx.db.search_settings import get_current_search_settings  # noqa: E402
+from onyx.db.search_settings import get_secondary_search_settings  # noqa: E402
+from onyx.document_index.document_index_utils import (  # noqa: E402
+    get_document_chunk_ids,
+)
+from onyx.document_index.document_index_utils import (  # noqa: E402
+    get_multipass_config,
+)
+from onyx.document_index.interfaces import EnrichedDocumentIndexingInfo  # noqa: E402
+from onyx.document_index.interfaces import MinimalDocumentIndexingInfo  # noqa: E402
+from onyx.document_index.vespa.deletion import delete_vespa_chunks  # noqa: E402
+from onyx.document_index.vespa.feed_client import get_vespa_feed_client  # noqa: E402
+from onyx.document_index.vespa.feed_client import VespaFeedOperation  # noqa: E402
+from onyx.document_index.vespa.indexing_utils import (  # noqa: E402
+    check_for_final_chunk_existence,
+)
+from onyx.document_index.vespa.indexing_utils import (  # noqa: E402
+    count_document_chunks,
+)
+from onyx.document_index.vespa.shared_utils.utils import (  # noqa: E402
+    get_vespa_http_client,
+)
+from onyx.document_index.vespa.shared_utils.utils import (  # noqa: E402
+    replace_invalid_doc_id_characters,
+)
+from onyx.document_index.vespa_constants import DOCUMENT_ID_ENDPOINT  # noqa: E402
+from onyx.document_index.vespa_constants import NUM_THREADS  # noqa: E402
+from onyx.utils.logger import setup_logger  # noqa: E402
+
+logger = setup_logger()
+
+
+def _strip_tensor_types(fields: dict[str, Any]) -> dict[str, Any]:
+    """Tensors are returned with their type, which is not part of the feed format"""
+    return {
+        name: (
+            {key: val for key, val in value.items() if key != "type"}
+            if isinstance(value, dict)
+            and "type" in value
+            and any(key in value for key in ("cells", "blocks", "values"))
+            else value
+        )
+        for name, value in fields.items()
+    }
+
+
+def _copy_chunks(
+    doc_id: str,
+    old_chunk_ids: list[Any],
+    new_chunk_ids: list[Any],
+    index_name: str,
+    http_client: httpx.Client,
+) -> None:
+    endpoint = DOCUMENT_ID_ENDPOINT.format(index_name=index_name)
+    operations: list[VespaFeedOperation] = []
+    # last to first so that the first chunk only exists once the copy is complete
+    for old_chunk_id, new_chunk_id in reversed(list(zip(old_chunk_ids, new_chunk_ids))):
+        response = http_client.get(
+            f"{endpoint}/{old_chunk_id}", params={"format.tensors": "long"}
+        )
+        if response.status_code == 404:
+            # e.g. a large chunk which was never written
+            continue
+        response.raise_for_status()
+        operations.append(
+            VespaFeedOperation(
+                method="POST",
+                url=f"{endpoint}/{new_chunk_id}",
+                document_id=doc_id,
+                body={"fields": _strip_tensor_types(response.json()["fields"])},
+            )
+        )
+
+    # the feed runs the operations concurrently, the first chunk is written on its own
+    # once all the others made it
+    if operations:
+        get_vespa_feed_client().feed(operations[:-1])
+        get_vespa_feed_client().feed(operations[-1:])
+
+
+def _backfill_document(
+    doc_id: str,
+    index_name: str,
+    large_chunks_enabled: bool,
+    tenant_id: str | None,
+    http_client: httpx.Client,
+) -> int:
+    """Moves the chunks of the document to the current chunk IDs if needed and returns
+    the chunk count to record."""
+    vespa_doc_id = replace_invalid_doc_id_characters(doc_id)
+
+    num_new_chunks = count_document_chunks(
+        document_id=vespa_doc_id,
+        index_name=index_name,
+        http_client=http_client,
+        tenant_id=tenant_id,
+    )
+    num_old_chunks = check_for_final_chunk_existence(
+        minimal_doc_info=MinimalDocumentIndexingInfo(
+            doc_id=vespa_doc_id, chunk_start_index=0
+        ),
+        start_index=0,
+        index_name=index_name,
+        http_client=http_client,
+    )
+    if not num_old_chunks:
+        return num_new_chunks
+
+    # both lists follow the same order, chunk by chunk
+    old_chunk_ids, new_chunk_ids = (
+        get_document_chunk_ids(
+            enriched_document_info_list=[
+                EnrichedDocumentIndexingInfo(
+                    doc_id=vespa_doc_id,
+                    chunk_start_index=0,
+                    chunk_end_index=num_old_chunks,
+                    old_version=old_version,
+                )
+            ],
+            tenant_id=tenant_id,
+            large_chunks_enabled=large_chunks_enabled,
+        )
+        for old_version in (True, False)
+    )
+
+    if not num_new_chunks:
+        _copy_chunks(doc_id, old_chunk_ids, new_chunk_ids, index_name, http_client)
+        num_new_chunks = num_old_chunks
+
+    delete_vespa_chunks(
+        doc_chunk_ids=old_chunk_ids, index_name=index_name, document_id=doc_id
+    )
+    return num_new_chunks
+
+
+def main(tenant_id: str | None, batch_size: int) -> None:
+    with get_session_with_tenant(tenant_id) as db_session:
+        if get_secondary_search_settings(db_session):
+            logger.error("An index swap is in progress, run this once it completed")
+            return
+
+        search_settings = get_current_search_settings(db_session)
+        index_name = search_settings.index_name
+        large_chunks_enabled = get_multipass_config(search_settings).enable_large_chunks
+
+    total_backfilled = 0
+    total_failed = 0
+    last_doc_id: str | None = None
+    with (
+        get_vespa_http_client() as http_client,
+        concurrent.futures.ThreadPoolExecutor(max_workers=NUM_THREADS) as executor,
+    ):
+        while True:
+            with get_session_with_tenant(tenant_id) as db_session:
+                doc_ids = get_document_ids_without_chunk_count(
+                    db_session, limit=batch_size, after_document_id=last_doc_id
+                )
+            if not doc_ids:
+                break
+            last_doc_id = doc_ids[-1]
+
+            future_to_doc_id = {
+                executor.submit(
+                    _backfill_document,
+                    doc_id,
+                    index_name,
+                    large_chunks_enabled,
+                    tenant_id,
+                    http_client,
+                ): doc_id
+                for doc_id in doc_ids
+            }
+            doc_id_to_chunk_count: dict[str, int] = {}
+            for future in concurrent.futures.as_completed(future_to_doc_id):
+                doc_id = future_to_doc_id[future]
+                try:
+                    doc_id_to_chunk_count[doc_id] = future.result()
+                except Exception:
+                    logger.exception(f"Failed to backfill the chunk count of {doc_id}")
+                    total_failed += 1
+
+            with get_session_with_tenant(tenant_id) as db_session:
+                update_docs_chunk_count__no_commit(
+                    document_ids=list(doc_id_to_chunk_count),
+                    doc_id_to_chunk_count=doc_id_to_chunk_count,
+                    db_session=db_session,
+                )
+                db_session.commit()
+
+            total_backfilled += len(doc_id_to_chunk_count)
+            logger.notice(
+                f"Backfilled the chunk count of {total_backfilled} documents so far, "
+                f"{total_failed} failed"
+            )
+
+    logger.notice(
+        f"Done. Backfilled the chunk count of {total_backfilled} documents, "
+        f"{total_failed} failed and can be retried by running this again."
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Backfill the chunk count of documents indexed before it was stored"
+    )
+    parser.add_argument("--tenant-id", type=str, default=None)
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    main(tenant_id=args.tenant_id, batch_size=args.batch_size)
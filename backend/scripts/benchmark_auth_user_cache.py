@@ -0,0 +1,172 @@
+"""Benchmarks the per request overhead of resolving the user of a session token.
+
+Without the auth user cache every request does a Redis lookup of the token, a Postgres
+query for the user and, with multi tenancy, another Redis lookup of the token for the
+tenant. These round trips are simulated with a fixed latency, the work on a cache hit
+(including copying the cached user) is real. Requests are spread evenly over the
+users, so after the first request of each user all lookups within the TTL are hits.
+
+Usage:
+    python scripts/benchmark_auth_user_cache.py [--requests 20000] [--users 200]
+        [--round-trip-ms 0.5]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import threading
+import time
+import uuid
+from collections.abc import Iterator
+from typing import Any
+from typing import cast
+
+from redis.client import Redis
+
+# makes it so `PYTHONPATH=.` is not required when running this script
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+
+from onyx.auth.schemas import UserRole  # noqa: E402
+from onyx.auth.user_cache import AuthUserCache  # noqa: E402
+from onyx.auth.user_cache import AuthUserCacheKind  # noqa: E402
+from onyx.auth.user_cache import hash_token  # noqa: E402
+from onyx.db.models import OAuthAccount  # noqa: E402
+from onyx.db.models import User  # noqa: E402
+
+
+class _LocalPubSub:
+    """No other processes publish invalidations in this benchmark"""
+
+    def __init__(self) -> None:
+        self._closed = threading.Event()
+
+    def subscribe(self, channel: str) -> None:
+        pass
+
+    def listen(self) -> Iterator[dict[str, Any]]:
+        yield {"type": "subscribe", "data": 1}
+        self._closed.wait()
+
+    def close(self) -> None:
+        self._closed.set()
+
+
+class _LocalRedis:
+    def pubsub(self) -> _LocalPubSub:
+        return _LocalPubSub()
+
+    def publish(self, channel: str, message: str) -> None:
+        pass
+
+
+def _make_user() -> User:
+    user_id = uuid.uuid4()
+    return User(
+        id=user_id,
+        email=f"{user_id}@example.com",
+        hashed_password="hashed-password",
+        role=UserRole.BASIC,
+        is_active=True,
+        is_verified=True,
+        chosen_assistants=[0, 1, 2],
+        oauth_accounts=[
+            OAuthAccount(
+                id=uuid.uuid4(),
+                user_id=user_id,
+                oauth_name="google",
+                access_token="access-token",
+                account_id="account",
+                account_email=f"{user_id}@example.com",
+            )
+        ],
+    )
+
+
+async def _resolve_uncached(user: User, round_trip: float) -> User:
+    # token data for the tenant, token data for the user id, the user
+    for _ in range(3):
+        await asyncio.sleep(round_trip)
+    return user
+
+
+async def _resolve_cached(
+    cache: AuthUserCache, token: str, user: User, round_trip: float
+) -> User | None:
+    token_hash = hash_token(token)
+    token_data = cache.get(AuthUserCacheKind.TOKEN_DATA, token_hash)
+    if token_data is None:
+        version = cache.version()
+        await asyncio.sleep(round_trip)
+        cache.put(
+            AuthUserCacheKind.TOKEN_DATA,
+            token_hash,
+            str(user.id),
+            {"sub": str(user.id), "tenant_id": "public"},
+            version,
+        )
+
+    async def load_user() -> User:
+        for _ in range(2):
+            await asyncio.sleep(round_trip)
+        return user
+
+    return await cache.get_or_load_user(AuthUserCacheKind.TOKEN, token_hash, load_user)
+
+
+def _report(name: str, durations: list[float]) -> None:
+    durations_us = sorted(duration * 1e6 for duration in durations)
+    p99 = durations_us[int(len(durations_us) * 0.99) - 1]
+    print(
+        f"{name:>9}: mean {statistics.mean(durations_us):8.1f} us, "
+        f"p50 {statistics.median(durations_us):8.1f} us, p99 {p99:8.1f} us"
+    )
+
+
+async def main(num_requests: int, num_users: int, round_trip_ms: float) -> None:
+    round_trip = round_trip_ms / 1000
+    users = [(str(uuid.uuid4()), _make_user()) for _ in range(num_users)]
+    cache = AuthUserCache(
+        ttl_seconds=3600,
+        max_entries=10000,
+        redis_client_factory=lambda: cast(Redis, _LocalRedis()),
+    )
+    cache.version()
+    while not cache._subscribed:
+        time.sleep(0.01)
+
+    uncached: list[float] = []
+    cached: list[float] = []
+    for i in range(num_requests):
+        token, user = users[i % num_users]
+
+        start = time.perf_counter()
+        await _resolve_uncached(user, round_trip)
+        uncached.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await _resolve_cached(cache, token, user, round_trip)
+        cached.append(time.perf_counter() - start)
+
+    print(
+        f"{num_requests} requests of {num_users} users, "
+        f"{round_trip_ms} ms per Redis / Postgres round trip"
+    )
+    _report("uncached", uncached)
+    _report("cached", cached)
+    for kind, stats in cache.stats().items():
+        if stats.hits or stats.misses:
+            print(f"{kind.value} hit rate: {stats.hit_rate:.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the per request overhead of resolving the user"
+    )
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--round-trip-ms", type=float, default=0.5)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.requests, args.users, args.round_trip_ms))
@@ -0,0 +1,123 @@
+"""Benchmarks chunking of synthetic documents made of many small sections (think Slack
+threads, Jira comments or spreadsheet rows).
+
+For every document size the time of `Chunker._chunk_document` is compared with the
+chunking before running token counts were introduced, which re-tokenized the whole
+chunk built so far for every appended section. The time per section of the chunker
+should stay flat as the number of sections grows, and both must produce the same
+chunks.
+
+Usage:
+    python scripts/benchmark_chunker.py [--sections 1000 4000 16000]
+        [--chunk-token-limit 8192] [--model-name intfloat/e5-base-v2]
+"""
+import argparse
+import os
+import sys
+import time
+
+# makes it so `PYTHONPATH=.` is not required when running this script
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+
+from onyx.configs.constants import DocumentSource  # noqa: E402
+from onyx.configs.constants import SECTION_SEPARATOR  # noqa: E402
+from onyx.connectors.models import Document  # noqa: E402
+from onyx.connectors.models import Section  # noqa: E402
+from onyx.indexing.chunker import Chunker  # noqa: E402
+from onyx.natural_language_processing.utils import BaseTokenizer  # noqa: E402
+from onyx.natural_language_processing.utils import get_tokenizer  # noqa: E402
+from onyx.utils.text_processing import clean_text  # noqa: E402
+
+
+def _make_document(num_sections: int) -> Document:
+    return Document(
+        id=f"benchmark_{num_sections}",
+        source=DocumentSource.SLACK,
+        semantic_identifier="Benchmark thread",
+        metadata={},
+        doc_updated_at=None,
+        sections=[
+            Section(
+                text=f"Reply number {i} in a long thread, mentioning ticket #{i * 7}.",
+                link=f"https://example.com/thread/{i}",
+            )
+            for i in range(num_sections)
+        ],
+    )
+
+
+def _reference_chunk_contents(
+    tokenizer: BaseTokenizer, document: Document, content_token_limit: int
+) -> list[str]:
+    """Chunking of small sections as it was done before running token counts"""
+    contents: list[str] = []
+    chunk_text = ""
+    for section in document.sections:
+        section_text = clean_text(section.text)
+        section_token_count = len(tokenizer.tokenize(section_text))
+        current_token_count = len(tokenizer.tokenize(chunk_text))
+        next_section_tokens = (
+            len(tokenizer.tokenize(SECTION_SEPARATOR)) + section_token_count
+        )
+        if next_section_tokens + current_token_count <= content_token_limit:
+            if chunk_text:
+                chunk_text += SECTION_SEPARATOR
+            chunk_text += section_text
+        else:
+            contents.append(chunk_text)
+            chunk_text = section_text
+    if chunk_text.strip() or not contents:
+        contents.append(chunk_text)
+    return contents
+
+
+def main(section_counts: list[int], chunk_token_limit: int, model_name: str) -> None:
+    tokenizer = get_tokenizer(model_name=model_name, provider_type=None)
+    chunker = Chunker(
+        tokenizer=tokenizer,
+        enable_multipass=False,
+        chunk_token_limit=chunk_token_limit,
+    )
+
+    print(f"tokenizer={model_name} chunk_token_limit={chunk_token_limit}")
+    for num_sections in section_counts:
+        document = _make_document(num_sections)
+
+        start = time.perf_counter()
+        chunks = chunker._chunk_document(
+            document,
+            title_prefix="",
+            metadata_suffix_semantic="",
+            metadata_suffix_keyword="",
+            content_token_limit=chunk_token_limit,
+        )
+        elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        reference_contents = _reference_chunk_contents(
+            tokenizer, document, chunk_token_limit
+        )
+        reference_elapsed = time.perf_counter() - start
+
+        if [chunk.content for chunk in chunks] != reference_contents:
+            raise RuntimeError(f"Chunks differ from the reference: {num_sections=}")
+
+        print(
+            f"sections={num_sections:>6} chunks={len(chunks):>4} "
+            f"chunker {elapsed * 1e6 / num_sections:7.1f} us/section, "
+            f"reference {reference_elapsed * 1e6 / num_sections:8.1f} us/section, "
+            f"speedup {reference_elapsed / elapsed:5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark chunking of documents with many small sections"
+    )
+    parser.add_argument("--sections", type=int, nargs="+", default=[1000, 4000, 16000])
+    parser.add_argument("--chunk-token-limit", type=int, default=8192)
+    parser.add_argument("--model-name", default="intfloat/e5-base-v2")
+    args = parser.parse_args()
+
+    main(args.sections, args.chunk_token_limit, args.model_name)
@@ -0,0 +1,121 @@
+"""Benchmarks the streaming citation processor on long answers.
+
+Streams a synthetic answer of prose with citations and code blocks through the
+`CitationProcessor` and reports the time per token at the start and the end of the
+answer. The processing time per token should not grow with the length of the answer.
+
+Usage:
+    python scripts/benchmark_citation_processing.py [--tokens 20000] [--runs 5]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+# makes it so `PYTHONPATH=.` is not required when running this script
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+
+from onyx.chat.models import LlmDoc  # noqa: E402
+from onyx.chat.stream_processing.citation_processing import (  # noqa: E402
+    CitationProcessor,
+)
+from onyx.chat.stream_processing.utils import DocumentIdOrderMapping  # noqa: E402
+from onyx.configs.constants import DocumentSource  # noqa: E402
+
+NUM_DOCS = 10
+# tokens at the start / end of the answer the time per token is measured over
+WINDOW = 1000
+
+_PROSE_TOKENS = [" the", " index", " is", " updated", " when", " a", " document", ","]
+_CODE_TOKENS = ["    ", "return", " x", " +", " 1", "\n", "def", " f", "(x):", "\n"]
+
+
+def _docs() -> list[LlmDoc]:
+    return [
+        LlmDoc(
+            document_id=f"doc_{i}",
+            content="Document is a doc",
+            blurb=f"Document #{i}",
+            semantic_identifier=f"Doc {i}",
+            source_type=DocumentSource.WEB,
+            metadata={},
+            updated_at=datetime.now(),
+            link=f"https://{i}.com" if i % 2 == 0 else None,
+            source_links=None,
+            match_highlights=[],
+        )
+        for i in range(NUM_DOCS)
+    ]
+
+
+def _answer_tokens(num_tokens: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    tokens: list[str] = []
+    while len(tokens) < num_tokens:
+        for _ in range(rng.randint(20, 80)):
+            tokens.append(rng.choice(_PROSE_TOKENS))
+        # citations are often split over several tokens
+        citation = f"[{rng.randint(1, NUM_DOCS)}]"
+        tokens.extend([" [", citation[1:]] if rng.random() < 0.5 else [citation])
+        tokens.append(".")
+        if rng.random() < 0.2:
+            tokens.append("\n```\n")
+            tokens.extend(rng.choice(_CODE_TOKENS) for _ in range(rng.randint(20, 60)))
+            tokens.append("\n```\n")
+    return tokens[:num_tokens]
+
+
+def _run(tokens: list[str], docs: list[LlmDoc]) -> list[float]:
+    doc_order = DocumentIdOrderMapping(
+        order_mapping={doc.document_id: i for i, doc in enumerate(docs, start=1)}
+    )
+    processor = CitationProcessor(
+        context_docs=docs,
+        final_doc_id_to_rank_map=doc_order,
+        display_doc_id_to_rank_map=doc_order,
+        stop_stream=None,
+    )
+
+    durations: list[float] = []
+    for token in tokens:
+        start = time.perf_counter()
+        for _ in processor.process_token(token):
+            pass
+        durations.append(time.perf_counter() - start)
+    for _ in processor.process_token(None):
+        pass
+    return durations
+
+
+def main(num_tokens: int, runs: int) -> None:
+    docs = _docs()
+    tokens = _answer_tokens(num_tokens)
+    window = min(WINDOW, num_tokens // 2)
+
+    totals: list[float] = []
+    first_window: list[float] = []
+    last_window: list[float] = []
+    for _ in range(runs):
+        durations = _run(tokens, docs)
+        totals.append(sum(durations))
+        first_window.append(sum(durations[:window]) / window)
+        last_window.append(sum(durations[-window:]) / window)
+
+    best = min(range(runs), key=lambda run: totals[run])
+    print(f"tokens: {num_tokens}, characters: {sum(len(token) for token in tokens)}")
+    print(f"total (best of {runs}): {totals[best] * 1000:.1f} ms")
+    print(f"per token, first {window} tokens: {first_window[best] * 1e6:.2f} us")
+    print(f"per token, last {window} tokens: {last_window[best] * 1e6:.2f} us")
+    print(f"last / first: {last_window[best] / first_window[best]:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the citation processor")
+    parser.add_argument("--tokens", type=int, default=20_000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    main(num_tokens=args.tokens, runs=args.runs)
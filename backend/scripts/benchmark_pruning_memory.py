@@ -0,0 +1,98 @@
+"""Benchmarks the memory used to compute the documents to prune.
+
+Compares holding the source and indexed document ids in Python sets against the
+`DocumentIdStore` used by the pruning task. Each approach runs in its own process and
+the growth of its peak resident memory is reported. The ids are synthetic, about the
+length of a URL, and 1% of the indexed documents are no longer in the source.
+
+Usage:
+    python scripts/benchmark_pruning_memory.py [--docs 1000000]
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import time
+from collections.abc import Iterator
+
+# makes it so `PYTHONPATH=.` is not required when running this script
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+
+from onyx.background.celery.tasks.pruning.utils import DocumentIdStore  # noqa: E402
+from onyx.utils.batching import batch_generator  # noqa: E402
+
+MODES = ("set", "store")
+# ids per batch returned by a connector
+CONNECTOR_BATCH_SIZE = 100
+
+
+def _doc_id(i: int) -> str:
+    return f"https://wiki.example.com/spaces/engineering/pages/{i:012d}"
+
+
+def _source_ids(num_docs: int) -> Iterator[str]:
+    # every 100th indexed document was deleted in the source
+    return (_doc_id(i) for i in range(num_docs) if i % 100 != 0)
+
+
+def _indexed_ids(num_docs: int) -> Iterator[str]:
+    return (_doc_id(i) for i in range(num_docs))
+
+
+def _prune_with_sets(num_docs: int) -> int:
+    source_ids: set[str] = set()
+    for batch in batch_generator(_source_ids(num_docs), CONNECTOR_BATCH_SIZE):
+        source_ids.update(batch)
+    indexed_ids = set(_indexed_ids(num_docs))
+    return len(indexed_ids - source_ids)
+
+
+def _prune_with_store(num_docs: int) -> int:
+    with DocumentIdStore() as source_ids, DocumentIdStore() as to_remove:
+        for batch in batch_generator(_source_ids(num_docs), CONNECTOR_BATCH_SIZE):
+            source_ids.add(batch)
+        to_remove.add(source_ids.missing(_indexed_ids(num_docs)))
+        return sum(1 for _ in to_remove)
+
+
+def _max_rss_kib() -> int:
+    # KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run(mode: str, num_docs: int) -> None:
+    baseline = _max_rss_kib()
+    start = time.perf_counter()
+    if mode == "set":
+        num_to_remove = _prune_with_sets(num_docs)
+    else:
+        num_to_remove = _prune_with_store(num_docs)
+    elapsed = time.perf_counter() - start
+
+    peak_mib = (_max_rss_kib() - baseline) / 1024
+    print(
+        f"{mode:>5}: docs={num_docs} to_remove={num_to_remove} "
+        f"peak_rss_growth={peak_mib:.1f} MiB time={elapsed:.1f}s"
+    )
+
+
+def main(num_docs: int) -> None:
+    for mode in MODES:
+        subprocess.run(
+            [sys.executable, __file__, "--docs", str(num_docs), "--mode", mode],
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the pruning memory")
+    parser.add_argument("--docs", type=int, default=1_000_000)
+    parser.add_argument("--mode", choices=MODES, default=None)
+    args = parser.parse_args()
+
+    if args.mode:
+        run(mode=args.mode, num_docs=args.docs)
+    else:
+        main(num_docs=args.docs)
@@ -0,0 +1,150 @@
+"""Moves the content of the files in the file store between Postgres large objects and
+S3 compatible object storage.
+
+The records of the files stay in Postgres, only where their content is stored
+changes. Each file is streamed chunk by chunk, as a multipart upload when moving to
+object storage, so large files are never fully loaded into memory. The record is
+updated and the old copy deleted in one transaction per file, and files are read from
+wherever their record points to, so this can run while Onyx is serving requests and
+can be stopped and rerun at any time.
+
+Set FILE_STORE_TYPE to the target store before running this, so files saved in the
+meantime are saved there as well. When moving to S3 the bucket and credentials are
+taken from the S3_* settings.
+
+Usage:
+    python scripts/migrate_file_store.py --to s3 [--tenant-id TENANT_ID] [--batch-size 100]
+"""
+import argparse
+import os
+import sys
+
+# makes it so `PYTHONPATH=.` is not required when running this script
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(parent_dir)
+
+from onyx.configs.constants import FileStoreType  # noqa: E402
+from onyx.db.engine import get_session_with_tenant  # noqa: E402
+from onyx.db.pg_file_store import create_populate_lobj  # noqa: E402
+from onyx.db.pg_file_store import delete_lobj_by_id  # noqa: E402
+from onyx.db.pg_file_store import get_pg_conn_from_session  # noqa: E402
+from onyx.db.pg_file_store import get_pgfilestore_by_file_name  # noqa: E402
+from onyx.db.pg_file_store import get_pgfilestore_file_names  # noqa: E402
+from onyx.file_store.file_store import S3BackedFileStore  # noqa: E402
+from onyx.utils.logger import setup_logger  # noqa: E402
+from shared_configs.contextvars import CURRENT_TENANT_ID_CONTEXTVAR  # noqa: E402
+
+logger = setup_logger()
+
+
+def _move_to_object_storage(file_name: str, file_store: S3BackedFileStore) -> bool:
+    db_session = file_store.db_session
+    file_record = get_pgfilestore_by_file_name(file_name, db_session)
+    if file_record.lobj_oid is None:
+        return False
+
+    object_key = file_store.get_object_key(file_name)
+    large_object = get_pg_conn_from_session(db_session).lobject(
+        file_record.lobj_oid, mode="rb"
+    )
+    try:
+        file_store.get_object_storage(file_store.bucket_name).upload(
+            object_key, large_object
+        )
+    finally:
+        large_object.close()
+
+    delete_lobj_by_id(file_record.lobj_oid, db_session)
+    file_record.lobj_oid = None
+    file_record.bucket_name = file_store.bucket_name
+    file_record.object_key = object_key
+    db_session.commit()
+    return True
+
+
+def _move_to_postgres(file_name: str, file_store: S3BackedFileStore) -> bool:
+    db_session = file_store.db_session
+    file_record = get_pgfilestore_by_file_name(file_name, db_session)
+    if (
+        file_record.lobj_oid is not None
+        or file_record.bucket_name is None
+        or file_record.object_key is None
+    ):
+        return False
+
+    object_storage = file_store.get_object_storage(file_record.bucket_name)
+    with object_storage.open(file_record.object_key) as content:
+        lobj_oid = create_populate_lobj(content, db_session)
+
+    object_key = file_record.object_key
+    file_record.lobj_oid = lobj_oid
+    file_record.bucket_name = None
+    file_record.object_key = None
+    db_session.commit()
+
+    # the record no longer points to it, a leftover object only takes up space
+    try:
+        object_storage.delete(object_key)
+    except Exception:
+        logger.exception(f"Failed to delete object {object_key}")
+    return True
+
+
+def main(target: FileStoreType, tenant_id: str | None, batch_size: int) -> None:
+    if tenant_id:
+        CURRENT_TENANT_ID_CONTEXTVAR.set(tenant_id)
+    move_file = (
+        _move_to_object_storage if target == FileStoreType.S3 else _move_to_postgres
+    )
+
+    total_moved = 0
+    total_failed = 0
+    last_file_name: str | None = None
+    while True:
+        with get_session_with_tenant(tenant_id) as db_session:
+            file_names = get_pgfilestore_file_names(
+                db_session,
+                in_object_storage=target == FileStoreType.POSTGRES,
+                limit=batch_size,
+                after_file_name=last_file_name,
+            )
+            if not file_names:
+                break
+            last_file_name = file_names[-1]
+
+            file_store = S3BackedFileStore(db_session)
+            for file_name in file_names:
+                try:
+                    if move_file(file_name, file_store):
+                        total_moved += 1
+                except Exception:
+                    db_session.rollback()
+                    logger.exception(f"Failed to move {file_name}")
+                    total_failed += 1
+
+        logger.notice(
+            f"Moved {total_moved} files to {target.value} so far, {total_failed} failed"
+        )
+
+    logger.notice(
+        f"Done. Moved {total_moved} files to {target.value}, {total_failed} failed "
+        "and can be retried by running this again."
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Move the content of the file store to another storage"
+    )
+    parser.add_argument(
+        "--to",
+        type=FileStoreType,
+        choices=list(FileStoreType),
+        required=True,
+        help="Where to move the files to",
+    )
+    parser.add_argument("--tenant-id", type=str, default=None)
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    main(target=args.to, tenant_id=args.tenant_id, batch_size=args.batch_size)
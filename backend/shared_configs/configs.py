@@ -20,6 +20,32 @@ INDEXING_MODEL_SERVER_PORT = int(
     os.environ.get("INDEXING_MODEL_SERVER_PORT") or MODEL_SERVER_PORT
 )
 
+
+def parse_model_server_hosts(
+    hosts_str: str, default_port: int
+) -> list[tuple[str, int]]:
+    """Parses a comma separated list of `host[:port]` entries"""
+    hosts: list[tuple[str, int]] = []
+    for entry in hosts_str.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        host, _, port = entry.rpartition(":")
+        if host and port.isdigit():
+            hosts.append((host, int(port)))
+        else:
+            hosts.append((entry, default_port))
+    return hosts
+
+
+# Additional replicas of the indexing model server, as a comma separated list of
+# `host[:port]`. Indexing spreads its embedding requests round-robin over the main
+# indexing model server and these (useful when they are not behind a load balancer).
+INDEXING_MODEL_SERVER_ADDITIONAL_HOSTS = parse_model_server_hosts(
+    os.environ.get("INDEXING_MODEL_SERVER_ADDITIONAL_HOSTS") or "",
+    default_port=INDEXING_MODEL_SERVER_PORT,
+)
+
 # Onyx custom Deep Learning Models
 CONNECTOR_CLASSIFIER_MODEL_REPO = "Danswer/filter-extraction-model"
 CONNECTOR_CLASSIFIER_MODEL_TAG = "1.0.0"
@@ -68,6 +94,22 @@ LOG_LEVEL = os.environ.get("LOG_LEVEL", "info")
 # allow us to specify a custom timeout
 API_BASED_EMBEDDING_TIMEOUT = int(os.environ.get("API_BASED_EMBEDDING_TIMEOUT", "600"))
 
+# Local model embedding requests (e.g. concurrent single query embeddings) which arrive within
+# this many milliseconds of each other are coalesced into shared forward passes.
+# 0 disables coalescing.
+EMBEDDING_COALESCE_WINDOW_MS = float(
+    os.environ.get("EMBEDDING_COALESCE_WINDOW_MS") or 0
+)
+# Max number of texts in a coalesced batch, larger requests are not coalesced at all
+EMBEDDING_COALESCE_MAX_BATCH_SIZE = int(
+    os.environ.get("EMBEDDING_COALESCE_MAX_BATCH_SIZE") or 64
+)
+# Budget for the padded size of a single forward pass in characters
+# (number of texts * longest text), used as a cheap proxy for padded tokens
+EMBEDDING_COALESCE_MAX_PADDED_CHARS = int(
+    os.environ.get("EMBEDDING_COALESCE_MAX_PADDED_CHARS") or 64 * 2048
+)
+
 # Only used for OpenAI
 OPENAI_EMBEDDING_TIMEOUT = int(
     os.environ.get("OPENAI_EMBEDDING_TIMEOUT", API_BASED_EMBEDDING_TIMEOUT)
@@ -95,6 +137,7 @@ PRESERVED_SEARCH_FIELDS = [
     "normalize",
     "passage_prefix",
     "query_prefix",
+    "embedding_precision",
 ]
 
 
@@ -9,3 +9,31 @@ def batch_list(
     batch_size: int,
 ) -> list[list[T]]:
     return [lst[i : i + batch_size] for i in range(0, len(lst), batch_size)]
+
+
+def batch_by_token_budget(
+    lengths: list[int],
+    token_budget: int,
+    max_batch_size: int,
+) -> list[list[int]]:
+    """Groups item indices into batches whose padded size (number of items * longest
+    item, in tokens) stays within `token_budget`. Items are sorted longest first so that
+    items of similar length end up together. A single item larger than the budget still
+    gets a batch of its own."""
+    order = sorted(range(len(lengths)), key=lambda ind: lengths[ind], reverse=True)
+
+    batches: list[list[int]] = []
+    current: list[int] = []
+    for ind in order:
+        # sorted longest first, so the first item of the batch is the longest
+        longest = lengths[current[0]] if current else lengths[ind]
+        if current and (
+            len(current) >= max_batch_size
+            or longest * (len(current) + 1) > token_budget
+        ):
+            batches.append(current)
+            current = []
+        current.append(ind)
+    if current:
+        batches.append(current)
+    return batches
@@ -0,0 +1,122 @@
+import asyncio
+import threading
+
+import pytest
+
+from model_server.embedding_batcher import EmbeddingBatcher
+from shared_configs.model_server_models import Embedding
+
+
+class FakeEncoder:
+    """Embeds a text as [len(text)] and records the batches it was called with"""
+
+    def __init__(self, fail: bool = False) -> None:
+        self.fail = fail
+        self.calls: list[list[str]] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, texts: list[str]) -> list[Embedding]:
+        with self._lock:
+            self.calls.append(texts)
+        if self.fail:
+            raise RuntimeError("model failed")
+        return [[float(len(text))] for text in texts]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_coalesced() -> None:
+    batcher = EmbeddingBatcher(
+        max_wait_ms=50, max_batch_texts=64, max_padded_chars=100_000
+    )
+    encoder = FakeEncoder()
+
+    requests = [["a" * (i + 1)] for i in range(10)] + [["bb", "c", "dddd"]]
+    results = await asyncio.gather(
+        *(batcher.embed("model", texts, encoder) for texts in requests)
+    )
+
+    # every request gets its own embeddings back, in its own order
+    for texts, embeddings in zip(requests, results):
+        assert embeddings == [[float(len(text))] for text in texts]
+
+    assert len(encoder.calls) == 1
+    assert batcher.num_requests == 11
+    assert batcher.num_forward_batches == 1
+
+
+@pytest.mark.asyncio
+async def test_different_keys_are_not_mixed() -> None:
+    batcher = EmbeddingBatcher(
+        max_wait_ms=20, max_batch_texts=64, max_padded_chars=100_000
+    )
+    encoder_a = FakeEncoder()
+    encoder_b = FakeEncoder()
+
+    await asyncio.gather(
+        batcher.embed("a", ["x"], encoder_a),
+        batcher.embed("b", ["y"], encoder_b),
+        batcher.embed("a", ["z"], encoder_a),
+    )
+
+    assert encoder_a.calls == [["x", "z"]]
+    assert encoder_b.calls == [["y"]]
+
+
+@pytest.mark.asyncio
+async def test_padded_size_budget_splits_by_length() -> None:
+    batcher = EmbeddingBatcher(max_wait_ms=20, max_batch_texts=64, max_padded_chars=40)
+    encoder = FakeEncoder()
+
+    long_text = "l" * 20
+    short_texts = ["s" * 2 for _ in range(10)]
+    results = await asyncio.gather(
+        batcher.embed("model", [long_text], encoder),
+        batcher.embed("model", short_texts, encoder),
+    )
+
+    assert results[0] == [[20.0]]
+    assert results[1] == [[2.0]] * 10
+    # the long text is not padding all of the short ones
+    assert [len(call) for call in encoder.calls] == [2, 9]
+    assert all(
+        len(call) * max(len(text) for text in call) <= 40 for call in encoder.calls
+    )
+
+
+@pytest.mark.asyncio
+async def test_full_batch_flushes_without_waiting() -> None:
+    batcher = EmbeddingBatcher(
+        max_wait_ms=10_000, max_batch_texts=4, max_padded_chars=100_000
+    )
+    encoder = FakeEncoder()
+
+    results = await asyncio.wait_for(
+        asyncio.gather(
+            batcher.embed("model", ["a", "b"], encoder),
+            batcher.embed("model", ["c", "d"], encoder),
+            # large enough to go straight through on its own
+            batcher.embed("model", ["e", "f", "g", "h", "i"], encoder),
+        ),
+        timeout=5,
+    )
+
+    assert results[0] == [[1.0], [1.0]]
+    # forward passes are still capped at max_batch_texts
+    assert sorted(len(call) for call in encoder.calls) == [1, 4, 4]
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_coalesced_request() -> None:
+    batcher = EmbeddingBatcher(
+        max_wait_ms=20, max_batch_texts=64, max_padded_chars=100_000
+    )
+    encoder = FakeEncoder(fail=True)
+
+    results = await asyncio.gather(
+        batcher.embed("model", ["a"], encoder),
+        batcher.embed("model", ["b"], encoder),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len(encoder.calls) == 1
@@ -0,0 +1,189 @@
+import asyncio
+import uuid
+from collections.abc import Awaitable
+from collections.abc import Callable
+from typing import cast
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import instance_state
+
+from onyx.auth.schemas import UserRole
+from onyx.auth.user_cache import _collect_bulk_user_changes
+from onyx.auth.user_cache import _collect_changed_users
+from onyx.auth.user_cache import _invalidate_changed_users
+from onyx.auth.user_cache import AuthUserCache
+from onyx.auth.user_cache import AuthUserCacheKind
+from onyx.db.models import ApiKey
+from onyx.db.models import OAuthAccount
+from onyx.db.models import User
+from tests.unit.onyx.redis.conftest import FakePubSubBroker
+from tests.unit.onyx.redis.conftest import wait_for
+
+
+def _make_cache(broker: FakePubSubBroker, ttl_seconds: float = 60) -> AuthUserCache:
+    cache = AuthUserCache(
+        ttl_seconds=ttl_seconds, max_entries=10, redis_client_factory=broker.client
+    )
+    cache.version()
+    wait_for(lambda: cache._subscribed)
+    return cache
+
+
+def _make_user() -> User:
+    user_id = uuid.uuid4()
+    return User(
+        id=user_id,
+        email="user@example.com",
+        role=UserRole.BASIC,
+        is_active=True,
+        chosen_assistants=[1, 2],
+        oauth_accounts=[
+            OAuthAccount(
+                id=uuid.uuid4(),
+                user_id=user_id,
+                oauth_name="google",
+                access_token="access-token",
+                account_id="account",
+                account_email="user@example.com",
+            )
+        ],
+    )
+
+
+def _load_counting(
+    user: User | None,
+) -> tuple[MagicMock, Callable[[], Awaitable[User | None]]]:
+    calls = MagicMock()
+
+    async def load_user() -> User | None:
+        calls()
+        return user
+
+    return calls, load_user
+
+
+def test_cached_users_are_detached_copies() -> None:
+    cache = _make_cache(FakePubSubBroker())
+    user = _make_user()
+    calls, load_user = _load_counting(user)
+
+    first = asyncio.run(
+        cache.get_or_load_user(AuthUserCacheKind.TOKEN, "token", load_user)
+    )
+    second = asyncio.run(
+        cache.get_or_load_user(AuthUserCacheKind.TOKEN, "token", load_user)
+    )
+
+    assert calls.call_count == 1
+    assert first is user
+    assert second is not None and second is not user
+    assert instance_state(second).detached
+    assert second.id == user.id and second.role == UserRole.BASIC
+    assert second.oauth_accounts[0].access_token == "access-token"
+    # modifying a copy does not affect the cached user
+    cast(list, second.chosen_assistants).append(3)
+    third = cast(User, cache.get(AuthUserCacheKind.TOKEN, "token"))
+    assert third.chosen_assistants == [1, 2]
+
+    stats = cache.stats()[AuthUserCacheKind.TOKEN]
+    assert (stats.hits, stats.misses) == (2, 1)
+    assert stats.hit_rate == 2 / 3
+
+
+def test_missing_users_are_not_cached() -> None:
+    cache = _make_cache(FakePubSubBroker())
+    calls, load_user = _load_counting(None)
+
+    for _ in range(2):
+        asyncio.run(cache.get_or_load_user(AuthUserCacheKind.API_KEY, "key", load_user))
+
+    assert calls.call_count == 2
+
+
+def test_entries_expire() -> None:
+    cache = _make_cache(FakePubSubBroker(), ttl_seconds=0)
+    cache.put(AuthUserCacheKind.TOKEN_DATA, "token", "user", {"sub": "user"}, 1)
+
+    assert cache.get(AuthUserCacheKind.TOKEN_DATA, "token") is None
+
+
+def test_logout_and_user_changes_invalidate_other_processes() -> None:
+    broker = FakePubSubBroker()
+    cache, other_cache = _make_cache(broker), _make_cache(broker)
+    user, other_user = _make_user(), _make_user()
+    for c in (cache, other_cache):
+        c.put(AuthUserCacheKind.TOKEN, "token", str(user.id), user, c.version())
+        c.put(
+            AuthUserCacheKind.TOKEN_DATA,
+            "token",
+            str(user.id),
+            {"sub": str(user.id)},
+            c.version(),
+        )
+        c.put(
+            AuthUserCacheKind.API_KEY,
+            "key",
+            str(other_user.id),
+            other_user,
+            c.version(),
+        )
+
+    cache.publish_invalidation(token_hashes=["token"])
+
+    assert cache.get(AuthUserCacheKind.TOKEN, "token") is None
+    wait_for(lambda: other_cache.get(AuthUserCacheKind.TOKEN_DATA, "token") is None)
+    assert other_cache.get(AuthUserCacheKind.TOKEN, "token") is None
+    assert other_cache.get(AuthUserCacheKind.API_KEY, "key") is not None
+
+    # e.g. the API key was revoked
+    cache.publish_invalidation(user_ids=[str(other_user.id)])
+    wait_for(lambda: other_cache.get(AuthUserCacheKind.API_KEY, "key") is None)
+
+
+def test_user_loaded_before_a_change_is_not_cached() -> None:
+    cache = _make_cache(FakePubSubBroker())
+    user = _make_user()
+
+    version = cache.version()
+    cache.invalidate(user_ids=[str(user.id)])
+    cache.put(AuthUserCacheKind.TOKEN, "token", str(user.id), user, version)
+
+    assert cache.get(AuthUserCacheKind.TOKEN, "token") is None
+
+
+def test_committed_user_changes_are_published() -> None:
+    user = _make_user()
+    api_key = ApiKey(id=1, user_id=uuid.uuid4())
+    session = MagicMock()
+    session.info = {}
+    session.dirty = {user}
+    session.deleted = {api_key}
+    cache = MagicMock()
+
+    _collect_changed_users(cast(Session, session), None)
+    with patch("onyx.auth.user_cache.get_auth_user_cache", return_value=cache):
+        _invalidate_changed_users(cast(Session, session))
+
+    cache.publish_invalidation.assert_called_once_with(
+        user_ids=sorted([str(user.id), str(api_key.user_id)]), all_users=False
+    )
+    assert session.info == {}
+
+
+def test_bulk_user_updates_invalidate_all_users() -> None:
+    session = MagicMock()
+    session.info = {}
+    orm_execute_state = MagicMock()
+    orm_execute_state.is_update = True
+    orm_execute_state.bind_mapper = inspect(User)
+    orm_execute_state.session = session
+    cache = MagicMock()
+
+    _collect_bulk_user_changes(orm_execute_state)
+    with patch("onyx.auth.user_cache.get_auth_user_cache", return_value=cache):
+        _invalidate_changed_users(cast(Session, session))
+
+    cache.publish_invalidation.assert_called_once_with(user_ids=[], all_users=True)
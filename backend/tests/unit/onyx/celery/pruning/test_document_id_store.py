@@ -0,0 +1,72 @@
+import os
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+from typing import cast
+from unittest.mock import MagicMock
+
+from sqlalchemy.orm import Session
+
+from onyx.background.celery.celery_utils import yield_ids_from_runnable_connector
+from onyx.background.celery.tasks.pruning.utils import DocumentIdStore
+from onyx.connectors.interfaces import LoadConnector
+from onyx.connectors.interfaces import SlimConnector
+from onyx.connectors.models import SlimDocument
+from onyx.db.document import yield_document_ids_for_connector_credential_pair
+
+
+def test_store_deduplicates_and_iterates(tmp_path: Path) -> None:
+    with DocumentIdStore(directory=str(tmp_path)) as store:
+        store.add(["b", "a", "weird\nid", "ü"])
+        store.add(iter(["a", "c"]))
+
+        assert len(store) == 5
+        assert sorted(store) == sorted(["a", "b", "c", "weird\nid", "ü"])
+        assert len(os.listdir(tmp_path)) == 1
+
+    # the file is removed on close
+    assert os.listdir(tmp_path) == []
+
+
+def test_missing_is_anti_join(tmp_path: Path) -> None:
+    source_ids = [f"doc_{i}" for i in range(0, 2000, 2)]
+    indexed_ids = (f"doc_{i}" for i in range(1500))
+
+    with DocumentIdStore(directory=str(tmp_path)) as store:
+        store.add(source_ids)
+
+        missing = list(store.missing(indexed_ids))
+
+    assert missing == [f"doc_{i}" for i in range(1, 1500, 2)]
+
+
+class _SlimAndLoadConnector(SlimConnector, LoadConnector):
+    def load_credentials(self, credentials: dict[str, Any]) -> None:
+        return None
+
+    def retrieve_all_slim_documents(self, *args: Any, **kwargs: Any) -> Iterator:
+        yield [SlimDocument(id="a"), SlimDocument(id="b")]
+        yield [SlimDocument(id="c")]
+
+    def load_from_state(self) -> Iterator:
+        raise AssertionError("full documents must not be pulled for ids")
+
+
+def test_slim_connector_ids_are_yielded_per_batch() -> None:
+    batches = list(yield_ids_from_runnable_connector(_SlimAndLoadConnector()))
+
+    assert batches == [{"a", "b"}, {"c"}]
+
+
+def test_indexed_ids_are_streamed_from_the_server() -> None:
+    db_session = MagicMock()
+    db_session.scalars.return_value = iter(["a", "b"])
+
+    ids = yield_document_ids_for_connector_credential_pair(
+        cast(Session, db_session), connector_id=1, credential_id=2
+    )
+
+    assert list(ids) == ["a", "b"]
+    stmt = db_session.scalars.call_args.args[0]
+    # set on the statement, yield_per implies a server side cursor (stream_results)
+    assert stmt.get_execution_options()["yield_per"] > 0
@@ -0,0 +1,179 @@
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from onyx.background.celery.tasks.vespa import tasks as vespa_tasks
+from onyx.background.celery.tasks.vespa.tasks import sync_document_batch
+from onyx.configs.constants import OnyxCeleryTask
+from onyx.redis import redis_object_helper
+from onyx.redis.redis_connector_credential_pair import RedisConnectorCredentialPair
+from onyx.redis.redis_document_set import RedisDocumentSet
+
+
+def _db_session_with_doc_ids(doc_ids: list[str]) -> MagicMock:
+    db_session = MagicMock()
+    db_session.scalars.return_value.yield_per.return_value = iter(doc_ids)
+    return db_session
+
+
+def _sent_batches(celery_app: MagicMock) -> list[list[str]]:
+    return [
+        call.kwargs["kwargs"]["document_ids"]
+        for call in celery_app.send_task.call_args_list
+    ]
+
+
+def test_document_set_sync_tasks_are_batched() -> None:
+    celery_app = MagicMock()
+    redis_client = MagicMock()
+    doc_ids = [f"doc_{i}" for i in range(7)]
+
+    rds = RedisDocumentSet(tenant_id=None, id=1)
+    with patch("onyx.redis.redis_document_set.VESPA_SYNC_BATCH_SIZE", 3), patch(
+        "onyx.redis.redis_document_set.construct_document_id_select_by_docset"
+    ):
+        result = rds.generate_tasks(
+            max_tasks=1024,
+            celery_app=celery_app,
+            db_session=_db_session_with_doc_ids(doc_ids),
+            redis_client=redis_client,
+            lock=MagicMock(),
+            tenant_id=None,
+        )
+
+    # the fence counts tasks, which is what the taskset tracks
+    assert result == (3, 3)
+    assert _sent_batches(celery_app) == [doc_ids[:3], doc_ids[3:6], doc_ids[6:]]
+    assert all(
+        call.args[0] == OnyxCeleryTask.VESPA_METADATA_SYNC_BATCH_TASK
+        for call in celery_app.send_task.call_args_list
+    )
+
+    # one taskset entry per task, added with the same id the task is sent with
+    task_ids = [call.args[1] for call in redis_client.sadd.call_args_list]
+    assert task_ids == [
+        call.kwargs["task_id"] for call in celery_app.send_task.call_args_list
+    ]
+    assert all(
+        RedisDocumentSet.get_id_from_task_id(task_id) == "1" for task_id in task_ids
+    )
+
+
+def test_cc_pair_sync_tasks_skip_docs_and_respect_max_tasks() -> None:
+    celery_app = MagicMock()
+    doc_ids = [f"doc_{i}" for i in range(10)]
+
+    rc = RedisConnectorCredentialPair(tenant_id=None, id=1)
+    rc.set_skip_docs({"doc_0", "doc_3"})
+    with patch(
+        "onyx.redis.redis_connector_credential_pair.VESPA_SYNC_BATCH_SIZE", 3
+    ), patch(
+        "onyx.redis.redis_connector_credential_pair.get_connector_credential_pair_from_id"
+    ), patch(
+        "onyx.redis.redis_connector_credential_pair."
+        "construct_document_id_select_for_connector_credential_pair_by_needs_sync"
+    ):
+        result = rc.generate_tasks(
+            max_tasks=2,
+            celery_app=celery_app,
+            db_session=_db_session_with_doc_ids(doc_ids),
+            redis_client=MagicMock(),
+            lock=MagicMock(),
+            tenant_id=None,
+        )
+
+    assert _sent_batches(celery_app) == [
+        ["doc_1", "doc_2", "doc_4"],
+        ["doc_5", "doc_6", "doc_7"],
+    ]
+    assert result == (2, 8)
+    assert {"doc_1", "doc_7"} <= rc.skip_docs
+
+
+def test_batch_size_of_one_sends_per_document_tasks() -> None:
+    celery_app = MagicMock()
+    redis_object_helper.send_vespa_metadata_sync_task(
+        celery_app,
+        MagicMock(),
+        taskset_key="documentset_taskset_1",
+        task_id_prefix="documentset_1",
+        document_ids=["doc_0"],
+        tenant_id=None,
+        priority=MagicMock(),
+        batch_size=1,
+    )
+
+    assert celery_app.send_task.call_args.args[0] == (
+        OnyxCeleryTask.VESPA_METADATA_SYNC_TASK
+    )
+    assert celery_app.send_task.call_args.kwargs["kwargs"] == {
+        "document_id": "doc_0",
+        "tenant_id": None,
+    }
+
+
+@pytest.fixture
+def fake_db(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
+    """Replaces the set based lookups with fakes, returns the mark-as-synced mock"""
+
+    def fake_get_documents_by_ids(
+        db_session: Any, document_ids: list[str]
+    ) -> list[MagicMock]:
+        # missing documents are simply not returned
+        return [
+            MagicMock(id=doc_id, chunk_count=1, boost=0, hidden=False)
+            for doc_id in document_ids
+            if doc_id != "deleted"
+        ]
+
+    mark_synced = MagicMock()
+    monkeypatch.setattr(vespa_tasks, "get_documents_by_ids", fake_get_documents_by_ids)
+    monkeypatch.setattr(
+        vespa_tasks,
+        "fetch_document_sets_for_documents",
+        lambda doc_ids, db_session: [(doc_id, ["set"]) for doc_id in doc_ids],
+    )
+    monkeypatch.setattr(
+        vespa_tasks, "get_access_for_documents", lambda document_ids, db_session: {}
+    )
+    monkeypatch.setattr(vespa_tasks, "mark_documents_as_synced", mark_synced)
+    return mark_synced
+
+
+def test_sync_document_batch(fake_db: MagicMock) -> None:
+    bad_request = httpx.HTTPStatusError(
+        "bad request",
+        request=httpx.Request("PUT", "http://vespa"),
+        response=httpx.Response(400),
+    )
+
+    def fake_update_single(doc_id: str, **kwargs: Any) -> int:
+        assert kwargs["fields"].document_sets == {"set"}
+        if doc_id == "flaky":
+            raise httpx.ConnectError("connection refused")
+        if doc_id == "invalid":
+            raise bad_request
+        return 2
+
+    retry_index = MagicMock()
+    retry_index.update_single.side_effect = fake_update_single
+
+    result = sync_document_batch(
+        document_ids=["a", "b", "flaky", "invalid", "deleted", "c"],
+        db_session=MagicMock(),
+        retry_index=retry_index,
+        tenant_id=None,
+        max_concurrency=4,
+    )
+
+    assert sorted(result.synced_doc_ids) == ["a", "b", "c"]
+    assert result.chunks_affected == 6
+    # only errors which may go away are retried
+    assert result.failed_doc_ids == ["flaky"]
+    assert isinstance(result.last_exception, httpx.ConnectError)
+    # the whole batch is marked synced at once
+    fake_db.assert_called_once()
+    assert sorted(fake_db.call_args.args[0]) == ["a", "b", "c"]
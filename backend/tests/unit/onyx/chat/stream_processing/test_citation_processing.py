@@ -1,3 +1,5 @@
+import random
+import re
 from datetime import datetime
 
 import pytest
@@ -5,7 +7,12 @@ import pytest
 from onyx.chat.models import CitationInfo
 from onyx.chat.models import LlmDoc
 from onyx.chat.models import OnyxAnswerPiece
+from onyx.chat.stream_processing.citation_processing import _CodeBlockTracker
+from onyx.chat.stream_processing.citation_processing import (
+    _ends_with_possible_citation,
+)
 from onyx.chat.stream_processing.citation_processing import CitationProcessor
+from onyx.chat.stream_processing.citation_processing import in_code_block
 from onyx.chat.stream_processing.utils import DocumentIdOrderMapping
 from onyx.configs.constants import DocumentSource
 
@@ -436,3 +443,24 @@ def test_citation_extraction(
     ] == expected_citations, (
         f"Test '{test_name}' failed: Citations do not match expected output."
     )
+
+
+def test_code_block_tracker_matches_full_count() -> None:
+    rng = random.Random(0)
+    for _ in range(2000):
+        tracker = _CodeBlockTracker()
+        text = ""
+        for _ in range(rng.randint(1, 20)):
+            token = "".join(rng.choice("``` a\n") for _ in range(rng.randint(0, 8)))
+            tracker.feed(token)
+            text += token
+            assert tracker.in_code_block == in_code_block(text), repr(text)
+
+
+def test_possible_citation_matches_regex() -> None:
+    rng = random.Random(0)
+    for _ in range(5000):
+        text = "".join(rng.choice("[]12a\n٣") for _ in range(rng.randint(0, 8)))
+        assert _ends_with_possible_citation(text) == bool(
+            re.search(r"(\[+\d*$)", text)
+        ), repr(text)
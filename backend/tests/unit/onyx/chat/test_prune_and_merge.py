@@ -1,9 +1,14 @@
+from unittest.mock import patch
+
 import pytest
 
+from onyx.chat.prune_and_merge import _apply_pruning
 from onyx.chat.prune_and_merge import _merge_sections
 from onyx.configs.constants import DocumentSource
 from onyx.context.search.models import InferenceChunk
 from onyx.context.search.models import InferenceSection
+from onyx.llm.interfaces import LLMConfig
+from onyx.natural_language_processing.utils import BaseTokenizer
 
 
 # This large test accounts for all of the following:
@@ -228,3 +233,65 @@ def test_merge_minimal_sections(
     merged_sections = _merge_sections(sections)
     assert merged_sections[0].combined_content == expected_content
     assert merged_sections[0].center_chunk == expected_center_chunk
+
+
+class WordTokenizer(BaseTokenizer):
+    """One token per word, counts how much text it had to encode"""
+
+    def __init__(self) -> None:
+        self.encoded_texts = 0
+
+    def encode(self, string: str) -> list[int]:
+        self.encoded_texts += 1
+        return [len(word) for word in string.split()]
+
+    def tokenize(self, string: str) -> list[str]:
+        return string.split()
+
+    def decode(self, tokens: list[int]) -> str:
+        return " ".join("x" * token for token in tokens)
+
+
+def _prune(
+    sections: list[InferenceSection], token_limit: int
+) -> list[InferenceSection]:
+    return _apply_pruning(
+        sections=sections,
+        section_relevance_list=None,
+        token_limit=token_limit,
+        is_manually_selected_docs=False,
+        use_sections=True,
+        using_tool_message=False,
+        llm_config=LLMConfig(model_provider="test", model_name="test", temperature=0),
+    )
+
+
+def test_pruning_reuses_token_counts_and_copies_on_write() -> None:
+    tokenizer = WordTokenizer()
+    sections = [
+        InferenceSection(
+            center_chunk=chunk,
+            chunks=[chunk],
+            combined_content=" ".join(["word"] * 50),
+        )
+        for chunk in [DOC_1_TOP_CHUNK, DOC_1_MID_CHUNK, DOC_2_TOP_CHUNK]
+    ]
+
+    with patch("onyx.chat.prune_and_merge.get_tokenizer", return_value=tokenizer):
+        pruned = _prune(sections, token_limit=150)
+        encoded_texts = tokenizer.encoded_texts
+        pruned_again = _prune(sections, token_limit=150)
+
+    # the second pass only has to encode the final section again to trim it
+    assert tokenizer.encoded_texts == encoded_texts + 1
+    assert [section.combined_content for section in pruned_again] == [
+        section.combined_content for section in pruned
+    ]
+
+    # the sections which fit are passed through, the trimmed one is a copy
+    assert len(pruned) == 3
+    assert pruned[0] is sections[0]
+    assert pruned[2] is not sections[2]
+    assert pruned[2].chunks is sections[2].chunks
+    assert len(pruned[2].combined_content.split()) < 50
+    assert sections[2].combined_content == " ".join(["word"] * 50)
@@ -0,0 +1,122 @@
+import re
+from typing import Any
+from unittest.mock import MagicMock
+
+from onyx.configs.constants import DocumentSource
+from onyx.connectors.confluence.connector import ConfluenceConnector
+from onyx.connectors.confluence.onyx_confluence import OnyxConfluence
+from onyx.connectors.interfaces import ConnectorCheckpoint
+from onyx.connectors.models import Document
+from onyx.connectors.models import Section
+
+
+# page ids per cursor of the page query, page 2 has 3 attachments
+_PAGE_IDS_BY_CURSOR: dict[str | None, list[str]] = {
+    None: ["1", "2"],
+    "a": ["3", "4"],
+    "b": ["5"],
+}
+_NEXT_CURSOR: dict[str | None, str | None] = {None: "a", "a": "b", "b": None}
+_ATTACHMENT_IDS = {"2": ["2.a", "2.b", "2.c"]}
+
+
+def _fake_get(requested_urls: list[str]) -> Any:
+    def get(path: str, advanced_mode: bool) -> MagicMock:
+        requested_urls.append(path)
+        response = MagicMock()
+
+        attachment_container = re.search(r"container='(\w+)'", path)
+        if attachment_container:
+            ids = _ATTACHMENT_IDS.get(attachment_container.group(1), [])
+            response.json.return_value = {
+                "results": [{"id": id, "type": "attachment"} for id in ids],
+                "_links": {},
+            }
+            return response
+
+        cursor_match = re.search(r"cursor=(\w+)", path)
+        cursor = cursor_match.group(1) if cursor_match else None
+        next_cursor = _NEXT_CURSOR[cursor]
+        response.json.return_value = {
+            "results": [
+                {"id": id, "type": "page"} for id in _PAGE_IDS_BY_CURSOR[cursor]
+            ],
+            "_links": (
+                # like confluence, the next links keep the limit of the request
+                {
+                    "next": f"rest/api/content/search?cql=type=page"
+                    f"&cursor={next_cursor}&limit=2"
+                }
+                if next_cursor
+                else {}
+            ),
+        }
+        return response
+
+    return get
+
+
+def _connector() -> tuple[ConfluenceConnector, list[str]]:
+    connector = ConfluenceConnector(
+        wiki_base="https://example.atlassian.net/wiki",
+        is_cloud=True,
+        batch_size=2,
+        labels_to_skip=[],
+    )
+    client = OnyxConfluence(url="https://example.atlassian.net/wiki", cloud=True)
+    requested_urls: list[str] = []
+    client.get = _fake_get(requested_urls)  # type: ignore
+    connector._confluence_client = client
+
+    def convert(confluence_object: dict[str, Any]) -> Document:
+        return Document(
+            id=confluence_object["id"],
+            sections=[Section(link=None, text="text")],
+            source=DocumentSource.CONFLUENCE,
+            semantic_identifier=confluence_object["id"],
+            metadata={},
+        )
+
+    connector._convert_object_to_document = convert  # type: ignore
+    return connector, requested_urls
+
+
+def _ids(batches: list[tuple[list[Document], ConnectorCheckpoint]]) -> list[str]:
+    return [doc.id for batch, _ in batches for doc in batch]
+
+
+def test_confluence_resumes_without_skipping_documents() -> None:
+    connector, _ = _connector()
+    batches = list(connector.load_from_checkpoint(None, None, None))
+
+    all_ids = _ids(batches)
+    # attachments follow their page
+    assert all_ids == ["1", "2", "2.a", "2.b", "2.c", "3", "4", "5"]
+
+    num_yielded = 0
+    for batch, checkpoint in batches:
+        num_yielded += len(batch)
+        remaining_ids = all_ids[num_yielded:]
+
+        resumed_connector, requested_urls = _connector()
+        resumed_ids = _ids(
+            list(resumed_connector.load_from_checkpoint(None, None, checkpoint))
+        )
+
+        # a page which was only partially yielded is repeated, nothing is skipped
+        assert resumed_ids[len(resumed_ids) - len(remaining_ids) :] == remaining_ids
+        assert set(resumed_ids) - set(remaining_ids) <= {"2", "2.a", "2.b", "2.c"}
+
+        if checkpoint["page_position"]:
+            # resumes from the stored page of results rather than from the start
+            assert requested_urls[0] == checkpoint["page_position"]["url"]
+
+
+def test_confluence_checkpoint_after_last_page() -> None:
+    connector, _ = _connector()
+    *_, (_, last_checkpoint) = connector.load_from_checkpoint(None, None, None)
+
+    resumed_connector, _ = _connector()
+    assert (
+        list(resumed_connector.load_from_checkpoint(None, None, last_checkpoint)) == []
+    )
@@ -0,0 +1,37 @@
+from io import BytesIO
+from unittest.mock import patch
+
+import pytest
+
+from onyx.connectors.file.connector import LocalFileConnector
+
+
+@pytest.mark.parametrize("num_processes", [0, 2])
+def test_failed_files_are_skipped(num_processes: int) -> None:
+    files = iter(
+        [
+            ("a.txt", BytesIO(b"first"), {}),
+            ("broken.docx", BytesIO(b"not a docx"), {}),
+            ("b.txt", BytesIO(b"second"), {}),
+        ]
+    )
+
+    with (
+        patch("onyx.connectors.file.connector.FILE_PARSING_PROCESSES", num_processes),
+        patch(
+            "onyx.connectors.file.connector.get_unstructured_api_key",
+            return_value=None,
+        ),
+    ):
+        results = list(LocalFileConnector(file_locations=[])._process_files(files))
+
+    assert [file_name for file_name, _, _ in results] == [
+        "a.txt",
+        "broken.docx",
+        "b.txt",
+    ]
+    assert [
+        [doc.sections[0].text for doc in documents] for _, documents, _ in results
+    ] == [["first"], [], ["second"]]
+    assert results[1][2] is not None
+    assert results[0][2] is None and results[2][2] is None
@@ -0,0 +1,77 @@
+from typing import Any
+
+from onyx.connectors.interfaces import ConnectorCheckpoint
+from onyx.connectors.zendesk.connector import ZendeskConnector
+
+
+class FakeZendeskClient:
+    """Serves 3 pages of tickets from the incremental export, one of them deleted"""
+
+    def __init__(self) -> None:
+        self.pages: dict[int, dict[str, Any]] = {
+            0: {"ticket_ids": [1, 2, 3, 4], "end_time": 100},
+            100: {"ticket_ids": [5, 6, 7], "end_time": 200},
+            200: {"ticket_ids": [8, 9], "end_time": 300},
+        }
+        self.requested_start_times: list[int] = []
+
+    def make_request(self, endpoint: str, params: dict[str, Any]) -> dict[str, Any]:
+        if endpoint == "guide/content_tags":
+            return {"records": [], "meta": {"has_more": False}}
+        if endpoint.startswith("tickets/"):
+            return {"comments": []}
+
+        assert endpoint == "incremental/tickets.json"
+        self.requested_start_times.append(params["start_time"])
+        page = self.pages[params["start_time"]]
+        return {
+            "tickets": [
+                {
+                    "id": ticket_id,
+                    "subject": f"ticket {ticket_id}",
+                    "status": "deleted" if ticket_id == 6 else "open",
+                }
+                for ticket_id in page["ticket_ids"]
+            ],
+            "end_time": page["end_time"],
+            "end_of_stream": page["end_time"] == 300,
+        }
+
+
+def _connector() -> tuple[ZendeskConnector, FakeZendeskClient]:
+    connector = ZendeskConnector(batch_size=3, content_type="tickets")
+    client = FakeZendeskClient()
+    connector.client = client  # type: ignore
+    return connector, client
+
+
+def _ids(batches: list[tuple[list, ConnectorCheckpoint]]) -> list[str]:
+    return [doc.id for batch, _ in batches for doc in batch]
+
+
+def test_zendesk_tickets_resume_from_every_checkpoint() -> None:
+    connector, _ = _connector()
+    batches = list(connector.load_from_checkpoint(None, None, None))
+
+    all_ids = _ids(batches)
+    assert all_ids == [f"zendesk_ticket_{i}" for i in [1, 2, 3, 4, 5, 7, 8, 9]]
+    # the checkpoints are plain json
+    assert batches[0][1] == {"position": {"start_time": 0, "offset": 3}}
+
+    num_yielded = 0
+    for batch, checkpoint in batches:
+        num_yielded += len(batch)
+
+        resumed_connector, client = _connector()
+        resumed = list(resumed_connector.load_from_checkpoint(None, None, checkpoint))
+        assert _ids(resumed) == all_ids[num_yielded:]
+        # pages before the checkpoint are not fetched again
+        assert client.requested_start_times[0] == checkpoint["position"]["start_time"]
+
+
+def test_zendesk_poll_source_matches_checkpointed_load() -> None:
+    connector, _ = _connector()
+    polled = [doc.id for batch in connector.poll_source(None, None) for doc in batch]
+
+    connector, _ = _connector()
+    assert polled == _ids(list(connector.load_from_checkpoint(None, None, None)))
@@ -0,0 +1,33 @@
+from typing import cast
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from onyx.db.enums import EmbeddingPrecision
+from onyx.db.models import SearchSettings
+from onyx.document_index.factory import get_default_document_index
+from onyx.document_index.vespa.index import VespaIndex
+
+
+def _search_settings(index_name: str) -> SearchSettings:
+    search_settings = MagicMock()
+    search_settings.index_name = index_name
+    search_settings.large_chunks_enabled = False
+    search_settings.embedding_precision = EmbeddingPrecision.BFLOAT16
+    return cast(SearchSettings, search_settings)
+
+
+def test_multi_tenant_indices_use_float_embeddings() -> None:
+    for multi_tenant, expected_precision in [
+        (False, EmbeddingPrecision.BFLOAT16),
+        (True, EmbeddingPrecision.FLOAT),
+    ]:
+        with patch("onyx.document_index.factory.MULTI_TENANT", multi_tenant):
+            document_index = get_default_document_index(
+                _search_settings("primary"),
+                _search_settings("secondary"),
+                httpx_client=MagicMock(),
+            )
+
+        assert isinstance(document_index, VespaIndex)
+        assert document_index.embedding_precision == expected_precision
+        assert document_index.secondary_embedding_precision == expected_precision
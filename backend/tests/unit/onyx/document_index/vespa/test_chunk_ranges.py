@@ -0,0 +1,136 @@
+import math
+import threading
+import time
+from unittest.mock import MagicMock
+from unittest.mock import patch
+from uuid import UUID
+
+import httpx
+import pytest
+
+from onyx.document_index.document_index_utils import get_uuid_from_chunk_info_old
+from onyx.document_index.interfaces import MinimalDocumentIndexingInfo
+from onyx.document_index.interfaces import VespaDocumentFields
+from onyx.document_index.vespa.index import _ChunkRangeRequest
+from onyx.document_index.vespa.index import VespaIndex
+from onyx.document_index.vespa.indexing_utils import check_for_final_chunk_existence
+
+
+@pytest.mark.parametrize("num_chunks", [0, 1, 2, 3, 5, 37, 128, 1000])
+def test_final_chunk_probe_is_logarithmic(num_chunks: int) -> None:
+    existing = {
+        get_uuid_from_chunk_info_old(document_id="doc", chunk_id=i)
+        for i in range(num_chunks)
+    }
+    probes: list[UUID] = []
+
+    def fake_exists(doc_chunk_id: UUID, index_name: str, http_client: object) -> bool:
+        probes.append(doc_chunk_id)
+        return doc_chunk_id in existing
+
+    with patch(
+        "onyx.document_index.vespa.indexing_utils._does_doc_chunk_exist",
+        side_effect=fake_exists,
+    ):
+        end = check_for_final_chunk_existence(
+            minimal_doc_info=MinimalDocumentIndexingInfo(
+                doc_id="doc", chunk_start_index=0
+            ),
+            start_index=0,
+            index_name="index",
+            http_client=MagicMock(),
+        )
+
+    assert end == num_chunks
+    assert len(probes) <= 2 * math.ceil(math.log2(num_chunks + 1)) + 2
+
+
+def test_enrich_basic_chunk_infos_probes_concurrently_once() -> None:
+    probed: list[str] = []
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def fake_probe(
+        minimal_doc_info: MinimalDocumentIndexingInfo, **kwargs: object
+    ) -> int:
+        nonlocal in_flight, max_in_flight
+        with lock:
+            probed.append(minimal_doc_info.doc_id)
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        time.sleep(0.05)
+        with lock:
+            in_flight -= 1
+        return int(minimal_doc_info.doc_id.split("-")[1])
+
+    legacy_requests = [
+        _ChunkRangeRequest(
+            index_name="index", document_id=f"legacy-{i}", previous_chunk_count=None
+        )
+        for i in range(8)
+    ]
+    known_request = _ChunkRangeRequest(
+        index_name="index", document_id="known", previous_chunk_count=4
+    )
+    cache: dict = {}
+
+    with patch(
+        "onyx.document_index.vespa.index.check_for_final_chunk_existence",
+        side_effect=fake_probe,
+    ):
+        chunk_ranges = VespaIndex.enrich_basic_chunk_infos(
+            chunk_range_requests=legacy_requests + [known_request] + legacy_requests,
+            http_client=MagicMock(),
+            cache=cache,
+        )
+        # resolved ranges are reused within the run
+        VespaIndex.enrich_basic_chunk_infos(
+            chunk_range_requests=legacy_requests,
+            http_client=MagicMock(),
+            cache=cache,
+        )
+
+    assert list(chunk_ranges) == legacy_requests + [known_request]
+    assert sorted(probed) == sorted(request.document_id for request in legacy_requests)
+    assert max_in_flight > 1
+
+    for i, request in enumerate(legacy_requests):
+        assert chunk_ranges[request].chunk_end_index == i
+        assert chunk_ranges[request].old_version
+    assert chunk_ranges[known_request].chunk_end_index == 4
+    assert not chunk_ranges[known_request].old_version
+
+
+def test_update_single_reuses_the_chunk_ranges_of_a_run() -> None:
+    feed_client = MagicMock()
+    feed_client.feed.side_effect = [httpx.ReadTimeout("timed out"), None]
+    vespa_index = VespaIndex(
+        index_name="index",
+        secondary_index_name=None,
+        large_chunks_enabled=False,
+        secondary_large_chunks_enabled=None,
+        httpx_client=MagicMock(),
+        feed_client=feed_client,
+    )
+    chunk_range_cache: dict = {}
+
+    with patch(
+        "onyx.document_index.vespa.index.check_for_final_chunk_existence",
+        return_value=3,
+    ) as probe:
+        # e.g. retried by RetryDocumentIndex after a timeout
+        for attempt in range(2):
+            try:
+                chunks = vespa_index.update_single(
+                    "legacy",
+                    chunk_count=None,
+                    tenant_id=None,
+                    fields=VespaDocumentFields(boost=2),
+                    chunk_range_cache=chunk_range_cache,
+                )
+            except httpx.ReadTimeout:
+                assert attempt == 0
+
+    assert chunks == 3
+    assert probe.call_count == 1
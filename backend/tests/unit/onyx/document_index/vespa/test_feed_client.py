@@ -0,0 +1,147 @@
+import asyncio
+import json
+from collections.abc import Awaitable
+from collections.abc import Callable
+
+import httpx
+import pytest
+
+from onyx.document_index.vespa.feed_client import VespaFeedClient
+from onyx.document_index.vespa.feed_client import VespaFeedOperation
+
+
+class FakeVespa:
+    """Records the requests it receives and how many were in flight at once"""
+
+    def __init__(
+        self, respond: Callable[[httpx.Request, int], Awaitable[httpx.Response]]
+    ) -> None:
+        self.respond = respond
+        self.requests: list[httpx.Request] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        attempt = sum(1 for seen in self.requests if seen.url == request.url)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            return await self.respond(request, attempt)
+        finally:
+            self.in_flight -= 1
+
+
+def _feed_client(fake_vespa: FakeVespa, **kwargs: int) -> VespaFeedClient:
+    return VespaFeedClient(
+        client_factory=lambda: httpx.AsyncClient(
+            transport=httpx.MockTransport(fake_vespa)
+        ),
+        backoff_base_seconds=0.001,
+        backoff_max_seconds=0.01,
+        **kwargs,  # type: ignore
+    )
+
+
+def _operations(num: int) -> list[VespaFeedOperation]:
+    return [
+        VespaFeedOperation(
+            method="PUT",
+            url=f"http://vespa/document/v1/default/index/docid/{i}",
+            document_id=f"doc-{i // 2}",
+            body={"fields": {"boost": {"assign": i}}},
+        )
+        for i in range(num)
+    ]
+
+
+def test_feed_keeps_operations_in_flight() -> None:
+    async def respond(request: httpx.Request, attempt: int) -> httpx.Response:
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={})
+
+    fake_vespa = FakeVespa(respond)
+    feed_client = _feed_client(fake_vespa, max_in_flight=16, min_in_flight=2)
+    try:
+        stats = feed_client.feed(iter(_operations(100)))
+    finally:
+        feed_client.close()
+
+    assert stats.operations == 100
+    assert stats.retries == 0
+    assert 1 < fake_vespa.max_in_flight <= 16
+    assert sorted(
+        json.loads(request.content)["fields"]["boost"]["assign"]
+        for request in fake_vespa.requests
+    ) == list(range(100))
+    assert all(request.method == "PUT" for request in fake_vespa.requests)
+
+
+def test_feed_backs_off_when_throttled() -> None:
+    async def respond(request: httpx.Request, attempt: int) -> httpx.Response:
+        # every operation is throttled on its first two attempts
+        if attempt <= 2:
+            return httpx.Response(429)
+        return httpx.Response(200, json={})
+
+    fake_vespa = FakeVespa(respond)
+    feed_client = _feed_client(fake_vespa, max_in_flight=32, min_in_flight=2)
+    try:
+        stats = feed_client.feed(_operations(40))
+        window_size = feed_client.window_size
+    finally:
+        feed_client.close()
+
+    assert stats.throttled == 80
+    assert stats.retries == 80
+    assert len(fake_vespa.requests) == 120
+    # started at a quarter of the max and was halved while throttled
+    assert window_size is not None and window_size < 8
+
+
+def test_feed_retries_transport_errors() -> None:
+    async def respond(request: httpx.Request, attempt: int) -> httpx.Response:
+        if attempt == 1:
+            raise httpx.ConnectError("connection reset", request=request)
+        if attempt == 2:
+            return httpx.Response(502)
+        return httpx.Response(200, json={})
+
+    fake_vespa = FakeVespa(respond)
+    feed_client = _feed_client(fake_vespa)
+    try:
+        stats = feed_client.feed(_operations(5))
+    finally:
+        feed_client.close()
+
+    assert stats.retries == 10
+    assert stats.throttled == 0
+
+
+def test_feed_raises_after_finishing_other_operations() -> None:
+    async def respond(request: httpx.Request, attempt: int) -> httpx.Response:
+        if request.url.path.endswith("/3"):
+            return httpx.Response(400, text="bad field")
+        return httpx.Response(200, json={})
+
+    fake_vespa = FakeVespa(respond)
+    feed_client = _feed_client(fake_vespa)
+    try:
+        with pytest.raises(httpx.HTTPStatusError) as exc_info:
+            feed_client.feed(_operations(10))
+    finally:
+        feed_client.close()
+
+    # client errors are not retried, everything else still went through
+    assert len(fake_vespa.requests) == 10
+    assert exc_info.value.response.status_code == 400
+    assert "doc-1" in "".join(exc_info.value.__notes__)
+
+
+def test_window_is_capped_by_the_connections_without_http2() -> None:
+    # plain http:// falls back to HTTP/1.1, one request per connection
+    feed_client = VespaFeedClient(max_in_flight=256, max_connections=32, http2=False)
+    assert (feed_client.max_connections, feed_client.max_in_flight) == (32, 32)
+
+    feed_client = VespaFeedClient(max_in_flight=256, max_connections=8, http2=True)
+    assert (feed_client.max_connections, feed_client.max_in_flight) == (8, 256)
@@ -0,0 +1,109 @@
+import struct
+from types import SimpleNamespace
+from typing import Any
+from typing import cast
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from onyx.db.enums import EmbeddingPrecision
+from onyx.document_index.vespa.index import _query_embedding_param
+from onyx.document_index.vespa.indexing_utils import _vespa_embedding_fields
+from onyx.document_index.vespa.shared_utils.utils import encode_dense_tensor_hex
+from onyx.document_index.vespa_constants import EMBEDDINGS
+from onyx.document_index.vespa_constants import TITLE_EMBEDDING
+
+
+def _decode_float(hex_cells: str) -> list[float]:
+    data = bytes.fromhex(hex_cells)
+    return list(struct.unpack(f">{len(data) // 4}f", data))
+
+
+def _decode_bfloat16(hex_cells: str) -> list[float]:
+    data = bytes.fromhex(hex_cells)
+    return [
+        struct.unpack(">f", data[i : i + 2] + b"\x00\x00")[0]
+        for i in range(0, len(data), 2)
+    ]
+
+
+def test_float_cells_round_trip() -> None:
+    values = [0.0, 1.0, -2.5, 0.123456789, 3.4e38]
+
+    hex_cells = encode_dense_tensor_hex(values)
+
+    assert len(hex_cells) == 8 * len(values)
+    assert hex_cells[:16] == "000000003f800000"
+    assert _decode_float(hex_cells) == pytest.approx(values, rel=1e-7)
+
+
+def test_bfloat16_cells_round_to_nearest_even() -> None:
+    values = [
+        1.0,
+        # halfway between two bfloat16 values, rounds to the even one (1.0)
+        struct.unpack(">f", bytes.fromhex("3f808000"))[0],
+        # just above halfway, rounds up
+        struct.unpack(">f", bytes.fromhex("3f808001"))[0],
+        -0.3333333,
+    ]
+
+    hex_cells = encode_dense_tensor_hex(values, EmbeddingPrecision.BFLOAT16)
+
+    assert len(hex_cells) == 4 * len(values)
+    assert hex_cells[:12] == "3f803f803f81"
+    assert _decode_bfloat16(hex_cells)[3] == pytest.approx(-0.3333333, rel=1e-2)
+
+
+def test_bfloat16_error_is_bounded() -> None:
+    values = np.random.default_rng(0).standard_normal(1024).tolist()
+
+    decoded = _decode_bfloat16(
+        encode_dense_tensor_hex(values, EmbeddingPrecision.BFLOAT16)
+    )
+
+    # 8 bits of mantissa, rounding is off by at most half a unit in the last place
+    assert np.allclose(decoded, values, rtol=2**-8, atol=0)
+
+
+def _chunk(title_embedding: list[float] | None) -> Any:
+    return SimpleNamespace(
+        embeddings=SimpleNamespace(
+            full_embedding=[1.0, 2.0], mini_chunk_embeddings=[[3.0, 4.0]]
+        ),
+        title_embedding=title_embedding,
+    )
+
+
+def test_embedding_fields_are_hex_encoded() -> None:
+    fields = _vespa_embedding_fields(
+        cast(Any, _chunk([0.5, -0.5])), EmbeddingPrecision.BFLOAT16
+    )
+
+    assert fields == {
+        EMBEDDINGS: {"blocks": {"full_chunk": "3f804000", "mini_chunk_0": "40404080"}},
+        TITLE_EMBEDDING: {"values": "3f00bf00"},
+    }
+
+    fields = _vespa_embedding_fields(cast(Any, _chunk(None)), EmbeddingPrecision.FLOAT)
+    assert fields[TITLE_EMBEDDING] is None
+
+
+def test_embedding_fields_without_hex_encoding() -> None:
+    with patch(
+        "onyx.document_index.vespa.indexing_utils.VESPA_TENSOR_HEX_ENCODING", False
+    ):
+        fields = _vespa_embedding_fields(
+            cast(Any, _chunk([0.5, -0.5])), EmbeddingPrecision.BFLOAT16
+        )
+
+    assert fields == {
+        EMBEDDINGS: {"full_chunk": [1.0, 2.0], "mini_chunk_0": [3.0, 4.0]},
+        TITLE_EMBEDDING: [0.5, -0.5],
+    }
+
+
+def test_query_embedding_param() -> None:
+    assert _query_embedding_param([1.0, -2.0]) == "tensor<float>(x[2]):3f800000c0000000"
+    with patch("onyx.document_index.vespa.index.VESPA_TENSOR_HEX_ENCODING", False):
+        assert _query_embedding_param([1.0, -2.0]) == "[1.0, -2.0]"
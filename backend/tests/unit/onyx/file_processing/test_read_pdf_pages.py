@@ -0,0 +1,88 @@
+from io import BytesIO
+
+from pypdf import PdfWriter
+from pypdf.generic import DecodedStreamObject
+from pypdf.generic import DictionaryObject
+from pypdf.generic import NameObject
+
+from onyx.connectors.file.connector import _process_file
+from onyx.file_processing.extract_file_text import read_pdf_file
+from onyx.file_processing.extract_file_text import read_pdf_pages
+
+
+def _make_pdf(page_texts: list[str]) -> bytes:
+    writer = PdfWriter()
+    font = writer._add_object(
+        DictionaryObject(
+            {
+                NameObject("/Type"): NameObject("/Font"),
+                NameObject("/Subtype"): NameObject("/Type1"),
+                NameObject("/BaseFont"): NameObject("/Helvetica"),
+            }
+        )
+    )
+    for text in page_texts:
+        page = writer.add_blank_page(width=612, height=792)
+        content = DecodedStreamObject()
+        content.set_data(f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode())
+        page[NameObject("/Contents")] = writer._add_object(content)
+        page[NameObject("/Resources")] = DictionaryObject(
+            {NameObject("/Font"): DictionaryObject({NameObject("/F1"): font})}
+        )
+
+    buffer = BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def test_pages_are_read_one_by_one() -> None:
+    pdf = _make_pdf(["page one", "page two", "page three"])
+
+    pages, _ = read_pdf_pages(BytesIO(pdf))
+
+    assert next(pages) == (1, "page one")
+    assert list(pages) == [(2, "page two"), (3, "page three")]
+    assert read_pdf_file(BytesIO(pdf))[0] == "page one\n\npage two\n\npage three"
+
+
+def test_reading_stops_after_max_chars() -> None:
+    pdf = _make_pdf(["page one", "page two", "page three"])
+
+    pages, _ = read_pdf_pages(BytesIO(pdf), max_chars=10)
+
+    assert [page_number for page_number, _ in pages] == [1, 2]
+
+
+def test_max_chars_counts_the_stripped_text() -> None:
+    padding = " " * 20
+    pdf = _make_pdf([f"{padding}page one{padding}", "page two", "page three"])
+
+    pages, _ = read_pdf_pages(BytesIO(pdf), max_chars=10)
+
+    assert list(pages) == [(1, "page one"), (2, "page two")]
+
+
+def test_invalid_pdf_has_no_pages() -> None:
+    pages, metadata = read_pdf_pages(BytesIO(b"not a pdf"))
+
+    assert list(pages) == []
+    assert metadata == {}
+
+
+def test_file_connector_sections_link_to_pages() -> None:
+    pdf = _make_pdf(["page one", "", "page three"])
+
+    (document,) = _process_file(
+        "manual.pdf",
+        BytesIO(pdf),
+        metadata={"link": "https://example.com/manual.pdf"},
+        use_unstructured=False,
+    )
+
+    assert [(section.link, section.text) for section in document.sections] == [
+        ("https://example.com/manual.pdf#page=1", "page one"),
+        ("https://example.com/manual.pdf#page=3", "page three"),
+    ]
+
+    (document,) = _process_file("manual.pdf", BytesIO(pdf), use_unstructured=False)
+    assert [section.link for section in document.sections] == [None, None]
@@ -0,0 +1,98 @@
+import os
+from io import BytesIO
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+from typing import cast
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+
+from onyx.file_store.chat_file_cache import ChatFileCache
+from onyx.file_store.models import ChatFileType
+from onyx.file_store.models import InMemoryChatFile
+from onyx.file_store.utils import load_all_chat_files
+
+
+def test_memory_is_bounded_by_size() -> None:
+    cache = ChatFileCache(max_bytes=10)
+
+    cache.put(("t", "a"), b"aaaa")
+    cache.put(("t", "b"), b"bbbb")
+    assert cache.get(("t", "a")) == b"aaaa"
+    # evicts b, a was used more recently
+    cache.put(("t", "c"), b"cccc")
+
+    assert cache.get(("t", "b")) is None
+    assert cache.get(("t", "a")) == b"aaaa"
+    assert cache.get(("t", "c")) == b"cccc"
+    # larger than the whole cache
+    cache.put(("t", "d"), b"d" * 11)
+    assert cache.get(("t", "d")) is None
+    # the key includes the tenant
+    assert cache.get(("other", "a")) is None
+
+
+def test_evicted_files_spill_to_disk(tmp_path: Path) -> None:
+    cache = ChatFileCache(max_bytes=4, disk_dir=str(tmp_path), max_disk_bytes=8)
+
+    cache.put(("t", "a"), b"aaaa")
+    cache.put(("t", "b"), b"bbbb")
+    cache.put(("t", "large"), b"l" * 6)
+
+    # b evicted a from memory to disk, large only fits on disk and evicted a there
+    assert cache.get(("t", "large")) == b"l" * 6
+    assert cache.get(("t", "a")) is None
+    assert cache.get(("t", "b")) == b"bbbb"
+
+    cache.clear()
+    assert os.listdir(tmp_path) == []
+    assert cache.get(("t", "b")) is None
+
+
+def test_lazy_content_is_loaded_once() -> None:
+    load_content = MagicMock(return_value=b"content")
+    file = InMemoryChatFile(
+        file_id="a", file_type=ChatFileType.PLAIN_TEXT, load_content=load_content
+    )
+
+    assert not file.is_loaded
+    assert file.content == b"content"
+    assert file.content == b"content"
+    assert load_content.call_count == 1
+
+    with pytest.raises(ValueError):
+        InMemoryChatFile(file_id="a", file_type=ChatFileType.PLAIN_TEXT)
+
+
+def test_history_files_load_lazily() -> None:
+    file_store = MagicMock()
+    file_store.read_file.side_effect = lambda file_id, mode: BytesIO(file_id.encode())
+    new_file: Any = {"id": "new", "type": ChatFileType.PLAIN_TEXT}
+    history_file: Any = {"id": "old", "type": ChatFileType.IMAGE}
+    history = [
+        SimpleNamespace(files=[history_file, new_file]),
+        SimpleNamespace(files=None),
+    ]
+
+    with (
+        patch("onyx.file_store.utils.get_default_file_store", return_value=file_store),
+        patch("onyx.file_store.utils.get_session_with_tenant", MagicMock()),
+        patch(
+            "onyx.file_store.utils.get_chat_file_cache",
+            return_value=ChatFileCache(max_bytes=1024),
+        ),
+    ):
+        files = load_all_chat_files(cast(Any, history), [new_file], MagicMock())
+
+        assert [file.file_id for file in files] == ["new", "old"]
+        assert [file.is_loaded for file in files] == [True, False]
+        assert file_store.read_file.call_count == 1
+
+        assert files[1].content == b"old"
+        # served from the cache on the next turn
+        files = load_all_chat_files(cast(Any, history), [new_file], MagicMock())
+        assert files[0].content == b"new"
+        assert files[1].content == b"old"
+        assert file_store.read_file.call_count == 2
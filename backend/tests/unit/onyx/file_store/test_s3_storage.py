@@ -0,0 +1,234 @@
+import hashlib
+import re
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from io import BytesIO
+from urllib.parse import parse_qs
+from urllib.parse import urlparse
+
+import pytest
+
+from onyx.file_store.s3_storage import build_s3_client
+from onyx.file_store.s3_storage import S3ObjectStorage
+
+_BUCKET = "test-bucket"
+
+
+class _S3StandIn:
+    """The parts of the S3 API used by S3ObjectStorage, in memory"""
+
+    def __init__(self) -> None:
+        self.objects: dict[str, bytes] = {}
+        # upload id -> part number -> content
+        self.uploads: dict[str, dict[int, bytes]] = {}
+        self.requests: list[tuple[str, str]] = []
+        self.lock = threading.Lock()
+
+
+def _make_handler(s3: _S3StandIn) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format: str, *args: object) -> None:
+            pass
+
+        def _key_and_query(self) -> tuple[str, dict[str, list[str]]]:
+            url = urlparse(self.path)
+            # path style addressing: /bucket/key
+            key = url.path.split("/", 2)[2]
+            with s3.lock:
+                s3.requests.append((self.command, url.query))
+            return key, parse_qs(url.query, keep_blank_values=True)
+
+        def _body(self) -> bytes:
+            return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        def _respond(
+            self, status: int, body: bytes = b"", headers: dict | None = None
+        ) -> None:
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(body)
+
+        def do_PUT(self) -> None:
+            key, query = self._key_and_query()
+            body = self._body()
+            etag = f'"{hashlib.md5(body).hexdigest()}"'
+            with s3.lock:
+                if "uploadId" in query:
+                    upload = s3.uploads[query["uploadId"][0]]
+                    upload[int(query["partNumber"][0])] = body
+                else:
+                    s3.objects[key] = body
+            self._respond(200, headers={"ETag": etag})
+
+        def do_POST(self) -> None:
+            key, query = self._key_and_query()
+            body = self._body()
+            if "uploads" in query:
+                with s3.lock:
+                    upload_id = f"upload-{len(s3.uploads)}"
+                    s3.uploads[upload_id] = {}
+                self._respond(
+                    200,
+                    (
+                        "<InitiateMultipartUploadResult>"
+                        f"<Bucket>{_BUCKET}</Bucket><Key>{key}</Key>"
+                        f"<UploadId>{upload_id}</UploadId>"
+                        "</InitiateMultipartUploadResult>"
+                    ).encode(),
+                )
+                return
+
+            part_numbers = [
+                int(number)
+                for number in re.findall(rb"<PartNumber>(\d+)</PartNumber>", body)
+            ]
+            with s3.lock:
+                upload = s3.uploads.pop(query["uploadId"][0])
+                s3.objects[key] = b"".join(upload[number] for number in part_numbers)
+            self._respond(
+                200,
+                (
+                    "<CompleteMultipartUploadResult>"
+                    f'<Bucket>{_BUCKET}</Bucket><Key>{key}</Key><ETag>"etag"</ETag>'
+                    "</CompleteMultipartUploadResult>"
+                ).encode(),
+            )
+
+        def do_GET(self) -> None:
+            key, _ = self._key_and_query()
+            content = s3.objects[key]
+            range_header = self.headers.get("Range")
+            if range_header is None:
+                self._respond(200, content)
+                return
+
+            match = re.fullmatch(r"bytes=(\d+)-(\d+)", range_header)
+            assert match
+            start, end = int(match.group(1)), int(match.group(2))
+            end = min(end, len(content) - 1)
+            self._respond(
+                206,
+                content[start : end + 1],
+                headers={"Content-Range": f"bytes {start}-{end}/{len(content)}"},
+            )
+
+        def do_HEAD(self) -> None:
+            key, _ = self._key_and_query()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(s3.objects[key])))
+            self.end_headers()
+
+        def do_DELETE(self) -> None:
+            key, query = self._key_and_query()
+            with s3.lock:
+                if "uploadId" in query:
+                    s3.uploads.pop(query["uploadId"][0], None)
+                else:
+                    s3.objects.pop(key, None)
+            self._respond(204)
+
+    return Handler
+
+
+@pytest.fixture
+def s3() -> Iterator[tuple[_S3StandIn, S3ObjectStorage]]:
+    stand_in = _S3StandIn()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(stand_in))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        client = build_s3_client(f"http://127.0.0.1:{server.server_address[1]}")
+        yield stand_in, S3ObjectStorage(_BUCKET, client=client, chunk_size=5)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def _credentials(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "test")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "test")
+
+
+def test_small_upload_is_a_single_put(
+    s3: tuple[_S3StandIn, S3ObjectStorage],
+) -> None:
+    stand_in, storage = s3
+
+    storage.upload("small", BytesIO(b"abc"))
+
+    assert stand_in.objects["small"] == b"abc"
+    assert [method for method, _ in stand_in.requests] == ["PUT"]
+    assert storage.read("small") == b"abc"
+
+
+def test_large_upload_is_a_multipart_upload(
+    s3: tuple[_S3StandIn, S3ObjectStorage],
+) -> None:
+    stand_in, storage = s3
+    content = b"0123456789abcdefghij-"
+
+    storage.upload("large", BytesIO(content))
+
+    assert stand_in.objects["large"] == content
+    # 5 parts of at most the chunk size
+    assert [method for method, _ in stand_in.requests].count("PUT") == 5
+    assert not stand_in.uploads
+    assert b"".join(storage.iter_chunks("large")) == content
+
+
+def test_failed_multipart_upload_is_aborted(
+    s3: tuple[_S3StandIn, S3ObjectStorage],
+) -> None:
+    stand_in, storage = s3
+
+    class _FailingContent(BytesIO):
+        def read(self, size: int | None = -1) -> bytes:
+            if self.tell() >= 10:
+                raise OSError("connection lost")
+            return super().read(size)
+
+    with pytest.raises(OSError):
+        storage.upload("failed", _FailingContent(b"0123456789abcdef"))
+
+    assert "failed" not in stand_in.objects
+    assert not stand_in.uploads
+
+
+def test_ranged_reads(s3: tuple[_S3StandIn, S3ObjectStorage]) -> None:
+    stand_in, storage = s3
+    stand_in.objects["ranged"] = b"0123456789abcdefghij"
+
+    assert storage.read_range("ranged", 3, 4) == b"3456"
+    # clipped to the end of the object
+    assert storage.read_range("ranged", 18, 10) == b"ij"
+
+    stand_in.requests.clear()
+    with storage.open("ranged") as file:
+        file.seek(-5, 2)
+        assert file.read(2) == b"fg"
+        file.seek(1)
+        assert file.read(3) == b"123"
+        assert file.read() == b"456789abcdefghij"
+
+    # only the ranges which were read are fetched
+    methods = [method for method, _ in stand_in.requests]
+    assert methods[0] == "HEAD"
+    assert methods.count("GET") == 3
+
+
+def test_delete(s3: tuple[_S3StandIn, S3ObjectStorage]) -> None:
+    stand_in, storage = s3
+    stand_in.objects["deleted"] = b"abc"
+
+    storage.delete("deleted")
+
+    assert "deleted" not in stand_in.objects
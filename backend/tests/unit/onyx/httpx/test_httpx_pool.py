@@ -0,0 +1,90 @@
+import socket
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from onyx.httpx.httpx_pool import HttpxPool
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        body = b"{}"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def server_url() -> Iterator[str]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def close_clients() -> Iterator[None]:
+    yield
+    HttpxPool.close_all()
+
+
+def test_pool_reuses_connections(server_url: str) -> None:
+    HttpxPool.init_client("test", http2=False, timeout=5)
+    client = HttpxPool.get("test")
+
+    for _ in range(5):
+        client.get(server_url).raise_for_status()
+
+    metrics = HttpxPool.get_metrics("test")
+    assert metrics is not None
+    assert metrics.requests == 5
+    assert metrics.failed_requests == 0
+    assert metrics.in_flight == 0
+    assert metrics.max_in_flight == 1
+    assert metrics.new_connections == 1
+    assert metrics.reused_connections == 4
+    assert metrics.connection_reuse_rate == pytest.approx(0.8)
+    assert metrics.avg_queue_seconds >= 0
+
+
+def test_pool_counts_failed_requests() -> None:
+    # a port nothing listens on
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    HttpxPool.init_client("test", http2=False, timeout=5)
+    with pytest.raises(httpx.ConnectError):
+        HttpxPool.get("test").get(f"http://127.0.0.1:{port}")
+
+    metrics = HttpxPool.get_metrics("test")
+    assert metrics is not None
+    assert metrics.requests == 1
+    assert metrics.failed_requests == 1
+    assert metrics.in_flight == 0
+
+
+def test_caller_trace_still_called(server_url: str) -> None:
+    events: list[str] = []
+
+    HttpxPool.get("test").get(
+        server_url, extensions={"trace": lambda name, info: events.append(name)}
+    )
+
+    assert "connection.connect_tcp.started" in events
+    assert HttpxPool.get_metrics("unknown") is None
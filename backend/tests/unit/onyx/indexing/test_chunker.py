@@ -1,10 +1,15 @@
+import random
+import re
+
 import pytest
 
 from onyx.configs.constants import DocumentSource
+from onyx.configs.constants import SECTION_SEPARATOR
 from onyx.connectors.models import Document
 from onyx.connectors.models import Section
 from onyx.indexing.chunker import Chunker
 from onyx.indexing.embedder import DefaultIndexingEmbedder
+from onyx.natural_language_processing.utils import BaseTokenizer
 from tests.unit.onyx.indexing.conftest import MockHeartbeat
 
 
@@ -81,3 +86,175 @@ def test_chunker_heartbeat(
 
     assert mock_heartbeat.call_count == 1
     assert len(chunks) > 0
+
+
+class CountingTokenizer(BaseTokenizer):
+    """Whitespace tokenizer that records how often and how many characters it has been
+    asked to tokenize"""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.chars_tokenized = 0
+        self._vocab: dict[str, int] = {}
+
+    def encode(self, string: str) -> list[int]:
+        return [
+            self._vocab.setdefault(token, len(self._vocab))
+            for token in self.tokenize(string)
+        ]
+
+    def tokenize(self, string: str) -> list[str]:
+        self.calls += 1
+        self.chars_tokenized += len(string)
+        return string.split()
+
+    def decode(self, tokens: list[int]) -> str:
+        id_to_token = {token_id: token for token, token_id in self._vocab.items()}
+        return " ".join(id_to_token[token_id] for token_id in tokens)
+
+
+class MergingTokenizer(CountingTokenizer):
+    """Attaches trailing newlines to the preceding token, so like tiktoken the joined
+    text can have fewer tokens than its parts"""
+
+    def tokenize(self, string: str) -> list[str]:
+        self.calls += 1
+        self.chars_tokenized += len(string)
+        return re.findall(r"\S+\n*|\n+", string)
+
+
+def _many_section_document(num_sections: int) -> Document:
+    return Document(
+        id=f"many_sections_{num_sections}",
+        source=DocumentSource.SLACK,
+        semantic_identifier="Many Sections",
+        metadata={},
+        doc_updated_at=None,
+        sections=[
+            Section(text=f"Reply number {i} in a long thread.", link=f"link{i}")
+            for i in range(num_sections)
+        ],
+    )
+
+
+def test_chunker_tokenization_scales_linearly() -> None:
+    """Chunking a document with many small sections must only tokenize each section
+    a constant number of times, not the whole accumulated chunk per appended section"""
+    chars_per_section: list[float] = []
+    for num_sections in (500, 4000):
+        tokenizer = CountingTokenizer()
+        chunker = Chunker(
+            tokenizer=tokenizer,
+            enable_multipass=False,
+            chunk_token_limit=100_000,
+        )
+        document = _many_section_document(num_sections)
+        tokenizer.calls = tokenizer.chars_tokenized = 0
+        chunks = chunker._chunk_document(
+            document,
+            title_prefix="",
+            metadata_suffix_semantic="",
+            metadata_suffix_keyword="",
+            content_token_limit=100_000,
+        )
+
+        assert len(chunks) == 1
+        assert len(chunks[0].source_links or {}) == num_sections
+        # a constant number of tokenizer calls per section
+        assert tokenizer.calls <= 3 * num_sections
+        section_chars = sum(len(section.text) for section in document.sections)
+        chars_per_section.append(tokenizer.chars_tokenized / section_chars)
+
+    # with re-tokenization of the growing chunk this ratio grows with the section count
+    assert chars_per_section[1] < chars_per_section[0] * 1.5
+
+
+def test_chunker_link_offsets_and_boundaries() -> None:
+    tokenizer = CountingTokenizer()
+    chunker = Chunker(tokenizer=tokenizer, enable_multipass=False)
+    document = Document(
+        id="offsets_doc",
+        source=DocumentSource.WEB,
+        semantic_identifier="Offsets",
+        metadata={},
+        doc_updated_at=None,
+        sections=[
+            Section(text="one two three", link="a"),
+            Section(text="four five", link="b"),
+            Section(text="six seven eight", link="c"),
+        ],
+    )
+    chunks = chunker._chunk_document(
+        document,
+        title_prefix="",
+        metadata_suffix_semantic="",
+        metadata_suffix_keyword="",
+        content_token_limit=6,
+    )
+
+    assert [chunk.content for chunk in chunks] == [
+        "one two three\n\nfour five",
+        "six seven eight",
+    ]
+    assert chunks[0].source_links == {0: "a", len("onetwothree"): "b"}
+    assert chunks[1].source_links == {0: "c"}
+
+
+def _reference_chunk_contents(
+    tokenizer: BaseTokenizer, section_texts: list[str], content_token_limit: int
+) -> list[str]:
+    """The chunking of small sections before running token counts were introduced,
+    which re-tokenized the whole chunk for every appended section"""
+    contents: list[str] = []
+    chunk_text = ""
+    for section_text in section_texts:
+        section_token_count = len(tokenizer.tokenize(section_text))
+        current_token_count = len(tokenizer.tokenize(chunk_text))
+        next_section_tokens = (
+            len(tokenizer.tokenize(SECTION_SEPARATOR)) + section_token_count
+        )
+        if next_section_tokens + current_token_count <= content_token_limit:
+            if chunk_text:
+                chunk_text += SECTION_SEPARATOR
+            chunk_text += section_text
+        else:
+            contents.append(chunk_text)
+            chunk_text = section_text
+    if chunk_text.strip() or not contents:
+        contents.append(chunk_text)
+    return contents
+
+
+@pytest.mark.parametrize("tokenizer_cls", [CountingTokenizer, MergingTokenizer])
+def test_chunker_matches_reference_chunking(
+    tokenizer_cls: type[CountingTokenizer],
+) -> None:
+    rng = random.Random(0)
+    words = ["alpha", "beta", "gamma", "delta.", "epsilon,", "zeta!"]
+    section_texts = [
+        " ".join(rng.choice(words) for _ in range(rng.randint(1, 12)))
+        for _ in range(500)
+    ]
+    document = Document(
+        id="reference_doc",
+        source=DocumentSource.SLACK,
+        semantic_identifier="Reference",
+        metadata={},
+        doc_updated_at=None,
+        sections=[Section(text=text, link=None) for text in section_texts],
+    )
+
+    tokenizer = tokenizer_cls()
+    chunker = Chunker(tokenizer=tokenizer, enable_multipass=False)
+    for content_token_limit in (20, 37, 64):
+        chunks = chunker._chunk_document(
+            document,
+            title_prefix="",
+            metadata_suffix_semantic="",
+            metadata_suffix_keyword="",
+            content_token_limit=content_token_limit,
+        )
+        expected = _reference_chunk_contents(
+            tokenizer, section_texts, content_token_limit
+        )
+        assert [chunk.content for chunk in chunks] == expected
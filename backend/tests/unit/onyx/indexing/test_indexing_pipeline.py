@@ -1,9 +1,14 @@
 from typing import List
+from unittest.mock import MagicMock
+from unittest.mock import patch
 
 from onyx.configs.app_configs import MAX_DOCUMENT_CHARS
 from onyx.connectors.models import Document
 from onyx.connectors.models import DocumentSource
+from onyx.connectors.models import IndexAttemptMetadata
 from onyx.connectors.models import Section
+from onyx.db.tag import upsert_document_tags
+from onyx.indexing.indexing_pipeline import _upsert_documents_in_db
 from onyx.indexing.indexing_pipeline import filter_documents
 
 
@@ -118,3 +123,68 @@ def test_filter_documents_multiple_documents() -> None:
 def test_filter_documents_empty_batch() -> None:
     result = filter_documents([])
     assert len(result) == 0
+
+
+def test_upsert_documents_in_db_upserts_tags_in_bulk() -> None:
+    docs = [
+        create_test_document(doc_id="1"),
+        create_test_document(doc_id="2"),
+    ]
+    docs[0].metadata = {"status": "open", "labels": ["a", "b"]}
+    docs[1].metadata = {"status": "open"}
+
+    with patch(
+        "onyx.indexing.indexing_pipeline.upsert_documents"
+    ) as mock_upsert_documents, patch(
+        "onyx.indexing.indexing_pipeline.upsert_document_tags"
+    ) as mock_upsert_tags:
+        _upsert_documents_in_db(
+            documents=docs,
+            index_attempt_metadata=IndexAttemptMetadata(
+                connector_id=1, credential_id=1
+            ),
+            db_session=MagicMock(),
+        )
+
+    mock_upsert_documents.assert_called_once()
+    mock_upsert_tags.assert_called_once()
+    assert mock_upsert_tags.call_args.args[1] == {
+        "1": [
+            ("status", "open", DocumentSource.FILE),
+            ("labels", "a", DocumentSource.FILE),
+            ("labels", "b", DocumentSource.FILE),
+        ],
+        "2": [("status", "open", DocumentSource.FILE)],
+    }
+
+
+def test_upsert_document_tags_dedupes_tags() -> None:
+    db_session = MagicMock()
+    tag_rows = [
+        (10, "status", "open", DocumentSource.JIRA),
+        (11, "labels", "a", DocumentSource.JIRA),
+    ]
+    db_session.execute.side_effect = [None, tag_rows, None]
+
+    upsert_document_tags(
+        db_session,
+        {
+            "1": [
+                ("status", "open", DocumentSource.JIRA),
+                ("labels", "a", DocumentSource.JIRA),
+                # too long to be used as a tag
+                ("labels", "x" * 300, DocumentSource.JIRA),
+            ],
+            "2": [("status", "open", DocumentSource.JIRA)],
+        },
+    )
+
+    # insert the tags, fetch their ids, insert the associations
+    assert db_session.execute.call_count == 3
+    tag_insert, _, association_insert = (
+        call.args[0] for call in db_session.execute.call_args_list
+    )
+    assert len(tag_insert.compile().params) == 2 * 3
+    params = list(association_insert.compile().params.values())
+    assert sorted(zip(params[::2], params[1::2])) == [("1", 10), ("1", 11), ("2", 10)]
+    db_session.commit.assert_called_once()
@@ -0,0 +1,136 @@
+import time
+from datetime import datetime
+from datetime import timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+from onyx.configs.constants import DocumentSource
+from onyx.connectors.models import Document
+from onyx.connectors.models import Section
+from onyx.db.models import IndexingStatus
+from onyx.indexing.indexing_pipeline import ChunkedDocumentBatch
+from onyx.indexing.indexing_pipeline import index_doc_batch_embed
+from onyx.indexing.indexing_profiler import IndexingProfile
+from onyx.indexing.indexing_profiler import IndexingProfiler
+from onyx.indexing.indexing_profiler import IndexingStage
+from onyx.indexing.indexing_profiler import profile_stage
+from onyx.server.documents.models import IndexAttemptSnapshot
+
+
+def _doc(doc_id: str, text: str) -> Document:
+    return Document(
+        id=doc_id,
+        source=DocumentSource.FILE,
+        semantic_identifier=doc_id,
+        sections=[Section(text=text, link=None)],
+        metadata={},
+    )
+
+
+def test_measure_accumulates_per_stage() -> None:
+    profiler = IndexingProfiler()
+
+    for _ in range(2):
+        with profiler.measure(IndexingStage.CHUNKING) as measurement:
+            measurement.add_documents([_doc("1", "abc"), _doc("2", "é")])
+            time.sleep(0.01)
+
+    # failures still count towards the time spent in the stage
+    with pytest.raises(ValueError):
+        with profiler.measure(IndexingStage.INDEX_WRITE):
+            raise ValueError("write failed")
+
+    profile = profiler.get_profile()
+    chunking = profile.stages[IndexingStage.CHUNKING]
+    assert chunking.calls == 2
+    assert chunking.items == 4
+    # utf-8 bytes, not characters
+    assert chunking.bytes == 2 * (3 + 2)
+    assert chunking.wall_time_seconds >= 0.02
+    # sleeping does not use CPU
+    assert chunking.cpu_time_seconds < chunking.wall_time_seconds
+
+    assert profile.stages[IndexingStage.INDEX_WRITE].calls == 1
+    assert profile.stages[IndexingStage.EMBEDDING].calls == 0
+    assert profile.slowest_stage == IndexingStage.CHUNKING
+
+
+def test_profile_document_batches() -> None:
+    profiler = IndexingProfiler()
+
+    def slow_connector() -> object:
+        for i in range(3):
+            time.sleep(0.01)
+            yield [_doc(str(i), "text")], {"position": i}
+
+    batches = list(profiler.profile_document_batches(slow_connector()))  # type: ignore
+
+    assert [checkpoint for _, checkpoint in batches] == [
+        {"position": 0},
+        {"position": 1},
+        {"position": 2},
+    ]
+    fetch = profiler.get_profile().stages[IndexingStage.CONNECTOR_FETCH]
+    # the exhausted connector is not counted as a call
+    assert fetch.calls == 3
+    assert fetch.items == 3
+    assert fetch.bytes == 3 * len("text")
+    assert fetch.wall_time_seconds >= 0.03
+
+
+def test_pipeline_stage_is_profiled() -> None:
+    profiler = IndexingProfiler()
+    embedder = MagicMock()
+    embedder.embed_chunks.side_effect = lambda chunks: chunks
+    chunks = [MagicMock(content="chunk one"), MagicMock(content="chunk two")]
+
+    index_doc_batch_embed(
+        chunked_batch=ChunkedDocumentBatch.model_construct(
+            filtered_documents=[], ctx=None, chunks=chunks
+        ),
+        embedder=embedder,
+        profiler=profiler,
+    )
+
+    embedding = profiler.get_profile().stages[IndexingStage.EMBEDDING]
+    assert embedding.calls == 1
+    assert embedding.items == 2
+    assert embedding.bytes == 2 * len("chunk one")
+
+    # without a profiler nothing is counted
+    with profile_stage(None, IndexingStage.EMBEDDING) as measurement:
+        measurement.add_chunks(chunks)
+    assert measurement.items == 0
+
+
+def test_profile_is_exposed_on_the_attempt_snapshot() -> None:
+    profiler = IndexingProfiler()
+    profiler.record(IndexingStage.CONNECTOR_FETCH, wall_time=1.0, cpu_time=0.1)
+    profiler.record(IndexingStage.EMBEDDING, wall_time=5.0, cpu_time=0.2, items=10)
+
+    index_attempt = MagicMock(
+        id=1,
+        status=IndexingStatus.SUCCESS,
+        new_docs_indexed=1,
+        total_docs_indexed=1,
+        docs_removed_from_index=0,
+        error_msg=None,
+        error_rows=[],
+        full_exception_trace=None,
+        time_started=None,
+        time_updated=datetime.now(timezone.utc),
+        # stored as JSON on the attempt
+        performance_profile=profiler.get_profile().model_dump(mode="json"),
+    )
+    snapshot = IndexAttemptSnapshot.from_index_attempt_db_model(index_attempt)
+
+    assert snapshot.slowest_stage == IndexingStage.EMBEDDING
+    assert snapshot.performance_profile is not None
+    assert snapshot.performance_profile.stages[IndexingStage.EMBEDDING].items == 10
+    assert IndexingProfile.model_validate(snapshot.model_dump()["performance_profile"])
+
+    index_attempt.performance_profile = None
+    snapshot = IndexAttemptSnapshot.from_index_attempt_db_model(index_attempt)
+    assert snapshot.performance_profile is None
+    assert snapshot.slowest_stage is None
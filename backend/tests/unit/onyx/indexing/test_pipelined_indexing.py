@@ -0,0 +1,180 @@
+import threading
+import time
+from collections.abc import Iterator
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+
+from onyx.configs.constants import DocumentSource
+from onyx.connectors.models import Document
+from onyx.connectors.models import IndexAttemptMetadata
+from onyx.connectors.models import Section
+from onyx.indexing import indexing_pipeline
+from onyx.indexing import pipelined_indexing
+from onyx.indexing.indexing_pipeline import ChunkedDocumentBatch
+from onyx.indexing.indexing_pipeline import IndexingPipelineResult
+from onyx.indexing.pipelined_indexing import PipelinedIndexer
+from onyx.utils.threadpool_concurrency import prefetch_iterator
+
+
+def _batch(batch_num: int, size: int = 2) -> list[Document]:
+    return [
+        Document(
+            id=f"doc_{batch_num}_{i}",
+            source=DocumentSource.FILE,
+            semantic_identifier=f"doc {batch_num} {i}",
+            sections=[Section(text="content", link=None)],
+            metadata={},
+        )
+        for i in range(size)
+    ]
+
+
+@pytest.fixture
+def fake_stages(monkeypatch: pytest.MonkeyPatch) -> list[tuple[str, int, str]]:
+    """Replaces the pipeline stages with fakes which record (stage, batch, thread)"""
+    events: list[tuple[str, int, str]] = []
+
+    def _batch_num(chunked_batch: ChunkedDocumentBatch) -> int:
+        return int(chunked_batch.filtered_documents[0].id.split("_")[1])
+
+    def fake_chunk(**kwargs: Any) -> ChunkedDocumentBatch:
+        batch = kwargs["document_batch"]
+        events.append(
+            ("chunk", int(batch[0].id.split("_")[1]), threading.current_thread().name)
+        )
+        return ChunkedDocumentBatch(filtered_documents=batch, ctx=None, chunks=[])
+
+    def fake_embed(**kwargs: Any) -> list:
+        chunked_batch = kwargs["chunked_batch"]
+        if chunked_batch.filtered_documents[0].id.startswith("doc_99"):
+            raise ValueError("embedding failed")
+        time.sleep(0.05)
+        events.append(
+            ("embed", _batch_num(chunked_batch), threading.current_thread().name)
+        )
+        return []
+
+    def fake_write(**kwargs: Any) -> IndexingPipelineResult:
+        chunked_batch = kwargs["chunked_batch"]
+        events.append(
+            ("write", _batch_num(chunked_batch), threading.current_thread().name)
+        )
+        return IndexingPipelineResult(
+            new_docs=1,
+            total_docs=len(chunked_batch.filtered_documents),
+            total_chunks=0,
+        )
+
+    monkeypatch.setattr(pipelined_indexing, "index_doc_batch_chunk", fake_chunk)
+    monkeypatch.setattr(pipelined_indexing, "index_doc_batch_embed", fake_embed)
+    monkeypatch.setattr(pipelined_indexing, "index_doc_batch_write", fake_write)
+    return events
+
+
+def _indexer(max_pending_batches: int) -> PipelinedIndexer:
+    return PipelinedIndexer(
+        chunker=MagicMock(enable_large_chunks=False),
+        embedder=MagicMock(),
+        document_index=MagicMock(),
+        index_attempt_metadata=IndexAttemptMetadata(connector_id=1, credential_id=1),
+        db_session=MagicMock(),
+        attempt_id=1,
+        max_pending_batches=max_pending_batches,
+    )
+
+
+def test_pipelined_indexer_order_and_backpressure(
+    fake_stages: list[tuple[str, int, str]]
+) -> None:
+    indexer = _indexer(max_pending_batches=2)
+
+    results: list[IndexingPipelineResult] = []
+    for batch_num in range(1, 6):
+        completed = indexer.submit(_batch(batch_num), batch_num=batch_num)
+        # never more than max_pending_batches waiting on the embedding stage
+        assert len(indexer._pending) <= 2
+        results.extend(completed)
+    results.extend(indexer.drain())
+    indexer.shutdown()
+
+    assert len(results) == 5
+    assert sum(result.total_docs for result in results) == 10
+
+    writes = [batch for stage, batch, _ in fake_stages if stage == "write"]
+    assert writes == [1, 2, 3, 4, 5]
+
+    main_thread = threading.current_thread().name
+    for stage, _, thread_name in fake_stages:
+        if stage == "embed":
+            assert thread_name != main_thread
+        else:
+            assert thread_name == main_thread
+
+    # batch 3 was chunked before batch 1 was written, i.e. the stages overlapped
+    assert fake_stages.index(("chunk", 3, main_thread)) < fake_stages.index(
+        ("write", 1, main_thread)
+    )
+    assert indexer.stage_stats["embed"].batches == 5
+
+
+def test_pipelined_indexer_failed_batch_raises(
+    fake_stages: list[tuple[str, int, str]]
+) -> None:
+    indexer = _indexer(max_pending_batches=1)
+    indexer.submit(_batch(99), batch_num=1)
+
+    # INDEXING_EXCEPTION_LIMIT defaults to 0, so the failure aborts the attempt
+    with pytest.raises(ValueError):
+        indexer.submit(_batch(2), batch_num=2)
+    indexer.shutdown()
+
+
+def test_pipelined_indexer_marks_tolerated_failures(
+    fake_stages: list[tuple[str, int, str]], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(indexing_pipeline, "INDEXING_EXCEPTION_LIMIT", 5)
+    monkeypatch.setattr(indexing_pipeline, "create_index_attempt_error", MagicMock())
+    indexer = _indexer(max_pending_batches=1)
+
+    results: list[IndexingPipelineResult] = []
+    for batch_num in (1, 99, 3):
+        results.extend(indexer.submit(_batch(batch_num), batch_num=batch_num))
+    results.extend(indexer.drain())
+    indexer.shutdown()
+
+    # the failed batch is reported in place so checkpoints never move past it
+    assert [result.failed for result in results] == [False, True, False]
+    assert indexer.index_attempt_metadata.num_exceptions == 1
+
+
+def test_prefetch_iterator_buffers_ahead_with_backpressure() -> None:
+    produced: list[int] = []
+
+    def producer() -> Iterator[int]:
+        for i in range(10):
+            produced.append(i)
+            yield i
+
+    timings: dict[str, float] = {}
+    prefetched = prefetch_iterator(producer(), max_prefetched=2, timings=timings)
+    assert next(prefetched) == 0
+
+    time.sleep(0.2)
+    # one item handed out, two buffered and one blocked on the full buffer
+    assert len(produced) <= 4
+
+    assert list(prefetched) == list(range(1, 10))
+    assert "produce" in timings and "wait" in timings
+
+
+def test_prefetch_iterator_propagates_errors() -> None:
+    def producer() -> Iterator[int]:
+        yield 1
+        raise RuntimeError("connector failed")
+
+    prefetched = prefetch_iterator(producer(), max_prefetched=1)
+    assert next(prefetched) == 1
+    with pytest.raises(RuntimeError, match="connector failed"):
+        next(prefetched)
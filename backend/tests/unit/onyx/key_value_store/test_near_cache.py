@@ -0,0 +1,120 @@
+import time
+from collections.abc import Iterator
+from typing import cast
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+
+from onyx.key_value_store.near_cache import KVNearCache
+from onyx.key_value_store.store import PgRedisKVStore
+from tests.unit.onyx.redis.conftest import FakePubSubBroker
+from tests.unit.onyx.redis.conftest import wait_for
+
+
+def _make_cache(broker: FakePubSubBroker, ttl_seconds: float = 60) -> KVNearCache:
+    cache = KVNearCache(
+        ttl_seconds=ttl_seconds, max_entries=2, redis_client_factory=broker.client
+    )
+    cache.version()
+    wait_for(lambda: cache._subscribed)
+    return cache
+
+
+def test_values_are_copied_and_expire() -> None:
+    cache = _make_cache(FakePubSubBroker(), ttl_seconds=0.05)
+
+    cache.put("t", "key", {"a": [1]}, cache.version())
+    found, value = cache.get("t", "key")
+    assert found and value == {"a": [1]}
+    cast(dict, value)["a"].append(2)
+    assert cache.get("t", "key") == (True, {"a": [1]})
+
+    time.sleep(0.1)
+    assert cache.get("t", "key") == (False, None)
+
+
+def test_bounded_number_of_entries() -> None:
+    cache = _make_cache(FakePubSubBroker())
+
+    for key in ("a", "b", "c"):
+        cache.put("t", key, key, cache.version())
+
+    assert cache.get("t", "a") == (False, None)
+    assert cache.get("t", "c") == (True, "c")
+
+
+def test_changes_invalidate_other_processes() -> None:
+    broker = FakePubSubBroker()
+    cache, other_cache = _make_cache(broker), _make_cache(broker)
+    for c in (cache, other_cache):
+        c.put("t", "key", "old", c.version())
+        c.put("other-tenant", "key", "old", c.version())
+
+    cache.publish_invalidation(broker.client(), "t", "key")
+
+    # dropped right away in the process which changed it
+    assert cache.get("t", "key") == (False, None)
+    wait_for(lambda: other_cache.get("t", "key") == (False, None))
+    assert other_cache.get("other-tenant", "key") == (True, "old")
+
+
+def test_value_loaded_before_a_change_is_not_cached() -> None:
+    cache = _make_cache(FakePubSubBroker())
+
+    version = cache.version()
+    # changed while the value was being loaded
+    cache.invalidate("t", "key")
+    cache.put("t", "key", "old", version)
+
+    assert cache.get("t", "key") == (False, None)
+
+
+def test_not_cached_while_unsubscribed() -> None:
+    broker = FakePubSubBroker()
+    cache = _make_cache(broker)
+    cache.put("t", "key", "value", cache.version())
+
+    with patch("onyx.redis.redis_invalidation._RESUBSCRIBE_DELAY_SECONDS", 0.2):
+        broker.disconnect()
+        wait_for(lambda: not cache._subscribed)
+
+        # changes may have been missed
+        assert cache.get("t", "key") == (False, None)
+        cache.put("t", "key", "value", cache.version())
+        assert cache.get("t", "key") == (False, None)
+
+        wait_for(lambda: cache._subscribed)
+    cache.put("t", "key", "value", cache.version())
+    assert cache.get("t", "key") == (True, "value")
+
+
+@pytest.fixture
+def kv_store() -> Iterator[tuple[PgRedisKVStore, MagicMock]]:
+    broker = FakePubSubBroker()
+    redis_client = MagicMock()
+    redis_client.get.return_value = b'{"enabled": true}'
+    redis_client.publish.side_effect = broker.publish
+    with patch.object(PgRedisKVStore, "_get_session"):
+        yield PgRedisKVStore(
+            redis_client=redis_client, near_cache=_make_cache(broker)
+        ), redis_client
+
+
+def test_loads_are_served_from_memory(
+    kv_store: tuple[PgRedisKVStore, MagicMock],
+) -> None:
+    store, redis_client = kv_store
+
+    assert store.load("settings") == {"enabled": True}
+    assert store.load("settings") == {"enabled": True}
+    assert redis_client.get.call_count == 1
+
+    store.store("settings", {"enabled": False})
+    redis_client.get.return_value = b'{"enabled": false}'
+    assert store.load("settings") == {"enabled": False}
+    assert redis_client.get.call_count == 2
+
+    store.delete("settings")
+    store.load("settings")
+    assert redis_client.get.call_count == 3
@@ -0,0 +1,63 @@
+from collections.abc import Iterator
+from unittest.mock import patch
+
+import pytest
+
+from onyx.llm.utils import get_max_input_tokens
+from onyx.llm.utils import get_model_capability_index
+from onyx.llm.utils import get_model_map
+from onyx.llm.utils import model_supports_image_input
+from onyx.llm.utils import refresh_model_capability_index
+
+_MODEL_COST = {
+    "openai/gpt-test": {"max_input_tokens": 1000, "supports_vision": True},
+    "gpt-test": {"max_input_tokens": 2000},
+    "llama-test": {"max_tokens": 3000},
+}
+
+
+@pytest.fixture(autouse=True)
+def model_cost() -> Iterator[None]:
+    refresh_model_capability_index()
+    with patch("onyx.llm.utils.litellm.model_cost", _MODEL_COST):
+        yield
+    refresh_model_capability_index()
+
+
+def test_lookups_use_fallbacks() -> None:
+    assert get_max_input_tokens("gpt-test", "openai", output_tokens=100) == 900
+    # without the provider prefix
+    assert get_max_input_tokens("gpt-test", "azure", output_tokens=100) == 1900
+    # extra provider prefix from a proxy and an ollama style tag
+    assert (
+        get_max_input_tokens("proxy/llama-test:8b", "ollama", output_tokens=0) == 3000
+    )
+
+    assert model_supports_image_input("gpt-test", "openai")
+    assert not model_supports_image_input("gpt-test", "azure")
+    assert not model_supports_image_input("unknown", "openai")
+
+
+def test_lookups_are_memoized() -> None:
+    index = get_model_capability_index()
+    model_obj = index.find("openai", "gpt-test")
+
+    with patch("onyx.llm.utils._find_model_obj") as find_model_obj:
+        assert index.find("openai", "gpt-test") is model_obj
+        assert index.find("openai", " gpt-test ") is model_obj
+        assert get_max_input_tokens("gpt-test", "openai", output_tokens=0) == 1000
+    find_model_obj.assert_not_called()
+
+    assert get_model_capability_index() is index
+    refresh_model_capability_index()
+    assert get_model_capability_index() is not index
+
+
+def test_model_map_is_read_only() -> None:
+    model_map = get_model_map()
+
+    assert model_map is get_model_map()
+    with pytest.raises(TypeError):
+        model_map["gpt-test"]["max_input_tokens"] = 5  # type: ignore
+    with pytest.raises(TypeError):
+        model_map["new-model"] = {}  # type: ignore
@@ -0,0 +1,186 @@
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from prometheus_client import REGISTRY
+
+from onyx.db.embedding_cache import fetch_cached_embeddings
+from onyx.natural_language_processing import embedding_cache
+from onyx.natural_language_processing.embedding_cache import (
+    build_embedding_cache_key,
+)
+from onyx.natural_language_processing.embedding_cache import EmbeddingCache
+from onyx.natural_language_processing.embedding_cache import pack_embedding
+from onyx.natural_language_processing.embedding_cache import QueryEmbeddingCache
+from onyx.natural_language_processing.embedding_cache import unpack_embedding
+from onyx.natural_language_processing.search_nlp_models import EmbeddingModel
+from shared_configs.enums import EmbedTextType
+from shared_configs.model_server_models import Embedding
+
+
+class InMemoryEmbeddingCache(EmbeddingCache):
+    def __init__(self) -> None:
+        super().__init__()
+        self.store: dict[str, Embedding] = {}
+
+    def get(self, cache_keys: list[str]) -> dict[str, Embedding]:
+        return {key: self.store[key] for key in cache_keys if key in self.store}
+
+    def put(self, model_name: str, key_to_embedding: dict[str, Embedding]) -> None:
+        self.store.update(key_to_embedding)
+
+
+def _embedding_model(cache: EmbeddingCache) -> EmbeddingModel:
+    return EmbeddingModel(
+        server_host="localhost",
+        server_port=9000,
+        model_name="intfloat/e5-base-v2",
+        normalize=True,
+        query_prefix="query: ",
+        passage_prefix="passage: ",
+        api_key=None,
+        api_url=None,
+        provider_type=None,
+        embedding_cache=cache,
+    )
+
+
+def _fake_encode(texts: list[str], **kwargs: object) -> list[Embedding]:
+    return [[float(len(text)), 1.0] for text in texts]
+
+
+def test_cache_hits_skip_model_server() -> None:
+    cache = InMemoryEmbeddingCache()
+    model = _embedding_model(cache)
+
+    with patch.object(
+        EmbeddingModel, "_batch_encode_texts", side_effect=_fake_encode
+    ) as mock_encode:
+        first = model.encode(["a", "bb", "a"], text_type=EmbedTextType.PASSAGE)
+        # duplicate texts are only sent once
+        assert mock_encode.call_args.kwargs["texts"] == ["a", "bb"]
+
+        second = model.encode(["bb", "ccc", "a"], text_type=EmbedTextType.PASSAGE)
+        # only the unseen text goes to the model server
+        assert mock_encode.call_args.kwargs["texts"] == ["ccc"]
+        assert mock_encode.call_count == 2
+
+        model.encode(["bb", "a"], text_type=EmbedTextType.PASSAGE)
+        assert mock_encode.call_count == 2
+
+    assert first == [[1.0, 1.0], [2.0, 1.0], [1.0, 1.0]]
+    assert second == [[2.0, 1.0], [3.0, 1.0], [1.0, 1.0]]
+
+
+def test_cache_key_covers_model_settings() -> None:
+    base_args = dict(
+        model_name="intfloat/e5-base-v2",
+        provider_type=None,
+        normalize=True,
+        prefix="passage: ",
+        text_type=EmbedTextType.PASSAGE,
+        max_seq_length=512,
+        text="some chunk text",
+    )
+    base_key = build_embedding_cache_key(**base_args)  # type: ignore
+    assert base_key == build_embedding_cache_key(**base_args)  # type: ignore
+
+    for field, value in [
+        ("model_name", "nomic-ai/nomic-embed-text-v1"),
+        ("normalize", False),
+        ("prefix", None),
+        ("text_type", EmbedTextType.QUERY),
+        ("max_seq_length", 2048),
+        ("text", "some chunk text "),
+        ("deployment_name", "my-azure-deployment"),
+    ]:
+        assert base_key != build_embedding_cache_key(
+            **{**base_args, field: value}  # type: ignore
+        )
+
+
+def test_pack_embedding_roundtrip() -> None:
+    embedding = [0.5, -1.25, 3.0, 0.0]
+    assert unpack_embedding(pack_embedding(embedding)) == embedding
+
+
+def test_query_embedding_cache_lru_and_ttl() -> None:
+    cache = QueryEmbeddingCache(max_entries=2, ttl_seconds=60, use_redis=False)
+    cache.put("model", {"a": [1.0], "b": [2.0]})
+
+    assert cache.get(["a"]) == {"a": [1.0]}
+    # "b" is now the least recently used entry
+    cache.put("model", {"c": [3.0]})
+    assert cache.get(["a", "b", "c"]) == {"a": [1.0], "c": [3.0]}
+    assert (cache.hits, cache.misses) == (3, 1)
+
+    with patch.object(embedding_cache.time, "monotonic", return_value=1e12):
+        assert cache.get(["a", "c"]) == {}
+
+
+def _lookups(result: str) -> float:
+    return (
+        REGISTRY.get_sample_value(
+            "onyx_query_embedding_cache_lookups_total", {"result": result}
+        )
+        or 0.0
+    )
+
+
+def test_query_embedding_cache_falls_back_to_redis() -> None:
+    redis_store: dict[str, bytes] = {}
+    redis_client = MagicMock()
+    redis_client.get.side_effect = redis_store.get
+    redis_client.set.side_effect = lambda key, value, ex: redis_store.update(
+        {key: value}
+    )
+
+    with patch.object(embedding_cache, "get_redis_client", return_value=redis_client):
+        writer = QueryEmbeddingCache(max_entries=10, ttl_seconds=60, use_redis=True)
+        writer.put("model", {"a": [0.5, 1.5]})
+        assert redis_client.set.call_args.kwargs["ex"] == 60
+
+        # e.g. another api server process
+        reader = QueryEmbeddingCache(max_entries=10, ttl_seconds=60, use_redis=True)
+        lookups_before = {
+            result: _lookups(result) for result in ("hit", "redis_hit", "miss")
+        }
+        assert reader.get(["a", "b"]) == {"a": [0.5, 1.5]}
+        assert reader.redis_hits == 1
+
+        # served locally from now on
+        redis_client.get.reset_mock()
+        assert reader.get(["a"]) == {"a": [0.5, 1.5]}
+        redis_client.get.assert_not_called()
+
+        assert {
+            result: _lookups(result) - lookups_before[result]
+            for result in ("hit", "redis_hit", "miss")
+        } == {"hit": 1, "redis_hit": 1, "miss": 1}
+
+
+def test_fetch_cached_embeddings_only_touches_stale_entries() -> None:
+    now = datetime.now(timezone.utc)
+    db_session = MagicMock()
+    db_session.execute.return_value.all.return_value = [
+        ("fresh", b"1", now - timedelta(minutes=5)),
+        ("stale", b"2", now - timedelta(days=2)),
+    ]
+
+    hits = fetch_cached_embeddings(db_session, ["fresh", "stale", "missing"])
+    assert hits == {"fresh": b"1", "stale": b"2"}
+    # one select and one update restricted to the stale key
+    assert db_session.execute.call_count == 2
+    update_stmt = db_session.execute.call_args.args[0]
+    assert update_stmt.compile().params["cache_key_1"] == ["stale"]
+
+    # recently used hits do not write at all
+    db_session.reset_mock()
+    db_session.execute.return_value.all.return_value = [
+        ("fresh", b"1", now - timedelta(minutes=5))
+    ]
+    assert fetch_cached_embeddings(db_session, ["fresh"]) == {"fresh": b"1"}
+    assert db_session.execute.call_count == 1
+    db_session.commit.assert_not_called()
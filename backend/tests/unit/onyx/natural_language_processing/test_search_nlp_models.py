@@ -0,0 +1,161 @@
+import threading
+import time
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+
+from onyx.natural_language_processing.search_nlp_models import EmbeddingModel
+from onyx.natural_language_processing.utils import BaseTokenizer
+from shared_configs.configs import parse_model_server_hosts
+from shared_configs.enums import EmbedTextType
+from shared_configs.model_server_models import EmbedRequest
+from shared_configs.model_server_models import EmbedResponse
+from shared_configs.utils import batch_by_token_budget
+
+
+class WhitespaceTokenizer(BaseTokenizer):
+    def encode(self, string: str) -> list[int]:
+        return [len(word) for word in string.split()]
+
+    def tokenize(self, string: str) -> list[str]:
+        return string.split()
+
+    def decode(self, tokens: list[int]) -> str:
+        raise NotImplementedError
+
+
+def test_batch_by_token_budget() -> None:
+    lengths = [10, 100, 10, 50, 10, 10, 100]
+    batches = batch_by_token_budget(lengths, token_budget=200, max_batch_size=3)
+
+    assert sorted(ind for batch in batches for ind in batch) == list(range(7))
+    for batch in batches:
+        assert len(batch) <= 3
+        assert len(batch) * max(lengths[ind] for ind in batch) <= 200
+    # the long items are not mixed in with the short ones
+    assert batches[0] == [1, 6]
+
+    # an item over the budget still goes through on its own
+    assert batch_by_token_budget([500, 1], token_budget=100, max_batch_size=8) == [
+        [0],
+        [1],
+    ]
+
+
+def _local_model(**kwargs: object) -> EmbeddingModel:
+    model = EmbeddingModel(
+        server_host="localhost",
+        server_port=9000,
+        model_name="intfloat/e5-base-v2",
+        normalize=True,
+        query_prefix=None,
+        passage_prefix=None,
+        api_key=None,
+        api_url=None,
+        provider_type=None,
+        **kwargs,  # type: ignore
+    )
+    model.tokenizer = WhitespaceTokenizer()
+    return model
+
+
+def test_local_batches_by_token_budget_and_keeps_order() -> None:
+    model = _local_model()
+
+    # a mix of mini chunks and full size chunks
+    texts = [
+        " ".join(f"w{i}" for _ in range(num_words))
+        for i, num_words in enumerate([2, 40, 3, 2, 40, 5, 2, 3])
+    ]
+
+    requests: list[EmbedRequest] = []
+
+    def fake_request(embed_request: EmbedRequest) -> EmbedResponse:
+        requests.append(embed_request)
+        return EmbedResponse(
+            embeddings=[[float(len(text.split()))] for text in embed_request.texts]
+        )
+
+    with patch.object(
+        EmbeddingModel, "_make_model_server_request", side_effect=fake_request
+    ):
+        embeddings = model._batch_encode_texts(
+            texts=texts,
+            text_type=EmbedTextType.PASSAGE,
+            batch_size=2,
+            max_seq_length=40,
+        )
+
+    assert embeddings == [[2.0], [40.0], [3.0], [2.0], [40.0], [5.0], [2.0], [3.0]]
+    # the two long chunks share a batch, the six short ones fit in a single other batch
+    assert sorted(len(request.texts) for request in requests) == [2, 6]
+
+
+def test_local_parallel_requests_round_robin_over_servers() -> None:
+    model = _local_model(additional_servers=[("replica-1", 9000), ("replica-2", 9001)])
+    texts = [f"text {i}" for i in range(12)]
+
+    urls: list[str] = []
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def fake_post(url: str, json: dict) -> MagicMock:
+        nonlocal in_flight, max_in_flight
+        with lock:
+            urls.append(url)
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        time.sleep(0.05)
+        with lock:
+            in_flight -= 1
+        response = MagicMock(status_code=200)
+        response.json.return_value = {
+            "embeddings": [[float(text.split()[1])] for text in json["texts"]]
+        }
+        return response
+
+    with patch(
+        "onyx.natural_language_processing.search_nlp_models.requests.post",
+        side_effect=fake_post,
+    ):
+        embeddings = model._batch_encode_texts(
+            texts=texts,
+            text_type=EmbedTextType.PASSAGE,
+            batch_size=1,
+            max_seq_length=2,
+            local_num_threads=3,
+        )
+
+    assert embeddings == [[float(i)] for i in range(12)]
+    assert max_in_flight > 1
+    assert sorted(set(urls)) == [
+        "http://localhost:9000/encoder/bi-encoder-embed",
+        "http://replica-1:9000/encoder/bi-encoder-embed",
+        "http://replica-2:9001/encoder/bi-encoder-embed",
+    ]
+    assert all(urls.count(url) == 4 for url in set(urls))
+
+
+def test_local_parallel_requests_stop_signal() -> None:
+    callback = MagicMock()
+    callback.should_stop.return_value = True
+    model = _local_model(callback=callback)
+
+    with patch.object(EmbeddingModel, "_make_model_server_request") as mock_request:
+        with pytest.raises(RuntimeError, match="stop signal"):
+            model._batch_encode_texts(
+                texts=["a", "b", "c"],
+                text_type=EmbedTextType.PASSAGE,
+                batch_size=1,
+                max_seq_length=2,
+                local_num_threads=2,
+            )
+        mock_request.assert_not_called()
+
+
+def test_parse_model_server_hosts() -> None:
+    assert parse_model_server_hosts(
+        "replica-1, replica-2:9001,http://replica-3 ,", default_port=9000
+    ) == [("replica-1", 9000), ("replica-2", 9001), ("http://replica-3", 9000)]
@@ -0,0 +1,62 @@
+import queue
+import time
+from collections.abc import Callable
+from collections.abc import Iterator
+from typing import cast
+from unittest.mock import MagicMock
+
+from redis.client import Redis
+
+
+class _FakePubSub:
+    def __init__(self, broker: "FakePubSubBroker") -> None:
+        self._broker = broker
+        self.channels: set[str] = set()
+        self.messages: queue.Queue[dict | None] = queue.Queue()
+
+    def subscribe(self, channel: str) -> None:
+        self.channels.add(channel)
+        self._broker.subscribers.append(self)
+        self.messages.put({"type": "subscribe", "channel": channel, "data": 1})
+
+    def listen(self) -> Iterator[dict]:
+        while True:
+            message = self.messages.get()
+            if message is None:
+                raise ConnectionError("Connection closed by server")
+            yield message
+
+    def close(self) -> None:
+        if self in self._broker.subscribers:
+            self._broker.subscribers.remove(self)
+
+
+class FakePubSubBroker:
+    """Redis pub/sub shared by the caches of several simulated processes"""
+
+    def __init__(self) -> None:
+        self.subscribers: list[_FakePubSub] = []
+
+    def client(self) -> Redis:
+        client = MagicMock()
+        client.pubsub.side_effect = lambda: _FakePubSub(self)
+        client.publish.side_effect = self.publish
+        return cast(Redis, client)
+
+    def publish(self, channel: str, data: str) -> None:
+        for subscriber in list(self.subscribers):
+            if channel in subscriber.channels:
+                subscriber.messages.put(
+                    {"type": "message", "channel": channel, "data": data.encode()}
+                )
+
+    def disconnect(self) -> None:
+        for subscriber in list(self.subscribers):
+            subscriber.messages.put(None)
+
+
+def wait_for(condition: Callable[[], bool], timeout: float = 5) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
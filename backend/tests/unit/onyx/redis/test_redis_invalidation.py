@@ -0,0 +1,37 @@
+from typing import Any
+from unittest.mock import patch
+
+from onyx.redis.redis_invalidation import RedisInvalidationSubscriber
+from tests.unit.onyx.redis.conftest import FakePubSubBroker
+from tests.unit.onyx.redis.conftest import wait_for
+
+
+def test_subscriber_receives_messages_of_its_channel() -> None:
+    broker = FakePubSubBroker()
+    messages: list[dict[str, Any]] = []
+    subscription_changes: list[bool] = []
+    subscriber = RedisInvalidationSubscriber(
+        channel="channel",
+        redis_client_factory=broker.client,
+        on_message=messages.append,
+        on_subscription_change=subscription_changes.append,
+        on_fork=lambda: None,
+    )
+    subscriber.ensure_started()
+    wait_for(lambda: subscription_changes == [True])
+
+    subscriber.publish(broker.client(), {"key": "a"})
+    RedisInvalidationSubscriber(
+        channel="other-channel",
+        redis_client_factory=broker.client,
+        on_message=messages.append,
+        on_subscription_change=subscription_changes.append,
+        on_fork=lambda: None,
+    ).publish(broker.client(), {"key": "b"})
+    wait_for(lambda: messages == [{"key": "a"}])
+
+    # messages may be missed until it is resubscribed
+    with patch("onyx.redis.redis_invalidation._RESUBSCRIBE_DELAY_SECONDS", 0.05):
+        broker.disconnect()
+        wait_for(lambda: subscription_changes == [True, False, True])
+    assert messages == [{"key": "a"}]
@@ -0,0 +1,69 @@
+import os
+import time
+
+import pytest
+
+from onyx.utils.process_pool import ProcessPool
+
+
+def _square(x: int) -> int:
+    return x * x
+
+
+def _fail_on_odd(x: int) -> int:
+    if x % 2:
+        raise ValueError(f"{x} is odd")
+    return x
+
+
+def _sleep(seconds: float) -> int:
+    time.sleep(seconds)
+    return os.getpid()
+
+
+def _allocate(num_mb: int) -> int:
+    return len(bytearray(num_mb * 1024 * 1024))
+
+
+def test_results_are_ordered() -> None:
+    with ProcessPool(num_processes=2) as pool:
+        results = list(pool.imap(_square, ((i,) for i in range(10))))
+
+    assert [result.args for result in results] == [(i,) for i in range(10)]
+    assert [result.value for result in results] == [i * i for i in range(10)]
+    assert all(result.error is None for result in results)
+
+
+def test_failures_are_per_task() -> None:
+    with ProcessPool(num_processes=1) as pool:
+        results = list(pool.imap(_fail_on_odd, [(1,), (2,), (3,)]))
+
+    assert [result.value for result in results] == [None, 2, None]
+    assert results[0].error == "ValueError: 1 is odd"
+    assert results[1].error is None
+
+
+def test_timeout_replaces_worker() -> None:
+    with ProcessPool(num_processes=1, timeout=2) as pool:
+        first, timed_out, after = pool.imap(_sleep, [(0,), (30,), (0,)])
+
+    assert timed_out.value is None
+    assert timed_out.error == "Timed out after 2 seconds"
+    # the worker which timed out was killed, a new one ran the next task
+    assert after.error is None
+    assert after.value != first.value
+
+
+def test_memory_limit() -> None:
+    with ProcessPool(num_processes=1, memory_limit_mb=1024) as pool:
+        too_large, small = pool.imap(_allocate, [(2048,), (1,)])
+
+    assert too_large.error == "Exceeded the memory limit"
+    assert small.value == 1024 * 1024
+
+
+def test_invalid_arguments() -> None:
+    with pytest.raises(ValueError):
+        ProcessPool(num_processes=0)
+    with pytest.raises(ValueError):
+        ProcessPool(num_processes=1, timeout=-1)
@@ -20,9 +20,15 @@ export enum RerankerProvider {
   LITELLM = "litellm",
 }
 
+export enum EmbeddingPrecision {
+  FLOAT = "float",
+  BFLOAT16 = "bfloat16",
+}
+
 export interface AdvancedSearchConfiguration {
   index_name: string | null;
   multipass_indexing: boolean;
+  embedding_precision: EmbeddingPrecision;
   multilingual_expansion: string[];
   disable_rerank_for_streaming: boolean;
   api_url: string | null;
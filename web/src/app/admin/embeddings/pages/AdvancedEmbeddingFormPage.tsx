@@ -3,13 +3,15 @@ import { Formik, Form, FormikProps, FieldArray, Field } from "formik";
 import * as Yup from "yup";
 import { TrashIcon } from "@/components/icons/icons";
 import { FaPlus } from "react-icons/fa";
-import { AdvancedSearchConfiguration } from "../interfaces";
+import { AdvancedSearchConfiguration, EmbeddingPrecision } from "../interfaces";
 import {
   BooleanFormField,
   Label,
+  SelectorFormField,
   SubLabel,
 } from "@/components/admin/connectors/Field";
 import NumberInput from "../../connectors/[connector]/pages/ConnectorInput/NumberInput";
+import { NEXT_PUBLIC_CLOUD_ENABLED } from "@/lib/constants";
 
 interface AdvancedEmbeddingFormPageProps {
   updateAdvancedEmbeddingDetails: (
@@ -31,6 +33,9 @@ const AdvancedEmbeddingFormPage = forwardRef<
         validationSchema={Yup.object().shape({
           multilingual_expansion: Yup.array().of(Yup.string()),
           multipass_indexing: Yup.boolean(),
+          embedding_precision: Yup.string().oneOf(
+            Object.values(EmbeddingPrecision)
+          ),
           disable_rerank_for_streaming: Yup.boolean(),
           num_rerank: Yup.number(),
         })}
@@ -95,6 +100,18 @@ const AdvancedEmbeddingFormPage = forwardRef<
               label="Multipass Indexing"
               name="multipass_indexing"
             />
+            {/* the indices shared by all tenants only store float embeddings */}
+            {!NEXT_PUBLIC_CLOUD_ENABLED && (
+              <SelectorFormField
+                name="embedding_precision"
+                label="Embedding Precision"
+                subtext="Precision the embeddings are stored with in the index. bfloat16 halves the memory needed for the vectors at a negligible loss in search quality."
+                options={[
+                  { name: "float32", value: EmbeddingPrecision.FLOAT },
+                  { name: "bfloat16", value: EmbeddingPrecision.BFLOAT16 },
+                ]}
+              />
+            )}
             <BooleanFormField
               subtext="Disable reranking for streaming to improve response time."
               optional
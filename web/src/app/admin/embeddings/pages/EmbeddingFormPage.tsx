@@ -19,6 +19,7 @@ import { ThreeDotsLoader } from "@/components/Loading";
 import AdvancedEmbeddingFormPage from "./AdvancedEmbeddingFormPage";
 import {
   AdvancedSearchConfiguration,
+  EmbeddingPrecision,
   RerankingDetails,
   SavedSearchSettings,
 } from "../interfaces";
@@ -39,6 +40,7 @@ export default function EmbeddingForm() {
     useState<AdvancedSearchConfiguration>({
       index_name: "",
       multipass_indexing: true,
+      embedding_precision: EmbeddingPrecision.FLOAT,
       multilingual_expansion: [],
       disable_rerank_for_streaming: false,
       api_url: null,
@@ -110,6 +112,7 @@ export default function EmbeddingForm() {
       setAdvancedEmbeddingDetails({
         index_name: searchSettings.index_name,
         multipass_indexing: searchSettings.multipass_indexing,
+        embedding_precision: searchSettings.embedding_precision,
         multilingual_expansion: searchSettings.multilingual_expansion,
         disable_rerank_for_streaming:
           searchSettings.disable_rerank_for_streaming,
@@ -156,7 +159,9 @@ export default function EmbeddingForm() {
   const needsReIndex =
     currentEmbeddingModel != selectedProvider ||
     searchSettings?.multipass_indexing !=
-      advancedEmbeddingDetails.multipass_indexing;
+      advancedEmbeddingDetails.multipass_indexing ||
+    searchSettings?.embedding_precision !=
+      advancedEmbeddingDetails.embedding_precision;
 
   const updateSearch = useCallback(async () => {
     if (!selectedProvider) {
@@ -208,6 +213,10 @@ export default function EmbeddingForm() {
                   advancedEmbeddingDetails.multipass_indexing && (
                   <li>Multipass indexing modification</li>
                 )}
+                {searchSettings?.embedding_precision !=
+                  advancedEmbeddingDetails.embedding_precision && (
+                  <li>Embedding precision modification</li>
+                )}
               </ul>
             </div>
           </div>
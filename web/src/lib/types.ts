@@ -131,6 +131,31 @@ export interface IndexAttemptSnapshot {
   full_exception_trace: string | null;
   time_started: string | null;
   time_updated: string;
+  performance_profile: IndexingProfile | null;
+  slowest_stage: IndexingStage | null;
+}
+
+export type IndexingStage =
+  | "connector_fetch"
+  | "doc_cleanup"
+  | "doc_filter"
+  | "db_upsert"
+  | "chunking"
+  | "embedding"
+  | "index_write"
+  | "metadata_update";
+
+export interface IndexingStageProfile {
+  wall_time_seconds: number;
+  cpu_time_seconds: number;
+  calls: number;
+  items: number;
+  bytes: number;
+}
+
+export interface IndexingProfile {
+  stages: Record<IndexingStage, IndexingStageProfile>;
+  wall_time_seconds: number;
 }
 
 export interface ConnectorStatus<ConnectorConfigType, ConnectorCredentialType> {